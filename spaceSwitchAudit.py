@@ -0,0 +1,371 @@
+'''
+code by kangddan
+https://github.com/kangddan
+https://space.bilibili.com/174575687
+https://animator.at8.fun/
+'''
+import os
+import io
+import re
+import json
+import time
+import multiprocessing
+from collections import OrderedDict
+
+'''
+read the SpaceSwitch meta nodes out of maya ascii files without maya, one pass per file:
+
+import spaceSwitchAudit
+spaceSwitchAudit.scanFile('scenes/hero.ma')['metas']
+report = spaceSwitchAudit.auditReport(spaceSwitchAudit.auditScenes(paths, workers=8))
+
+python -m spaceSwitchBatch audit scenes/ --workers 8 --report audit.json
+
+only the statements that matter are kept (createNode / rename -uid of every node, setAttr of network nodes and connectAttr),
+the attribute data that makes up most of a scene is skipped line by line, memory grows with the node count, not the file size
+'''
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+# the schema of MetaUtils.addMetaAttributes, this module does not import spaceSwitchTool (and maya)
+META_CLASS      = 'SpaceSwitch'
+META_TYPE       = 'network'
+SUMMARY_VERSION = 1
+DEFAULT_MODE    = 'condition'
+CONSTRAINTS     = OrderedDict([('point',  'pointConstraint'),
+                               ('orient', 'orientConstraint'),
+                               ('scale',  'scaleConstraint'),
+                               ('parent', 'parentConstraint')])
+NODE_ARRAYS     = ('spaceLocs', 'conditionNodes', 'matrixNodes')
+
+_TOKEN    = re.compile(r'"((?:[^"\\]|\\.)*)"|([^\s;]+)')
+_ESCAPE   = re.compile(r'\\(.)')
+_ESCAPES  = {'n': '\n', 't': '\t', 'r': '\r'}
+_ELEMENT  = re.compile(r'^(\w+)\[(\d+)\]$')
+_ATTRNAME = re.compile(r'^(?:target|tgt)\[(\d+)(?::\d+)?\]\.attrName$') # a range sets one value per element
+_UNKNOWN  = object() # a node connected from outside the file (a reference), it matches any uuid
+_SETATTR_FLAGS = ('-s', '-l', '-k', '-cb', '-ch', '-type', '-c', '-size', '-lock', '-keyable', '-channelBox', '-caching')
+
+def tokenize(statement):
+    '''
+    maya ascii statement -> [(isString, value), ...], "a" + "b" concatenations are joined
+    '''
+    tokens = []
+    for match in _TOKEN.finditer(statement):
+        string, word = match.groups()
+        if string is not None:
+            if '\\' in string:
+                string = _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), string)
+            if len(tokens) > 1 and tokens[-1] == (False, '+') and tokens[-2][0]:
+                tokens[-2:] = [(True, tokens[-2][1] + string)]
+                continue
+            tokens.append((True, string))
+        else:
+            tokens.append((False, word))
+    return tokens
+
+def readStatements(lines, wanted):
+    '''
+    yield (command, statement) for the statements whose first word passes wanted(command),
+    the others are skipped line by line without being kept
+    '''
+    keep, skip = None, False
+    for line in lines:
+        if keep is None and not skip:
+            stripped = line.lstrip()
+            if not stripped or stripped.startswith('//'):
+                continue
+            command = stripped.split(None, 1)[0].rstrip(';')
+            if wanted(command):
+                keep = []
+            else:
+                skip = True
+        if keep is not None:
+            keep.append(line)
+        if line.rstrip().endswith(';'):
+            if keep is not None:
+                yield command, ''.join(keep)
+            keep, skip = None, False
+
+# ---------------------------------------------------------------------------------------------
+class MaScan(object):
+    '''
+    the state of one file: a path and uuid for every node, the network nodes being read and the meta nodes found
+    '''
+    def __init__(self):
+        self.leaves  = {}          # leaf name: [path, ...]
+        self.uuids   = {}          # path: uuid
+        self.metas   = OrderedDict()
+        self.nodes   = 0
+        self.current = None        # path of the node the following setAttr / rename apply to
+        self.network = None        # raw attributes of the current network node
+
+    def wanted(self, command):
+        return command in ('createNode', 'rename', 'connectAttr', 'select') or \
+               (command == 'setAttr' and self.network is not None)
+
+    # -----------------------------------------------------------------
+    def resolve(self, name):
+        '''
+        a name as the file writes it (short, partial or full path) -> path, None when it is not in the file
+        '''
+        absolute = name.startswith('|')
+        name     = name.lstrip('|')
+        paths    = self.leaves.get(name.rsplit('|', 1)[-1], ())
+        if absolute or '|' not in name:
+            matches = [path for path in paths if path == name] if absolute else list(paths)
+        else:
+            matches = [path for path in paths if path == name or path.endswith('|' + name)]
+        return matches[0] if len(matches) == 1 else None
+
+    def uuidOf(self, name):
+        '''
+        _UNKNOWN for a node the file does not create or an old file without uuids
+        '''
+        path = self.resolve(name)
+        uuid = None if path is None else self.uuids.get(path)
+        return _UNKNOWN if uuid is None else uuid
+
+    # -----------------------------------------------------------------
+    def feed(self, command, statement):
+        tokens = tokenize(statement)
+        if command == 'createNode':
+            self._closeNetwork()
+            self._createNode(tokens)
+        elif command == 'rename':
+            values = [value for _, value in tokens[1:]]
+            if '-uid' in values and self.current is not None:
+                self.uuids[self.current] = values[values.index('-uid') + 1]
+        elif command == 'select':
+            self._closeNetwork()
+            self.current = None
+        elif command == 'setAttr':
+            self._setAttr(tokens)
+        elif command == 'connectAttr':
+            self._closeNetwork()
+            self._connectAttr(tokens)
+
+    def finish(self):
+        self._closeNetwork()
+        return [self._metaResult(path, meta) for path, meta in self.metas.items()]
+
+    def _createNode(self, tokens):
+        values = [value for _, value in tokens]
+        flags  = dict((values[i], values[i + 1]) for i in range(2, len(values) - 1) if values[i] in ('-n', '-p'))
+        name   = flags.get('-n', values[1] if len(values) > 1 else '')
+        parent = None
+        if '-p' in flags: # a parent the file did not create (a reference) keeps the name it is written with
+            parent = self.resolve(flags['-p']) or flags['-p'].lstrip('|')
+        path   = '{}|{}'.format(parent, name) if parent else name
+        self.leaves.setdefault(name, []).append(path)
+        self.uuids[path] = None
+        self.nodes  += 1
+        self.current = path
+        if len(values) > 1 and values[1] == META_TYPE:
+            self.network = {'attrNames': {}}
+
+    def _closeNetwork(self):
+        network, self.network = self.network, None
+        if network is not None and network.get('metaClass') == META_CLASS:
+            network.update(source=None, offsetGroup=None, spaceTargets={}, constraints={},
+                           arrays=dict((attrName, {}) for attrName in NODE_ARRAYS))
+            self.metas[self.current] = network
+
+    def _setAttr(self, tokens):
+        plug, values, i = None, [], 1
+        while i < len(tokens):
+            isString, value = tokens[i]
+            if not isString and value in _SETATTR_FLAGS:
+                i += 2
+                continue
+            if not isString and value.startswith('-'):
+                i += 1
+                continue
+            if plug is None:
+                plug = value
+            else:
+                values.append(value)
+            i += 1
+        if not plug or not values:
+            return
+        attr = plug.lstrip('.')
+        if attr in ('metaClass', 'mode', 'summary'):
+            self.network[attr] = values[-1]
+            return
+        element = _ATTRNAME.match(attr)
+        if element:
+            for offset, value in enumerate(values):
+                self.network['attrNames'][int(element.group(1)) + offset] = value
+
+    def _connectAttr(self, tokens):
+        plugs = [value for isString, value in tokens[1:] if isString]
+        if len(plugs) < 2 or '.' not in plugs[1]:
+            return
+        metaName, attr = plugs[1].split('.', 1)
+        meta = self.metas.get(metaName.lstrip('|')) if self.metas else None
+        if meta is None:
+            return
+        source = plugs[0].split('.', 1)[0]
+        parts  = attr.split('.')
+        match  = _ELEMENT.match(parts[0])
+        if attr in ('source', 'offsetGroup'):
+            meta[attr] = source
+        elif match and match.group(1) in ('target', 'tgt') and parts[-1] == 'spaceTarget':
+            meta['spaceTargets'][int(match.group(2))] = source
+        elif parts[-1] in CONSTRAINTS.values():
+            meta['constraints'][parts[-1]] = source
+        elif match and match.group(1) in NODE_ARRAYS:
+            meta['arrays'][match.group(1)][int(match.group(2))] = source
+
+    # -----------------------------------------------------------------
+    def _metaResult(self, path, meta):
+        '''
+        one meta node of the report, its summary is compared with the connections like SpaceSwitchMeta.checkSummaries
+        '''
+        indices = sorted(set(meta['attrNames']) | set(meta['spaceTargets']))
+        targets = [OrderedDict([('attrName'   , meta['attrNames'].get(index, '')),
+                                ('spaceTarget', meta['spaceTargets'].get(index)),
+                                ('uuid'       , self._uuid(meta['spaceTargets'].get(index)))]) for index in indices]
+        constraints = OrderedDict((conType, meta['constraints'][conCmd]) for conType, conCmd in CONSTRAINTS.items()
+                                  if conCmd in meta['constraints'])
+        arrays = OrderedDict((attrName, [meta['arrays'][attrName][index] for index in sorted(meta['arrays'][attrName])])
+                             for attrName in NODE_ARRAYS)
+        mode   = meta.get('mode') or DEFAULT_MODE
+        result = OrderedDict([('name'           , path),
+                              ('uuid'           , self.uuids.get(path)),
+                              ('mode'           , mode),
+                              ('source'         , meta['source']),
+                              ('sourceUuid'     , self._uuid(meta['source'])),
+                              ('offsetGroup'    , meta['offsetGroup']),
+                              ('offsetGroupUuid', self._uuid(meta['offsetGroup'])),
+                              ('conType'        , None if mode == 'matrix' else
+                                                  OrderedDict((conType, conType in constraints) for conType in CONSTRAINTS)),
+                              ('targets'        , targets),
+                              ('nodes'          , OrderedDict(arrays, constraints=constraints)),
+                              ('summary'        , None),
+                              ('issues'         , [])])
+        for key in ('source', 'offsetGroup'):
+            if meta[key] is None:
+                result['issues'].append('No {}'.format(key))
+        if not targets:
+            result['issues'].append('No targets')
+        for index, target in zip(indices, targets):
+            if target['spaceTarget'] is None:
+                result['issues'].append('Target {} ({}) has no spaceTarget'.format(index, target['attrName']))
+
+        result['summary'], record = self._checkSummary(meta.get('summary'), result, arrays, constraints)
+        if result['conType'] is None and record is not None: # matrix mode keeps it in blendMatrix weights, not connections
+            result['conType'] = OrderedDict((conType, bool(record.get('conType', {}).get(conType))) for conType in CONSTRAINTS)
+        if result['summary'] != 'ok':
+            result['issues'].append({'missing'    : 'No summary',
+                                     'unreadable' : 'Summary is not readable or of another version',
+                                     'stale'      : 'Summary does not match the connections'}[result['summary']])
+        for key in ('sourceUuid', 'offsetGroupUuid'):
+            result[key] = None if result[key] is _UNKNOWN else result[key]
+        for target in targets:
+            target['uuid'] = None if target['uuid'] is _UNKNOWN else target['uuid']
+        return result
+
+    def _uuid(self, name):
+        return None if name is None else self.uuidOf(name)
+
+    def _checkSummary(self, summary, result, arrays, constraints):
+        '''
+        return: ('ok', 'missing', 'unreadable' or 'stale', the summary record or None)
+        '''
+        if not summary:
+            return 'missing', None
+        try:
+            record = json.loads(summary)
+        except ValueError:
+            return 'unreadable', None
+        if not isinstance(record, dict) or record.get('version') != SUMMARY_VERSION:
+            return 'unreadable', None
+        nodes = OrderedDict((attrName, [self._uuid(name) for name in names]) for attrName, names in arrays.items())
+        nodes['constraints'] = dict((conType, self._uuid(name)) for conType, name in constraints.items())
+        live = (result['sourceUuid'], result['offsetGroupUuid'], result['mode'],
+                _UNKNOWN if result['conType'] is None else sorted(conType for conType, value in result['conType'].items() if value),
+                [(target['attrName'], target['uuid']) for target in result['targets']], nodes)
+        recorded = (record.get('sourceUuid'), record.get('offsetGroupUuid'), record.get('mode'),
+                    sorted(key for key, value in record.get('conType', {}).items() if value),
+                    [(target.get('attrName'), target.get('uuid')) for target in record.get('targets', [])],
+                    record.get('nodes'))
+        return 'ok' if _matches(live, recorded) else 'stale', record
+
+def _matches(live, recorded):
+    if live is _UNKNOWN:
+        return True
+    if isinstance(live, dict):
+        return isinstance(recorded, dict) and sorted(live) == sorted(recorded) and \
+               all(_matches(live[key], recorded[key]) for key in live)
+    if isinstance(live, (list, tuple)):
+        return isinstance(recorded, (list, tuple)) and len(live) == len(recorded) and \
+               all(_matches(a, b) for a, b in zip(live, recorded))
+    return live == recorded
+
+# ---------------------------------------------------------------------------------------------
+def scanFile(path):
+    '''
+    read the meta nodes of one maya ascii file
+    return: {'file', 'ok', 'bytes', 'seconds', 'nodes', 'metas': [...], 'error'}
+    '''
+    start  = _clock()
+    result = OrderedDict([('file', path), ('ok', False), ('bytes', 0), ('seconds', 0.0), ('nodes', 0),
+                          ('metas', []), ('error', None)])
+    try:
+        if path.lower().endswith('.mb'):
+            raise ValueError('Maya binary files can not be read without maya')
+        result['bytes'] = os.path.getsize(path)
+        scan = MaScan()
+        with io.open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for command, statement in readStatements(f, scan.wanted):
+                scan.feed(command, statement)
+        result.update(ok=True, nodes=scan.nodes, metas=scan.finish())
+    except Exception as e:
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+    result['seconds'] = _clock() - start
+    return result
+
+def auditScenes(paths, workers=None):
+    '''
+    generator, scanFile of every path in the order they finish
+    workers: processes to spread the files over, default: cpu count, 0 reads them one by one in this process
+    '''
+    paths   = list(paths)
+    workers = multiprocessing.cpu_count() if workers is None else workers
+    if not workers or len(paths) < 2:
+        for path in paths:
+            yield scanFile(path)
+        return
+    pool = multiprocessing.Pool(min(workers, len(paths)))
+    try:
+        for result in pool.imap_unordered(scanFile, paths):
+            yield result
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+def auditReport(results):
+    '''
+    one report of many scanFile results: totals, the switches per mode and per issue, then every file sorted by path
+    '''
+    files  = sorted(results, key=lambda result: result['file'])
+    metas  = [meta for result in files for meta in result['metas']]
+    modes, issues = OrderedDict(), OrderedDict()
+    for meta in metas:
+        modes[meta['mode']] = modes.get(meta['mode'], 0) + 1
+        for issue in meta['issues']:
+            issue = re.sub(r'^Target \d+ \(.*\)', 'Target', issue)
+            issues[issue] = issues.get(issue, 0) + 1
+    return OrderedDict([('files'     , len(files)),
+                        ('failed'    , sum(1 for result in files if not result['ok'])),
+                        ('bytes'     , sum(result['bytes'] for result in files)),
+                        ('metas'     , len(metas)),
+                        ('withIssues', sum(1 for meta in metas if meta['issues'])),
+                        ('modes'     , modes),
+                        ('issues'    , issues),
+                        ('scenes'    , files)])
@@ -0,0 +1,354 @@
+'''
+code by kangddan
+https://github.com/kangddan
+https://space.bilibili.com/174575687
+https://animator.at8.fun/
+'''
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import importlib
+import threading
+import subprocess
+import multiprocessing
+try:
+    import queue
+except ImportError: # mayapy 2019 - 2021
+    import Queue as queue
+from collections import OrderedDict, deque
+
+'''
+apply a spec file written by SpaceSwitchMeta.exportSpecs to many scenes, the scenes are spread over a pool of
+mayapy workers and every scene prints one json line as soon as it is done, then one summary line:
+
+mayapy -m spaceSwitchTool apply spec.json scenes/*.ma --workers 4
+python -m spaceSwitchBatch apply spec.jsonl scenes/ --replace --dry-run --mayapy "C:/Program Files/Autodesk/Maya2024/bin/mayapy.exe"
+python -m spaceSwitchBatch apply spec.json scenes/*.ma --stand-in --setup spaceSwitchBench:batchScene
+python -m spaceSwitchBatch audit assets/ --report audit.json   # maya ascii files are read without maya, see spaceSwitchAudit
+
+this module does not import maya, only the workers (and --workers 0, which runs in this process) load it
+'''
+
+_clock = getattr(time, 'perf_counter', time.time)
+SCENE_EXTENSIONS = ('.ma', '.mb')
+RESULT_KEYS      = ('scene', 'ok', 'switches', 'seconds', 'timings', 'build', 'error', 'worker')
+RESPAWNS         = 3 # crashed workers replaced per worker of the pool before the rest of the queue is failed
+
+def defaultWorkers():
+    '''
+    every mayapy holds a whole maya session, so the default pool stays small
+    '''
+    return max(1, min(4, multiprocessing.cpu_count()))
+
+def findMayapy():
+    '''
+    $MAYAPY, this interpreter when it is mayapy, then mayapy on PATH
+    return: path or None
+    '''
+    if os.environ.get('MAYAPY'):
+        return os.environ['MAYAPY']
+    if os.path.basename(sys.executable).lower().startswith('mayapy'):
+        return sys.executable
+    names = ('mayapy.exe', 'mayapy') if os.name == 'nt' else ('mayapy',)
+    for folder in os.environ.get('PATH', '').split(os.pathsep):
+        for name in names:
+            path = os.path.join(folder, name)
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
+    return None
+
+def expandScenes(patterns):
+    '''
+    files, shell patterns and folders (searched for .ma / .mb) to unique absolute paths, in order
+    a path that does not exist is kept so its worker reports it
+    '''
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(SCENE_EXTENSIONS))
+        elif any(char in pattern for char in '*?['):
+            paths.extend(sorted(glob.glob(pattern)))
+        else:
+            paths.append(pattern)
+
+    seen, scenes = set(), []
+    for path in (os.path.abspath(path) for path in paths):
+        if path not in seen:
+            seen.add(path)
+            scenes.append(path)
+    return scenes
+
+def failedResult(scene, error):
+    result = OrderedDict((key, None) for key in RESULT_KEYS)
+    result.update(scene=scene, ok=False, switches=0, seconds=0.0, error=error)
+    return result
+
+# ---------------------------------------------------------------------------------------------
+# worker side
+def initWorker(standIn=False):
+    '''
+    load maya (or the in-memory stand-in) in this process
+    return: the spaceSwitchTool module
+    '''
+    if standIn:
+        import spaceSwitchStandIn
+        if not spaceSwitchStandIn.isInstalled():
+            spaceSwitchStandIn.install()
+    else:
+        import maya.cmds
+        if not hasattr(maya.cmds, 'file'): # a bare mayapy, the commands only exist once maya is initialized
+            import maya.standalone
+            maya.standalone.initialize(name='python')
+    import spaceSwitchTool
+    return spaceSwitchTool
+
+def loadHook(setup):
+    '''
+    'module:function' to the function, it is called with the scene path after the scene is opened
+    '''
+    if not setup:
+        return None
+    if os.getcwd() not in sys.path:
+        sys.path.append(os.getcwd())
+    moduleName, _, name = setup.partition(':')
+    return getattr(importlib.import_module(moduleName), name or 'setup')
+
+def applyScene(tool, spec, scene, replace=False, save=True, setup=None):
+    '''
+    open scene, import the switches of spec in one createMany and save it
+    return: {'scene', 'ok', 'switches', 'seconds', 'timings', 'build', 'error', 'worker'}
+    '''
+    timer  = tool.PhaseTimer()
+    result = failedResult(scene, None)
+    result.update(timings=timer.timings, worker=os.getpid())
+    try:
+        with timer('open'):
+            if not os.path.isfile(scene):
+                raise IOError('No such scene: {}'.format(scene))
+            tool.cmds.file(scene, open=True, force=True, ignoreVersion=True)
+        if setup is not None:
+            with timer('setup'):
+                setup(scene)
+        with timer('apply'):
+            metas = tool.SpaceSwitchMeta.importSpecs(spec, replace=replace)
+        result.update(switches=len(metas), build=tool.SpaceSwitchMeta.lastBuildTimings)
+        if save:
+            with timer('save'):
+                tool.cmds.file(save=True, force=True)
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+    result['seconds'] = timer.total
+    return result
+
+def serve(spec, standIn=False, replace=False, save=True, setup=None):
+    '''
+    one pool worker: read scene paths from stdin, write one json result per line to stdout
+    everything maya prints goes to stderr so stdout only carries results
+    '''
+    out = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    tool = initWorker(standIn)
+    hook = loadHook(setup)
+    for line in iter(sys.stdin.readline, ''):
+        scene = line.strip()
+        if scene:
+            out.write(json.dumps(applyScene(tool, spec, scene, replace, save, hook)) + '\n')
+            out.flush()
+
+# ---------------------------------------------------------------------------------------------
+# pool side
+class _Worker(object):
+    '''
+    one worker process, a thread forwards its result lines to the pool queue and (self, None) once it exits
+    '''
+    def __init__(self, command, results):
+        self.scene   = None
+        self.done    = 0
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        universal_newlines=True, bufsize=1)
+        self.thread  = threading.Thread(target=self._read, args=(results,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _read(self, results):
+        for line in iter(self.process.stdout.readline, ''):
+            try:
+                results.put((self, json.loads(line)))
+            except ValueError: # not a result, pass it on
+                sys.stderr.write(line)
+        self.process.wait()
+        results.put((self, None))
+
+    def send(self, scene):
+        self.scene = scene
+        try:
+            self.process.stdin.write(scene + '\n')
+            self.process.stdin.flush()
+        except (IOError, OSError): # it already exited, the reader reports the scene
+            pass
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError):
+            pass
+
+def workerCommand(spec, standIn=False, replace=False, save=True, setup=None, executable=None):
+    script  = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+    command = [executable or sys.executable, script, 'worker', spec]
+    command += ['--stand-in'] * standIn + ['--replace'] * replace + ['--dry-run'] * (not save)
+    return command + (['--setup', setup] if setup else [])
+
+def applySpecs(spec, scenes, workers=None, executable=None, standIn=False, replace=False, save=True, setup=None):
+    '''
+    generator, yields one result per scene (see applyScene) in the order they finish
+    workers: processes to spread the scenes over, default: defaultWorkers(), 0 runs them one by one in this process
+    executable: the worker interpreter, default: findMayapy(), or this interpreter with standIn
+    a worker that dies fails its scene and is replaced, up to RESPAWNS times per worker, then the rest fails
+    '''
+    spec    = os.path.abspath(spec)
+    pending = deque(scenes)
+    workers = defaultWorkers() if workers is None else workers
+    if not workers:
+        tool = initWorker(standIn)
+        hook = loadHook(setup)
+        while pending:
+            yield applyScene(tool, spec, pending.popleft(), replace, save, hook)
+        return
+
+    executable = executable or (sys.executable if standIn else findMayapy())
+    if not executable:
+        raise RuntimeError('mayapy not found, pass executable or set $MAYAPY')
+    command = workerCommand(spec, standIn, replace, save, setup, executable)
+    results = queue.Queue()
+
+    def feed(worker):
+        if pending:
+            worker.send(pending.popleft())
+        else:
+            worker.close()
+
+    pool = [_Worker(command, results) for _ in range(min(workers, len(pending)))]
+    for worker in pool:
+        feed(worker)
+    size     = running = len(pool)
+    respawns = size * RESPAWNS
+    try:
+        while running:
+            worker, result = results.get()
+            if result is not None:
+                worker.scene = None
+                worker.done += 1
+                feed(worker)
+                yield result
+                continue
+
+            running -= 1
+            if worker.scene is None:
+                continue
+            yield failedResult(worker.scene, 'worker exited with code {}'.format(worker.process.returncode))
+            worker.scene = None
+            if pending and respawns:
+                respawns -= 1
+                pool.append(_Worker(command, results))
+                running += 1
+                feed(pool[-1])
+        while pending:
+            yield failedResult(pending.popleft(), 'no worker left, {} crashed workers were replaced'.format(len(pool) - size))
+    finally:
+        for worker in pool:
+            worker.close()
+            if worker.process.poll() is None and running:
+                worker.process.terminate()
+
+def audit(patterns, workers=None, report=None):
+    '''
+    spaceSwitchAudit over the scenes of patterns: one json line per file as they finish, then the totals
+    report: path of the whole report (spaceSwitchAudit.auditReport)
+    return: exit code, 1 when a file could not be read or a switch has issues
+    '''
+    import spaceSwitchAudit
+    start   = _clock()
+    results = []
+    for result in spaceSwitchAudit.auditScenes(expandScenes(patterns), workers):
+        results.append(result)
+        line = OrderedDict((key, result[key]) for key in ('file', 'ok', 'bytes', 'seconds', 'nodes', 'error'))
+        line.update(metas=len(result['metas']), issues=sum(len(meta['issues']) for meta in result['metas']))
+        sys.stdout.write(json.dumps(line) + '\n')
+        sys.stdout.flush()
+
+    summary = spaceSwitchAudit.auditReport(results)
+    summary['seconds'] = _clock() - start
+    if report:
+        with open(report, 'w') as f:
+            json.dump(summary, f, indent=4)
+    del summary['scenes']
+    sys.stdout.write(json.dumps({'summary': summary}) + '\n')
+    return 1 if summary['failed'] or summary['withIssues'] else 0
+
+# ---------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser   = argparse.ArgumentParser(prog='spaceSwitchBatch', description='apply and audit space switches across scenes without the UI')
+    commands = parser.add_subparsers(dest='command')
+
+    applyCmd  = commands.add_parser('apply', help='apply a spec file to many scenes, one json line per scene')
+    applyCmd.add_argument('spec', help='a spec file written by SpaceSwitchMeta.exportSpecs, .json or .jsonl')
+    applyCmd.add_argument('scenes', nargs='+', help='scene files, folders or patterns, e.g. scenes/*.ma')
+    applyCmd.add_argument('--workers', '-j', type=int, default=defaultWorkers(),
+                          help='worker processes, 0 runs the scenes in this process (default: %(default)s)')
+    applyCmd.add_argument('--mayapy', help='worker interpreter, default: $MAYAPY, this mayapy or mayapy on PATH')
+
+    auditCmd  = commands.add_parser('audit', help='read the meta nodes of maya ascii files without maya, one json line per file')
+    auditCmd.add_argument('scenes', nargs='+', help='scene files, folders or patterns, e.g. assets/')
+    auditCmd.add_argument('--workers', '-j', type=int, default=multiprocessing.cpu_count(),
+                          help='reader processes, 0 reads the files in this process (default: %(default)s)')
+    auditCmd.add_argument('--report', help='also write one json report with every meta node to this file')
+
+    workerCmd = commands.add_parser('worker', help='pool worker, reads scene paths from stdin')
+    workerCmd.add_argument('spec')
+    for sub in (applyCmd, workerCmd):
+        sub.add_argument('--stand-in', action='store_true', help='run on the in-memory stand-in (spaceSwitchStandIn), for testing')
+        sub.add_argument('--replace', action='store_true', help='replace the switches that already exist on the imported sources')
+        sub.add_argument('--dry-run', action='store_true', help='do not save the scenes')
+        sub.add_argument('--setup', help='module:function called with the scene path after it is opened')
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        serve(args.spec, args.stand_in, args.replace, not args.dry_run, args.setup)
+        return 0
+    if args.command == 'audit':
+        return audit(args.scenes, args.workers, args.report)
+    if args.command != 'apply':
+        parser.print_help()
+        return 2
+    if args.workers and not (args.mayapy or args.stand_in or findMayapy()):
+        parser.error('mayapy not found, pass --mayapy or set $MAYAPY')
+
+    scenes  = expandScenes(args.scenes)
+    summary = OrderedDict([('scenes', len(scenes)), ('ok', 0), ('failed', 0), ('switches', 0),
+                           ('seconds', 0.0), ('workers', args.workers)])
+    start   = _clock()
+    try:
+        for result in applySpecs(args.spec, scenes, args.workers, args.mayapy, args.stand_in,
+                                 args.replace, not args.dry_run, args.setup):
+            summary['ok' if result['ok'] else 'failed'] += 1
+            summary['switches'] += result['switches']
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+    except (OSError, RuntimeError) as e: # the workers could not be started
+        parser.exit(2, '{}: error: {}\n'.format(parser.prog, e))
+    summary['seconds'] = _clock() - start
+    sys.stdout.write(json.dumps({'summary': summary}) + '\n')
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
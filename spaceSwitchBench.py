@@ -0,0 +1,1023 @@
+import os
+import sys
+import json
+import subprocess
+import argparse
+from collections import OrderedDict
+
+import spaceSwitchStandIn
+try:
+    import maya.cmds as cmds
+except ImportError: # no maya, run on the in-memory stand-in
+    cmds, _ = spaceSwitchStandIn.install()
+
+import spaceSwitchTool
+from spaceSwitchTool import SpaceSwitchMeta, SpaceSwitchSpec, MetaUtils, MetaRegistry, NameAllocator, validateSpecs, _clock
+
+'''
+benchmarks for the meta node layer, run them on an empty scene (mayapy or the script editor):
+
+import spaceSwitchBench
+spaceSwitchBench.benchNodeDataRead(switches=200, targets=8)
+spaceSwitchBench.runSuite(sizes=[(10, 4), (100, 8)])
+
+outside maya the in-memory stand-in (spaceSwitchStandIn) is used, so the suite also runs on build boxes:
+
+python spaceSwitchBench.py --sizes 10x4 100x8 1000x8 --appends 10 100 1000 --frames 100 1000 5000 --specs 500x8 --edits 100x8 --health 1000x8 --validate 1000x8 --mirror 500x8 --rekey 50x8x500 --index 1000x8 --undo 500x8 --batch 20x50x8 --audit 20x50x8 --imports 5 --json bench.json
+'''
+
+STANDIN = spaceSwitchStandIn.isInstalled()
+IMPORT_BUDGET = 0.25 # seconds, median import of spaceSwitchTool in a fresh interpreter, maya modules already loaded
+
+def buildSpecs(switches, targets, mode='condition', prefix='bench'):
+    '''
+    shared target transforms and one offsetGroup | ctrl pair per switch
+    return: [nodeData, ...]
+    '''
+    spaceTargets = [cmds.createNode('transform', n='{}_space{}'.format(prefix, i)) for i in range(targets)]
+    specs = []
+    for i in range(switches):
+        offsetGroup = cmds.createNode('transform', n='{}_ctrl{}_grp'.format(prefix, i))
+        ctrl        = cmds.createNode('transform', n='{}_ctrl{}'.format(prefix, i), p=offsetGroup)
+        specs.append({'source'       : cmds.ls(ctrl, long=True)[0],
+                      'offsetGroup'  : cmds.ls(offsetGroup, long=True)[0],
+                      'conType'      : {'point': False, 'orient': False, 'scale': True, 'parent': True},
+                      'targetWidgets': dict((index, {'attrName': 'space{}'.format(index), 'spaceTarget': target})
+                                            for index, target in enumerate(spaceTargets)),
+                      'mode'         : mode})
+    return specs
+
+def bestOf(func, repeat=3):
+    '''
+    return: fastest wall time of func() in seconds
+    '''
+    times = []
+    for _ in range(repeat):
+        start = _clock()
+        func()
+        times.append(_clock() - start)
+    return min(times)
+
+def printTable(title, results, baseline=None):
+    baseline = baseline or list(results)[0]
+    print(title)
+    for name, seconds in results.items():
+        print('    {:<24} {:>9.4f}s  x{:.1f}'.format(name, seconds, results[baseline] / seconds if seconds else 0.0))
+
+# ---------------------------------------------------------------------------------------------
+class _CountingModule(object):
+    def __init__(self, module):
+        self._module = module
+        self.calls   = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        if not callable(attr):
+            return attr
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+class CallCounter(object):
+    '''
+    number of maya calls made inside the with block, the stand-in counts both cmds and om2 calls,
+    in maya only the cmds calls made by spaceSwitchTool are counted (om2 is None)
+    '''
+    def __init__(self):
+        self.cmds = 0
+        self.om2  = None
+
+    def __enter__(self):
+        if STANDIN:
+            spaceSwitchStandIn.resetCallCounts()
+        else:
+            self._cmds = spaceSwitchTool.cmds
+            spaceSwitchTool.cmds = _CountingModule(self._cmds)
+        return self
+
+    def __exit__(self, *args):
+        if STANDIN:
+            self.cmds = spaceSwitchStandIn.callCount('cmds.')
+            self.om2  = spaceSwitchStandIn.callCount('om2.')
+        else:
+            self.cmds = spaceSwitchTool.cmds.calls
+            spaceSwitchTool.cmds = self._cmds
+
+def measure(ops, name, func):
+    '''
+    time func() once and record it in ops[name]
+    return: the result of func
+    '''
+    with CallCounter() as counter:
+        start   = _clock()
+        result  = func()
+        seconds = _clock() - start
+    ops[name] = OrderedDict([('seconds', seconds), ('cmds', counter.cmds), ('om2', counter.om2)])
+    return result
+
+# ---------------------------------------------------------------------------------------------
+def legacyNodeData(meta):
+    '''
+    the nodeData getter before readNodeData, one cmds query per attribute
+    '''
+    return {'source'       : meta.source,
+            'offsetGroup'  : meta.offsetGroup,
+            'conType'      : meta.conType,
+            'targetWidgets': meta.target,
+            'mode'         : meta.mode}
+
+def benchNodeDataRead(switches=100, targets=8, repeat=3, metas=None):
+    '''
+    cmds getter vs the om2 single pass read vs the batch read
+    return: {name: seconds}
+    '''
+    metas = metas or SpaceSwitchMeta.createMany(buildSpecs(switches, targets))
+    if [legacyNodeData(meta) for meta in metas] != SpaceSwitchMeta.readMany(metas):
+        raise RuntimeError('readNodeData does not match the cmds getter')
+
+    results = OrderedDict()
+    results['cmds getter']  = bestOf(lambda: [legacyNodeData(meta) for meta in metas], repeat)
+    results['readNodeData'] = bestOf(lambda: [meta.readNodeData() for meta in metas], repeat)
+    results['readMany']     = bestOf(lambda: SpaceSwitchMeta.readMany(metas), repeat)
+    results['readSummaries'] = bestOf(lambda: SpaceSwitchMeta.readSummaries(metas), repeat)
+    printTable('nodeData read, {} switches x {} targets'.format(len(metas), targets), results)
+    return results
+
+def legacyConnectMiAttr(node, attr, metaNode, metaAttr):
+    '''
+    connectMiAttr before connectMiAttrs, one listConnections per slot until a free one is found
+    '''
+    index = 0
+    while True:
+        fullPathAttr = '{}.{}[{}]'.format(metaNode, metaAttr, index)
+        if cmds.listConnections(fullPathAttr, d=False) is None:
+            cmds.connectAttr('{}.{}'.format(node, attr), fullPathAttr, f=True)
+            break
+        index += 1
+
+def benchConnectMiAttr(counts=(10, 100, 1000)):
+    '''
+    append count message connections to conditionNodes, one at a time with the old slot search vs one connectMiAttrs call
+    return: [{'count', 'ops': {op: {'seconds', 'cmds', 'om2'}}}, ...]
+    '''
+    rows = []
+    for count in counts:
+        cmds.file(new=True, force=True)
+        nodes = [cmds.createNode('condition', n='bench_cond{}'.format(i)) for i in range(count)]
+        metas = [MetaUtils.createMetaNode('bench_{}_META'.format(name), SpaceSwitchMeta._NODETYPE) for name in ('legacy', 'batch')]
+        ops   = OrderedDict()
+        measure(ops, 'listConnections loop', lambda: [legacyConnectMiAttr(node, 'message', metas[0], 'conditionNodes') for node in nodes])
+        measure(ops, 'connectMiAttrs', lambda: MetaUtils.connectMiAttrs(nodes, 'message', metas[1], 'conditionNodes'))
+        if cmds.listConnections('{}.conditionNodes'.format(metas[0])) != cmds.listConnections('{}.conditionNodes'.format(metas[1])):
+            raise RuntimeError('connectMiAttrs does not match the listConnections loop')
+        rows.append(OrderedDict([('count', count), ('ops', ops)]))
+    return rows
+
+def benchSwitchSpace(frameCounts=(100, 1000, 5000), switches=10, targets=4, mode='matrix', tolerance=1e-6):
+    '''
+    match and switch every ctrl to the last space over frame ranges of growing length, the spaces are animated,
+    rotated and scaled. the ctrls have to keep their world matrix on a few sampled frames (not checked on the stand-in 
+    in the constraint modes, it does not evaluate constraints) and with numpy both solvers have to agree
+    return: [{'frames', 'switches', 'keys', 'phases': {phase: seconds}}, ...]
+    '''
+    cmds.file(new=True, force=True)
+    specs = buildSpecs(switches, targets, mode)
+    metas = SpaceSwitchMeta.createMany(specs)
+    for index in range(targets):
+        space = 'bench_space{}'.format(index)
+        cmds.setAttr('{}.rotate'.format(space), 10.0 * index, 20.0 * index, 0.0)
+        cmds.setAttr('{}.scale'.format(space), 1.0 + index * 0.5, 1.0 + index * 0.5, 1.0 + index * 0.5)
+        cmds.setKeyframe(space, attribute='translateX', time=1, value=0.0)
+        cmds.setKeyframe(space, attribute='translateX', time=max(frameCounts), value=float(index + 1) * 10.0)
+        
+    plugs = [MetaUtils.getPlug(MetaUtils.getMObject(data['source']), 'worldMatrix[0]') for data in specs]
+    def worlds(frames):
+        return MetaUtils.sampleMatrices(plugs, frames)
+    def differ(a, b):
+        return max(abs(x - y) for x, y in zip(a, b)) > tolerance
+        
+    if spaceSwitchTool.numpy is not None:
+        # flags: the build's parent + scale and one with rotate off, that mixes the space and offsetGroup matrices
+        for flags in ((True, True, True), (True, False, True)):
+            for meta in metas:
+                job = SpaceSwitchMeta._switchJob(meta, targets - 1)
+                matrices = MetaUtils.sampleMatrices(job['plugs'], range(1, min(frameCounts) + 1))
+                solved   = zip(SpaceSwitchMeta._solveNumpy(matrices, job['offset'], flags), 
+                               SpaceSwitchMeta._solveMatrices(matrices, job['offset'], flags))
+                if any(differ(a, b) for a, b in solved):
+                    raise RuntimeError('_solveNumpy does not match _solveMatrices on {}, flags {}'.format(meta, flags))
+                    
+    rows = []
+    for frames in frameCounts:
+        sampled = sorted(set([1, (frames + 1) // 2, frames]))
+        before  = worlds(sampled)
+        start = _clock()
+        keys  = SpaceSwitchMeta.switchSpaceMany(metas, targets - 1, range(1, frames + 1))
+        rows.append(OrderedDict([('frames', frames), ('switches', switches), ('keys', keys), ('seconds', _clock() - start),
+                                 ('phases', SpaceSwitchMeta.lastSwitchTimings)]))
+        if mode == 'matrix' or not STANDIN:
+            for data, old, new in zip(specs, before, worlds(sampled)):
+                if any(differ(a, b) for a, b in zip(old, new)):
+                    raise RuntimeError('switchSpaceMany moves {} over {} frames'.format(data['source'], frames))
+        cmds.undo()
+    return rows
+
+def benchSpecFiles(switches=500, targets=8, mode='condition', folder=None):
+    '''
+    export a whole rig to .json and .jsonl, delete every switch and import it again
+    return: {'switches', 'targets', 'ops': {op: {'seconds', 'cmds', 'om2'}}}
+    '''
+    import os
+    import tempfile
+    folder = folder or tempfile.gettempdir()
+    cmds.file(new=True, force=True)
+    metas = SpaceSwitchMeta.createMany(buildSpecs(switches, targets, mode))
+    ops   = OrderedDict()
+    before = SpaceSwitchMeta.readMany(metas)
+    for ext in ('json', 'jsonl'):
+        path = os.path.join(folder, 'spaceSwitchBench.{}'.format(ext))
+        measure(ops, 'export .{}'.format(ext), lambda: SpaceSwitchMeta.exportSpecs(path, metas))
+        ops['export .{}'.format(ext)]['bytes'] = os.path.getsize(path)
+        
+        for meta in MetaUtils.getMetaNodes():
+            del meta.nodeData
+        metas = measure(ops, 'import .{}'.format(ext), lambda: SpaceSwitchMeta.importSpecs(path))
+        if SpaceSwitchMeta.readMany(metas) != before:
+            raise RuntimeError('importSpecs does not rebuild the exported switches')
+        os.remove(path)
+    return OrderedDict([('switches', switches), ('targets', targets), ('ops', ops)])
+
+def benchEdit(switches=100, targets=8, mode='condition'):
+    '''
+    the same changes on animated switches, edited in place vs deleted and built again:
+    add a target, rename a field, reverse the targets, switch scale off, remove a target, change the mode
+    the edit has to match the rebuild and keep the spaceSwitch keys on their target, undo has to give back the switch
+    as it was and redo the edit
+    return: {'switches', 'targets', 'mode', 'ops': {op: {'seconds', 'cmds', 'om2'}}}
+    '''
+    import copy
+    def addTarget(data):
+        data['targetWidgets'][len(data['targetWidgets'])] = {'attrName': 'extra', 'spaceTarget': 'bench_extra'}
+    def renameField(data):
+        data['targetWidgets'][0]['attrName'] = 'renamed'
+    def reverseTargets(data):
+        widgets = [data['targetWidgets'][index] for index in sorted(data['targetWidgets'])]
+        data['targetWidgets'] = dict(enumerate(reversed(widgets)))
+    def scaleOff(data):
+        data['conType']['scale'] = False
+    def removeTarget(data):
+        widgets = [data['targetWidgets'][index] for index in sorted(data['targetWidgets'])][1:]
+        data['targetWidgets'] = dict(enumerate(widgets))
+    def otherMode(data):
+        modes = SpaceSwitchMeta.MODES
+        data['mode'] = modes[(modes.index(data.get('mode', modes[0])) + 1) % len(modes)]
+    def spaceKeys(specs):
+        return [cmds.getAttr('{}.spaceSwitch'.format(data['source']), time=10) for data in specs]
+    changes = OrderedDict([('add target', addTarget), ('rename field', renameField), ('reverse targets', reverseTargets),
+                           ('scale off', scaleOff), ('remove target', removeTarget), ('other mode', otherMode)])
+    
+    ops, results = OrderedDict(), []
+    for method in ('edit', 'rebuild'):
+        cmds.file(new=True, force=True)
+        specs = buildSpecs(switches, targets, mode)
+        cmds.createNode('transform', n='bench_extra')
+        metas = SpaceSwitchMeta.createMany(specs)
+        keyed = 'bench_space{}'.format(targets - 1)
+        for data in specs:
+            cmds.setKeyframe(data['source'], attribute='spaceSwitch', time=1, value=0)
+            cmds.setKeyframe(data['source'], attribute='spaceSwitch', time=10, value=targets - 1)
+            
+        for name, change in changes.items():
+            specs = copy.deepcopy(specs)
+            for data in specs:
+                change(data)
+            if method == 'edit':
+                previous, before, keys = metas, SpaceSwitchMeta.readMany(metas), spaceKeys(specs)
+                metas  = measure(ops, 'edit: ' + name, lambda: [meta.edit(data) for meta, data in zip(metas, specs)])
+                edited = SpaceSwitchMeta.readMany(metas)
+                spaces = [data['targetWidgets'][index]['spaceTarget'] for index in sorted(specs[0]['targetWidgets'])]
+                expected = spaces.index(keyed) if keyed in spaces else 0
+                if set(spaceKeys(specs)) != set([expected]):
+                    raise RuntimeError('edit: {} does not keep the spaceSwitch keys'.format(name))
+                    
+                # every edit is one undo step that has to give back the switch as it was, healthy
+                for _ in metas:
+                    cmds.undo()
+                report = SpaceSwitchMeta.checkScene(previous)
+                if report['healthy'] != len(previous) or SpaceSwitchMeta.readMany(previous) != before or spaceKeys(specs) != keys:
+                    raise RuntimeError('undo of edit: {} does not give back the switches as they were'.format(name))
+                for _ in metas:
+                    cmds.redo()
+                if SpaceSwitchMeta.readMany(metas) != edited:
+                    raise RuntimeError('redo of edit: {} does not match the edit'.format(name))
+            else:
+                def rebuild():
+                    for meta in metas:
+                        del meta.nodeData
+                    return SpaceSwitchMeta.createMany(specs)
+                metas = measure(ops, 'rebuild: ' + name, rebuild)
+            results.append(SpaceSwitchMeta.readMany(metas))
+    if results[:len(changes)] != results[len(changes):]:
+        raise RuntimeError('edit does not match the rebuild')
+    return OrderedDict([('switches', switches), ('targets', targets), ('mode', mode), ('ops', ops)])
+
+def legacyHealthScan(metas):
+    '''
+    the only check before checkScene: a switch was broken when its nodeData getter threw or could not be built again
+    '''
+    broken = []
+    for meta in metas:
+        try:
+            message = MetaUtils.checkNodeData(legacyNodeData(meta))
+        except (RuntimeError, TypeError, ValueError) as e:
+            message = str(e)
+        if message:
+            broken.append((meta, message))
+    return broken
+
+def benchHealth(switches=1000, targets=8, mode='condition', damage=10):
+    '''
+    checkScene on a clean rig against the legacy nodeData scan, then every damage-th switch is broken (a locator or
+    multMatrix deleted, the enum renamed, a selector disconnected, the source deleted, an orphaned condition added),
+    checked, repaired with repairScene and checked again, the scene has to come back clean
+    return: {'switches', 'targets', 'mode', 'damaged', 'issues': {category: count}, 'repaired', 'ops'}
+    '''
+    cmds.file(new=True, force=True)
+    specs = buildSpecs(switches, targets, mode)
+    metas = SpaceSwitchMeta.createMany(specs)
+    ops   = OrderedDict()
+    report = measure(ops, 'checkScene: clean', SpaceSwitchMeta.checkScene)
+    if report['healthy'] != switches:
+        raise RuntimeError('checkScene finds issues on a clean rig')
+    measure(ops, 'legacy nodeData scan', lambda: legacyHealthScan(metas))
+    
+    def deletePart(meta, data):
+        cmds.delete(meta.matrixNodes[1] if mode == 'matrix' else meta.spaceLocs[0])
+    def renameEnum(meta, data):
+        cmds.addAttr('{}.spaceSwitch'.format(data['source']), e=True, en=':'.join('drift{}'.format(i) for i in range(targets)))
+    def disconnectSelector(meta, data):
+        cmds.disconnectAttr('{}.spaceSwitch'.format(data['source']), '{}.firstTerm'.format(meta.conditionNodes[0]))
+    def deleteSource(meta, data):
+        cmds.delete(data['source'])
+    def addOrphan(meta, data):
+        cmds.createNode('condition', n='{}_spaceSwitch_condition'.format(data['source'].split('|')[-1] + '_orphan'))
+    damages = [deletePart, renameEnum, disconnectSelector, deleteSource, addOrphan]
+    damaged = list(range(0, switches, damage))
+    for count, index in enumerate(damaged):
+        damages[count % len(damages)](metas[index], specs[index])
+    teardowns = len(damaged[3::len(damages)])
+    orphans   = len(damaged[4::len(damages)]) # scene orphans, their switch stays healthy
+        
+    report = measure(ops, 'checkScene: damaged', SpaceSwitchMeta.checkScene)
+    issues = OrderedDict((category, len(report[category])) for category in ('brokenLinks', 'orphans', 'enumDrift'))
+    if report['healthy'] != switches - len(damaged) + orphans or issues['orphans'] < orphans:
+        raise RuntimeError('checkScene finds {} damaged switches, {} were damaged'.format(switches - report['healthy'], len(damaged) - orphans))
+    repaired = measure(ops, 'repairScene', lambda: SpaceSwitchMeta.repairScene(report))
+    report   = measure(ops, 'checkScene: repaired', SpaceSwitchMeta.checkScene)
+    if report['healthy'] != switches - teardowns or report['metas'] != report['healthy'] or report['orphans']:
+        raise RuntimeError('repairScene leaves issues behind')
+    return OrderedDict([('switches', switches), ('targets', targets), ('mode', mode), ('damaged', len(damaged)), 
+                        ('issues', issues), ('repaired', repaired), ('ops', ops)])
+
+def legacyValidate(specs):
+    '''
+    validation before validateSpecs: one spec at a time, every node name looked up on its own
+    '''
+    errors = []
+    for index, data in enumerate(specs):
+        message = MetaUtils.checkNodeData(data)
+        if not message:
+            names   = [data['source'], data['offsetGroup']] + [widget['spaceTarget'] for widget in data['targetWidgets'].values()]
+            message = 'Object does not exist' if None in [MetaUtils.getMObject(name) for name in names] else None
+            if not message and cmds.attributeQuery('spaceSwitch', node=data['source'], ex=True):
+                message = 'Source already has a space switch'
+        if message:
+            errors.append((index, message))
+    return errors
+
+def benchValidate(switches=1000, targets=8, mode='condition', broken=10):
+    '''
+    validateSpecs on a batch of nodeData dicts and of SpaceSwitchSpec objects against the legacy one spec at a time
+    validation, every broken-th spec points at a missing target and every other one of those shares an offsetGroup,
+    the specs also have to survive the nodeData round trip unchanged
+    return: {'switches', 'targets', 'mode', 'errors', 'ops'}
+    '''
+    cmds.file(new=True, force=True)
+    specs = buildSpecs(switches, targets, mode)
+    for count, index in enumerate(range(0, switches, broken)):
+        if count % 2:
+            specs[index]['offsetGroup'] = specs[index - 1]['offsetGroup']
+        else:
+            specs[index]['targetWidgets'][0]['spaceTarget'] = 'bench_missing{}'.format(index)
+    ops     = OrderedDict()
+    objects = measure(ops, 'nodeData -> spec', lambda: [SpaceSwitchSpec.fromNodeData(data) for data in specs])
+    if measure(ops, 'spec -> nodeData', lambda: [spec.toNodeData() for spec in objects]) != specs:
+        raise RuntimeError('the nodeData round trip is not lossless')
+    legacy  = measure(ops, 'legacy per spec', lambda: legacyValidate(specs))
+    errors  = measure(ops, 'validateSpecs: nodeData', lambda: validateSpecs(specs))
+    if measure(ops, 'validateSpecs: specs', lambda: validateSpecs(objects)) != errors:
+        raise RuntimeError('validateSpecs differs between nodeData and SpaceSwitchSpec')
+    expected = len(range(0, switches, broken))
+    if len(errors) != expected or len(legacy) != (expected + 1) // 2:
+        raise RuntimeError('validateSpecs finds {} broken specs, {} were broken'.format(len(errors), expected))
+    return OrderedDict([('switches', switches), ('targets', targets), ('mode', mode), ('errors', len(errors)), ('ops', ops)])
+
+def buildSidedSpecs(switches, targets, mode='condition'):
+    '''
+    L_ / R_ offsetGroup | ctrl pairs, half of the targets are shared (world, COG like), the other half have a side
+    return: [nodeData, ...] of the left side
+    '''
+    shared = [cmds.createNode('transform', n='bench_space{}'.format(i)) for i in range(targets - targets // 2)]
+    sided  = dict((side, [cmds.createNode('transform', n='{}_bench_space{}'.format(side, i)) for i in range(targets // 2)]) 
+                  for side in 'LR')
+    specs  = []
+    for i in range(switches):
+        for side in 'LR':
+            offsetGroup = cmds.createNode('transform', n='{}_bench_ctrl{}_grp'.format(side, i))
+            ctrl        = cmds.createNode('transform', n='{}_bench_ctrl{}'.format(side, i), p=offsetGroup)
+            if side == 'R':
+                continue
+            specs.append({'source'       : cmds.ls(ctrl, long=True)[0],
+                          'offsetGroup'  : cmds.ls(offsetGroup, long=True)[0],
+                          'conType'      : {'point': False, 'orient': False, 'scale': True, 'parent': True},
+                          'targetWidgets': dict((index, {'attrName': target, 'spaceTarget': target})
+                                                for index, target in enumerate(shared + sided['L'])),
+                          'mode'         : mode})
+    return specs
+
+def legacyMirror(metas):
+    '''
+    mirroring by hand: every switch read, its names looked up one by one and built on its own
+    '''
+    built = []
+    for meta in metas:
+        data   = meta.readNodeData()
+        mirror = SpaceSwitchMeta.mirrorName
+        spec   = {'source'       : cmds.ls(mirror(data['source']), long=True)[0],
+                  'offsetGroup'  : cmds.ls(mirror(data['offsetGroup']), long=True)[0],
+                  'conType'      : data['conType'],
+                  'targetWidgets': dict((index, {'attrName'   : mirror(widget['attrName']), 
+                                                 'spaceTarget': cmds.ls(mirror(widget['spaceTarget']), long=True)[0]}) 
+                                        for index, widget in data['targetWidgets'].items()),
+                  'mode'         : data['mode']}
+        built.extend(SpaceSwitchMeta.createMany([spec]))
+    return built
+
+def benchMirror(switches=500, targets=8, mode='condition'):
+    '''
+    mirrorMany of a whole left side against mirroring one switch at a time, both have to build the same right side
+    return: {'switches', 'targets', 'mode', 'mirrored', 'skipped', 'ops'}
+    '''
+    cmds.file(new=True, force=True)
+    metas = SpaceSwitchMeta.createMany(buildSidedSpecs(switches, targets, mode))
+    ops   = OrderedDict()
+    legacy = measure(ops, 'legacy one by one', lambda: legacyMirror(metas))
+    expected = SpaceSwitchMeta.readMany(legacy)
+    for meta in legacy:
+        del meta.nodeData
+    result = measure(ops, 'mirrorMany', lambda: SpaceSwitchMeta.mirrorMany(metas))
+    if result['skipped'] or SpaceSwitchMeta.readMany(result['metas']) != expected:
+        raise RuntimeError('mirrorMany does not build the same right side, skipped: {}'.format(result['skipped'][:3]))
+    skipped = measure(ops, 'mirrorMany: existing', lambda: SpaceSwitchMeta.mirrorMany(metas))
+    if skipped['metas'] or len(skipped['skipped']) != switches:
+        raise RuntimeError('mirrorMany builds a second switch on {} sources'.format(len(skipped['metas'])))
+    return OrderedDict([('switches', switches), ('targets', targets), ('mode', mode), ('mirrored', len(result['metas'])), 
+                        ('skipped', len(skipped['skipped'])), ('ops', ops)])
+
+def legacyRekey(metas, specs):
+    '''
+    createAttr before the in place edit: the spaceSwitch is deleted and added again, the animator keys it back one key
+    at a time
+    '''
+    for meta, data in zip(metas, specs):
+        ctrl   = data['source']
+        plug   = MetaUtils.getPlug(MetaUtils.getMObject(ctrl), 'spaceSwitch')
+        fields = cmds.attributeQuery('spaceSwitch', node=ctrl, listEnum=True)[0].split(':')
+        curve  = SpaceSwitchMeta._switchCurves(plug)[0]
+        keys   = [(curve.input(index).value, fields[int(round(curve.value(index)))]) for index in range(curve.numKeys)]
+        cmds.deleteAttr('{}.spaceSwitch'.format(ctrl))
+        attrNames = [widget['attrName'] for widget in data['targetWidgets'].values()]
+        cmds.addAttr(ctrl, ln='spaceSwitch', at='enum', k=True, en=':'.join(attrNames))
+        for time, field in keys:
+            cmds.setKeyframe(ctrl, at='spaceSwitch', t=time, v=attrNames.index(field) if field in attrNames else 0)
+
+def benchRekey(switches=50, targets=8, keys=500, mode='condition'):
+    '''
+    rebuild every switch of a keyed rig with its targets reversed, createAttr edits the spaceSwitch in place and remaps
+    the keys with one call per curve, against deleting the attribute and keying it again
+    return: {'switches', 'targets', 'keys', 'mode', 'ops'}
+    '''
+    def keyed():
+        cmds.file(new=True, force=True)
+        specs = buildSpecs(switches, targets, mode)
+        metas = SpaceSwitchMeta.createMany(specs)
+        curves = spaceSwitchTool.AnimCurveModifier()
+        plugs  = [MetaUtils.getPlug(MetaUtils.getMObject(data['source']), 'spaceSwitch') for data in specs]
+        for fnCurve in curves.curves([(plug, spaceSwitchTool.oma2.MFnAnimCurve.kAnimCurveTU) for plug in plugs]):
+            curves.addKeys(fnCurve, [spaceSwitchTool.om2.MTime(frame) for frame in range(keys)], 
+                           [frame % targets for frame in range(keys)], spaceSwitchTool.oma2.MFnAnimCurve.kTangentStep)
+        spaceSwitchTool.commitModifier(curves)
+        for data in specs:
+            widgets = data['targetWidgets']
+            data['targetWidgets'] = dict((index, widgets[len(widgets) - 1 - index]) for index in widgets)
+        return metas, specs, plugs
+    def values(plugs):
+        return [[curve.value(index) for curve in SpaceSwitchMeta._switchCurves(plug) for index in range(curve.numKeys)] 
+                for plug in plugs]
+    
+    ops = OrderedDict()
+    metas, specs, plugs = keyed()
+    measure(ops, 'legacy: deleteAttr + rekey', lambda: legacyRekey(metas, specs))
+    expected = values(plugs)
+    metas, specs, plugs = keyed()
+    measure(ops, 'createAttr: in place', lambda: [meta.createAttr(data['source'], data['targetWidgets']) 
+                                                  for meta, data in zip(metas, specs)])
+    if values(plugs) != expected:
+        raise RuntimeError('createAttr does not remap the keys like keying them again')
+    metas, specs, plugs = keyed()
+    def rebuild():
+        for meta in metas:
+            meta._teardown(keepAttr=True)
+        return SpaceSwitchMeta.createMany(specs, replacing=[data['source'] for data in specs])
+    measure(ops, 'rebuild: keep keys', rebuild)
+    if values(plugs) != expected:
+        raise RuntimeError('a rebuild loses the spaceSwitch keys')
+    return OrderedDict([('switches', switches), ('targets', targets), ('keys', keys), ('mode', mode), ('ops', ops)])
+
+def legacyReverseLookup(sources, spaceTargets):
+    '''
+    the lookups before the index: the spaceSwitch attribute and the message connections of a control for its switch,
+    every meta node read to find the switches of a target
+    '''
+    metas = []
+    for ctrl in sources:
+        found = None
+        if cmds.attributeQuery('spaceSwitch', node=ctrl, ex=True):
+            for node in cmds.listConnections('{}.message'.format(ctrl), s=False) or []:
+                if MetaRegistry.contains(MetaUtils.getUuid(node)):
+                    found = MetaUtils.getUuid(node)
+                    break
+        metas.append(found)
+    allData = [(MetaUtils.getUuid(meta.path), data) for meta, data in 
+               zip(MetaUtils.getMetaNodes(), SpaceSwitchMeta.readMany(MetaUtils.getMetaNodes()))]
+    for target in spaceTargets:
+        targetId = MetaUtils.getUuid(target)
+        metas.append(sorted(uuid for uuid, data in allData if any(MetaUtils.getUuid(widget['spaceTarget']) == targetId 
+                                                                  for widget in data['targetWidgets'].values())))
+    return metas
+
+def benchIndex(switches=1000, targets=8, mode='condition', damage=10):
+    '''
+    metaOfSource / metasOfSpaceTarget for every control and target of a rig against the scans they replace, 
+    then again after a few targets and sources are deleted and a few switches are built
+    return: {'switches', 'targets', 'mode', 'queries', 'ops'}
+    '''
+    cmds.file(new=True, force=True)
+    specs = buildSpecs(switches, targets, mode)
+    SpaceSwitchMeta.createMany(specs)
+    sources = [data['source'] for data in specs]
+    spaceTargets = sorted(set(widget['spaceTarget'] for data in specs for widget in data['targetWidgets'].values()))
+    def indexed():
+        return ([MetaUtils.nodeUuid(meta.mobject) if meta is not None else None 
+                 for meta in map(MetaUtils.metaOfSource, sources)] +
+                [sorted(MetaUtils.nodeUuid(meta.mobject) for meta in MetaUtils.metasOfSpaceTarget(target)) 
+                 for target in spaceTargets])
+    ops = OrderedDict()
+    expected = measure(ops, 'legacy scan', lambda: legacyReverseLookup(sources, spaceTargets))
+    spaceSwitchTool.MetaIndex.reset()
+    measure(ops, 'index: seed', spaceSwitchTool.MetaIndex.seed)
+    if measure(ops, 'index: lookup', indexed) != expected:
+        raise RuntimeError('the index does not find the same switches as the scan')
+    cmds.delete(spaceTargets[:1] + sources[:damage])
+    spaceTargets, sources = spaceTargets[1:], sources[damage:]
+    SpaceSwitchMeta.createMany(buildSpecs(damage, targets, mode, prefix='added'))
+    sources += [data['source'] for data in buildSpecs(damage, targets, mode, prefix='added')]
+    expected = measure(ops, 'legacy scan: edited', lambda: legacyReverseLookup(sources, spaceTargets))
+    if measure(ops, 'index: lookup edited', indexed) != expected:
+        raise RuntimeError('the index is out of date after the rig changed')
+    return OrderedDict([('switches', switches), ('targets', targets), ('mode', mode), 
+                        ('queries', len(sources) + len(spaceTargets)), ('ops', ops)])
+
+def benchUndo(switches=500, targets=8, mode='condition'):
+    '''
+    undo / redo of a batch build, one transaction and one undo entry, against the same switches built one by one
+    that take an undo each, then a build that fails on its last switch has to leave the scene as it was
+    return: {'switches', 'targets', 'mode', 'entries', 'ops'}
+    '''
+    def sceneNodes():
+        return sorted(cmds.ls(long=True))
+    def undoCount():
+        return len(spaceSwitchStandIn.UNDO_QUEUE) if STANDIN else None
+        
+    cmds.file(new=True, force=True)
+    specs = buildSpecs(switches, targets, mode)
+    empty = sceneNodes()
+    ops   = OrderedDict()
+    measure(ops, 'legacy: build one by one', lambda: [SpaceSwitchMeta.createMany([data]) for data in specs])
+    measure(ops, 'legacy: undo one by one', lambda: [cmds.undo() for _ in specs])
+    if sceneNodes() != empty:
+        raise RuntimeError('undoing the switches one by one does not empty the scene')
+        
+    start = undoCount()
+    measure(ops, 'createMany', lambda: SpaceSwitchMeta.createMany(specs))
+    entries = None if start is None else undoCount() - start
+    built   = sceneNodes()
+    measure(ops, 'undo', cmds.undo)
+    if sceneNodes() != empty:
+        raise RuntimeError('one undo does not remove the whole batch')
+    measure(ops, 'redo', cmds.redo)
+    if sceneNodes() != built:
+        raise RuntimeError('redo does not bring the batch back')
+    cmds.undo()
+    
+    phase = '_createMatrixNetwork' if mode == 'matrix' else '_createConditionNodes'
+    built = getattr(SpaceSwitchMeta, phase)
+    def lastFails(meta, *args, **kwargs): # the last switch fails in the last phase, after everything else is built
+        if meta.source == specs[-1]['source']:
+            raise RuntimeError('last switch')
+        return built(meta, *args, **kwargs)
+    def failing():
+        setattr(SpaceSwitchMeta, phase, lastFails)
+        try:
+            SpaceSwitchMeta.createMany(specs)
+        except RuntimeError:
+            return True
+        finally:
+            setattr(SpaceSwitchMeta, phase, built)
+    if not measure(ops, 'rollback: failed build', failing) or sceneNodes() != empty:
+        raise RuntimeError('a failed build leaves nodes behind')
+    return OrderedDict([('switches', switches), ('targets', targets), ('mode', mode), ('entries', entries), ('ops', ops)])
+
+BATCH_SCENE = '//spaceSwitchBench {switches}x{targets}\n'
+
+def batchScene(path):
+    '''
+    spaceSwitchBatch setup hook, rebuilds the rig of buildSpecs that benchBatch wrote into the scene header
+    the stand-in cannot read scene files, in maya the header is only a comment
+    '''
+    with open(path) as f:
+        header = f.readline().split()
+    if header[:1] == ['//spaceSwitchBench']:
+        switches, targets = (int(value) for value in header[1].split('x'))
+        buildSpecs(switches, targets)
+
+def benchBatch(scenes, switches, targets, workers=2):
+    '''
+    apply one exported spec file to many scenes: one by one in this process against a spaceSwitchBatch worker pool
+    return: {'scenes', 'switches', 'targets', 'workers', 'ops'}
+    '''
+    import shutil
+    import tempfile
+    import spaceSwitchBatch
+    folder = tempfile.mkdtemp(prefix='spaceSwitchBatch')
+    try:
+        cmds.file(new=True, force=True)
+        SpaceSwitchMeta.createMany(buildSpecs(switches, targets))
+        spec = os.path.join(folder, 'spec.jsonl')
+        SpaceSwitchMeta.exportSpecs(spec)
+        paths = []
+        for i in range(scenes):
+            paths.append(os.path.join(folder, 'scene{}.ma'.format(i)))
+            with open(paths[-1], 'w') as f:
+                f.write(BATCH_SCENE.format(switches=switches, targets=targets))
+
+        ops = OrderedDict()
+        def run(workers):
+            results = list(spaceSwitchBatch.applySpecs(spec, paths, workers, standIn=STANDIN, save=False,
+                                                       setup='spaceSwitchBench:batchScene'))
+            failed  = [result for result in results if not result['ok'] or result['switches'] != switches]
+            if failed:
+                raise RuntimeError('{} scenes failed: {}'.format(len(failed), failed[0]['error']))
+            if sorted(result['scene'] for result in results) != sorted(paths):
+                raise RuntimeError('the batch does not report every scene once')
+            return results
+        measure(ops, 'one by one', lambda: run(0))
+        measure(ops, 'pool x{}'.format(workers), lambda: run(workers))
+        cmds.file(new=True, force=True)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return OrderedDict([('scenes', scenes), ('switches', switches), ('targets', targets), ('workers', workers), ('ops', ops)])
+
+def meshPadding(vertices):
+    '''
+    a mesh block in maya ascii, the bulk of attribute data a real asset carries around its rig
+    '''
+    lines = ['createNode transform -n "benchGeo";', 'createNode mesh -n "benchGeoShape" -p "benchGeo";',
+             '\tsetAttr -s {} ".vt";'.format(vertices), '\tsetAttr ".vt[0:{}]"'.format(vertices - 1)]
+    lines.extend('\t\t {0}.5 -{0}.25 {0}.125'.format(i) for i in range(vertices))
+    lines[-1] += ';'
+    return '\n'.join(lines) + '\n'
+
+def benchAudit(scenes, switches, targets, workers=2, mode='condition', vertices=20000):
+    '''
+    read the meta nodes of saved maya ascii scenes: opening them (maya only) against spaceSwitchAudit one by one
+    and in a pool, one switch per scene has a summary that no longer matches its connections
+    return: {'scenes', 'switches', 'targets', 'workers', 'bytes', 'peak', 'ops'}
+    '''
+    import shutil
+    import tempfile
+    import spaceSwitchAudit
+    folder = tempfile.mkdtemp(prefix='spaceSwitchAudit')
+    try:
+        cmds.file(new=True, force=True)
+        metas = SpaceSwitchMeta.createMany(buildSpecs(switches, targets, mode))
+        cmds.setAttr('{}.target[0].attrName'.format(metas[0].path), 'renamed', type='string')
+        stale = sorted(meta.path.split('|')[-1] for meta, _ in SpaceSwitchMeta.checkSummaries())
+        paths = [os.path.join(folder, 'scene{}.ma'.format(i)) for i in range(scenes)]
+        cmds.file(rename=paths[0])
+        cmds.file(save=True, type='mayaAscii', force=True)
+        with open(paths[0]) as f:
+            ascii = f.read()
+        start = ascii.index('createNode')
+        with open(paths[0], 'w') as f:
+            f.write(ascii[:start] + meshPadding(vertices) + ascii[start:])
+        for path in paths[1:]:
+            shutil.copyfile(paths[0], path)
+        size = os.path.getsize(paths[0])
+
+        def check(results):
+            for result in results:
+                if not result['ok'] or len(result['metas']) != switches:
+                    raise RuntimeError('{}: {} of {} switches read, {}'.format(result['file'], len(result['metas']), switches, result['error']))
+                if sorted(meta['name'] for meta in result['metas'] if meta['issues']) != stale or \
+                   set(meta['mode'] for meta in result['metas']) != set([mode]):
+                    raise RuntimeError('{}: the audit does not match checkSummaries'.format(result['file']))
+            if sorted(result['file'] for result in results) != sorted(paths):
+                raise RuntimeError('the audit does not report every file once')
+        ops = OrderedDict()
+        if not STANDIN: # the stand-in can not open scene files
+            def openScenes():
+                for path in paths:
+                    cmds.file(path, open=True, force=True)
+                    SpaceSwitchMeta.checkSummaries()
+            measure(ops, 'open + checkSummaries', openScenes)
+        check(measure(ops, 'scan one by one', lambda: list(spaceSwitchAudit.auditScenes(paths, 0))))
+        check(measure(ops, 'scan pool x{}'.format(workers), lambda: list(spaceSwitchAudit.auditScenes(paths, workers))))
+
+        peak = None
+        try:
+            import tracemalloc
+            tracemalloc.start()
+            spaceSwitchAudit.scanFile(paths[0])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        except ImportError: # python 2
+            pass
+        cmds.file(new=True, force=True)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return OrderedDict([('scenes', scenes), ('switches', switches), ('targets', targets), ('workers', workers),
+                        ('bytes', size), ('peak', peak), ('ops', ops)])
+
+IMPORT_PROBE = '''
+import sys, time, json
+sys.path.insert(0, {folder!r})
+if {standIn!r}:
+    import spaceSwitchStandIn
+    spaceSwitchStandIn.install()
+else:
+    import maya.cmds, maya.api.OpenMaya, maya.api.OpenMayaAnim
+clock = getattr(time, 'perf_counter', time.time)
+start = clock()
+import spaceSwitchTool
+seconds = clock() - start
+print(json.dumps({{'seconds': seconds, 'qt': sorted(name for name in sys.modules if name.split('.')[0] in ('PySide2', 'shiboken2'))}}))
+'''
+
+def benchImport(repeat=5, budget=IMPORT_BUDGET):
+    '''
+    import spaceSwitchTool in fresh interpreters, the meta layer must not pull in Qt and must stay under budget
+    '''
+    probe   = IMPORT_PROBE.format(folder=os.path.dirname(os.path.abspath(spaceSwitchTool.__file__)), standIn=STANDIN)
+    results = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', probe])
+        results.append(json.loads(output.decode('utf-8').strip().splitlines()[-1]))
+    seconds = sorted(result['seconds'] for result in results)
+    row = {'repeat': repeat, 'best': seconds[0], 'median': seconds[len(seconds) // 2], 'budget': budget, 
+           'qt': results[0]['qt']}
+    if row['qt']:
+        raise RuntimeError('importing spaceSwitchTool loads {}'.format(', '.join(row['qt'])))
+    if row['median'] > budget:
+        raise RuntimeError('importing spaceSwitchTool takes {:.3f}s, the budget is {:.3f}s'.format(row['median'], budget))
+    return row
+
+def printSwitchReport(rows):
+    print('{:>8} {:>8} {:>8}  {:>9}  {}'.format('frames', 'switches', 'keys', 'seconds', 'phases'))
+    for row in rows:
+        print('{:>8} {:>8} {:>8}  {:>9.4f}  {}'.format(row['frames'], row['switches'], row['keys'], row['seconds'], 
+              '  '.join('{} {:.4f}'.format(phase, seconds) for phase, seconds in row['phases'].items())))
+
+# ---------------------------------------------------------------------------------------------
+def benchSize(switches, targets, mode='condition'):
+    '''
+    one synthetic rig on a new scene: create, read, summaries, cached lookups, getMetaNodes, uniqueName, delete
+    return: {'switches', 'targets', 'mode', 'nodes', 'ops': {op: {'seconds', 'cmds', 'om2'}}}
+    '''
+    cmds.file(new=True, force=True)
+    specs = buildSpecs(switches, targets, mode)
+    nodes = len(cmds.ls())
+    ops   = OrderedDict()
+
+    metas = measure(ops, 'create', lambda: SpaceSwitchMeta.createMany(specs))
+    nodes = len(cmds.ls()) - nodes
+    measure(ops, 'nodeData', lambda: [meta.nodeData for meta in metas])
+    expected = measure(ops, 'readMany', lambda: SpaceSwitchMeta.readMany(metas))
+    if measure(ops, 'readSummaries', lambda: SpaceSwitchMeta.readSummaries(metas)) != expected:
+        raise RuntimeError('readSummaries does not match readMany')
+    if measure(ops, 'checkSummaries', SpaceSwitchMeta.checkSummaries):
+        raise RuntimeError('checkSummaries finds a summary out of date right after the build')
+
+    names = [meta.path for meta in metas]
+    mobjs = [meta.mobject for meta in metas]
+    measure(ops, 'meta by name', lambda: [SpaceSwitchMeta(name) for name in names])
+    measure(ops, 'meta by MObject', lambda: [SpaceSwitchMeta.fromMObject(mobj) for mobj in mobjs])
+
+    MetaRegistry.reset()
+    measure(ops, 'getMetaNodes (seed)', MetaUtils.getMetaNodes)
+    measure(ops, 'getMetaNodes', MetaUtils.getMetaNodes)
+
+    # every ctrl already has one locator per target, worst case for the name search
+    locNames = ['{}_spaceSwitch_LOC'.format(data['source'].split('|')[-1]) for data in specs]
+    NameAllocator.reset()
+    measure(ops, 'uniqueName (index)', lambda: [MetaUtils.uniqueName(name) for name in locNames])
+    measure(ops, 'uniqueName', lambda: [MetaUtils.uniqueName(name) for name in locNames])
+
+    def delete():
+        for meta in metas:
+            del meta.nodeData
+    measure(ops, 'delete', delete)
+    return OrderedDict([('switches', switches), ('targets', targets), ('mode', mode), ('nodes', nodes), ('ops', ops)])
+
+def runSuite(sizes=((10, 4), (100, 8)), mode='condition', verbose=True):
+    '''
+    sizes: [(switches, targets), ...]
+    return: [benchSize result, ...]
+    '''
+    rows = [benchSize(switches, targets, mode) for switches, targets in sizes]
+    if verbose:
+        printReport(rows)
+    return rows
+
+def printReport(rows):
+    print('{} | {}'.format('stand-in' if STANDIN else 'maya', cmds.about(version=True)))
+    print('{:>8} {:>7} {:<9} {:>6}  {:<20} {:>9} {:>7} {:>7}'.format(
+          'switches', 'targets', 'mode', 'nodes', 'op', 'seconds', 'cmds', 'om2'))
+    for row in rows:
+        for op, result in row['ops'].items():
+            print('{:>8} {:>7} {:<9} {:>6}  {:<20} {:>9.4f} {:>7} {:>7}'.format(
+                  row['switches'], row['targets'], row['mode'], row['nodes'], op,
+                  result['seconds'], result['cmds'], '-' if result['om2'] is None else result['om2']))
+
+# ---------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='space switch meta node benchmarks')
+    parser.add_argument('--sizes', nargs='+', default=['10x4', '100x8'], help='switches x targets, e.g. 100x8')
+    parser.add_argument('--mode', default=SpaceSwitchMeta.MODES[0], choices=SpaceSwitchMeta.MODES)
+    parser.add_argument('--appends', nargs='*', type=int, default=[], help='also time multi attribute appends, e.g. 10 100 1000')
+    parser.add_argument('--frames', nargs='*', type=int, default=[], help='also time switchSpaceMany over frame ranges, e.g. 100 1000 5000')
+    parser.add_argument('--specs', help='also time exportSpecs / importSpecs on one rig, switches x targets, e.g. 500x8')
+    parser.add_argument('--edits', help='also time SpaceSwitchMeta.edit against delete and rebuild, switches x targets, e.g. 100x8')
+    parser.add_argument('--health', help='also time checkScene / repairScene on a partly broken rig, switches x targets, e.g. 1000x8')
+    parser.add_argument('--validate', help='also time validateSpecs against one spec at a time validation, switches x targets, e.g. 1000x8')
+    parser.add_argument('--mirror', help='also time mirrorMany against mirroring one switch at a time, switches x targets, e.g. 500x8')
+    parser.add_argument('--rekey', help='also time createAttr on keyed switches against keying them again, switches x targets x keys, e.g. 50x8x500')
+    parser.add_argument('--index', help='also time metaOfSource / metasOfSpaceTarget against scanning the scene, switches x targets, e.g. 1000x8')
+    parser.add_argument('--undo', help='also time undo / redo of a batch build and a failed build rollback, switches x targets, e.g. 500x8')
+    parser.add_argument('--batch', help='also time spaceSwitchBatch on many scenes, scenes x switches x targets, e.g. 20x50x8')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes of --batch and --audit')
+    parser.add_argument('--audit', help='also time spaceSwitchAudit on saved scenes, scenes x switches x targets, e.g. 20x50x8')
+    parser.add_argument('--imports', type=int, default=0, help='also time importing spaceSwitchTool in this many fresh interpreters')
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET, help='fail when the median import is slower, seconds')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args(argv)
+
+    if not STANDIN:
+        import maya.standalone
+        maya.standalone.initialize()
+    sizes = [tuple(int(value) for value in size.lower().split('x')) for size in args.sizes]
+    rows  = runSuite(sizes, args.mode)
+    if args.appends:
+        appends = benchConnectMiAttr(args.appends)
+        print('{:>8}  {:<20} {:>9} {:>7} {:>7}'.format('count', 'op', 'seconds', 'cmds', 'om2'))
+        for row in appends:
+            for op, result in row['ops'].items():
+                print('{:>8}  {:<20} {:>9.4f} {:>7} {:>7}'.format(row['count'], op, result['seconds'], result['cmds'], 
+                                                                  '-' if result['om2'] is None else result['om2']))
+        rows = {'sizes': rows, 'appends': appends}
+    if args.frames:
+        switches = benchSwitchSpace(args.frames)
+        printSwitchReport(switches)
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['switchSpace'] = switches
+    if args.specs:
+        switches, targets = (int(value) for value in args.specs.lower().split('x'))
+        specs = benchSpecFiles(switches, targets, args.mode)
+        print('{:>8} {:>7}  {:<20} {:>9} {:>7} {:>7}'.format('switches', 'targets', 'op', 'seconds', 'cmds', 'om2'))
+        for op, result in specs['ops'].items():
+            print('{:>8} {:>7}  {:<20} {:>9.4f} {:>7} {:>7}'.format(switches, targets, op, result['seconds'], result['cmds'],
+                                                                   '-' if result['om2'] is None else result['om2']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['specFiles'] = specs
+    if args.edits:
+        switches, targets = (int(value) for value in args.edits.lower().split('x'))
+        edits = benchEdit(switches, targets, args.mode)
+        print('{:>8} {:>7}  {:<24} {:>9} {:>7} {:>7}'.format('switches', 'targets', 'op', 'seconds', 'cmds', 'om2'))
+        for op, result in edits['ops'].items():
+            print('{:>8} {:>7}  {:<24} {:>9.4f} {:>7} {:>7}'.format(switches, targets, op, result['seconds'], result['cmds'],
+                                                                   '-' if result['om2'] is None else result['om2']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['edits'] = edits
+    if args.health:
+        switches, targets = (int(value) for value in args.health.lower().split('x'))
+        health = benchHealth(switches, targets, args.mode)
+        print('{:>8} {:>7}  {:<24} {:>9} {:>7} {:>7}'.format('switches', 'targets', 'op', 'seconds', 'cmds', 'om2'))
+        for op, result in health['ops'].items():
+            print('{:>8} {:>7}  {:<24} {:>9.4f} {:>7} {:>7}'.format(switches, targets, op, result['seconds'], result['cmds'],
+                                                                   '-' if result['om2'] is None else result['om2']))
+        print('damaged {}, issues {}, repaired {}'.format(health['damaged'], dict(health['issues']), 
+                                                          dict((k, v) for k, v in health['repaired'].items() if k != 'failed')))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['health'] = health
+    if args.validate:
+        switches, targets = (int(value) for value in args.validate.lower().split('x'))
+        validate = benchValidate(switches, targets, args.mode)
+        print('{:>8} {:>7}  {:<24} {:>9} {:>7} {:>7}'.format('switches', 'targets', 'op', 'seconds', 'cmds', 'om2'))
+        for op, result in validate['ops'].items():
+            print('{:>8} {:>7}  {:<24} {:>9.4f} {:>7} {:>7}'.format(switches, targets, op, result['seconds'], result['cmds'],
+                                                                   '-' if result['om2'] is None else result['om2']))
+        print('broken specs found: {}'.format(validate['errors']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['validate'] = validate
+    if args.mirror:
+        switches, targets = (int(value) for value in args.mirror.lower().split('x'))
+        mirror = benchMirror(switches, targets, args.mode)
+        print('{:>8} {:>7}  {:<24} {:>9} {:>7} {:>7}'.format('switches', 'targets', 'op', 'seconds', 'cmds', 'om2'))
+        for op, result in mirror['ops'].items():
+            print('{:>8} {:>7}  {:<24} {:>9.4f} {:>7} {:>7}'.format(switches, targets, op, result['seconds'], result['cmds'],
+                                                                   '-' if result['om2'] is None else result['om2']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['mirror'] = mirror
+    if args.rekey:
+        switches, targets, keys = (int(value) for value in args.rekey.lower().split('x'))
+        rekey = benchRekey(switches, targets, keys, args.mode)
+        print('{:>8} {:>7} {:>6}  {:<26} {:>9} {:>7} {:>7}'.format('switches', 'targets', 'keys', 'op', 'seconds', 'cmds', 'om2'))
+        for op, result in rekey['ops'].items():
+            print('{:>8} {:>7} {:>6}  {:<26} {:>9.4f} {:>7} {:>7}'.format(switches, targets, keys, op, result['seconds'], result['cmds'],
+                                                                       '-' if result['om2'] is None else result['om2']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['rekey'] = rekey
+    if args.index:
+        switches, targets = (int(value) for value in args.index.lower().split('x'))
+        index = benchIndex(switches, targets, args.mode)
+        print('{:>8} {:>7}  {:<24} {:>9} {:>7} {:>7}'.format('switches', 'targets', 'op', 'seconds', 'cmds', 'om2'))
+        for op, result in index['ops'].items():
+            print('{:>8} {:>7}  {:<24} {:>9.4f} {:>7} {:>7}'.format(switches, targets, op, result['seconds'], result['cmds'],
+                                                                   '-' if result['om2'] is None else result['om2']))
+        print('queries per pass: {}'.format(index['queries']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['index'] = index
+    if args.undo:
+        switches, targets = (int(value) for value in args.undo.lower().split('x'))
+        undo = benchUndo(switches, targets, args.mode)
+        print('{:>8} {:>7}  {:<24} {:>9} {:>7} {:>7}'.format('switches', 'targets', 'op', 'seconds', 'cmds', 'om2'))
+        for op, result in undo['ops'].items():
+            print('{:>8} {:>7}  {:<24} {:>9.4f} {:>7} {:>7}'.format(switches, targets, op, result['seconds'], result['cmds'],
+                                                                   '-' if result['om2'] is None else result['om2']))
+        print('undo entries of the batch: {}'.format('-' if undo['entries'] is None else undo['entries']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['undo'] = undo
+    if args.batch:
+        scenes, switches, targets = (int(value) for value in args.batch.lower().split('x'))
+        batch = benchBatch(scenes, switches, targets, args.workers)
+        print('{:>6} {:>8} {:>7}  {:<24} {:>9}'.format('scenes', 'switches', 'targets', 'op', 'seconds'))
+        for op, result in batch['ops'].items():
+            print('{:>6} {:>8} {:>7}  {:<24} {:>9.4f}'.format(scenes, switches, targets, op, result['seconds']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['batch'] = batch
+    if args.audit:
+        scenes, switches, targets = (int(value) for value in args.audit.lower().split('x'))
+        audit = benchAudit(scenes, switches, targets, args.workers, args.mode)
+        print('{:>6} {:>8} {:>7}  {:<24} {:>9}'.format('scenes', 'switches', 'targets', 'op', 'seconds'))
+        for op, result in audit['ops'].items():
+            print('{:>6} {:>8} {:>7}  {:<24} {:>9.4f}'.format(scenes, switches, targets, op, result['seconds']))
+        print('bytes per scene: {}, peak memory of one scan: {}'.format(audit['bytes'], '-' if audit['peak'] is None else audit['peak']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['audit'] = audit
+    if args.imports:
+        imports = benchImport(args.imports, args.import_budget)
+        print('{:>8}  {:<20} {:>9} {:>9} {:>9}'.format('repeat', 'op', 'best', 'median', 'budget'))
+        print('{:>8}  {:<20} {:>9.4f} {:>9.4f} {:>9.4f}'.format(imports['repeat'], 'import spaceSwitchTool', 
+                                                              imports['best'], imports['median'], imports['budget']))
+        rows = rows if isinstance(rows, dict) else {'sizes': rows}
+        rows['imports'] = imports
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=4)
+    return rows
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,51 @@
+import maya.api.OpenMaya as om2
+
+'''
+tiny plugin that puts the om2 modifiers used by spaceSwitchTool on maya's undo queue, a spaceSwitchTool.Transaction
+goes on it the same way as one entry for all of its modifiers
+it is loaded on demand by spaceSwitchTool.commitModifier
+'''
+
+'''
+modifiers handed over by spaceSwitchTool, one per spaceSwitchModifier call. both sides reach the list through
+"import spaceSwitchCmd", so it is the same list whichever copy of spaceSwitchTool (module or script) pushed it
+'''
+PENDING = []
+
+maya_useNewAPI = True
+
+class SpaceSwitchModifierCmd(om2.MPxCommand):
+    NAME = 'spaceSwitchModifier'
+
+    def __init__(self):
+        super(SpaceSwitchModifierCmd, self).__init__()
+        self.modifier = None
+
+    @staticmethod
+    def creator():
+        return SpaceSwitchModifierCmd()
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        # the modifier has already been executed by spaceSwitchTool, we only keep it for undo/redo
+        import spaceSwitchCmd
+        if not spaceSwitchCmd.PENDING:
+            raise RuntimeError('spaceSwitchModifier: no modifier was handed over, it is only called by spaceSwitchTool')
+        self.modifier = spaceSwitchCmd.PENDING.pop(0)
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+
+def initializePlugin(mobject):
+    plugin = om2.MFnPlugin(mobject, 'kangddan', '1.0')
+    plugin.registerCommand(SpaceSwitchModifierCmd.NAME, SpaceSwitchModifierCmd.creator)
+
+def uninitializePlugin(mobject):
+    plugin = om2.MFnPlugin(mobject)
+    plugin.deregisterCommand(SpaceSwitchModifierCmd.NAME)
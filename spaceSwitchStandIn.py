@@ -0,0 +1,2868 @@
+import os
+import re
+import sys
+import types
+import math
+import uuid
+import fnmatch
+import itertools
+from collections import OrderedDict, Counter
+
+'''
+in-memory stand-in for the subset of maya.cmds / maya.api.OpenMaya used by spaceSwitchTool,
+lets the meta-node layer run (and be benchmarked) without a maya session:
+
+import spaceSwitchStandIn
+spaceSwitchStandIn.install()
+import spaceSwitchTool
+
+only the data model is simulated: nodes, attributes, multi attributes, connections, uuids,
+dag parenting and transform matrices. nothing is evaluated except the transform hierarchy,
+constraints do not move anything and undo is limited to om2 modifiers, the cmds a modifier runs through
+pythonCommandToExecute included
+'''
+
+CALL_COUNTS = Counter() # 'cmds.ls' / 'om2.MPlug.source' -> number of calls
+
+def resetCallCounts():
+    CALL_COUNTS.clear()
+
+def callCount(prefix=''):
+    return sum(count for name, count in CALL_COUNTS.items() if name.startswith(prefix))
+
+# ---------------------------------------------------------------------------------------------
+# math
+class MVector(object):
+    def __init__(self, *args):
+        values = args[0] if len(args) == 1 else (args or (0.0, 0.0, 0.0))
+        self.x, self.y, self.z = [float(v) for v in list(values)[:3]]
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __repr__(self):
+        return 'MVector({}, {}, {})'.format(self.x, self.y, self.z)
+
+    def length(self):
+        return math.sqrt(self.x ** 2 + self.y ** 2 + self.z ** 2)
+
+MPoint = MVector
+
+
+class MMatrix(object):
+    def __init__(self, values=None):
+        if values is None:
+            self._m = [1.0 if row == col else 0.0 for row in range(4) for col in range(4)]
+        else:
+            values = list(values)
+            if len(values) == 4:
+                values = [v for row in values for v in row]
+            self._m = [float(v) for v in values]
+
+    def __getitem__(self, index):
+        return self._m[index]
+
+    def __setitem__(self, index, value):
+        self._m[index] = float(value)
+
+    def __len__(self):
+        return 16
+
+    def __iter__(self):
+        return iter(self._m)
+
+    def __repr__(self):
+        return 'MMatrix({})'.format(self._m)
+
+    def __eq__(self, other):
+        return isinstance(other, MMatrix) and self._m == other._m
+
+    def __ne__(self, other):
+        return not self == other
+
+    def getElement(self, row, col):
+        return self._m[row * 4 + col]
+
+    def setElement(self, row, col, value):
+        self._m[row * 4 + col] = float(value)
+
+    def __mul__(self, other):
+        a, b = self._m, other._m
+        return MMatrix([sum(a[r * 4 + k] * b[k * 4 + c] for k in range(4)) for r in range(4) for c in range(4)])
+
+    def transpose(self):
+        return MMatrix([self._m[c * 4 + r] for r in range(4) for c in range(4)])
+
+    def isEquivalent(self, other, tolerance=1e-10):
+        return all(abs(a - b) <= tolerance for a, b in zip(self._m, other._m))
+
+    def inverse(self):
+        m   = [self._m[r * 4:r * 4 + 4] + [1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+        for col in range(4):
+            pivot = max(range(col, 4), key=lambda r: abs(m[r][col]))
+            if abs(m[pivot][col]) < 1e-12:
+                raise RuntimeError('(kFailure): matrix is singular')
+            m[col], m[pivot] = m[pivot], m[col]
+            scale  = m[col][col]
+            m[col] = [v / scale for v in m[col]]
+            for row in range(4):
+                if row != col and m[row][col]:
+                    factor = m[row][col]
+                    m[row] = [a - factor * b for a, b in zip(m[row], m[col])]
+        return MMatrix([v for row in m for v in row[4:]])
+
+    def homogenize(self):
+        return MMatrix(self)
+
+MMatrix.kIdentity = MMatrix()
+
+
+class MEulerRotation(object):
+    kXYZ, kYZX, kZXY, kXZY, kYXZ, kZYX = range(6)
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, order=0):
+        if isinstance(x, (list, tuple, MVector)):
+            x, y, z = list(x)[:3]
+        self.x, self.y, self.z, self.order = float(x), float(y), float(z), order
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __repr__(self):
+        return 'MEulerRotation({}, {}, {}, {})'.format(self.x, self.y, self.z, self.order)
+
+    def reorder(self, order):
+        if order != self.order:
+            raise NotImplementedError('the stand-in only knows the xyz rotate order')
+        return MEulerRotation(self.x, self.y, self.z, self.order)
+
+    def closestSolution(self, dst):
+        '''
+        the equivalent rotation (x + pi, pi - y, z + pi) or a 2pi turn of either that is closest to dst
+        '''
+        def cut(values):
+            return [v + 2.0 * math.pi * round((d - v) / (2.0 * math.pi)) for v, d in zip(values, dst)]
+        solutions = [cut((self.x, self.y, self.z)), cut((self.x + math.pi, math.pi - self.y, self.z + math.pi))]
+        best = min(solutions, key=lambda values: sum(abs(v - d) for v, d in zip(values, dst)))
+        return MEulerRotation(best[0], best[1], best[2], self.order)
+
+    def setToClosestSolution(self, dst):
+        self.x, self.y, self.z = self.closestSolution(dst)
+        return self
+
+    def asMatrix(self):
+        # the stand-in only knows the xyz rotate order
+        cx, sx = math.cos(self.x), math.sin(self.x)
+        cy, sy = math.cos(self.y), math.sin(self.y)
+        cz, sz = math.cos(self.z), math.sin(self.z)
+        rx = MMatrix([1, 0, 0, 0,  0, cx, sx, 0,  0, -sx, cx, 0,  0, 0, 0, 1])
+        ry = MMatrix([cy, 0, -sy, 0,  0, 1, 0, 0,  sy, 0, cy, 0,  0, 0, 0, 1])
+        rz = MMatrix([cz, sz, 0, 0,  -sz, cz, 0, 0,  0, 0, 1, 0,  0, 0, 0, 1])
+        return rx * ry * rz
+
+
+class MSpace(object):
+    kInvalid, kTransform, kPreTransform, kPostTransform, kWorld, kObject = 0, 1, 1, 3, 4, 3
+
+
+class MTransformationMatrix(object):
+    def __init__(self, matrix=None):
+        self._t = MVector()
+        self._r = MEulerRotation()
+        self._s = [1.0, 1.0, 1.0]
+        if matrix is not None:
+            self._decompose(matrix)
+
+    def _decompose(self, matrix):
+        m = matrix if isinstance(matrix, MMatrix) else MMatrix(matrix)
+        self._t = MVector(m[12], m[13], m[14])
+        rows = [[m[r * 4 + c] for c in range(3)] for r in range(3)]
+        self._s = [math.sqrt(sum(v * v for v in row)) for row in rows]
+        rows = [[v / s if s else 0.0 for v in row] for row, s in zip(rows, self._s)]
+        y = math.asin(max(-1.0, min(1.0, -rows[0][2])))
+        if abs(math.cos(y)) > 1e-9:
+            x = math.atan2(rows[1][2], rows[2][2])
+            z = math.atan2(rows[0][1], rows[0][0])
+        else:
+            x = math.atan2(-rows[2][1], rows[1][1])
+            z = 0.0
+        self._r = MEulerRotation(x, y, z)
+
+    def asMatrix(self):
+        s = MMatrix([self._s[0], 0, 0, 0,  0, self._s[1], 0, 0,  0, 0, self._s[2], 0,  0, 0, 0, 1])
+        t = MMatrix([1, 0, 0, 0,  0, 1, 0, 0,  0, 0, 1, 0,  self._t.x, self._t.y, self._t.z, 1])
+        return s * self._r.asMatrix() * t
+
+    def translation(self, space=MSpace.kTransform):
+        return MVector(self._t)
+
+    def setTranslation(self, vector, space=MSpace.kTransform):
+        self._t = MVector(vector)
+        return self
+
+    def rotation(self, asQuaternion=False):
+        return MEulerRotation(self._r.x, self._r.y, self._r.z)
+
+    def setRotation(self, rotation):
+        self._r = MEulerRotation(rotation.x, rotation.y, rotation.z)
+        return self
+
+    def rotationOrder(self):
+        return MTransformationMatrix.kXYZ
+
+    def reorderRotation(self, order):
+        return self
+
+    def scale(self, space=MSpace.kTransform):
+        return list(self._s)
+
+    def setScale(self, scale, space=MSpace.kTransform):
+        self._s = [float(v) for v in scale]
+        return self
+
+MTransformationMatrix.kXYZ = MEulerRotation.kXYZ
+
+# ---------------------------------------------------------------------------------------------
+# scene model
+class MFn(object):
+    kInvalid          = 0
+    kBase             = 1
+    kDependencyNode   = 4
+    kDagNode          = 107
+    kTransform        = 110
+    kJoint            = 121
+    kConstraint       = 917
+    kPointConstraint  = 240
+    kOrientConstraint = 239
+    kScaleConstraint  = 244
+    kParentConstraint = 242
+    kAffect           = 6      # network
+    kCondition        = 37
+    kMultMatrix       = 1154
+    kBlendMatrix      = 1155
+    kChoice           = 36
+    kAnimCurve        = 7
+    kAttribute        = 554
+    kData             = 571
+    kMatrixData       = 587
+    kStringData       = 595
+
+_CONSTRAINT_TYPES = {'pointConstraint': MFn.kPointConstraint, 'orientConstraint': MFn.kOrientConstraint,
+                     'scaleConstraint': MFn.kScaleConstraint, 'parentConstraint': MFn.kParentConstraint}
+_DAG_TYPES = set(['transform', 'joint'] + list(_CONSTRAINT_TYPES))
+
+def _nodeFns(typeName):
+    fns = set([MFn.kBase, MFn.kDependencyNode])
+    if typeName in _DAG_TYPES:
+        fns.update([MFn.kDagNode, MFn.kTransform])
+    if typeName == 'joint':
+        fns.add(MFn.kJoint)
+    if typeName in _CONSTRAINT_TYPES:
+        fns.update([MFn.kConstraint, _CONSTRAINT_TYPES[typeName]])
+    fns.update({'network': [MFn.kAffect], 'condition': [MFn.kCondition], 'multMatrix': [MFn.kMultMatrix],
+                'blendMatrix': [MFn.kBlendMatrix], 'choice': [MFn.kChoice]}.get(typeName, []))
+    if typeName.startswith('animCurve'):
+        fns.add(MFn.kAnimCurve)
+    return fns
+
+
+class _Attr(object):
+    '''
+    kind: message, double, float, bool, long, enum, string, matrix, compound, angle, distance, time
+    '''
+    def __init__(self, name, kind, shortName=None, multi=False, default=None, keyable=False, children=()):
+        self.name      = name
+        self.shortName = shortName or name
+        self.kind      = kind
+        self.multi     = multi
+        self.default   = default
+        self.keyable   = keyable
+        self.fields    = OrderedDict()
+        self.parent    = None
+        self.children  = []
+        self.dynamic   = False
+        self.hidden    = False
+        self.readable  = self.writable = self.storable = self.connectable = True
+        for child in children:
+            self.addChild(child)
+
+    def addChild(self, child):
+        child.parent = self
+        self.children.append(child)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            for attr in child.walk():
+                yield attr
+
+    def defaultValue(self):
+        if self.kind == 'matrix':
+            return MMatrix(self.default) if self.default is not None else MMatrix()
+        if self.kind in ('message', 'compound', 'string'):
+            return self.default
+        return self.default if self.default is not None else 0
+
+    def __repr__(self):
+        return '<_Attr {} {}>'.format(self.name, self.kind)
+
+
+def _double3(name, shortName, childNames, kind='double', default=0.0, keyable=True):
+    return _Attr(name, 'compound', shortName,
+                 children=[_Attr(n, kind, s, default=default, keyable=keyable) for n, s in childNames])
+
+def _xyz(name, shortName, kind='double', default=0.0):
+    return _double3(name, shortName, [(name + axis, shortName + axis.lower()) for axis in 'XYZ'], kind, default)
+
+def _rgb(name, shortName, default=0.0):
+    return _double3(name, shortName, [(name + c, shortName + c) for c in 'RGB'], 'float', default, False)
+
+def _staticAttrs(typeName):
+    attrs = [_Attr('message', 'message', 'msg')]
+    if typeName in _DAG_TYPES:
+        attrs += [_xyz('translate', 't', 'distance'), _xyz('rotate', 'r', 'angle'), _xyz('scale', 's', 'double', 1.0),
+                  _Attr('rotateOrder', 'enum', 'ro'), _Attr('visibility', 'bool', 'v', default=True, keyable=True),
+                  _Attr('matrix', 'matrix', 'm'), _Attr('inverseMatrix', 'matrix', 'im'),
+                  _Attr('worldMatrix', 'matrix', 'wm', multi=True), _Attr('worldInverseMatrix', 'matrix', 'wim', multi=True),
+                  _Attr('parentMatrix', 'matrix', 'pm', multi=True), _Attr('parentInverseMatrix', 'matrix', 'pim', multi=True),
+                  _Attr('offsetParentMatrix', 'matrix', 'opm')]
+        attrs[3].fields = OrderedDict((i, n) for i, n in enumerate(['xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx']))
+    if typeName == 'joint':
+        attrs.append(_xyz('jointOrient', 'jo', 'angle'))
+    if typeName in _CONSTRAINT_TYPES:
+        attrs += [_Attr('target', 'compound', 'tg', multi=True,
+                        children=[_Attr('targetParentMatrix', 'matrix', 'tpm'), _Attr('targetWeight', 'double', 'tw', default=1.0)]),
+                  _Attr('enableRestPosition', 'bool', 'erp'), _Attr('constraintParentInverseMatrix', 'matrix', 'cpim')]
+        if typeName in ('orientConstraint', 'parentConstraint'):
+            attrs.append(_Attr('interpType', 'enum', 'int', default=1))
+    if typeName == 'condition':
+        attrs += [_Attr('operation', 'enum', 'op'), _Attr('firstTerm', 'float', 'ft'), _Attr('secondTerm', 'float', 'st'),
+                  _rgb('colorIfTrue', 'ct', 0.0), _rgb('colorIfFalse', 'cf', 1.0), _rgb('outColor', 'oc')]
+    if typeName == 'multMatrix':
+        attrs += [_Attr('matrixIn', 'matrix', 'i', multi=True), _Attr('matrixSum', 'matrix', 'o')]
+    if typeName == 'blendMatrix':
+        attrs += [_Attr('inputMatrix', 'matrix', 'imat'), _Attr('envelope', 'float', 'env', default=1.0),
+                  _Attr('outputMatrix', 'matrix', 'omat'),
+                  _Attr('target', 'compound', 'tgt', multi=True,
+                        children=[_Attr('targetMatrix', 'matrix', 'tmat'), _Attr('weight', 'float', 'wgt', default=1.0),
+                                  _Attr('useMatrix', 'bool', 'umat', default=True),
+                                  _Attr('translateWeight', 'float', 'tw', default=1.0),
+                                  _Attr('rotateWeight', 'float', 'rw', default=1.0),
+                                  _Attr('scaleWeight', 'float', 'sw', default=1.0),
+                                  _Attr('shearWeight', 'float', 'shw', default=1.0)])]
+    if typeName == 'choice':
+        attrs += [_Attr('selector', 'long', 's'), _Attr('input', 'double', 'i', multi=True), _Attr('output', 'double', 'o')]
+    if typeName.startswith('animCurve'):
+        attrs += [_Attr('input', 'time', 'i'), _Attr('output', 'double', 'o')]
+    return attrs
+
+
+class _Node(object):
+    def __init__(self, scene, typeName, name):
+        self.scene    = scene
+        self.typeName = typeName
+        self.name     = name
+        self.uuid     = str(uuid.uuid4()).upper()
+        self.isDag    = typeName in _DAG_TYPES
+        self.parent   = None
+        self.children = []
+        self.attrs    = _staticAttrs(typeName)
+        self.values   = {}
+        self.locked   = set()
+        self.alive    = False # True while the node is part of the scene
+        self.deleted  = False
+        self.fns      = _nodeFns(typeName)
+        self.keys     = []    # anim curves: [(time, value), ...]
+        self._index   = None
+
+    def __repr__(self):
+        return '<_Node {} {}>'.format(self.typeName, self.name)
+
+    # -----------------------------------------------------------------
+    def attrIndex(self):
+        if self._index is None:
+            self._index = {}
+            for top in self.attrs:
+                for attr in top.walk():
+                    self._index.setdefault(attr.name, attr)
+                    self._index.setdefault(attr.shortName, attr)
+        return self._index
+
+    def findAttr(self, name):
+        return self.attrIndex().get(name)
+
+    def addAttr(self, attr, index=None):
+        if self.findAttr(attr.name) is not None:
+            raise RuntimeError('Found a dynamic attribute with the same name: {}.{}'.format(self.name, attr.name))
+        for each in attr.walk():
+            each.dynamic = True
+        self.attrs.insert(len(self.attrs) if index is None else index, attr)
+        self._index = None
+        self.scene.record(lambda: self.removeAttr(attr), lambda: self.addAttr(attr, index))
+
+    def removeAttr(self, attr):
+        index = self.attrs.index(attr)
+        del self.attrs[index]
+        self._index = None
+        self.scene.record(lambda: self.addAttr(attr, index), lambda: self.removeAttr(attr))
+
+    # -----------------------------------------------------------------
+    def fullPath(self):
+        if not self.isDag:
+            return self.name
+        names, node = [], self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return '|' + '|'.join(reversed(names))
+
+    def partialPath(self):
+        if not self.isDag:
+            return self.name
+        parts = self.fullPath().split('|')[1:]
+        for start in range(len(parts) - 1, -1, -1):
+            candidate = '|'.join(parts[start:])
+            if len(self.scene.resolveAll(candidate)) == 1:
+                return candidate
+        return self.fullPath()
+
+    def descendants(self):
+        for child in self.children:
+            for node in child.descendants():
+                yield node
+            yield child
+
+    # -----------------------------------------------------------------
+    def channel(self, key, default, time=None):
+        if not self.scene.links.get(id(self)):
+            return self.values.get(key, default) # nothing connected, skip the plug lookup
+        value = self.scene.readValue(self, key, time)
+        return default if value is None else value
+
+    def localMatrix(self, time=None):
+        t = [self.channel('translate.translate' + a, 0.0, time) for a in 'XYZ']
+        r = [self.channel('rotate.rotate' + a, 0.0, time) for a in 'XYZ']
+        s = [self.channel('scale.scale' + a, 1.0, time) for a in 'XYZ']
+        matrix = MTransformationMatrix()
+        matrix.setTranslation(MVector(t)).setRotation(MEulerRotation(r)).setScale(s)
+        return matrix.asMatrix()
+
+    def setLocalMatrix(self, matrix):
+        matrix = MTransformationMatrix(matrix)
+        for attr, values in (('translate', matrix.translation()), ('rotate', matrix.rotation()), ('scale', matrix.scale())):
+            for axis, value in zip('XYZ', values):
+                self.scene.setValue(self, '{0}.{0}{1}'.format(attr, axis), value)
+
+    def offsetParentMatrix(self, time=None):
+        value = self.scene.readValue(self, 'offsetParentMatrix', time)
+        return value if isinstance(value, MMatrix) else MMatrix()
+
+    def worldMatrix(self, time=None):
+        matrix = self.localMatrix(time) * self.offsetParentMatrix(time)
+        return matrix * self.parent.worldMatrix(time) if self.parent is not None else matrix
+
+    def parentMatrix(self, time=None):
+        return self.parent.worldMatrix(time) if self.parent is not None else MMatrix()
+
+
+def _tokens(path):
+    '''
+    'target[0].spaceTarget' -> [('target', 0), ('spaceTarget', None)]
+    '''
+    tokens = []
+    for token in path.split('.'):
+        match = re.match(r'^([^\[]+)(?:\[(\d+)\])?$', token)
+        if match is None:
+            raise ValueError('Invalid attribute: {}'.format(path))
+        tokens.append((match.group(1), int(match.group(2)) if match.group(2) is not None else None))
+    return tokens
+
+
+class _PlugRef(object):
+    '''
+    node + resolved attribute chain, key is the canonical plug path 'target[0].spaceTarget'
+    '''
+    __slots__ = ('node', 'chain', 'key')
+
+    def __init__(self, node, chain):
+        self.node  = node
+        self.chain = tuple(chain)
+        self.key   = '.'.join(attr.name if index is None else '{}[{}]'.format(attr.name, index) for attr, index in self.chain)
+
+    @property
+    def attr(self):
+        return self.chain[-1][0]
+
+    @property
+    def index(self):
+        return self.chain[-1][1]
+
+    def __eq__(self, other):
+        return isinstance(other, _PlugRef) and self.node is other.node and self.key == other.key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self.node), self.key))
+
+    def name(self, partial=False):
+        return '{}.{}'.format(self.node.partialPath(), self.key)
+
+    @staticmethod
+    def resolve(node, path, autoIndex=False):
+        chain = []
+        for name, index in _tokens(path):
+            attr = node.findAttr(name)
+            if attr is None:
+                raise ValueError("No object matches name: {}.{}".format(node.name, path))
+            # fill the compound parents that were skipped: 'node.pointConstraint'
+            if not chain and attr.parent is not None:
+                parents, parent = [], attr.parent
+                while parent is not None:
+                    parents.append((parent, 0 if parent.multi else None))
+                    parent = parent.parent
+                chain.extend(reversed(parents))
+            if autoIndex and index is None and attr.name in _INSTANCED:
+                index = 0 # cmds: 'node.worldMatrix' -> 'node.worldMatrix[0]'
+            chain.append((attr, index))
+        return _PlugRef(node, chain)
+
+    def isAncestorOf(self, other):
+        return self.node is other.node and (other.key == self.key or other.key.startswith(self.key + '.')
+                                              or other.key.startswith(self.key + '['))
+
+
+_INSTANCED = ('worldMatrix', 'worldInverseMatrix', 'parentMatrix', 'parentInverseMatrix')
+
+def _sortKey(key):
+    return [int(part) if part.isdigit() else part for part in re.split(r'\[(\d+)\]', key)]
+
+
+class _Scene(object):
+    def __init__(self):
+        self.nodes       = OrderedDict() # id -> node
+        self.byName      = {}
+        self.byUuid      = {}
+        self.sources     = {}            # dst _PlugRef -> src _PlugRef
+        self.destinations = {}           # src _PlugRef -> [dst _PlugRef]
+        self.links       = {}            # id(node) -> set([(src, dst), ...]) both directions
+        self.selection   = []
+        self.currentTime = 1.0
+        self.plugins     = {}
+        self.journal     = None          # [(undo, redo), ...] of the edits made while a modifier command runs
+
+    def record(self, undo, redo):
+        '''
+        keep undo / redo of an edit for the modifier python command that is running, see MDGModifier.pythonCommandToExecute,
+        only with undo on: like maya, an edit made with undo off has no record to be undone with
+        '''
+        if self.journal is not None and UNDO_STATE['state']:
+            self.journal.append((undo, redo))
+
+    def setValue(self, node, key, value):
+        '''
+        node.values[key] = value, None removes the key
+        '''
+        if self.journal is not None:
+            previous = node.values.get(key)
+            self.record(lambda: self.setValue(node, key, previous), lambda: self.setValue(node, key, value))
+        if value is None:
+            node.values.pop(key, None)
+        else:
+            node.values[key] = value
+
+    # -----------------------------------------------------------------
+    def attach(self, node):
+        node.alive, node.deleted = True, False
+        self.nodes[id(node)] = node
+        self.byName.setdefault(node.name, []).append(node)
+        self.byUuid[node.uuid] = node
+        if node.isDag and node.parent is not None:
+            node.parent.children.append(node)
+        _Callbacks.nodeAdded(node)
+        self.record(lambda: self.detach(node), lambda: self.attach(node))
+
+    def detach(self, node):
+        _Callbacks.nodeRemoved(node)
+        node.alive, node.deleted = False, True
+        self.nodes.pop(id(node), None)
+        self.byName[node.name].remove(node)
+        self.byUuid.pop(node.uuid, None)
+        if node.isDag and node.parent is not None and node in node.parent.children:
+            node.parent.children.remove(node)
+        self.selection = [n for n in self.selection if n is not node]
+        removed = list(self.links.get(id(node), ()))
+        for src, dst in removed:
+            self.disconnect(src, dst)
+        self.record(lambda: self.attach(node), lambda: self.detach(node))
+        return removed
+
+    def rename(self, node, name):
+        if not node.alive:
+            node.name = name
+            return name
+        name = self.uniqueName(name, node.parent if node.isDag else None, node.isDag, ignore=node)
+        previous = node.name
+        self.byName[node.name].remove(node)
+        node.name = name
+        self.byName.setdefault(name, []).append(node)
+        _Callbacks.nameChanged(node, previous)
+        self.record(lambda: self.rename(node, previous), lambda: self.rename(node, name))
+        return name
+
+    def uniqueName(self, name, parent=None, isDag=False, ignore=None):
+        def taken(candidate):
+            for other in self.byName.get(candidate, []):
+                if other is ignore:
+                    continue
+                if not (isDag and other.isDag) or other.parent is parent:
+                    return True
+            return False
+        if not taken(name):
+            return name
+        stem  = re.sub(r'\d+$', '', name)
+        for number in itertools.count(1):
+            candidate = '{}{}'.format(stem, number)
+            if not taken(candidate):
+                return candidate
+
+    def createNode(self, typeName, name=None, parent=None, attach=True):
+        node = _Node(self, typeName, None)
+        node.parent = parent if node.isDag else None
+        node.name = self.uniqueName(name or typeName + '1', node.parent, node.isDag) if attach else (name or typeName + '1')
+        if attach:
+            self.attach(node)
+        return node
+
+    def delete(self, node):
+        for child in list(node.descendants()):
+            if child.alive:
+                self.detach(child)
+        if node.alive:
+            self.detach(node)
+
+    # -----------------------------------------------------------------
+    def resolveAll(self, name):
+        name = str(name)
+        if '|' not in name:
+            return list(self.byName.get(name, []))
+        absolute = name.startswith('|')
+        short    = name.rstrip('|').split('|')[-1]
+        result   = []
+        for node in self.byName.get(short, []):
+            path = node.fullPath()
+            if (absolute and path == name) or (not absolute and (path.endswith('|' + name))):
+                result.append(node)
+        return result
+
+    def resolve(self, name):
+        nodes = self.resolveAll(name)
+        if not nodes:
+            raise ValueError('No object matches name: {}'.format(name))
+        if len(nodes) > 1:
+            raise ValueError('More than one object matches name: {}'.format(name))
+        return nodes[0]
+
+    def plug(self, path):
+        path = str(path)
+        nodeName, _, attrPath = path.partition('.')
+        if not attrPath:
+            raise ValueError('Invalid plug: {}'.format(path))
+        return _PlugRef.resolve(self.resolve(nodeName), attrPath, autoIndex=True)
+
+    # -----------------------------------------------------------------
+    def connect(self, src, dst, force=True):
+        if dst in self.sources:
+            if self.sources[dst] == src:
+                return
+            if not force:
+                raise RuntimeError('{} is already connected'.format(dst.name()))
+            self.disconnect(self.sources[dst], dst)
+        self.sources[dst] = src
+        self.destinations.setdefault(src, []).append(dst)
+        self.links.setdefault(id(src.node), set()).add((src, dst))
+        self.links.setdefault(id(dst.node), set()).add((src, dst))
+        _Callbacks.connection(src, dst, True)
+        self.record(lambda: self.disconnect(src, dst), lambda: self.connect(src, dst))
+
+    def disconnect(self, src, dst):
+        if self.sources.get(dst) != src:
+            raise RuntimeError('{} is not connected to {}'.format(src.name(), dst.name()))
+        del self.sources[dst]
+        self.destinations[src].remove(dst)
+        if not self.destinations[src]:
+            del self.destinations[src]
+        self.links[id(src.node)].discard((src, dst))
+        self.links[id(dst.node)].discard((src, dst))
+        _Callbacks.connection(src, dst, False)
+        self.record(lambda: self.connect(src, dst), lambda: self.disconnect(src, dst))
+
+    def connectionsUnder(self, ref, asSrc=True, asDst=True):
+        '''
+        [(thisPlug, otherPlug), ...] for ref and all its elements / children
+        '''
+        attr, index = ref.chain[-1]
+        if not attr.children and (index is not None or not attr.multi):
+            # a leaf plug, look it up instead of scanning the node
+            result = [(ref, self.sources[ref])] if asDst and ref in self.sources else []
+            if asSrc:
+                result.extend((ref, dst) for dst in self.destinations.get(ref, ()))
+            return sorted(result, key=lambda pair: _sortKey(pair[1].name()))
+        result = []
+        for src, dst in self.links.get(id(ref.node), ()):
+            if asDst and ref.isAncestorOf(dst):
+                result.append((dst, src))
+            if asSrc and ref.isAncestorOf(src):
+                result.append((src, dst))
+        return sorted(result, key=lambda pair: (_sortKey(pair[0].key), _sortKey(pair[1].name())))
+
+    def disconnectAll(self, ref):
+        '''
+        break every connection of ref and its elements / children
+        return: [(src, dst), ...]
+        '''
+        pairs = [(src, dst) for src, dst in self.links.get(id(ref.node), ()) if ref.isAncestorOf(src) or ref.isAncestorOf(dst)]
+        for src, dst in pairs:
+            self.disconnect(src, dst)
+        return pairs
+
+    def nodeConnections(self, node, asSrc=True, asDst=True):
+        result = []
+        for src, dst in self.links.get(id(node), ()):
+            if asDst and dst.node is node:
+                result.append((dst, src))
+            if asSrc and src.node is node:
+                result.append((src, dst))
+        return sorted(result, key=lambda pair: (_sortKey(pair[0].key), _sortKey(pair[1].name())))
+
+    # -----------------------------------------------------------------
+    def readValue(self, node, key, time=None):
+        ref = _PlugRef.resolve(node, key) if not isinstance(key, _PlugRef) else key
+        if ref in self.sources:
+            src = self.sources[ref]
+            if src.attr.kind != 'message':
+                return self.readValue(src.node, src, time)
+        attr = ref.attr
+        if attr.name in ('matrix', 'worldMatrix', 'parentMatrix', 'inverseMatrix', 'worldInverseMatrix',
+                         'parentInverseMatrix') and node.isDag:
+            matrix = {'matrix': node.localMatrix, 'worldMatrix': node.worldMatrix,
+                      'parentMatrix': node.parentMatrix}.get(attr.name.replace('Inverse', ''))(time)
+            return matrix.inverse() if 'Inverse' in attr.name else matrix
+        if node.typeName.startswith('animCurve') and attr.name == 'output':
+            return _evaluateCurve(node, self.currentTime if time is None else time)
+        evaluate = _EVALUATORS.get((node.typeName, attr.parent.name if attr.parent else attr.name))
+        if evaluate is not None:
+            value = evaluate(self, node, time)
+            return value[attr.parent.children.index(attr)] if attr.parent else value
+        if ref.key in node.values:
+            return node.values[ref.key]
+        value = attr.defaultValue()
+        return MMatrix(value) if isinstance(value, MMatrix) else value
+
+    def writeValue(self, ref, value):
+        if ref.attr.kind == 'compound':
+            for child, each in zip(ref.attr.children, value):
+                self.writeValue(_PlugRef(ref.node, ref.chain + ((child, None),)), each)
+            return
+        if ref.attr.name in ('matrix',) and ref.node.isDag:
+            ref.node.setLocalMatrix(value)
+            return
+        self.setValue(ref.node, ref.key, value)
+        _Callbacks.attributeSet(ref)
+
+    def existingIndices(self, ref):
+        indices = set()
+        prefix  = ref.key + '['
+        keys    = list(ref.node.values) + [plug.key for pair in self.links.get(id(ref.node), ()) 
+                                               for plug in pair if plug.node is ref.node]
+        for key in keys:
+            if key.startswith(prefix):
+                indices.add(int(key[len(prefix):].split(']')[0]))
+        return sorted(indices)
+
+    def reset(self):
+        '''
+        new scene, loaded plugins stay loaded
+        '''
+        plugins = self.plugins
+        for node in list(self.nodes.values()):
+            node.alive, node.deleted = False, True
+        self.__init__()
+        self.plugins = plugins
+
+
+def _evaluateCurve(node, time):
+    if not node.keys:
+        return 0.0
+    keys = sorted(node.keys)
+    if time <= keys[0][0]:
+        return keys[0][1]
+    for (t0, v0), (t1, v1) in zip(keys, keys[1:]):
+        if t0 <= time <= t1:
+            return v0 if t1 == t0 else v0 + (v1 - v0) * (time - t0) / (t1 - t0)
+    return keys[-1][1]
+
+def _read(scene, node, key, time):
+    return scene.readValue(node, key, time)
+
+def _condition(scene, node, time):
+    first, second = _read(scene, node, 'firstTerm', time), _read(scene, node, 'secondTerm', time)
+    operation = _read(scene, node, 'operation', time)
+    result = [first == second, first != second, first > second, first >= second, first < second, first <= second][operation]
+    color  = 'colorIfTrue' if result else 'colorIfFalse'
+    return tuple(_read(scene, node, '{0}.{0}{1}'.format(color, c), time) for c in 'RGB')
+
+def _multMatrix(scene, node, time):
+    result = MMatrix()
+    for index in scene.existingIndices(_PlugRef.resolve(node, 'matrixIn')):
+        result = result * _read(scene, node, 'matrixIn[{}]'.format(index), time)
+    return result
+
+def _blendMatrix(scene, node, time):
+    '''
+    translate / rotate / scale are blended separately, rotations are linear euler blends
+    '''
+    result = MTransformationMatrix(_read(scene, node, 'inputMatrix', time))
+    envelope = _read(scene, node, 'envelope', time)
+    for index in scene.existingIndices(_PlugRef.resolve(node, 'target')):
+        get    = lambda name: _read(scene, node, 'target[{}].{}'.format(index, name), time)
+        weight = get('weight') * envelope
+        if not weight:
+            continue
+        target = MTransformationMatrix(get('targetMatrix'))
+        lerp   = lambda a, b, w: [x + (y - x) * w * weight for x, y in zip(a, b)]
+        result.setTranslation(MVector(lerp(result.translation(), target.translation(), get('translateWeight'))))
+        result.setRotation(MEulerRotation(lerp(result.rotation(), target.rotation(), get('rotateWeight'))))
+        result.setScale(lerp(result.scale(), target.scale(), get('scaleWeight')))
+    return result.asMatrix()
+
+def _choice(scene, node, time):
+    return _read(scene, node, 'input[{}]'.format(int(_read(scene, node, 'selector', time))), time)
+
+_EVALUATORS = {('condition', 'outColor'): _condition, ('multMatrix', 'matrixSum'): _multMatrix,
+               ('blendMatrix', 'outputMatrix'): _blendMatrix, ('choice', 'output'): _choice}
+
+SCENE = _Scene()
+
+# ---------------------------------------------------------------------------------------------
+# callbacks
+class _Callbacks(object):
+    _ids       = itertools.count(1)
+    added      = {} # id -> (func, nodeType, clientData)
+    removed    = {}
+    scene      = {} # id -> (message, func, clientData)
+    names      = {} # id -> (node or None, func, clientData)
+    attributes = {} # id -> (node, func, clientData)
+
+    @classmethod
+    def register(cls, table, value):
+        callbackId = next(cls._ids)
+        table[callbackId] = value
+        return callbackId
+
+    @classmethod
+    def remove(cls, callbackId):
+        for table in (cls.added, cls.removed, cls.scene, cls.names, cls.attributes):
+            table.pop(callbackId, None)
+
+    @staticmethod
+    def _matches(node, nodeType):
+        return nodeType in ('dependNode', None) or node.typeName == nodeType or \
+               (nodeType == 'dagNode' and node.isDag) or (nodeType == 'transform' and node.isDag)
+
+    @classmethod
+    def nodeAdded(cls, node):
+        for func, nodeType, clientData in list(cls.added.values()):
+            if cls._matches(node, nodeType):
+                func(MObject(node), clientData)
+
+    @classmethod
+    def nodeRemoved(cls, node):
+        for func, nodeType, clientData in list(cls.removed.values()):
+            if cls._matches(node, nodeType):
+                func(MObject(node), clientData)
+        for callbackId, (watched, func, clientData) in list(cls.attributes.items()):
+            if watched is node:
+                del cls.attributes[callbackId]
+
+    @classmethod
+    def sceneMessage(cls, message):
+        for msg, func, clientData in list(cls.scene.values()):
+            if msg == message:
+                func(clientData)
+
+    @classmethod
+    def nameChanged(cls, node, previous):
+        for watched, func, clientData in list(cls.names.values()):
+            if watched is None or watched is node:
+                func(MObject(node), previous, clientData)
+
+    @classmethod
+    def connection(cls, src, dst, made):
+        if not cls.attributes:
+            return
+        base = MNodeMessage.kConnectionMade if made else MNodeMessage.kConnectionBroken
+        for watched, func, clientData in list(cls.attributes.values()):
+            if watched is dst.node:
+                func(base | MNodeMessage.kIncomingDirection, MPlug(dst), MPlug(src), clientData)
+            if watched is src.node:
+                func(base, MPlug(src), MPlug(dst), clientData)
+
+    @classmethod
+    def attributeSet(cls, ref):
+        if not cls.attributes:
+            return
+        for watched, func, clientData in list(cls.attributes.values()):
+            if watched is ref.node:
+                func(MNodeMessage.kAttributeSet, MPlug(ref), MPlug(), clientData)
+
+
+class MMessage(object):
+    @staticmethod
+    def removeCallback(callbackId):
+        _Callbacks.remove(callbackId)
+
+    @staticmethod
+    def removeCallbacks(callbackIds):
+        for callbackId in callbackIds:
+            _Callbacks.remove(callbackId)
+
+
+class MDGMessage(MMessage):
+    @staticmethod
+    def addNodeAddedCallback(func, nodeType='dependNode', clientData=None):
+        return _Callbacks.register(_Callbacks.added, (func, nodeType, clientData))
+
+    @staticmethod
+    def addNodeRemovedCallback(func, nodeType='dependNode', clientData=None):
+        return _Callbacks.register(_Callbacks.removed, (func, nodeType, clientData))
+
+
+class MSceneMessage(MMessage):
+    kSceneUpdate, kBeforeNew, kAfterNew, kBeforeOpen, kAfterOpen = 0, 1, 2, 5, 6
+    kBeforeImport, kAfterImport, kBeforeReference, kAfterReference = 3, 4, 20, 21
+
+    @staticmethod
+    def addCallback(message, func, clientData=None):
+        return _Callbacks.register(_Callbacks.scene, (message, func, clientData))
+
+
+class MNodeMessage(MMessage):
+    kConnectionMade, kConnectionBroken, kAttributeEval, kAttributeSet = 0x01, 0x02, 0x04, 0x08
+    kAttributeLocked, kAttributeUnlocked, kAttributeAdded, kAttributeRemoved = 0x10, 0x20, 0x40, 0x80
+    kAttributeRenamed, kAttributeKeyable, kAttributeUnkeyable = 0x100, 0x200, 0x400
+    kIncomingDirection, kAttributeArrayAdded, kAttributeArrayRemoved = 0x800, 0x1000, 0x2000
+    kOtherPlugSet = 0x4000
+
+    @staticmethod
+    def addNameChangedCallback(node, func, clientData=None):
+        watched = None if node is None or node.isNull() else node._payload
+        return _Callbacks.register(_Callbacks.names, (watched, func, clientData))
+
+    @staticmethod
+    def addAttributeChangedCallback(node, func, clientData=None):
+        return _Callbacks.register(_Callbacks.attributes, (node._payload, func, clientData))
+
+# ---------------------------------------------------------------------------------------------
+# om2
+class MObject(object):
+    def __init__(self, payload=None):
+        if isinstance(payload, MObject):
+            payload = payload._payload
+        self._payload = payload
+
+    def isNull(self):
+        return self._payload is None
+
+    def hasFn(self, fnType):
+        payload = self._payload
+        if isinstance(payload, _Node):
+            return fnType in payload.fns
+        if isinstance(payload, _Attr):
+            return fnType == MFn.kAttribute
+        if isinstance(payload, _Data):
+            return fnType in (MFn.kData, payload.fnType)
+        return False
+
+    def apiType(self):
+        payload = self._payload
+        if isinstance(payload, _Node):
+            return max(payload.fns)
+        if isinstance(payload, _Attr):
+            return MFn.kAttribute
+        if isinstance(payload, _Data):
+            return payload.fnType
+        return MFn.kInvalid
+
+    def apiTypeStr(self):
+        return str(self.apiType())
+
+    def __eq__(self, other):
+        return isinstance(other, MObject) and self._payload is other._payload
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return id(self._payload)
+
+MObject.kNullObj = MObject()
+
+
+class _Data(object):
+    def __init__(self, fnType, value):
+        self.fnType, self.value = fnType, value
+
+
+class MObjectHandle(object):
+    def __init__(self, mobj=None):
+        self._mobj = MObject(mobj) if mobj is not None else MObject()
+
+    def isValid(self):
+        payload = self._mobj._payload
+        return payload is not None and (not isinstance(payload, _Node) or payload.alive)
+
+    def isAlive(self):
+        return self._mobj._payload is not None
+
+    def hashCode(self):
+        return id(self._mobj._payload) & 0xffffffff
+
+    def object(self):
+        return MObject(self._mobj)
+
+    def objectRef(self):
+        return self.object()
+
+    def __eq__(self, other):
+        return isinstance(other, MObjectHandle) and self._mobj == other._mobj
+
+    def __hash__(self):
+        return self.hashCode()
+
+
+class MUuid(object):
+    def __init__(self, value=None):
+        self._value = None
+        if isinstance(value, MUuid):
+            self._value = value._value
+        elif value:
+            try:
+                self._value = str(uuid.UUID(str(value))).upper()
+            except ValueError:
+                self._value = None
+
+    def valid(self):
+        return self._value is not None
+
+    def asString(self):
+        return self._value or '00000000-0000-0000-0000-000000000000'
+
+    def __eq__(self, other):
+        return isinstance(other, MUuid) and self._value == other._value
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._value)
+
+
+class MPlug(object):
+    def __init__(self, *args):
+        self._ref = None
+        if len(args) == 1 and isinstance(args[0], _PlugRef):
+            self._ref = args[0]
+        elif len(args) == 1 and isinstance(args[0], MPlug):
+            self._ref = args[0]._ref
+        elif len(args) == 2:
+            node, attr = args[0]._payload, args[1]._payload
+            self._ref = _PlugRef.resolve(node, attr.name)
+
+    def _check(self):
+        if self._ref is None:
+            raise RuntimeError('(kFailure): Unexpected Internal Failure')
+        return self._ref
+
+    def __eq__(self, other):
+        return isinstance(other, MPlug) and self._ref == other._ref
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<MPlug {}>'.format(self.name() if self._ref else None)
+
+    @property
+    def isNull(self):
+        return self._ref is None
+
+    def name(self):
+        return self._check().name()
+
+    def partialName(self, includeNodeName=False, *args):
+        ref = self._check()
+        return ref.name() if includeNodeName else ref.key
+
+    def node(self):
+        return MObject(self._check().node)
+
+    def attribute(self):
+        return MObject(self._check().attr)
+
+    # -----------------------------------------------------------------
+    @property
+    def isArray(self):
+        ref = self._check()
+        return ref.attr.multi and ref.index is None
+
+    @property
+    def isElement(self):
+        ref = self._check()
+        return ref.attr.multi and ref.index is not None
+
+    @property
+    def isCompound(self):
+        return self._check().attr.kind == 'compound'
+
+    @property
+    def isChild(self):
+        return self._check().attr.parent is not None
+
+    def _getLocked(self):
+        ref = self._check()
+        return ref.key in ref.node.locked
+
+    def _setLocked(self, value):
+        ref = self._check()
+        (ref.node.locked.add if value else ref.node.locked.discard)(ref.key)
+
+    isLocked = property(_getLocked, _setLocked)
+
+    @property
+    def isKeyable(self):
+        return self._check().attr.keyable
+
+    def logicalIndex(self):
+        return self._check().index
+
+    def elementByLogicalIndex(self, index):
+        ref = self._check()
+        if not ref.attr.multi:
+            raise TypeError('(kFailure): plug is not an array: {}'.format(ref.name()))
+        return MPlug(_PlugRef(ref.node, ref.chain[:-1] + ((ref.attr, index),)))
+
+    def elementByPhysicalIndex(self, index):
+        return self.elementByLogicalIndex(self.getExistingArrayAttributeIndices()[index])
+
+    def array(self):
+        ref = self._check()
+        return MPlug(_PlugRef(ref.node, ref.chain[:-1] + ((ref.attr, None),)))
+
+    def parent(self):
+        ref = self._check()
+        return MPlug(_PlugRef(ref.node, ref.chain[:-1]))
+
+    def child(self, attr):
+        ref = self._check()
+        if isinstance(attr, int):
+            child = ref.attr.children[attr]
+        else:
+            child = attr._payload
+            if child not in ref.attr.children:
+                raise RuntimeError('(kInvalidParameter): not a child of {}'.format(ref.name()))
+        return MPlug(_PlugRef(ref.node, ref.chain + ((child, None),)))
+
+    def numChildren(self):
+        return len(self._check().attr.children)
+
+    def getExistingArrayAttributeIndices(self):
+        ref = self._check()
+        return SCENE.existingIndices(ref)
+
+    def numElements(self):
+        return len(self.getExistingArrayAttributeIndices())
+
+    def evaluateNumElements(self):
+        return self.numElements()
+
+    def numConnectedElements(self):
+        ref = self._check()
+        return len(set(dst.chain[len(ref.chain) - 1][1] for dst, src in SCENE.connectionsUnder(ref)))
+
+    # -----------------------------------------------------------------
+    @property
+    def isConnected(self):
+        ref = self._check()
+        return ref in SCENE.sources or ref in SCENE.destinations
+
+    @property
+    def isDestination(self):
+        return self._check() in SCENE.sources
+
+    @property
+    def isSource(self):
+        return self._check() in SCENE.destinations
+
+    def source(self):
+        src = SCENE.sources.get(self._check())
+        return MPlug(src) if src is not None else MPlug()
+
+    def sourceWithConversion(self):
+        return self.source()
+
+    def destinations(self):
+        return [MPlug(dst) for dst in SCENE.destinations.get(self._check(), [])]
+
+    def destinationsWithConversions(self):
+        return self.destinations()
+
+    def connectedTo(self, asDst, asSrc):
+        ref, result = self._check(), []
+        if asDst and ref in SCENE.sources:
+            result.append(MPlug(SCENE.sources[ref]))
+        if asSrc:
+            result += [MPlug(dst) for dst in SCENE.destinations.get(ref, [])]
+        return result
+
+    # -----------------------------------------------------------------
+    def _value(self, context=None):
+        ref  = self._check()
+        context = context if context is not None else MDGContext.current()
+        time = context._time.value if context is not None and context._time is not None else None
+        return SCENE.readValue(ref.node, ref, time)
+
+    def asString(self, context=None):
+        value = self._value(context)
+        return '' if value is None else str(value)
+
+    def asDouble(self, context=None):
+        return float(self._value(context) or 0.0)
+
+    asFloat = asDouble
+
+    def asMAngle(self, context=None):
+        return MAngle(self.asDouble(context))
+
+    def asInt(self, context=None):
+        return int(self._value(context) or 0)
+
+    asShort = asLong = asChar = asInt
+
+    def asBool(self, context=None):
+        return bool(self._value(context))
+
+    def asMObject(self, context=None):
+        value = self._value(context)
+        if isinstance(value, MMatrix):
+            return MObject(_Data(MFn.kMatrixData, MMatrix(value)))
+        if isinstance(value, str):
+            return MObject(_Data(MFn.kStringData, value))
+        return MObject()
+
+    def _set(self, value):
+        ref = self._check()
+        SCENE.writeValue(ref, value)
+
+    def setString(self, value):
+        self._set(str(value))
+
+    def setDouble(self, value):
+        self._set(float(value))
+
+    setFloat = setMAngle = setDouble
+
+    def setInt(self, value):
+        self._set(int(value))
+
+    setShort = setLong = setInt
+
+    def setBool(self, value):
+        self._set(bool(value))
+
+    def setMObject(self, value):
+        self._set(value._payload.value)
+
+
+class MTime(object):
+    kInvalid, kHours, kMinutes, kSeconds, kMilliseconds, kFilm, kPALFrame, kNTSCFrame = 0, 1, 2, 3, 4, 6, 7, 8
+
+    def __init__(self, value=0.0, unit=None):
+        # every unit counts frames, the stand-in has no frame rate
+        self.value = float(value)
+        self.unit  = MTime.kFilm if unit is None else unit
+
+    def __repr__(self):
+        return 'MTime({})'.format(self.value)
+
+    def asUnits(self, unit):
+        return self.value
+
+    @staticmethod
+    def uiUnit():
+        return MTime.kFilm
+
+
+class MTimeArray(list):
+    pass
+
+
+class MDoubleArray(list):
+    pass
+
+
+class MDGContext(object):
+    _STACK = [] # contexts made current by MDGContextGuard
+
+    def __init__(self, time=None):
+        self._time = time
+
+    def isNormal(self):
+        return self._time is None
+
+    def getTime(self):
+        return self._time if self._time is not None else MTime(SCENE.currentTime)
+
+    @classmethod
+    def current(cls):
+        return cls._STACK[-1] if cls._STACK else None
+
+MDGContext.kNormal = MDGContext()
+
+
+class MDGContextGuard(object):
+    '''
+    with MDGContextGuard(context): plugs read without an explicit context are evaluated in it
+    '''
+    def __init__(self, context):
+        self.context = context
+        MDGContext._STACK.append(context)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.restore()
+
+    def restore(self):
+        if self.context in MDGContext._STACK:
+            MDGContext._STACK.remove(self.context)
+
+
+class MAngle(object):
+    kInvalid, kRadians, kDegrees = 0, 1, 2
+
+    def __init__(self, value=0.0, unit=1):
+        self._value = math.radians(value) if unit == MAngle.kDegrees else float(value)
+
+    def asRadians(self):
+        return self._value
+
+    def asDegrees(self):
+        return math.degrees(self._value)
+
+    def value(self):
+        return self._value
+
+
+class MSelectionList(object):
+    def __init__(self, other=None):
+        self._items = list(other._items) if isinstance(other, MSelectionList) else []
+
+    def add(self, item, mergeWithExisting=True):
+        if isinstance(item, MObject):
+            self._items.append(item._payload)
+        elif isinstance(item, MDagPath):
+            self._items.append(item._node)
+        elif isinstance(item, MPlug):
+            self._items.append(item._ref)
+        elif isinstance(item, MUuid):
+            nodes = [SCENE.byUuid[item.asString()]] if item.asString() in SCENE.byUuid else []
+            if not nodes:
+                raise RuntimeError('(kInvalidParameter): Object does not exist')
+            self._items.extend(nodes)
+        else:
+            item = str(item)
+            try:
+                self._items.append(SCENE.plug(item) if '.' in item else SCENE.resolve(item))
+            except ValueError:
+                raise RuntimeError('(kInvalidParameter): Object does not exist')
+        return self
+
+    def length(self):
+        return len(self._items)
+
+    def isEmpty(self):
+        return not self._items
+
+    def clear(self):
+        self._items = []
+        return self
+
+    def getDependNode(self, index):
+        item = self._items[index]
+        return MObject(item.node if isinstance(item, _PlugRef) else item)
+
+    def getDagPath(self, index):
+        item = self._items[index]
+        item = item.node if isinstance(item, _PlugRef) else item
+        if not item.isDag:
+            raise TypeError('(kInvalidParameter): Object is not a DAG Node.')
+        return MDagPath(item)
+
+    def getPlug(self, index):
+        item = self._items[index]
+        if not isinstance(item, _PlugRef):
+            raise TypeError('(kInvalidParameter): Not a plug')
+        return MPlug(item)
+
+    def getSelectionStrings(self):
+        return [item.name() if isinstance(item, _PlugRef) else item.partialPath() for item in self._items]
+
+
+class MDagPath(object):
+    def __init__(self, node=None):
+        self._node = node._node if isinstance(node, MDagPath) else node
+
+    @staticmethod
+    def getAPathTo(mobj):
+        node = mobj._payload
+        if not isinstance(node, _Node) or not node.isDag:
+            raise TypeError('(kInvalidParameter): Object is not a DAG Node.')
+        return MDagPath(node)
+
+    def isValid(self):
+        return self._node is not None and self._node.alive
+
+    def node(self):
+        return MObject(self._node)
+
+    def transform(self):
+        return MObject(self._node)
+
+    def fullPathName(self):
+        return self._node.fullPath()
+
+    def partialPathName(self):
+        return self._node.partialPath()
+
+    def length(self):
+        return len(self._node.fullPath().split('|')) - 1
+
+    def hasFn(self, fnType):
+        return fnType in self._node.fns
+
+    def apiType(self):
+        return max(self._node.fns)
+
+    def inclusiveMatrix(self):
+        return self._node.worldMatrix()
+
+    def inclusiveMatrixInverse(self):
+        return self._node.worldMatrix().inverse()
+
+    def exclusiveMatrix(self):
+        return self._node.parentMatrix()
+
+    def exclusiveMatrixInverse(self):
+        return self._node.parentMatrix().inverse()
+
+    def __eq__(self, other):
+        return isinstance(other, MDagPath) and self._node is other._node
+
+
+class MFnBase(object):
+    def __init__(self, mobj=None):
+        self._mobj = MObject()
+        if mobj is not None:
+            self.setObject(mobj)
+
+    def setObject(self, mobj):
+        self._mobj = MObject(mobj.node() if isinstance(mobj, MDagPath) else mobj)
+        return self
+
+    def object(self):
+        return MObject(self._mobj)
+
+
+class MFnDependencyNode(MFnBase):
+    @property
+    def _node(self):
+        return self._mobj._payload
+
+    def name(self):
+        return self._node.name
+
+    def absoluteName(self):
+        return ':' + self._node.name
+
+    def setName(self, name):
+        return SCENE.rename(self._node, name)
+
+    @property
+    def typeName(self):
+        return self._node.typeName
+
+    @property
+    def isLocked(self):
+        return False
+
+    def uuid(self):
+        return MUuid(self._node.uuid)
+
+    def hasAttribute(self, name):
+        return self._node.findAttr(name) is not None
+
+    def attribute(self, name):
+        attr = self._node.findAttr(name)
+        return MObject(attr) if attr is not None else MObject()
+
+    def attributeCount(self):
+        return sum(1 for top in self._node.attrs for _ in top.walk())
+
+    def findPlug(self, attr, wantNetworkedPlug=False):
+        if isinstance(attr, MObject):
+            attr = attr._payload.name
+        try:
+            return MPlug(_PlugRef.resolve(self._node, attr))
+        except ValueError:
+            raise RuntimeError('(kInvalidParameter): Cannot find plug or attribute: {}.{}'.format(self._node.name, attr))
+
+    def getConnections(self):
+        return [MPlug(ref) for ref, _ in SCENE.nodeConnections(self._node)]
+
+
+class MFnDagNode(MFnDependencyNode):
+    def fullPathName(self):
+        return self._node.fullPath()
+
+    def partialPathName(self):
+        return self._node.partialPath()
+
+    def getPath(self):
+        return MDagPath(self._node)
+
+    def dagPath(self):
+        return MDagPath(self._node)
+
+    def parentCount(self):
+        return 1
+
+    def parent(self, index=0):
+        return MObject(self._node.parent) if self._node.parent is not None else MObject()
+
+    def childCount(self):
+        return len(self._node.children)
+
+    def child(self, index):
+        return MObject(self._node.children[index])
+
+
+class MFnTransform(MFnDagNode):
+    def transformation(self):
+        return MTransformationMatrix(self._node.localMatrix())
+
+    def setTransformation(self, matrix):
+        self._node.setLocalMatrix(matrix.asMatrix())
+
+
+class MFnData(object):
+    kInvalid, kNumeric, kPlugin, kPluginGeometry, kString, kMatrix, kStringArray = 0, 1, 2, 3, 4, 5, 6
+
+
+class MFnNumericData(object):
+    kInvalid, kBoolean, kByte, kChar, kShort, kInt, kLong, kFloat, kDouble = 0, 1, 2, 3, 4, 5, 5, 7, 9
+    _KINDS = {1: 'bool', 4: 'long', 5: 'long', 7: 'float', 9: 'double'}
+
+
+class MFnMatrixData(MFnBase):
+    def create(self, matrix=None):
+        self._mobj = MObject(_Data(MFn.kMatrixData, MMatrix(matrix) if matrix is not None else MMatrix()))
+        return self._mobj
+
+    def matrix(self):
+        return MMatrix(self._mobj._payload.value)
+
+    def set(self, matrix):
+        self._mobj._payload.value = MMatrix(matrix)
+
+
+class MFnStringData(MFnBase):
+    def create(self, value=''):
+        self._mobj = MObject(_Data(MFn.kStringData, value))
+        return self._mobj
+
+    def string(self):
+        return self._mobj._payload.value
+
+
+class MFnAttribute(MFnBase):
+    @property
+    def _attr(self):
+        return self._mobj._payload
+
+    def _make(self, attr):
+        self._mobj = MObject(attr)
+        return self._mobj
+
+    @property
+    def name(self):
+        return self._attr.name
+
+    @property
+    def shortName(self):
+        return self._attr.shortName
+
+    def _flag(name):
+        return property(lambda self: getattr(self._attr, name), lambda self, value: setattr(self._attr, name, value))
+
+    keyable     = _flag('keyable')
+    hidden      = _flag('hidden')
+    readable    = _flag('readable')
+    writable    = _flag('writable')
+    storable    = _flag('storable')
+    connectable = _flag('connectable')
+    array       = _flag('multi')
+    channelBox  = property(lambda self: False, lambda self, value: None)
+    usesArrayDataBuilder = property(lambda self: False, lambda self, value: None)
+    indexMatters = property(lambda self: True, lambda self, value: None)
+    del _flag
+
+
+class MFnTypedAttribute(MFnAttribute):
+    def create(self, longName, shortName, dataType, default=None):
+        kind = {MFnData.kString: 'string', MFnData.kMatrix: 'matrix'}.get(dataType, 'string')
+        return self._make(_Attr(longName, kind, shortName))
+
+
+class MFnMessageAttribute(MFnAttribute):
+    def create(self, longName, shortName):
+        return self._make(_Attr(longName, 'message', shortName))
+
+
+class MFnMatrixAttribute(MFnAttribute):
+    kFloat, kDouble = 0, 1
+
+    def create(self, longName, shortName, matrixType=1):
+        return self._make(_Attr(longName, 'matrix', shortName))
+
+
+class MFnNumericAttribute(MFnAttribute):
+    def create(self, longName, shortName, dataType, default=0.0):
+        return self._make(_Attr(longName, MFnNumericData._KINDS.get(dataType, 'double'), shortName, default=default))
+
+
+class MFnUnitAttribute(MFnAttribute):
+    kInvalid, kAngle, kDistance, kTime = 0, 1, 2, 3
+
+    def create(self, longName, shortName, unitType, default=0.0):
+        kind = {1: 'angle', 2: 'distance', 3: 'time'}.get(unitType, 'double')
+        return self._make(_Attr(longName, kind, shortName, default=default))
+
+
+class MFnCompoundAttribute(MFnAttribute):
+    def create(self, longName, shortName):
+        return self._make(_Attr(longName, 'compound', shortName))
+
+    def addChild(self, child):
+        self._attr.addChild(child._payload)
+
+    def numChildren(self):
+        return len(self._attr.children)
+
+    def child(self, index):
+        return MObject(self._attr.children[index])
+
+
+class MFnEnumAttribute(MFnAttribute):
+    def create(self, longName, shortName, default=0):
+        return self._make(_Attr(longName, 'enum', shortName, default=default))
+
+    def addField(self, name, value):
+        self._attr.fields[int(value)] = name
+
+    def fieldName(self, value):
+        try:
+            return self._attr.fields[int(value)]
+        except KeyError:
+            raise RuntimeError('(kInvalidParameter): no field with value {}'.format(value))
+
+    def fieldValue(self, name):
+        for value, fieldName in self._attr.fields.items():
+            if fieldName == name:
+                return value
+        raise RuntimeError('(kInvalidParameter): no field named {}'.format(name))
+
+    def getMin(self):
+        return min(self._attr.fields) if self._attr.fields else 0
+
+    def getMax(self):
+        return max(self._attr.fields) if self._attr.fields else 0
+
+    @property
+    def default(self):
+        return self._attr.default or 0
+
+
+class MArgList(object):
+    def __init__(self, args=()):
+        self._args = list(args)
+
+    def length(self):
+        return len(self._args)
+
+
+class MPxCommand(object):
+    def __init__(self):
+        self._result = None
+
+    def isUndoable(self):
+        return False
+
+    def doIt(self, args):
+        pass
+
+    def undoIt(self):
+        pass
+
+    def redoIt(self):
+        pass
+
+    def setResult(self, value):
+        self._result = value
+
+    def clearResult(self):
+        self._result = None
+
+
+class MFnPlugin(MFnBase):
+    def __init__(self, mobj=None, vendor='', version='', apiVersion='Any'):
+        super(MFnPlugin, self).__init__(mobj)
+
+    def registerCommand(self, name, creator, syntaxCreator=None):
+        def command(*args, **kwargs):
+            CALL_COUNTS['cmds.' + name] += 1
+            instance = creator()
+            instance.doIt(MArgList(args))
+            if instance.isUndoable():
+                UNDO_QUEUE.append(instance)
+                del REDO_QUEUE[:]
+            return instance._result
+        command.__name__ = name
+        setattr(cmds, name, command)
+
+    def deregisterCommand(self, name):
+        if hasattr(cmds, name):
+            delattr(cmds, name)
+
+UNDO_QUEUE = [] # undoable plugin commands, in execution order
+REDO_QUEUE = [] # undone commands, the last one undone at the end
+UNDO_STATE = {'state': True, 'chunks': 0, 'mark': 0} # cmds.undoInfo(state / stateWithoutFlush), open chunks
+
+class _Chunk(object):
+    '''
+    the entries recorded between the outermost undoInfo(openChunk) and undoInfo(closeChunk), undone as one
+    '''
+    def __init__(self, entries):
+        self.entries = entries
+
+    def undoIt(self):
+        for entry in reversed(self.entries):
+            entry.undoIt()
+
+    def redoIt(self):
+        for entry in self.entries:
+            entry.redoIt()
+
+# ---------------------------------------------------------------------------------------------
+class MDGModifier(object):
+    '''
+    operations are queued and run by doIt, undoIt reverts every operation run so far
+    '''
+    def __init__(self):
+        self._ops  = []
+        self._done = 0
+
+    def _queue(self, do, undo):
+        self._ops.append((do, undo))
+
+    def doIt(self):
+        while self._done < len(self._ops):
+            self._ops[self._done][0]()
+            self._done += 1
+
+    def undoIt(self):
+        while self._done:
+            self._done -= 1
+            self._ops[self._done][1]()
+
+    # -----------------------------------------------------------------
+    def _createNode(self, typeName, parent=None):
+        node = SCENE.createNode(typeName, attach=False)
+        node.parent = parent._payload if (parent is not None and not parent.isNull() and node.isDag) else None
+        state = {}
+
+        def do():
+            if 'name' not in state:
+                state['name'] = SCENE.uniqueName(node.name, node.parent, node.isDag)
+            node.name = state['name']
+            SCENE.attach(node)
+
+        def undo():
+            SCENE.detach(node)
+        self._queue(do, undo)
+        return MObject(node)
+
+    def createNode(self, typeName):
+        if typeName in _DAG_TYPES:
+            raise RuntimeError('(kInvalidParameter): use MDagModifier to create dag nodes')
+        return self._createNode(typeName)
+
+    def renameNode(self, mobj, name):
+        node, state = mobj._payload, {}
+
+        def do():
+            state['previous'] = node.name
+            SCENE.rename(node, name)
+
+        def undo():
+            SCENE.rename(node, state['previous'])
+        self._queue(do, undo)
+
+    def deleteNode(self, mobj, includeParents=False):
+        node, state = mobj._payload, {}
+
+        def do():
+            state['nodes'] = [n for n in list(node.descendants()) + [node] if n.alive]
+            state['connections'] = []
+            for each in state['nodes']:
+                state['connections'] += SCENE.detach(each)
+
+        def undo():
+            for each in reversed(state['nodes']):
+                SCENE.attach(each)
+            for src, dst in state['connections']:
+                SCENE.connect(src, dst)
+        self._queue(do, undo)
+
+    # -----------------------------------------------------------------
+    def connect(self, *args):
+        src, dst = (args[0]._ref, args[1]._ref) if len(args) == 2 else \
+                   (MPlug(args[0], args[1])._ref, MPlug(args[2], args[3])._ref)
+        state = {}
+
+        def do():
+            state['previous'] = SCENE.sources.get(dst)
+            SCENE.connect(src, dst)
+
+        def undo():
+            SCENE.disconnect(src, dst)
+            if state['previous'] is not None:
+                SCENE.connect(state['previous'], dst)
+        self._queue(do, undo)
+
+    def disconnect(self, *args):
+        src, dst = (args[0]._ref, args[1]._ref) if len(args) == 2 else \
+                   (MPlug(args[0], args[1])._ref, MPlug(args[2], args[3])._ref)
+        self._queue(lambda: SCENE.disconnect(src, dst), lambda: SCENE.connect(src, dst))
+
+    def removeMultiInstance(self, plug, breakConnections):
+        ref, state = plug._ref, {}
+
+        def do():
+            if not breakConnections and SCENE.connectionsUnder(ref):
+                raise RuntimeError('(kFailure): {} is connected'.format(ref.name()))
+            state['connections'] = SCENE.disconnectAll(ref)
+            state['values'] = dict((k, v) for k, v in ref.node.values.items() if k == ref.key or
+                                   k.startswith(ref.key + '.') or k.startswith(ref.key + '['))
+            for key in state['values']:
+                del ref.node.values[key]
+
+        def undo():
+            ref.node.values.update(state['values'])
+            for src, dst in state['connections']:
+                SCENE.connect(src, dst)
+        self._queue(do, undo)
+
+    def addAttribute(self, mobj, attr):
+        node, attr = mobj._payload, attr._payload
+        self._queue(lambda: node.addAttr(attr), lambda: node.removeAttr(attr))
+
+    def removeAttribute(self, mobj, attr):
+        node, attr, state = mobj._payload, attr._payload, {}
+
+        def do():
+            ref = _PlugRef.resolve(node, attr.name)
+            state['connections'] = SCENE.disconnectAll(ref)
+            state['values'] = dict((k, v) for k, v in node.values.items() if k == ref.key or
+                                   k.startswith(ref.key + '.') or k.startswith(ref.key + '['))
+            for key in state['values']:
+                del node.values[key]
+            node.removeAttr(attr)
+
+        def undo():
+            node.addAttr(attr)
+            node.values.update(state['values'])
+            for src, dst in state['connections']:
+                SCENE.connect(src, dst)
+        self._queue(do, undo)
+
+    def renameAttribute(self, mobj, attr, shortName, longName):
+        attr = attr._payload
+        state = {}
+
+        def do():
+            state['names'] = (attr.name, attr.shortName)
+            attr.name, attr.shortName = longName, shortName
+            mobj._payload._index = None
+
+        def undo():
+            attr.name, attr.shortName = state['names']
+            mobj._payload._index = None
+        self._queue(do, undo)
+
+    # -----------------------------------------------------------------
+    def _setValue(self, plug, value):
+        ref, state = plug._ref, {}
+
+        def do():
+            state['previous'] = ref.node.values.get(ref.key)
+            SCENE.writeValue(ref, value)
+
+        def undo():
+            if state['previous'] is None:
+                ref.node.values.pop(ref.key, None)
+            else:
+                ref.node.values[ref.key] = state['previous']
+        self._queue(do, undo)
+
+    def newPlugValue(self, plug, value):
+        self._setValue(plug, value._payload.value)
+
+    def newPlugValueString(self, plug, value):
+        self._setValue(plug, str(value))
+
+    def newPlugValueDouble(self, plug, value):
+        self._setValue(plug, float(value))
+
+    newPlugValueFloat = newPlugValueMAngle = newPlugValueMDistance = newPlugValueDouble
+
+    def newPlugValueInt(self, plug, value):
+        self._setValue(plug, int(value))
+
+    newPlugValueShort = newPlugValueChar = newPlugValueInt
+
+    def newPlugValueBool(self, plug, value):
+        self._setValue(plug, bool(value))
+
+    # -----------------------------------------------------------------
+    def pythonCommandToExecute(self, command):
+        '''
+        every edit the command makes with undo on (nodes, connections, values, attributes, locks, enum fields) 
+        is journaled like maya keeps the command's undo record, undo plays the journal back and redo plays it forward,
+        a command that raises is undone before the error
+        '''
+        state = {}
+
+        def play(calls):
+            outer, SCENE.journal = SCENE.journal, None
+            try:
+                for call in calls:
+                    call()
+            finally:
+                SCENE.journal = outer
+
+        def do():
+            if 'journal' in state: # redo
+                play([redo for _, redo in state['journal']])
+                return
+            outer, SCENE.journal = SCENE.journal, []
+            try:
+                exec(command, {})
+            except Exception:
+                journal, SCENE.journal = SCENE.journal, outer
+                play([undo for undo, _ in reversed(journal)])
+                raise
+            state['journal'], SCENE.journal = SCENE.journal, outer
+            if outer is not None:
+                outer.extend(state['journal'])
+
+        def undo():
+            play([undo for undo, _ in reversed(state['journal'])])
+        self._queue(do, undo)
+
+    def commandToExecute(self, command):
+        raise NotImplementedError('the stand-in can not run MEL: {}'.format(command))
+
+
+class MDagModifier(MDGModifier):
+    def createNode(self, typeName, parent=None):
+        if typeName not in _DAG_TYPES:
+            raise RuntimeError('(kInvalidParameter): {} is not a dag node type'.format(typeName))
+        return self._createNode(typeName, parent)
+
+    def reparentNode(self, mobj, newParent=None):
+        node, state = mobj._payload, {}
+        parent = newParent._payload if newParent is not None and not newParent.isNull() else None
+
+        def do():
+            state['previous'] = node.parent
+            _reparent(node, parent)
+
+        def undo():
+            _reparent(node, state['previous'])
+        self._queue(do, undo)
+
+
+def _reparent(node, parent, keepWorld=False):
+    world, previous = node.worldMatrix(), node.parent
+    if node.parent is not None and node in node.parent.children:
+        node.parent.children.remove(node)
+    node.parent = parent
+    if parent is not None:
+        parent.children.append(node)
+    SCENE.record(lambda: _reparent(node, previous), lambda: _reparent(node, parent))
+    if keepWorld:
+        node.setLocalMatrix(world * node.offsetParentMatrix().inverse() * node.parentMatrix().inverse())
+
+
+class MItDependencyNodes(object):
+    def __init__(self, filterType=MFn.kInvalid):
+        self._nodes = [node for node in SCENE.nodes.values()
+                       if filterType == MFn.kInvalid or filterType in node.fns]
+        self._index = 0
+
+    def isDone(self):
+        return self._index >= len(self._nodes)
+
+    def next(self):
+        self._index += 1
+
+    def thisNode(self):
+        return MObject(self._nodes[self._index])
+
+    def reset(self):
+        self._index = 0
+
+
+class MGlobal(object):
+    kReplaceList, kAddToList = 0, 2
+    MESSAGES = []
+
+    @staticmethod
+    def getSelectionListByName(name):
+        return MSelectionList().add(name)
+
+    @staticmethod
+    def getActiveSelectionList(orderedSelectionIfAvailable=False):
+        sel = MSelectionList()
+        sel._items = list(SCENE.selection)
+        return sel
+
+    @staticmethod
+    def setActiveSelectionList(sel, listAdjustment=0):
+        SCENE.selection = [item for item in sel._items if isinstance(item, _Node)]
+
+    @staticmethod
+    def displayInfo(message):
+        MGlobal.MESSAGES.append(('info', message))
+
+    @staticmethod
+    def displayWarning(message):
+        MGlobal.MESSAGES.append(('warning', message))
+
+    @staticmethod
+    def displayError(message):
+        MGlobal.MESSAGES.append(('error', message))
+
+    @staticmethod
+    def mayaState():
+        return 1 # kBatch
+
+    @staticmethod
+    def apiVersion():
+        return 20220000
+
+# ---------------------------------------------------------------------------------------------
+# maya.cmds
+cmds = types.ModuleType('maya.cmds')
+
+def _command(func):
+    name = func.__name__.rstrip('_')
+
+    def wrapper(*args, **kwargs):
+        CALL_COUNTS['cmds.' + name] += 1
+        return func(*args, **kwargs)
+    wrapper.__name__ = name
+    setattr(cmds, name, wrapper)
+    return wrapper
+
+def _flag(kwargs, *names, **default):
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+    return default.get('default')
+
+def _flatten(args):
+    result = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            result.extend(_flatten(arg))
+        elif arg is not None:
+            result.append(str(arg))
+    return result
+
+def _names(nodes, long=False):
+    return [node.fullPath() if long else node.partialPath() for node in nodes]
+
+def _plugName(ref):
+    return '{}.{}'.format(ref.node.partialPath(), ref.key)
+
+
+@_command
+def createNode(nodeType, name=None, n=None, parent=None, p=None, skipSelect=False, ss=False, shared=False):
+    parentName = parent or p
+    parentNode = SCENE.resolve(parentName) if parentName else None
+    node = SCENE.createNode(nodeType, name or n, parentNode)
+    return node.partialPath()
+
+@_command
+def rename(*args, **kwargs):
+    args = _flatten(args)
+    node = SCENE.resolve(args[0]) if len(args) > 1 else SCENE.selection[-1]
+    return SCENE.rename(node, args[-1]) and node.partialPath()
+
+@_command
+def objExists(name):
+    try:
+        SCENE.plug(name) if '.' in str(name) else SCENE.resolve(name)
+        return True
+    except ValueError:
+        return False
+
+@_command
+def ls(*args, **kwargs):
+    patterns = _flatten(args)
+    typ      = _flag(kwargs, 'typ', 'type')
+    typ      = [typ] if isinstance(typ, str) else typ
+    if _flag(kwargs, 'sl', 'selection'):
+        nodes = list(SCENE.selection)
+    elif patterns:
+        nodes = []
+        for pattern in patterns:
+            if '*' in pattern or '?' in pattern:
+                nodes += [node for node in SCENE.nodes.values()
+                          if fnmatch.fnmatchcase(node.fullPath() if '|' in pattern else node.name, pattern)]
+            else:
+                try:
+                    nodes += SCENE.resolveAll(pattern) if MUuid(pattern).valid() is False else \
+                             [SCENE.byUuid[MUuid(pattern).asString()]]
+                except (ValueError, KeyError):
+                    pass
+    else:
+        nodes = list(SCENE.nodes.values())
+    if typ:
+        nodes = [node for node in nodes if node.typeName in typ or ('transform' in typ and node.isDag)]
+    if _flag(kwargs, 'dag'):
+        nodes = [node for node in nodes if node.isDag]
+    seen, unique = set(), []
+    for node in nodes:
+        if id(node) not in seen:
+            seen.add(id(node))
+            unique.append(node)
+    if _flag(kwargs, 'uuid'):
+        return [node.uuid for node in unique]
+    return _names(unique, _flag(kwargs, 'long', 'l'))
+
+@_command
+def delete(*args, **kwargs):
+    names = _flatten(args) or [node.partialPath() for node in SCENE.selection]
+    nodes = [SCENE.resolve(name) for name in names]
+    for node in nodes:
+        if node.alive:
+            SCENE.delete(node)
+
+@_command
+def select(*args, **kwargs):
+    if _flag(kwargs, 'cl', 'clear'):
+        SCENE.selection = []
+        return
+    nodes = [SCENE.resolve(name) for name in _flatten(args)]
+    if _flag(kwargs, 'add'):
+        SCENE.selection += nodes
+    else:
+        SCENE.selection = nodes
+
+@_command
+def listRelatives(*args, **kwargs):
+    node = SCENE.resolve(_flatten(args)[0])
+    longName = _flag(kwargs, 'f', 'fullPath')
+    if _flag(kwargs, 'p', 'parent'):
+        return [node.parent.fullPath() if longName else node.parent.partialPath()] if node.parent else None
+    children = list(node.descendants()) if _flag(kwargs, 'ad', 'allDescendents') else list(node.children)
+    typ = _flag(kwargs, 'type', 'typ')
+    if typ:
+        children = [child for child in children if child.typeName == typ]
+    return _names(children, longName) or None
+
+@_command
+def parent(*args, **kwargs):
+    names = _flatten(args)
+    if _flag(kwargs, 'w', 'world'):
+        children, newParent = names, None
+    else:
+        children, newParent = names[:-1], SCENE.resolve(names[-1])
+    result = []
+    for name in children:
+        node = SCENE.resolve(name)
+        _reparent(node, newParent, keepWorld=not _flag(kwargs, 'r', 'relative'))
+        result.append(node.partialPath())
+    return result
+
+@_command
+def matchTransform(*args, **kwargs):
+    names = _flatten(args)
+    target = SCENE.resolve(names[-1])
+    for name in names[:-1]:
+        node = SCENE.resolve(name)
+        node.setLocalMatrix(target.worldMatrix() * node.offsetParentMatrix().inverse() * node.parentMatrix().inverse())
+
+@_command
+def xform(*args, **kwargs):
+    node  = SCENE.resolve(_flatten(args)[0])
+    world = _flag(kwargs, 'ws', 'worldSpace')
+    if _flag(kwargs, 'q', 'query'):
+        if _flag(kwargs, 'm', 'matrix'):
+            return list(node.worldMatrix() if world else node.localMatrix())
+        if _flag(kwargs, 't', 'translation'):
+            matrix = node.worldMatrix() if world else node.localMatrix()
+            return [matrix[12], matrix[13], matrix[14]]
+        return None
+    matrix = _flag(kwargs, 'm', 'matrix')
+    if matrix is not None:
+        matrix = MMatrix(matrix)
+        if world:
+            matrix = matrix * node.offsetParentMatrix().inverse() * node.parentMatrix().inverse()
+        node.setLocalMatrix(matrix)
+    translation = _flag(kwargs, 't', 'translation')
+    if translation is not None:
+        for axis, value in zip('XYZ', translation):
+            SCENE.setValue(node, 'translate.translate' + axis, float(value))
+
+# -----------------------------------------------------------------------------------------
+def _dataKind(dataType):
+    return {'string': 'string', 'matrix': 'matrix'}.get(dataType, 'string')
+
+def _attributeKind(attributeType):
+    return {'message': 'message', 'double': 'double', 'float': 'float', 'bool': 'bool', 'long': 'long',
+            'short': 'long', 'byte': 'long', 'enum': 'enum', 'compound': 'compound', 'matrix': 'matrix',
+            'fltMatrix': 'matrix', 'doubleAngle': 'angle', 'doubleLinear': 'distance', 'time': 'time'}.get(attributeType)
+
+@_command
+def addAttr(*args, **kwargs):
+    names = _flatten(args)
+    if _flag(kwargs, 'e', 'edit'):
+        ref  = SCENE.plug(names[0]) if '.' in names[0] else \
+               _PlugRef.resolve(SCENE.resolve(names[0]), _flag(kwargs, 'ln', 'longName'))
+        enum = _flag(kwargs, 'en', 'enumName')
+        if enum is not None:
+            _setField(ref.attr, 'fields', _parseEnum(enum))
+        keyable = _flag(kwargs, 'k', 'keyable')
+        if keyable is not None:
+            _setField(ref.attr, 'keyable', keyable)
+        return
+    node      = SCENE.resolve(names[0]) if names else SCENE.selection[-1]
+    longName  = _flag(kwargs, 'ln', 'longName')
+    shortName = _flag(kwargs, 'sn', 'shortName') or longName
+    attrType  = _flag(kwargs, 'at', 'attributeType')
+    dataType  = _flag(kwargs, 'dt', 'dataType')
+    if attrType in ('double3', 'float3'):
+        attr = _Attr(longName, 'compound', shortName)
+    else:
+        attr = _Attr(longName, _attributeKind(attrType) or _dataKind(dataType) if (attrType or dataType) else 'double',
+                     shortName, default=_flag(kwargs, 'dv', 'defaultValue'))
+    attr.multi   = bool(_flag(kwargs, 'm', 'multi'))
+    attr.keyable = bool(_flag(kwargs, 'k', 'keyable'))
+    if attr.kind == 'enum':
+        attr.fields = _parseEnum(_flag(kwargs, 'en', 'enumName') or '')
+    parentName = _flag(kwargs, 'p', 'parent')
+    if parentName:
+        parentAttr = node.findAttr(parentName)
+        attr.dynamic = True
+        parentAttr.addChild(attr)
+        node._index = None
+    else:
+        node.addAttr(attr)
+
+def _setField(attr, name, value):
+    previous = getattr(attr, name)
+    setattr(attr, name, value)
+    SCENE.record(lambda: setattr(attr, name, previous), lambda: setattr(attr, name, value))
+
+def _parseEnum(enum):
+    fields, value = OrderedDict(), 0
+    for field in [f for f in enum.split(':') if f]:
+        name, _, explicit = field.partition('=')
+        value = int(explicit) if explicit else value
+        fields[value] = name
+        value += 1
+    return fields
+
+@_command
+def deleteAttr(*args, **kwargs):
+    names = _flatten(args)
+    ref   = SCENE.plug(names[0]) if '.' in names[0] else _PlugRef.resolve(SCENE.resolve(names[0]), _flag(kwargs, 'at', 'attribute'))
+    if not ref.attr.dynamic:
+        raise RuntimeError('Cannot delete static attribute {}'.format(ref.name()))
+    SCENE.disconnectAll(ref)
+    for key in [k for k in ref.node.values if k == ref.key or k.startswith(ref.key + '.') or k.startswith(ref.key + '[')]:
+        del ref.node.values[key]
+    top = ref.attr
+    while top.parent is not None:
+        top = top.parent
+    ref.node.removeAttr(top)
+
+@_command
+def attributeQuery(attr, node=None, n=None, **kwargs):
+    target = SCENE.resolve(node or n)
+    found  = target.findAttr(attr)
+    if _flag(kwargs, 'ex', 'exists'):
+        return found is not None
+    if found is None:
+        raise RuntimeError("Attribute '{}' not found on {}".format(attr, target.name))
+    if _flag(kwargs, 'lc', 'listChildren'):
+        return [child.name for child in found.children] or None
+    if _flag(kwargs, 'le', 'listEnum'):
+        return [':'.join(found.fields.values())]
+    if _flag(kwargs, 'm', 'multi'):
+        return found.multi
+    if _flag(kwargs, 'k', 'keyable'):
+        return found.keyable
+    if _flag(kwargs, 'at', 'attributeType'):
+        return found.kind
+    return None
+
+@_command
+def listAttr(*args, **kwargs):
+    node  = SCENE.resolve(_flatten(args)[0])
+    attrs = [attr for attr in node.attrs]
+    if _flag(kwargs, 'ud', 'userDefined'):
+        attrs = [attr for attr in attrs if attr.dynamic]
+    if _flag(kwargs, 'k', 'keyable'):
+        attrs = [attr for top in attrs for attr in top.walk() if attr.keyable]
+    return [attr.name for attr in attrs] or None
+
+@_command
+def getAttr(plug, **kwargs):
+    ref = SCENE.plug(plug)
+    if _flag(kwargs, 'mi', 'multiIndices'):
+        return SCENE.existingIndices(ref) or None
+    if _flag(kwargs, 'l', 'lock'):
+        return ref.key in ref.node.locked
+    if _flag(kwargs, 'k', 'keyable'):
+        return ref.attr.keyable
+    if _flag(kwargs, 'typ', 'type'):
+        return ref.attr.kind
+    if ref.attr.kind == 'compound':
+        return [tuple(_toUi(child, SCENE.readValue(ref.node, _PlugRef(ref.node, ref.chain + ((child, None),))))
+                      for child in ref.attr.children)]
+    if ref.attr.multi and ref.index is None:
+        return [_pyValue(SCENE.readValue(ref.node, _PlugRef(ref.node, ref.chain[:-1] + ((ref.attr, i),))))
+                for i in SCENE.existingIndices(ref)] or None
+    time  = _flag(kwargs, 't', 'time')
+    return _toUi(ref.attr, _pyValue(SCENE.readValue(ref.node, ref, time)))
+
+def _pyValue(value):
+    return list(value) if isinstance(value, MMatrix) else value
+
+def _toUi(attr, value):
+    # angles are stored in radians like maya's internal unit, cmds works in degrees
+    return math.degrees(value) if attr.kind == 'angle' and isinstance(value, (int, float)) else value
+
+def _fromUi(attr, value):
+    return math.radians(value) if attr.kind == 'angle' else value
+
+@_command
+def setAttr(plug, *values, **kwargs):
+    ref = SCENE.plug(plug)
+    lock = _flag(kwargs, 'l', 'lock')
+    if lock is not None:
+        _setField(ref.node, 'locked', ref.node.locked | set([ref.key]) if lock else ref.node.locked - set([ref.key]))
+    keyable = _flag(kwargs, 'k', 'keyable')
+    if keyable is not None:
+        _setField(ref.attr, 'keyable', keyable)
+    if not values:
+        return
+    if ref.key in ref.node.locked:
+        raise RuntimeError('The attribute {} is locked or connected and cannot be modified.'.format(ref.name()))
+    if ref in SCENE.sources:
+        raise RuntimeError('The attribute {} is locked or connected and cannot be modified.'.format(ref.name()))
+    typ = _flag(kwargs, 'typ', 'type')
+    if typ == 'matrix' or ref.attr.kind == 'matrix':
+        values = _flatten([values]) if not isinstance(values[0], (list, tuple, MMatrix)) else list(values[0])
+        SCENE.writeValue(ref, MMatrix([float(v) for v in values]))
+    elif typ == 'string' or ref.attr.kind == 'string':
+        SCENE.writeValue(ref, values[0])
+    elif ref.attr.kind == 'compound':
+        values = values if len(values) > 1 else values[0]
+        SCENE.writeValue(ref, [_fromUi(child, value) for child, value in zip(ref.attr.children, values)])
+    else:
+        SCENE.writeValue(ref, _fromUi(ref.attr, values[0]))
+
+@_command
+def connectAttr(src, dst, f=False, force=False, **kwargs):
+    SCENE.connect(SCENE.plug(src), SCENE.plug(dst), force=f or force)
+
+@_command
+def disconnectAttr(src, dst, **kwargs):
+    SCENE.disconnect(SCENE.plug(src), SCENE.plug(dst))
+
+@_command
+def isConnected(src, dst, **kwargs):
+    return SCENE.sources.get(SCENE.plug(dst)) == SCENE.plug(src)
+
+@_command
+def listConnections(*args, **kwargs):
+    names = _flatten(args)
+    asSrc = _flag(kwargs, 'd', 'destination', default=True)
+    asDst = _flag(kwargs, 's', 'source', default=True)
+    plugs = _flag(kwargs, 'p', 'plugs')
+    pairs = _flag(kwargs, 'c', 'connections')
+    typ   = _flag(kwargs, 't', 'type')
+    result = []
+    for name in names:
+        if '.' in name:
+            connections = SCENE.connectionsUnder(SCENE.plug(name), asSrc, asDst)
+        else:
+            connections = SCENE.nodeConnections(SCENE.resolve(name), asSrc, asDst)
+        for this, other in connections:
+            if typ and other.node.typeName != typ:
+                continue
+            if pairs:
+                result.append(_plugName(this))
+            result.append(_plugName(other) if plugs else other.node.partialPath())
+    return result or None
+
+@_command
+def about(**kwargs):
+    if _flag(kwargs, 'api', 'apiVersion'):
+        return 20220000
+    if _flag(kwargs, 'b', 'batch'):
+        return True
+    if _flag(kwargs, 'v', 'version'):
+        return '2022'
+    return None
+
+@_command
+def undoInfo(*args, **kwargs):
+    if _flag(kwargs, 'ock', 'openChunk'):
+        if not UNDO_STATE['chunks']:
+            UNDO_STATE['mark'] = len(UNDO_QUEUE)
+        UNDO_STATE['chunks'] += 1
+        return None
+    if _flag(kwargs, 'cck', 'closeChunk'):
+        UNDO_STATE['chunks'] = max(UNDO_STATE['chunks'] - 1, 0)
+        if not UNDO_STATE['chunks'] and len(UNDO_QUEUE) - UNDO_STATE['mark'] > 1:
+            UNDO_QUEUE[UNDO_STATE['mark']:] = [_Chunk(UNDO_QUEUE[UNDO_STATE['mark']:])]
+        return None
+    if _flag(kwargs, 'q', 'query'):
+        return UNDO_STATE['state'] if _flag(kwargs, 'st', 'state', 'swf', 'stateWithoutFlush') else True
+    state = _flag(kwargs, 'st', 'state', 'swf', 'stateWithoutFlush')
+    if state is not None:
+        UNDO_STATE['state'] = bool(state)
+        if not state and _flag(kwargs, 'st', 'state') is not None: # state=False flushes the queue
+            del UNDO_QUEUE[:], REDO_QUEUE[:]
+    return None
+
+@_command
+def undo(*args, **kwargs):
+    if UNDO_QUEUE:
+        command = UNDO_QUEUE.pop()
+        command.undoIt()
+        REDO_QUEUE.append(command)
+
+@_command
+def redo(*args, **kwargs):
+    if REDO_QUEUE:
+        command = REDO_QUEUE.pop()
+        command.redoIt()
+        UNDO_QUEUE.append(command)
+
+@_command
+def refresh(*args, **kwargs):
+    pass
+
+@_command
+def evalDeferred(command=None, **kwargs):
+    if callable(command):
+        command()
+
+@_command
+def setKeyframe(*args, **kwargs):
+    '''
+    one key per attribute on the anim curve driving it (a new one when there is none), not undoable
+    '''
+    time   = _flag(kwargs, 't', 'time')
+    time   = SCENE.currentTime if time is None else float(time)
+    value  = _flag(kwargs, 'v', 'value')
+    attrs  = _flag(kwargs, 'at', 'attribute')
+    attrs  = [attrs] if isinstance(attrs, str) else attrs
+    for name in _flatten(args):
+        for ref in [SCENE.plug('{}.{}'.format(name, attr)) for attr in attrs] if attrs else [SCENE.plug(name)]:
+            source = SCENE.sources.get(ref)
+            if source is None or not source.node.typeName.startswith('animCurve'):
+                fnCurve = MFnAnimCurve()
+                fnCurve.create(MPlug(ref))
+                source  = SCENE.sources[ref]
+            key = SCENE.readValue(ref.node, ref, time) if value is None else _fromUi(ref.attr, value)
+            source.node.keys = sorted(dict(list(source.node.keys) + [(time, float(key))]).items())
+    return len(attrs or [None])
+
+@_command
+def currentTime(*args, **kwargs):
+    if _flag(kwargs, 'q', 'query'):
+        return SCENE.currentTime
+    SCENE.currentTime = float(args[0])
+    return SCENE.currentTime
+
+@_command
+def playbackOptions(**kwargs):
+    if _flag(kwargs, 'min', 'minTime'):
+        return 1.0
+    if _flag(kwargs, 'max', 'maxTime'):
+        return 120.0
+
+@_command
+def file(*args, **kwargs):
+    if _flag(kwargs, 'new', 'n'):
+        _Callbacks.sceneMessage(MSceneMessage.kBeforeNew)
+        SCENE.reset()
+        del UNDO_QUEUE[:], REDO_QUEUE[:]
+        _Callbacks.sceneMessage(MSceneMessage.kAfterNew)
+        return 'untitled'
+    if _flag(kwargs, 'o', 'open'):
+        _Callbacks.sceneMessage(MSceneMessage.kBeforeOpen)
+        SCENE.reset()
+        del UNDO_QUEUE[:], REDO_QUEUE[:]
+        SCENE.sceneName = _flatten(args)[0]
+        _Callbacks.sceneMessage(MSceneMessage.kAfterOpen)
+        return SCENE.sceneName
+    if _flag(kwargs, 'rn', 'rename'):
+        SCENE.sceneName = _flag(kwargs, 'rn', 'rename')
+        return SCENE.sceneName
+    if _flag(kwargs, 'q', 'query') and _flag(kwargs, 'sn', 'sceneName'):
+        return getattr(SCENE, 'sceneName', '')
+    if _flag(kwargs, 's', 'save'):
+        sceneName = getattr(SCENE, 'sceneName', '')
+        if sceneName.lower().endswith('.ma') and _flag(kwargs, 'typ', 'type', default='mayaAscii') == 'mayaAscii':
+            with open(sceneName, 'w') as f:
+                f.writelines(line + '\n' for line in _asciiLines(sceneName))
+        return sceneName
+
+_MA_ATTR_TYPES = {'string': '-dt "string"', 'matrix': '-dt "matrix"', 'message': '-at "message"', 'double': '-at "double"',
+                  'float': '-at "float"', 'bool': '-at "bool"', 'long': '-at "long"', 'angle': '-at "doubleAngle"',
+                  'distance': '-at "doubleLinear"', 'time': '-at "time"'}
+
+def _maString(value, width=200):
+    '''
+    a quoted maya ascii string, long ones are split into "..." + "..." like maya does
+    '''
+    chunks = [value[i:i + width] for i in range(0, len(value), width)] or ['']
+    return '\n\t\t+ '.join('"{}"'.format(chunk.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                            for chunk in chunks)
+
+def _asciiLines(sceneName):
+    '''
+    the scene as maya ascii: every node with its uuid, the dynamic attributes with their values and every connection,
+    static attribute values are left out and the stand-in can not read the file back
+    '''
+    version = about(version=True)
+    yield '//Maya ASCII {} scene'.format(version)
+    yield '//Name: {}'.format(os.path.basename(sceneName))
+    yield 'requires maya "{}";'.format(version)
+
+    def dagOrder(node):
+        yield node
+        for child in node.children:
+            for each in dagOrder(child):
+                yield each
+    nodes  = [node for root in SCENE.nodes.values() if root.isDag and root.parent is None for node in dagOrder(root)]
+    nodes += [node for node in SCENE.nodes.values() if not node.isDag]
+    for node in nodes:
+        parent = ' -p {}'.format(_maString(node.parent.partialPath())) if node.isDag and node.parent is not None else ''
+        yield 'createNode {} -n {}{};'.format(node.typeName, _maString(node.name), parent)
+        yield '\trename -uid "{}";'.format(node.uuid)
+        for attr in (attr for top in node.attrs if top.dynamic for attr in top.walk()):
+            flags = ['-ci true'] + ['-m'] * attr.multi + ['-sn', _maString(attr.shortName), '-ln', _maString(attr.name)]
+            if attr.kind == 'compound':
+                flags += ['-nc', str(len(attr.children)), '-at "compound"']
+            elif attr.kind == 'enum':
+                flags += ['-at "enum"', '-en', _maString(':'.join('{}={}'.format(name, value) for value, name in attr.fields.items()))]
+            else:
+                flags.append(_MA_ATTR_TYPES.get(attr.kind, '-at "double"'))
+            if attr.parent is not None:
+                flags += ['-p', _maString(attr.parent.name)]
+            yield '\taddAttr {};'.format(' '.join(flags))
+        for key, value in node.values.items():
+            top = node.findAttr(re.split(r'[.\[]', key)[0])
+            if top is None or not top.dynamic:
+                continue
+            lock = '-l on ' if key in node.locked else ''
+            if isinstance(value, str):
+                yield '\tsetAttr {}".{}" -type "string" {};'.format(lock, key, _maString(value))
+            elif isinstance(value, MMatrix):
+                yield '\tsetAttr {}".{}" -type "matrix" {};'.format(lock, key, ' '.join(repr(float(v)) for v in list(value)))
+            elif isinstance(value, bool):
+                yield '\tsetAttr {}".{}" {};'.format(lock, key, 'yes' if value else 'no')
+            elif isinstance(value, (int, float)):
+                yield '\tsetAttr {}".{}" {!r};'.format(lock, key, value)
+    for dst, src in sorted(SCENE.sources.items(), key=lambda pair: (pair[0].name(), pair[1].name())):
+        yield 'connectAttr {} {};'.format(_maString(src.name()), _maString(dst.name()))
+    yield '// End of {}'.format(os.path.basename(sceneName))
+
+@_command
+def loadPlugin(path, quiet=False, qt=False, **kwargs):
+    import importlib.util
+    name = re.sub(r'\.py$', '', path.replace('\\', '/').split('/')[-1])
+    if name in SCENE.plugins:
+        return [name]
+    spec   = importlib.util.spec_from_file_location('_standInPlugin_' + name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.initializePlugin(MObject())
+    SCENE.plugins[name] = module
+    return [name]
+
+@_command
+def unloadPlugin(name, **kwargs):
+    module = SCENE.plugins.pop(name, None)
+    if module is not None:
+        module.uninitializePlugin(MObject())
+
+@_command
+def pluginInfo(name, **kwargs):
+    name = re.sub(r'\.py$', '', str(name).replace('\\', '/').split('/')[-1])
+    return name in SCENE.plugins
+
+# -----------------------------------------------------------------------------------------
+def _constraint(typeName):
+    def command(*args, **kwargs):
+        names = _flatten(args)
+        if _flag(kwargs, 'q', 'query'):
+            node    = SCENE.resolve(names[0])
+            targets = _constraintTargets(node)
+            if _flag(kwargs, 'wal', 'weightAliasList'):
+                return [alias for _, alias in targets]
+            if _flag(kwargs, 'tl', 'targetList'):
+                return [target.partialPath() for target, _ in targets]
+            return None
+        if _flag(kwargs, 'e', 'edit'):
+            constrained = SCENE.resolve(names[-1])
+            node = _findConstraint(constrained, typeName)
+            if _flag(kwargs, 'rm', 'remove'):
+                for name in names[:-1]:
+                    _removeConstraintTarget(node, SCENE.resolve(name))
+            return [node.partialPath()]
+        constrained = SCENE.resolve(names[-1])
+        targets     = [SCENE.resolve(name) for name in names[:-1]]
+        node = _findConstraint(constrained, typeName)
+        if node is None:
+            name = _flag(kwargs, 'n', 'name') or '{}_{}1'.format(constrained.name, typeName)
+            node = SCENE.createNode(typeName, name, constrained)
+        for target in targets:
+            _addConstraintTarget(node, target)
+        return [node.partialPath()]
+    command.__name__ = typeName
+    return command
+
+def _constraintTargets(node):
+    targets = []
+    for index in SCENE.existingIndices(_PlugRef.resolve(node, 'target')):
+        src = SCENE.sources.get(_PlugRef.resolve(node, 'target[{}].targetParentMatrix'.format(index)))
+        if src is not None:
+            targets.append((src.node, node.values.get('_alias[{}]'.format(index))))
+    return targets
+
+def _findConstraint(constrained, typeName):
+    for child in constrained.children:
+        if child.typeName == typeName:
+            return child
+    return None
+
+def _addConstraintTarget(node, target):
+    index = max(SCENE.existingIndices(_PlugRef.resolve(node, 'target')) or [-1]) + 1
+    alias = '{}W{}'.format(target.name, index)
+    weight = _Attr(alias, 'double', alias, default=1.0, keyable=True)
+    node.addAttr(weight)
+    SCENE.setValue(node, '_alias[{}]'.format(index), alias)
+    SCENE.connect(_PlugRef.resolve(target, 'parentMatrix[0]'), _PlugRef.resolve(node, 'target[{}].targetParentMatrix'.format(index)))
+    SCENE.connect(_PlugRef.resolve(node, alias), _PlugRef.resolve(node, 'target[{}].targetWeight'.format(index)))
+
+def _removeConstraintTarget(node, target):
+    for index in SCENE.existingIndices(_PlugRef.resolve(node, 'target')):
+        ref = _PlugRef.resolve(node, 'target[{}].targetParentMatrix'.format(index))
+        src = SCENE.sources.get(ref)
+        if src is not None and src.node is target:
+            alias = node.values['_alias[{}]'.format(index)]
+            SCENE.setValue(node, '_alias[{}]'.format(index), None)
+            SCENE.disconnectAll(_PlugRef.resolve(node, alias))
+            SCENE.disconnectAll(_PlugRef.resolve(node, 'target[{}]'.format(index)))
+            node.removeAttr(node.findAttr(alias))
+            for key in [k for k in node.values if k.startswith('target[{}]'.format(index))]:
+                SCENE.setValue(node, key, None)
+
+for _typeName in _CONSTRAINT_TYPES:
+    _command(_constraint(_typeName))
+
+# ---------------------------------------------------------------------------------------------
+def _counted(cls):
+    '''
+    count every public method call of an om2 class in CALL_COUNTS
+    '''
+    for attrName, value in list(vars(cls).items()):
+        if attrName.startswith('_') or not callable(value) or isinstance(value, type):
+            continue
+        if isinstance(value, staticmethod):
+            continue
+
+        def wrap(func, label):
+            def wrapper(*args, **kwargs):
+                CALL_COUNTS[label] += 1
+                return func(*args, **kwargs)
+            wrapper.__name__ = func.__name__
+            return wrapper
+        setattr(cls, attrName, wrap(value, 'om2.{}.{}'.format(cls.__name__, attrName)))
+    return cls
+
+for _cls in (MPlug, MSelectionList, MDagPath, MFnDependencyNode, MFnDagNode, MDGModifier, MDagModifier):
+    _counted(_cls)
+
+om2 = types.ModuleType('maya.api.OpenMaya')
+for _name, _value in list(globals().items()):
+    if _name.startswith('M') and isinstance(_value, type):
+        setattr(om2, _name, _value)
+
+# ---------------------------------------------------------------------------------------------
+# om2 anim
+class MAnimCurveChange(object):
+    '''
+    keys before / after every curve edited with it
+    '''
+    def __init__(self):
+        self._edits = [] # [(node, keysBefore, keysAfter), ...]
+
+    def _record(self, node, before):
+        self._edits.append((node, before, list(node.keys)))
+
+    def undoIt(self):
+        for node, before, after in reversed(self._edits):
+            node.keys = list(before)
+
+    def redoIt(self):
+        for node, before, after in self._edits:
+            node.keys = list(after)
+
+
+@_counted
+class MFnAnimCurve(MFnBase):
+    kAnimCurveTA, kAnimCurveTL, kAnimCurveTT, kAnimCurveTU = 0, 1, 2, 3
+    kTangentGlobal, kTangentFixed, kTangentLinear, kTangentFlat, kTangentSmooth, kTangentStep = 0, 1, 2, 3, 4, 5
+    kTangentClamped, kTangentAuto = 8, 11
+    _TYPES = {0: 'animCurveTA', 1: 'animCurveTL', 2: 'animCurveTT', 3: 'animCurveTU'}
+
+    def create(self, plug, animCurveType=None, modifier=None):
+        if animCurveType is None:
+            animCurveType = {'angle': self.kAnimCurveTA, 'distance': self.kAnimCurveTL,
+                             'time': self.kAnimCurveTT}.get(plug._check().attr.kind, self.kAnimCurveTU)
+        typeName = self._TYPES[animCurveType]
+        if modifier is not None:
+            mobj = modifier.createNode(typeName)
+            modifier.connect(MPlug(_PlugRef.resolve(mobj._payload, 'output')), plug)
+        else:
+            node = SCENE.createNode(typeName)
+            SCENE.connect(_PlugRef.resolve(node, 'output'), plug._check())
+            mobj = MObject(node)
+        self.setObject(mobj)
+        return mobj
+
+    def _node(self):
+        return self._mobj._payload
+
+    @property
+    def numKeys(self):
+        return len(self._node().keys)
+
+    @property
+    def isUnitlessInput(self):
+        return self._node().typeName.startswith('animCurveU')
+
+    def input(self, index):
+        return MTime(sorted(self._node().keys)[index][0])
+
+    def value(self, index):
+        return sorted(self._node().keys)[index][1]
+
+    def evaluate(self, time):
+        return _evaluateCurve(self._node(), time.value)
+
+    def setValue(self, index, value, change=None):
+        node   = self._node()
+        before = list(node.keys)
+        keys   = sorted(node.keys)
+        keys[index] = (keys[index][0], float(value))
+        node.keys = keys
+        if change is not None:
+            change._record(node, before)
+
+    def addKey(self, time, value, tangentInType=0, tangentOutType=0, change=None):
+        self.addKeys([time], [value], tangentInType, tangentOutType, True, change)
+
+    def addKeys(self, times, values, tangentInType=0, tangentOutType=0, keepExistingKeys=False, change=None):
+        node   = self._node()
+        before = list(node.keys)
+        keys   = dict(before) if keepExistingKeys else {}
+        keys.update((time.value, float(value)) for time, value in zip(times, values))
+        node.keys = sorted(keys.items())
+        if change is not None:
+            change._record(node, before)
+
+oma2 = types.ModuleType('maya.api.OpenMayaAnim')
+oma2.MFnAnimCurve, oma2.MAnimCurveChange = MFnAnimCurve, MAnimCurveChange
+
+# ---------------------------------------------------------------------------------------------
+def newScene():
+    '''
+    empty the stand-in scene, fires the new scene callbacks
+    '''
+    cmds.file(new=True, force=True)
+
+def install():
+    '''
+    register the stand-in as maya / maya.cmds / maya.api.OpenMaya / maya.api.OpenMayaAnim, returns (cmds, om2)
+    '''
+    maya       = types.ModuleType('maya')
+    api        = types.ModuleType('maya.api')
+    standalone = types.ModuleType('maya.standalone')
+    standalone.initialize   = lambda *args, **kwargs: None
+    standalone.uninitialize = lambda *args, **kwargs: None
+    maya.cmds, maya.api, maya.standalone, api.OpenMaya, api.OpenMayaAnim = cmds, api, standalone, om2, oma2
+    maya.STANDIN = True
+    sys.modules.update({'maya': maya, 'maya.cmds': cmds, 'maya.api': api, 'maya.api.OpenMaya': om2,
+                        'maya.api.OpenMayaAnim': oma2, 'maya.standalone': standalone})
+    return cmds, om2
+
+def isInstalled():
+    return getattr(sys.modules.get('maya'), 'STANDIN', False)
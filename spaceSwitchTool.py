@@ -1,907 +1,3168 @@
-import maya.cmds         as cmds
-import maya.api.OpenMaya as om2
-import PySide2.QtWidgets as QtWidgets
-import PySide2.QtCore    as QtCore
-import PySide2.QtGui     as QtGui
-from functools import partial
-
-def addUndo(func):
-    def undo(*args, **kwargs):
-        cmds.undoInfo(openChunk=True)
-        func(*args, **kwargs)
-        cmds.undoInfo(closeChunk=True)
-    return undo      
-
-def mayaMainWindow():
-    import sys
-    from maya.OpenMayaUI import MQtUtil
-    from shiboken2       import wrapInstance
-    if sys.version_info.major >= 3:
-        return wrapInstance(int(MQtUtil.mainWindow()), QtWidgets.QMainWindow)
-    else:
-        return wrapInstance(long(MQtUtil.mainWindow()), QtWidgets.QMainWindow)
-        
-def getSelection():
-    sel = om2.MGlobal.getActiveSelectionList()
-    return [sel.getDagPath(i) 
-            if sel.getDependNode(i).hasFn(om2.MFn.kDagNode) 
-            else om2.MFnDependencyNode(sel.getDependNode(i)) 
-            for i in range(sel.length())]
-            
-def getNodeLongName(obj):
-    '''
-    return: name, longName
-    '''
-    if isinstance(obj, om2.MFnDependencyNode):
-        return obj.name(), obj.name()
-    else:
-        return obj.fullPathName().split('|')[-1], obj.fullPathName()
-
-        
-class MetaUtils(object):
-    
-    @staticmethod
-    def createMetaNode(nodeName, nodeType):
-        metaNode = cmds.createNode(nodeType, name=nodeName)
-        # ----------------------------------------------------
-        cmds.addAttr(metaNode, ln='metaClass', dt='string')
-        cmds.setAttr('{}.metaClass'.format(metaNode), 'SpaceSwitch', typ='string')
-        cmds.setAttr('{}.metaClass'.format(metaNode), lock=True)
-        cmds.addAttr(metaNode, ln='source', at='message')
-        cmds.addAttr(metaNode, ln='offsetGroup', at='message')
-        cmds.addAttr(metaNode, ln='constraints', nc=4, at='compound')
-        cmds.addAttr(metaNode, ln='pointConstraint', at='message', p='constraints')
-        cmds.addAttr(metaNode, ln='orientConstraint',at='message', p='constraints')
-        cmds.addAttr(metaNode, ln='scaleConstraint', at='message', p='constraints')
-        cmds.addAttr(metaNode, ln='parentConstraint',at='message', p='constraints')
-        
-        # ----------------------------------------------------
-        cmds.addAttr(metaNode, ln='target', nc=2, at='compound', m=True)
-        cmds.addAttr(metaNode, ln='attrName', dt='string', p='target')
-        cmds.addAttr(metaNode, ln='spaceTarget', at='message', p='target')
-        # ----------------------------------------------------
-        cmds.addAttr(metaNode, ln='spaceLocs', dt='string', m=True)
-        cmds.addAttr(metaNode, ln='conditionNodes', dt='string', m=True)
-        # cmds.addAttr(metaNode, ln='spaceLocs', at='message', m=True)
-        # cmds.addAttr(metaNode, ln='conditionNodes', at='message', m=True)
-        
-        cmds.addAttr(metaNode, ln='offsetGroupLocalMatrix', dt="matrix")
-        return metaNode
-    
-    @staticmethod
-    def connectMiAttr(node, attr, metaNode, metaAttr):
-        index = 0  
-        while True:
-            fullPathAttr = '{}.{}[{}]'.format(metaNode, metaAttr, index)
-            if cmds.listConnections(fullPathAttr, d=False) is None:
-                cmds.connectAttr('{}.{}'.format(node, attr), fullPathAttr, f=True)
-                break   
-            index += 1 
-    
-    @staticmethod
-    def isUuidValid(uuid):
-        if isinstance(uuid, str):
-            return om2.MUuid(uuid).valid()
-        elif isinstance(uuid, om2.MUuid):
-            return uuid.valid()
-        return False
-        
-    @staticmethod
-    def getMetaNodes():
-        return [SpaceSwitchMeta(node) for node in cmds.ls(typ='network')
-                if cmds.attributeQuery('metaClass', n=node, ex=True) and 
-                cmds.getAttr('{}.metaClass'.format(node)) == 'SpaceSwitch']
-                
-    @staticmethod            
-    def uniqueName(name):
-        startNum = 0; newName = name
-        while cmds.objExists(newName):
-            startNum += 1
-            newName = '{}_{:03d}'.format(name, startNum)
-        return newName
-        
-    @staticmethod     
-    def getUuid(nodeName):
-        try:
-            mobj = om2.MGlobal.getSelectionListByName(nodeName).getDependNode(0)
-            return om2.MFnDependencyNode(mobj).uuid().asString()
-        except:
-            return  
-     
-class SpaceSwitchMeta(object):
-    _CACHE = {}
-    _NODETYPE = 'network'
-    
-    def __new__(cls, *args, **kwargs):
-        nodeName = args[0] if len(args) > 0 else kwargs.get('nodeName')
-        
-        uuid = MetaUtils.getUuid(nodeName)
-        if uuid is None:
-            uuid = MetaUtils.getUuid(cls._create(nodeName, cls._NODETYPE))
-            
-        if uuid in cls._CACHE:
-            return cls._CACHE[uuid]
-            
-        instance = super(SpaceSwitchMeta, cls).__new__(cls)
-        cls._CACHE[uuid] = instance
-        return instance
-        
-    def __init__(self, nodeName):
-        if not hasattr(self, '_INITOK'):
-            self.node    = nodeName
-            self._INITOK = True
-            
-    def __str__(self):
-        return self.path
-        
-    def __repr__(self):
-        return "<SpaceSwitchMeta |'{}'>".format(self.path)
-        
-    @classmethod
-    def _create(cls, nodeName, nodeType):
-        return MetaUtils.createMetaNode(nodeName, nodeType)
-            
-    @property
-    def node(self):
-        return self._node
-    
-    @node.setter
-    def node(self, nodeName):
-        mobj       = om2.MGlobal.getSelectionListByName(nodeName).getDependNode(0)
-        self._node = om2.MFnDependencyNode(mobj)
-        
-    @property
-    def path(self):
-        return self.node.name()
-        
-    # -----------------------------------------------------------------------------------------    
-    @property
-    def source(self):
-        source = cmds.listConnections('{}.source'.format(self), d=False)
-        return cmds.ls(source[0], long=True)[0] if source else None
-    
-    @source.setter
-    def source(self, obj):
-        cmds.connectAttr('{}.message'.format(obj), '{}.source'.format(self), f=True)
-        
-    @property
-    def offsetGroup(self):
-        offsetGroup = cmds.listConnections('{}.offsetGroup'.format(self), d=False)
-        return cmds.ls(offsetGroup[0], long=True)[0] if offsetGroup else None
-    
-    @offsetGroup.setter
-    def offsetGroup(self, obj):
-        cmds.connectAttr('{}.message'.format(obj), '{}.offsetGroup'.format(self), f=True)
-    
-    # -----------------------------------------------------------------------------------------
-    @property
-    def target(self):
-        targetWidgets = {}
-        # get target count
-        spaceTargets = cmds.listConnections('{}.target'.format(self), d=False)
-        #print(spaceTargets)
-        for index, target in enumerate(spaceTargets):
-            targetData = {}
-            targetData['attrName']    = cmds.getAttr('{}.target[{}].attrName'.format(self, index))
-            targetData['spaceTarget'] = target
-            targetWidgets[index] = targetData
-            
-        return targetWidgets
-        
-    @target.setter
-    def target(self, data):
-        for index, widget in enumerate(data.values()):
-            target = widget['spaceTarget']
-            cmds.connectAttr('{}.message'.format(target), '{}.target[{}].spaceTarget'.format(self, index), f=True)
-            attrName = widget['attrName']
-            cmds.setAttr('{}.target[{}].attrName'.format(self, index), attrName, typ="string")
-            
-    @property        
-    def spaceLocs(self):
-        return cmds.listConnections('{}.spaceLocs'.format(self), d=False) or []
-        
-    @spaceLocs.setter
-    def spaceLocs(self, data):
-        offsetGroup, targets = data
-        _targets = [value['spaceTarget'] for value in targets.values()]
-
-        for target in _targets:
-            #locName = MetaUtils.uniqueName('{}_{}_spaceSwitch_LOC'.format(self.source.split('|')[-1], target.split('|')[-1]))
-            locName = MetaUtils.uniqueName('{}_spaceSwitch_LOC'.format(self.source.split('|')[-1]))
-            loc = cmds.createNode('transform', name=locName)
-            cmds.parent(loc, target)
-            cmds.matchTransform(loc, offsetGroup)
-            MetaUtils.connectMiAttr(loc, 'message', self, 'spaceLocs')
-                
-    @property
-    def constraints(self):
-        _constraints = []
-        childAttrs = cmds.attributeQuery('constraints', node=self, listChildren=True)
-        for attr in childAttrs:
-            cons = cmds.listConnections('{}.constraints.{}'.format(self, attr), d=False)
-            if cons is None:
-                continue
-            _constraints.append(cons[0])
-        return _constraints
-        
-    @constraints.setter
-    def constraints(self, data):
-        types, offsetGroup, spaceLoc = data
-        conTypes = [i for i in types if types[i]]
-        for conType in conTypes:
-            if conType == 'point':
-                c = cmds.pointConstraint(spaceLoc, offsetGroup, mo=True)[0]
-                cmds.connectAttr('{}.message'.format(c), '{}.constraints.pointConstraint'.format(self), f=True)
-            elif conType == 'orient':
-                c = cmds.orientConstraint(spaceLoc, offsetGroup, mo=True)[0]
-                cmds.setAttr('{}.interpType'.format(c), 2)
-                cmds.connectAttr('{}.message'.format(c), '{}.constraints.orientConstraint'.format(self), f=True)
-            elif conType == 'scale':
-                c = cmds.scaleConstraint(spaceLoc, offsetGroup, mo=True)[0]
-                cmds.connectAttr('{}.message'.format(c), '{}.constraints.scaleConstraint'.format(self), f=True)
-            elif conType == 'parent':
-                c = cmds.parentConstraint(spaceLoc, offsetGroup, mo=True)[0]
-                cmds.setAttr('{}.interpType'.format(c), 2)
-                cmds.connectAttr('{}.message'.format(c), '{}.constraints.parentConstraint'.format(self), f=True)
-                
-    # -----------------------------------------------------------------------------------------
-    @property
-    def conType(self):
-        conTypeDic = {}
-        # get childs attr name
-        childAttrs = cmds.attributeQuery('constraints', node=self, listChildren=True)
-        for attr in childAttrs:
-            value = bool(cmds.listConnections('{}.constraints.{}'.format(self, attr)))
-            conTypeDic[attr.split('Constraint')[0]] = value
-        return conTypeDic
-        
-    def createAttr(self, ctrl, targets):
-        attrNames = [value['attrName'] for value in targets.values()]
-        if cmds.attributeQuery('spaceSwitch', node=ctrl, ex=True):
-            cmds.deleteAttr('{}.spaceSwitch'.format(ctrl))
-        cmds.addAttr(ctrl, ln='spaceSwitch', at='enum', k=True, en=':'.join(attrNames))
-    
-    # -----------------------------------------------------------------------------------------------
-    @property
-    def conditionNodes(self):
-        return cmds.listConnections('{}.conditionNodes'.format(self), d=False) or []
-            
-    def createConditionNode(self, ctrl, constraints):
-        for cons in constraints:
-            for index, loc in enumerate(self.spaceLocs):
-                condNodeName = MetaUtils.uniqueName('{}_condition'.format(loc.split('|')[-1]))
-                condNode = cmds.createNode('condition', name=condNodeName)
-                cmds.setAttr('{}.colorIfTrueR'.format(condNode), 1)
-                cmds.setAttr('{}.colorIfFalseR'.format(condNode), 0)
-                cmds.setAttr('{}.secondTerm'.format(condNode), index)
-                cmds.connectAttr('{}.spaceSwitch'.format(ctrl),   '{}.firstTerm'.format(condNode), f=True)
-                cmds.connectAttr('{}.outColorR'.format(condNode), '{}.{}W{}'.format(cons, loc, index), f=True)
-                MetaUtils.connectMiAttr(condNode, 'message', self, 'conditionNodes')
-                
-    @property    
-    def offsetGroupMatrix(self):
-        return cmds.getAttr('{}.offsetGroupLocalMatrix'.format(self))
-
-    @offsetGroupMatrix.setter
-    def offsetGroupMatrix(self, inMatrix):
-        cmds.setAttr('{}.offsetGroupLocalMatrix'.format(self), inMatrix, typ='matrix')
-    # -----------------------------------------------------------------------------------------
-        
-    @property
-    def nodeData(self):
-        _nodeData = {}
-        _nodeData['source']        = self.source
-        _nodeData['offsetGroup']   = self.offsetGroup
-        _nodeData['conType']       = self.conType
-        _nodeData['targetWidgets'] = self.target
-        return _nodeData
-        
-    @nodeData.setter    
-    def nodeData(self, data):
-        self.source = data['source']
-        self.offsetGroup = data['offsetGroup']
-        self.target = data['targetWidgets']
-        self.spaceLocs = (self.offsetGroup, self.target)
-        self.offsetGroupMatrix = cmds.xform(self.offsetGroup, q=True, m=True, ws=False)
-        
-        self.constraints = (data['conType'], self.offsetGroup, self.spaceLocs)
-        self.createAttr(self.source, self.target)
-        self.createConditionNode(self.source, self.constraints)
-        cmds.select(self.source, ne=True)
-        
-    @nodeData.deleter    
-    def nodeData(self):
-        cmds.delete(self.conditionNodes, 
-                    self.constraints,
-                    self.spaceLocs)
-        if cmds.attributeQuery('spaceSwitch', node=self.source, ex=True):
-            cmds.deleteAttr('{}.spaceSwitch'.format(self.source))
-        cmds.xform(self.offsetGroup, m=self.offsetGroupMatrix, ws=False)
-        cmds.delete(self)
-
-'''
-data =  {'source': 'joint1', 
-         'offsetGroup': 'joint1_str', 
-         'conType': {'point': False, 'orient': False, 'scale': True, 'parent': True}, 
-         'targetWidgets': {0: {'attrName': 'ikk', 'spaceTarget': 'ik'}, 
-                           1: {'attrName': 'fkk', 'spaceTarget': 'fk'}}} #        
-
-node = SpaceSwitchMeta('woshikangddan')
-node.nodeData = data
-node.nodeData
-del node.nodeData
-nodes = MetaUtils.getMetaNodes()
-'''
-
-class LineShape(QtWidgets.QFrame):
-    def __init__(self):
-        super(LineShape, self).__init__()
-        self.setFrameShape(QtWidgets.QFrame.HLine)
-        self.setStyleSheet("border-top: 2px solid #505050;")
-        
-class TargetWidget(QtWidgets.QWidget):
-
-    def __init__(self, parent=None):
-        super(TargetWidget, self).__init__(parent)
-        self.setAttribute(QtCore.Qt.WA_StyledBackground, True) 
-        self.setObjectName('baseWidget')
-        self.createWidgets()
-        self.createLayouts()
-        self.createConnections()
-        self.spaceTargetLong = None
-        
-    def setWidgetColor(self, count):
-        if count % 2 == 0:
-            self.setStyleSheet('#baseWidget { background-color: #373737;}')
-        else:
-            self.setStyleSheet('#baseWidget { background-color: #444444;}')
-        
-    def __repr__(self):
-        return '<{0}> AttrName: {1} SpaceTarget: {2}'.format(
-        self.__class__.__name__, self.attrNameLine.text(), self.spaceTargetLine.text())
-        
-    def createLayouts(self):
-        mainLayout = QtWidgets.QVBoxLayout(self)
-        mainLayout.setMargin(8)
-        mainLayout.setSpacing(5)
-        
-        gridLayout = QtWidgets.QGridLayout()
-        gridLayout.setSpacing(5)
-        gridLayout.addWidget(QtWidgets.QLabel('Attr Name'), 0, 0)
-        gridLayout.addWidget(self.attrNameLine, 0, 1, 1, 2)
-        gridLayout.addWidget(QtWidgets.QLabel('Space Target'), 1, 0)
-        gridLayout.addWidget(self.spaceTargetLine, 1, 1)
-        gridLayout.addWidget(self.spaceBut, 1, 2)
-        
-        mainLayout.addLayout(gridLayout)
-        mainLayout.addWidget(LineShape())
-        #mainLayout.addStretch()
-        
-    def createWidgets(self):
-        self.attrNameLine = QtWidgets.QLineEdit()
-        regex = QtCore.QRegExp('^[a-zA-Z_][a-zA-Z0-9_]*$')
-        validator = QtGui.QRegExpValidator(regex, self.attrNameLine)
-        self.attrNameLine.setValidator(validator)
-        
-        # ---------------------------------------
-        self.spaceTargetLine  = QtWidgets.QLineEdit()
-        self.spaceTargetLine.setReadOnly(True)
-        self.spaceBut = QtWidgets.QPushButton()
-        self.spaceBut.setIcon(QtGui.QIcon(':moveUVLeft.png'))
-        self.spaceBut.setFixedSize(28, 28)
-
-    def createConnections(self):
-        self.spaceBut.clicked.connect(self.addSpaceTargetNode)
-
-    def addSpaceTargetNode(self):
-        sel = getSelection()
-
-        if not sel:
-            return om2.MGlobal.displayWarning('Please select an object')
-        if isinstance(sel[0], om2.MFnDependencyNode):
-            return om2.MGlobal.displayWarning('Please select an dagNode')
-            
-        name, longName = getNodeLongName(sel[0])
-        self.spaceTargetLine.setText(name)
-        self.spaceTargetLong = longName
-        
-    def getWidgetData(self):
-        return {'attrName':self.attrNameLine.text(),
-                'spaceTarget':self.spaceTargetLong }
-                
-    def setWidgetData(self, data):
-        self.attrNameLine.setText(data.get('attrName'))
-        
-        self.spaceTargetLine.setText(data.get('spaceTarget').split('|')[-1])
-        self.spaceTargetLong = data.get('spaceTarget')
-        
-
-class SpaceSwitchUI(QtWidgets.QDialog):
-    INSTANCE = None
-    
-    def showEvent(self, event):
-        if self.geometry:
-            self.restoreGeometry(self.geometry)
-        #self.getMeta()
-        if self.openUI:
-            self.createScriptJobs()
-            self.openUI = False
-        super(SpaceSwitchUI, self).showEvent(event)
-        
-    def closeEvent(self, event):
-        super(SpaceSwitchUI, self).closeEvent(event)
-        self.geometry = self.saveGeometry()
-        self.deleteScriptJobs()
-        self.openUI = True
-        
-    # --------------------------------------------------------    
-    def createScriptJobs(self):
-        #print('create')
-        self.scriptJobs.append(cmds.scriptJob(event=['NewSceneOpened', partial(self.getMeta)], pro=True)) # new scene
-        self.scriptJobs.append(cmds.scriptJob(event=['PostSceneRead', partial(self.getMeta)], pro=True))  # open scene
-        self.scriptJobs.append(cmds.scriptJob(event=['Undo', partial(self.undoUpdate)], pro=True))  # undo
-        
-    def deleteScriptJobs(self):
-        #print('delete')
-        for jobNumber in self.scriptJobs:
-            cmds.evalDeferred('if cmds.scriptJob(exists={0}):\tcmds.scriptJob(kill={0}, force=True)'.format(jobNumber))   
-        self.scriptJobs = [] 
-    # --------------------------------------------------------  
-    def undoUpdate(self):
-        TargetBoxitemDatas = [self.targetsBox.itemData(i) 
-                              for i in range(self.targetsBox.count())
-                              if isinstance(self.targetsBox.itemData(i), SpaceSwitchMeta)]
-                              
-        metaNodes = MetaUtils.getMetaNodes()
-        if not set(TargetBoxitemDatas) == set(metaNodes):
-            #print('start undo')
-            self._updateUI_()
-
-    def getMeta(self):
-        metaNodes = MetaUtils.getMetaNodes()
-        self.targetsBox.clear()
-        self.targetsBox.addItem('<New>')
-        
-        for metaNode in metaNodes:
-            self.targetsBox.addItem(metaNode.path, metaNode) # metaNode instance to data
-
-        self.updateData()
-        
-    def resetData(self):
-        self.deleteAllTargetWidget()
-        self.sourceLineEdit.setText('')
-        self.offsetGroupLineEdit.setText('')
-        self.positionCheckBox.setChecked(False)
-        self.rotationCheckBox.setChecked(False)
-        self.scaleCheckBox.setChecked(False)
-        self.parentCheckBox.setChecked(False)
-        
-        self.positionCheckBox.setEnabled(True)
-        self.rotationCheckBox.setEnabled(True)
-        self.sourceLong = None
-        self.offsetGroupLong = None
-        
-    def updateData(self):
-        currentIndex = self.targetsBox.currentIndex()
-        itemData = self.targetsBox.itemData(currentIndex)
-        if itemData is not None and isinstance(itemData, SpaceSwitchMeta):
-            self.setWidgetData(itemData.nodeData) # set metaNode instance data
-            cmds.select(itemData.source, ne=True)
-        else:   
-            self.resetData()
-            #cmds.select(cl=True)
-    
-    def parentTo(self):
-        isParent = self.parentCheckBox.isChecked()
-        if isParent:
-            # get conscheckbox state
-            self.pBoxState = self.positionCheckBox.isChecked()
-            self.rBoxState = self.rotationCheckBox.isChecked()
-            
-            self.positionCheckBox.setChecked(False)
-            self.positionCheckBox.setEnabled(False)
-            self.rotationCheckBox.setChecked(False)
-            self.rotationCheckBox.setEnabled(False)
-            
-        else:
-            #try:
-            self.positionCheckBox.setChecked(self.pBoxState)
-            self.positionCheckBox.setEnabled(True)
-            self.rotationCheckBox.setChecked(self.rBoxState)
-            self.rotationCheckBox.setEnabled(True)
-            #except:
-                #pass
-    
-    # --------------------------------------------------------
-        
-    @classmethod
-    def displayUI(cls):
-        if cls.INSTANCE is None:
-            cls.INSTANCE = SpaceSwitchUI()
-  
-        if cls.INSTANCE.isHidden():
-            cls.INSTANCE.show()
-            
-        else:
-            if cls.INSTANCE.isMinimized():
-                cls.INSTANCE.showNormal()
-            cls.INSTANCE.raise_()
-            cls.INSTANCE.activateWindow()
-            
-    def __init__(self, parent=mayaMainWindow()):
-        super(SpaceSwitchUI, self).__init__(parent)
-        self.setWindowTitle('Space Switch Tool')
-        self.geometry = None
-        self.setWindowFlags(QtCore.Qt.WindowType.Window)
-        self.resize(380, 450)
-        self.setFocusPolicy(QtCore.Qt.StrongFocus); self.setFocus()
-        # ---------------------------------------
-        self.createWidgets()
-        self.createLayouts()
-        self.createConnections()
-        self.sourceLong = None
-        self.offsetGroupLong = None
-        self.getMeta()
-        
-        self.openUI = True
-        self.scriptJobs = []
-        
-    def createLayouts(self):
-        mainLayout = QtWidgets.QVBoxLayout(self)
-        mainLayout.setMargin(8)
-        mainLayout.setSpacing(5)
-        
-        targetsLayout = QtWidgets.QHBoxLayout()
-        targetsLayout.setSpacing(5)
-        targetsLayout.addWidget(QtWidgets.QLabel('Meta  Nodes'))
-        targetsLayout.addWidget(self.targetsBox)
-        targetsLayout.addWidget(self.updateBut)
-        targetsLayout.setStretchFactor(self.targetsBox, 1)
-        
-        gridLayout = QtWidgets.QGridLayout()
-        gridLayout.setSpacing(5)
-        gridLayout.addWidget(QtWidgets.QLabel('Source'), 0, 0)
-        gridLayout.addWidget( self.sourceLineEdit, 0, 1)
-        gridLayout.addWidget( self.sourceBut, 0, 2)
-        gridLayout.addWidget(QtWidgets.QLabel('Offset Group'), 1, 0)
-        gridLayout.addWidget( self.offsetGroupLineEdit, 1, 1)
-        gridLayout.addWidget( self.offsetGroupBut, 1, 2)
-        
-        subLayout = QtWidgets.QHBoxLayout()
-        subLayout.setSpacing(2)
-        subLayout.addWidget(self.addBut)
-        subLayout.addWidget(self.removeBut)
-    
-        # -----------------------------------------
-        self.targetsWidget = QtWidgets.QScrollArea()
-        self.targetsWidget.setFrameShape(QtWidgets.QFrame.NoFrame)
-        self.targetsWidget.setWidgetResizable(True)
-        self.targetsWidget.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-        
-        innerWidget = QtWidgets.QWidget()
-        self.targetsLayout = QtWidgets.QVBoxLayout(innerWidget)
-        self.targetsLayout.setSpacing(0)
-        self.targetsLayout.setMargin(0)
-        self.targetsWidget.setWidget(innerWidget)
-        # -----------------------------------------
-        butLayout = QtWidgets.QHBoxLayout()
-        butLayout.setSpacing(2)
-        butLayout.addWidget(self.createBut)
-        butLayout.addWidget(self.deleteBut)
-        
-        # -----------------------------------------
-        # buts layout
-        consCheckboxLayout = QtWidgets.QHBoxLayout()
-        consCheckboxLayout.setSpacing(5)
-        consCheckboxLayout.addWidget(self.positionCheckBox)
-        consCheckboxLayout.addWidget(self.rotationCheckBox)
-        consCheckboxLayout.addWidget(self.scaleCheckBox)
-        consCheckboxLayout.addWidget(self.parentCheckBox)
-         
-        # -----------------------------------------
-        mainLayout.addLayout(targetsLayout)
-        mainLayout.addWidget(LineShape())
-        mainLayout.addLayout(gridLayout)
-        mainLayout.addLayout(subLayout)
-        mainLayout.addLayout(consCheckboxLayout)
-        
-        #mainLayout.addWidget(LineShape())
-        mainLayout.addWidget(self.targetsWidget)
-        mainLayout.addLayout(butLayout)
-        #mainLayout.addStretch()
-        
-    def createWidgets(self):
-
-        self.targetsBox = QtWidgets.QComboBox()
-        self.updateBut  = QtWidgets.QPushButton()
-        self.updateBut.setFixedSize(26, 26)
-        self.updateBut.setIcon(QtGui.QIcon(':refresh.png'))
-        # ----------------------------------------
-        self.sourceLineEdit = QtWidgets.QLineEdit()
-        self.sourceLineEdit.setReadOnly(True)
-        self.sourceBut = QtWidgets.QPushButton()
-        self.sourceBut.setIcon(QtGui.QIcon(':moveUVLeft.png'))
-        
-        self.sourceBut.setFixedSize(28, 28)
-        self.offsetGroupLineEdit = QtWidgets.QLineEdit()
-        self.offsetGroupLineEdit.setReadOnly(True)
-        self.offsetGroupBut = QtWidgets.QPushButton()
-        self.offsetGroupBut.setIcon(QtGui.QIcon(':moveUVLeft.png'))
-        self.offsetGroupBut.setFixedSize(28, 28)
-        
-        # ----------------------------------------
-        self.addBut = QtWidgets.QPushButton('Add')
-        self.addBut.setFixedHeight(30)
-        self.removeBut = QtWidgets.QPushButton('Remove')
-        self.removeBut.setFixedHeight(30)
-        
-        # ----------------------------------------
-        self.positionCheckBox = QtWidgets.QCheckBox('point')
-        self.rotationCheckBox = QtWidgets.QCheckBox('orient')
-        self.scaleCheckBox = QtWidgets.QCheckBox('Scale')
-        self.parentCheckBox = QtWidgets.QCheckBox('Parent')
-        
-        # ----------------------------------------
-        self.createBut = QtWidgets.QPushButton('Create')
-        self.createBut.setFixedHeight(30)
-        self.deleteBut = QtWidgets.QPushButton('Delete')
-        self.deleteBut.setFixedHeight(30)
- 
-    def createConnections(self):
-        self.addBut.clicked.connect(self.addTargetWidget)
-        self.removeBut.clicked.connect(self.deleteTargetWidget)
-        self.parentCheckBox.clicked.connect(self.parentTo)
-        
-        self.sourceBut.clicked.connect(self.addSourceNode)
-        self.offsetGroupBut.clicked.connect(self.addOffsetGroupNode)
-
-        self.createBut.clicked.connect(self.createSpaceSwitch)
-        self.deleteBut.clicked.connect(self.deleteSpaceSwitch)
-        
-        '''
-        The activated signal is only emitted when the user manually selects an item
-        it will not be triggered by programmatically selecting an item
-        '''
-        self.targetsBox.activated.connect(self.updateData)
-        
-        # update ui
-        #self.shortcut = QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+Z"), self)
-        #self.shortcut.activated.connect(self._updateUI_)
-        self.updateBut.clicked.connect(self._updateUI_)
-        
-    # ----------------------------------------------------------------    
-    def _updateUI_(self):
-        itemText = self.targetsBox.currentText() 
-        self.getMeta()
-        
-        # select item
-        self.textToItemWidget(itemText)
-    
-    def textToItemWidget(self, itemText):
-        itemTexts = [self.targetsBox.itemText(i) for i in range(self.targetsBox.count())]
-        
-        if itemText in itemTexts:
-            index = self.targetsBox.findText(itemText)
-            self.targetsBox.setCurrentIndex(index)
-            
-            itemData = self.targetsBox.itemData(index)
-            if itemData is not None and isinstance(itemData, SpaceSwitchMeta):
-                self.setWidgetData(itemData.nodeData) # get metaNode instance data
-                return True
-        return          
-    # --------------------------------------------------------------------------    
-    def metaExists(self, obj):
-        if not cmds.attributeQuery('spaceSwitch', node=obj, ex=True):
-            return 
-        outputs = cmds.listConnections('{}.message'.format(obj), s=False) or []
-        if not outputs:
-            return 
-        # -------------------------------------------------------------------------------------    
-        metaNodeStrs = [m.path for m in MetaUtils.getMetaNodes()]
-        for node in outputs:
-            if node not in metaNodeStrs:
-                continue
-            metaNodeName = metaNodeStrs[metaNodeStrs.index(node)]
-            return self.textToItemWidget(metaNodeName)
-        # -------------------------------------------------------------------------------------  
-        return 
-                
-    def addSourceNode(self):
-        sel = getSelection()
-        if not sel:
-            return om2.MGlobal.displayWarning('Please select an object')
-            
-        name, longName = getNodeLongName(sel[0])
-        
-        
-        if self.metaExists(longName):
-            return
-        # -------------------------------------------------------
-        self.sourceLineEdit.setText(name)
-        self.sourceLong = longName
-        
-        if isinstance(sel[0], om2.MFnDependencyNode):
-            return
-        parent = cmds.listRelatives(longName, p=True, f=True) # get parent longName
-        if parent:
-            self.offsetGroupLineEdit.setText(parent[0].split('|')[-1])
-            self.offsetGroupLong = parent[0]
-        
-    # -------------------------------------------------------------------------- 
-    
-    def addOffsetGroupNode(self):
-        sel = getSelection()
-        if not sel:
-            return om2.MGlobal.displayWarning('Please select an object')
-        
-        if isinstance(sel[0], om2.MFnDependencyNode):
-            return om2.MGlobal.displayWarning('Please select an dagNode')
-            
-        name, longName = getNodeLongName(sel[0])
-        self.offsetGroupLineEdit.setText(name)
-        self.offsetGroupLong = longName
-    # --------------------------------------------------------------------------
-    def addTargetWidget(self, data=None):
-        count = self.targetsLayout.count()
-        targetWidget = TargetWidget()
-        if data:
-            targetWidget.setWidgetData(data)
-        
-        if count > 0:
-            self.targetsLayout.insertWidget(count-1, targetWidget)
-        else:
-            self.targetsLayout.addWidget(targetWidget)
-            self.targetsLayout.addStretch()
-            
-        targetWidget.setWidgetColor(self.targetsLayout.count())
-
-    def deleteTargetWidget(self):
-        targetWidgets = self.getTargetWidgets()
-        if not targetWidgets:
-            return
-        self.targetsLayout.removeWidget(targetWidgets[-1])
-        targetWidgets[-1].deleteLater()
-        
-    def deleteAllTargetWidget(self):
-        for widget in self.getTargetWidgets():
-            self.targetsLayout.removeWidget(widget)
-            widget.deleteLater()
- 
-    def getTargetWidgets(self):
-        targetWidgets = [self.targetsLayout.itemAt(i).widget() for i in range(self.targetsLayout.count()-1)]
- 
-        return targetWidgets
-        
-    # ---------------------------------------------------------------
-    def getWidgetData(self):
-        data = {}
-        data['source']      = self.sourceLong
-        data['offsetGroup'] = self.offsetGroupLong
-        data['conType']     = {'point':self.positionCheckBox.isChecked(),
-                               'orient':self.rotationCheckBox.isChecked(),
-                               'scale'   :self.scaleCheckBox.isChecked(),
-                               'parent'  :self.parentCheckBox.isChecked()}
-                               
-        targetWidgetsData = {}
-        for index, widget in enumerate(self.getTargetWidgets()):
-            targetWidgetsData[index] = widget.getWidgetData()
-        
-        data['targetWidgets'] = targetWidgetsData
-        return data
-        
-    def setWidgetData(self, data):
-
-        self.sourceLineEdit.setText(data.get('source').split('|')[-1])
-        self.sourceLong = data.get('source')
-        self.offsetGroupLineEdit.setText(data.get('offsetGroup').split('|')[-1])
-        self.offsetGroupLong = data.get('offsetGroup')
-        
-        # ------------------------------------------------------------------------
-
-        self.positionCheckBox.setChecked(data.get('conType')['point'])
-        self.rotationCheckBox.setChecked(data.get('conType')['orient'])
-        self.scaleCheckBox.setChecked(data.get('conType')['scale'])
-        self.parentCheckBox.setChecked(data.get('conType')['parent'])
-        
-        # --------------------------------------------------
-        # update checkbox state
-        self.pBoxState = data.get('conType')['point']
-        self.rBoxState = data.get('conType')['orient']
-        self.parentTo()
-        
-        # ------------------------------------------------------------------------
-        self.deleteAllTargetWidget()
-        targetWidgets = data.get('targetWidgets', [])
-        for i in range(len(targetWidgets)):
-            self.addTargetWidget(targetWidgets[i])
-            
-    # --------------------------------------------------------------------------------
-    def deleteTargetItemAndMeta(self):
-
-        currentIndex = self.targetsBox.currentIndex()      
-        itemData = self.targetsBox.itemData(currentIndex)
-        if itemData is not None and isinstance(itemData, SpaceSwitchMeta):
-            del itemData.nodeData
-            self.targetsBox.removeItem(currentIndex)
-            
-    # -----------------------------------------------------------------------------       
-    def checkDuplicateValue(self, data, key):
-        values = set()
-        for item in data.values():
-            value = item[key]
-            if value in values:
-                return False
-            values.add(value)
-        return True
-            
-    def checkData(self, data):
-
-        # ----------------------------------------------------------------     
-        if data['source'] is None or data['offsetGroup'] is None:
-            return om2.MGlobal.displayWarning('Invalid parameter')
-            
-        if data['source'] == data['offsetGroup']:
-            return om2.MGlobal.displayWarning('Invalid parameter')
-        
-        
-        if True not in data['conType'].values():
-            return om2.MGlobal.displayWarning('Invalid constraint type')
-
-
-        targetWidgetsData = data['targetWidgets']
-        if not targetWidgetsData:
-            return om2.MGlobal.displayWarning('Please add at least one space switch')
-        
-        if False in [bool(widget['attrName']) for widget in targetWidgetsData.values()]:
-            return om2.MGlobal.displayWarning('Invalid attribute name')
-            
- 
-        if None in [widget['spaceTarget'] for widget in targetWidgetsData.values()]:
-            return om2.MGlobal.displayWarning('Invalid target object')
-            
-        '''
-        avoid having identical targets/attrName, which could cause us to lose the constraint objects
-        '''    
-        
-        if not self.checkDuplicateValue(targetWidgetsData, 'attrName'):
-            return om2.MGlobal.displayWarning('Having the same attribute name')    
-            
-        if not self.checkDuplicateValue(targetWidgetsData, 'spaceTarget'):
-            return om2.MGlobal.displayWarning('Having the same target object')
-            
-        return True
-        
-    # -----------------------------------------------------------------------------       
-    @addUndo        
-    def createSpaceSwitch(self): 
-        data = self.getWidgetData()
-  
-        if not self.checkData(data):
-            return
-
-        # ---------------------------------------------------------------- 
-        self.deleteTargetItemAndMeta()
- 
-        # ----------------------------------------------------------------
-        metaNodeName = MetaUtils.uniqueName('{}_spaceSwitch_META'.format(data['source'].split('|')[-1]))
-        metaNodeInstance = SpaceSwitchMeta(metaNodeName)
-        metaNodeInstance.nodeData = data
-        self.targetsBox.addItem(metaNodeInstance.path, metaNodeInstance) # add instance to item data
-        self.targetsBox.setCurrentText(metaNodeInstance.path)
-      
-    @addUndo  
-    def deleteSpaceSwitch(self):
-        
-        self.deleteTargetItemAndMeta()
-        self.updateData()
-        
-    
-if __name__ == '__main__':
-    SpaceSwitchUI.displayUI()
-
-'''
-code by kangddan
-https://github.com/kangddan
-https://space.bilibili.com/174575687
-https://animator.at8.fun/
-'''
+import os
+import sys
+import json
+import re
+import time
+import atexit
+import maya.cmds         as cmds
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaAnim as oma2
+from collections import OrderedDict
+from contextlib  import contextmanager
+try:
+    import numpy
+except ImportError: # optional, SpaceSwitchMeta.switchSpaceMany falls back to om2 matrices
+    numpy = None
+
+def addUndo(func):
+    '''
+    func runs in one undo chunk and one Transaction, the chunk is closed and the transaction rolled back
+    when func raises
+    '''
+    def undo(*args, **kwargs):
+        cmds.undoInfo(openChunk=True)
+        try:
+            with Transaction():
+                return func(*args, **kwargs)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+    return undo      
+
+def getSelection():
+    sel = om2.MGlobal.getActiveSelectionList()
+    return [sel.getDagPath(i) 
+            if sel.getDependNode(i).hasFn(om2.MFn.kDagNode) 
+            else om2.MFnDependencyNode(sel.getDependNode(i)) 
+            for i in range(sel.length())]
+            
+def getNodeLongName(obj):
+    '''
+    return: name, longName
+    '''
+    if isinstance(obj, om2.MFnDependencyNode):
+        return obj.name(), obj.name()
+    else:
+        return obj.fullPathName().split('|')[-1], obj.fullPathName()
+
+# ---------------------------------------------------------------------------------------------
+UNDO_PLUGIN      = 'spaceSwitchCmd'
+UNDO_PLUGIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spaceSwitchCmd.py')
+
+def commitModifier(modifier):
+    '''
+    run an om2 modifier and put it on maya's undo queue, inside a Transaction it joins the transaction instead,
+    a modifier that fails part way is undone before the error is raised
+    '''
+    try:
+        modifier.doIt()
+    except Exception:
+        modifier.undoIt()
+        raise
+    if Transaction.current is not None:
+        Transaction.current.modifiers.append(modifier)
+        return
+    _pushUndo(modifier)
+    
+def _pushUndo(modifier):
+    '''
+    hand modifier, already done, over to spaceSwitchCmd.PENDING and put it on maya's undo queue,
+    when the command fails the modifier is undone so the scene is not left changed without an undo entry
+    '''
+    if not cmds.pluginInfo(UNDO_PLUGIN, q=True, loaded=True):
+        cmds.loadPlugin(UNDO_PLUGIN_PATH, quiet=True)
+    if os.path.dirname(UNDO_PLUGIN_PATH) not in sys.path: # run as a script, the plugin folder may not be importable
+        sys.path.append(os.path.dirname(UNDO_PLUGIN_PATH))
+    import spaceSwitchCmd
+    spaceSwitchCmd.PENDING.append(modifier)
+    try:
+        cmds.spaceSwitchModifier()
+    except Exception:
+        if modifier in spaceSwitchCmd.PENDING:
+            spaceSwitchCmd.PENDING.remove(modifier)
+        modifier.undoIt()
+        raise
+    
+def queueCommand(modifier, command, *args, **kwargs):
+    '''
+    maya.cmds.command(*args, **kwargs) run by modifier.doIt and undone by modifier.undoIt, 
+    for the edits om2 has no modifier call for (constraints, enum fields, xform)
+    the modifier undoes the command through the command's own undo record, so it runs with undo on,
+    an entry it may leave on the queue lands in the chunk addUndo opens around every public edit
+    '''
+    modifier.pythonCommandToExecute('import maya.cmds; maya.cmds.{}(*{!r}, **{!r})'.format(command, args, kwargs))
+    
+class Transaction(object):
+    '''
+    with Transaction(): the modifiers committed in the block go on maya's undo queue as a single entry 
+    when the outermost block ends, so undo/redo of a batch is one step however many switches it built,
+    a block that raises undoes the modifiers it committed, last first, before the error goes on,
+    nested blocks join the outermost one. the names NameAllocator reserved in it are given back when it ends,
+    the ones a node was created with stay taken by that node
+    '''
+    current = None
+    
+    def __init__(self):
+        self.modifiers = []
+        self.reserved  = [] # [(prefix, suffix), ...] see NameAllocator.allocate
+        self.outer     = None
+        self.mark      = 0
+        
+    def __enter__(self):
+        self.outer = Transaction.current
+        if self.outer is None:
+            Transaction.current = self
+        self.mark = len(Transaction.current.modifiers)
+        return Transaction.current
+        
+    def __exit__(self, excType, excValue, traceback):
+        if excType is not None:
+            Transaction.current.rollback(self.mark)
+        if self.outer is None:
+            Transaction.current = None
+            NameAllocator.release(self.reserved)
+            self.reserved = []
+            if self.modifiers:
+                _pushUndo(self)
+        return False
+        
+    def rollback(self, mark=0):
+        '''
+        undo the modifiers committed after the first mark ones
+        '''
+        while len(self.modifiers) > mark:
+            modifier = self.modifiers.pop()
+            try:
+                modifier.undoIt()
+            except Exception as e: # keep going, the rest can still be undone
+                om2.MGlobal.displayWarning('Transaction.rollback: {}'.format(e))
+                
+    def doIt(self):
+        for modifier in self.modifiers:
+            modifier.doIt()
+            
+    def undoIt(self):
+        for modifier in reversed(self.modifiers):
+            modifier.undoIt()
+
+class AnimCurveModifier(object):
+    '''
+    anim curves created through an MDGModifier and keys added through an MAnimCurveChange,
+    both are applied as they are added, commitModifier then puts them on the undo queue as one modifier
+    '''
+    def __init__(self):
+        self.modifier = om2.MDGModifier()
+        self.change   = oma2.MAnimCurveChange()
+        self.done     = True
+        
+    def curves(self, plugs):
+        '''
+        plugs : [(plug, curveType), ...]
+        return: [MFnAnimCurve, ...] the anim curve already driving each plug or a new one
+        '''
+        fnCurves = []
+        for plug, curveType in plugs:
+            fnCurve = oma2.MFnAnimCurve()
+            source  = plug.source()
+            if not source.isNull and source.node().hasFn(om2.MFn.kAnimCurve):
+                fnCurve.setObject(source.node())
+            else:
+                fnCurve.create(plug, curveType, self.modifier)
+            fnCurves.append(fnCurve)
+        self.modifier.doIt()
+        return fnCurves
+        
+    def addKeys(self, fnCurve, times, values, tangentType):
+        fnCurve.addKeys(om2.MTimeArray(times), om2.MDoubleArray(values), tangentType, tangentType, True, self.change)
+        
+    def setValues(self, fnCurve, values, tangentType):
+        '''
+        new values for all the keys of a curve, written with one addKeys that replaces the curve,
+        driven key curves have no time input and are set key by key
+        '''
+        if fnCurve.isUnitlessInput:
+            for index, value in enumerate(values):
+                fnCurve.setValue(index, value, self.change)
+            return
+        times = [fnCurve.input(index) for index in range(fnCurve.numKeys)]
+        fnCurve.addKeys(om2.MTimeArray(times), om2.MDoubleArray(values), tangentType, tangentType, False, self.change)
+        
+    def doIt(self):
+        if self.done:
+            return
+        self.modifier.doIt()
+        self.change.redoIt()
+        self.done = True
+        
+    def undoIt(self):
+        self.change.undoIt()
+        self.modifier.undoIt()
+        self.done = False
+        
+_clock = getattr(time, 'perf_counter', time.time)
+
+class PhaseTimer(object):
+    '''
+    with timer('phase'): ... accumulates wall time per phase
+    '''
+    def __init__(self):
+        self.timings = OrderedDict()
+
+    @contextmanager
+    def __call__(self, phase):
+        start = _clock()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + _clock() - start
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    def report(self):
+        lines = ['{:<12} {:>9.4f}s'.format(phase, seconds) for phase, seconds in self.timings.items()]
+        lines.append('{:<12} {:>9.4f}s'.format('total', self.total))
+        return '\n'.join(lines)
+
+# ---------------------------------------------------------------------------------------------
+class _ProfiledCall(object):
+    '''
+    stands in for a cmds / om2 callable while profiling
+    '''
+    def __init__(self, target, name, profiler):
+        self._target   = target
+        self._name     = name
+        self._profiler = profiler
+        
+    def __call__(self, *args, **kwargs):
+        caller = sys._getframe(1)
+        start  = _clock()
+        try:
+            return self._target(*args, **kwargs)
+        finally:
+            self._profiler.recordCall(self._name, caller, _clock() - start)
+            
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        return _ProfiledCall(attr, '{}.{}'.format(self._name, name), self._profiler) if callable(attr) else attr
+        
+    def __instancecheck__(self, obj):
+        return isinstance(obj, self._target)
+        
+    def __subclasscheck__(self, cls):
+        return issubclass(cls, self._target)
+        
+        
+class Profiler(object):
+    '''
+    opt-in instrumentation of MetaUtils / SpaceSwitchMeta and the main SpaceSwitchUI handlers:
+    per operation wall time and maya call counts, plus the slowest cmds / om2 call sites
+    om2 counts are the calls made through the module (constructors, MGlobal...), not the method calls
+    
+    with SpaceSwitchMeta.profile() as profiler: ...
+    or set SPACESWITCH_PROFILE=1 (SPACESWITCH_PROFILE=path.json also dumps the results on exit)
+    '''
+    ACTIVE = None
+    
+    def __init__(self):
+        self.operations = OrderedDict() # name: {'calls', 'seconds', 'cmds', 'om2'}
+        self.callSites  = {}            # 'cmds.getAttr (target:412)': {'calls', 'seconds'}
+        self._stack     = []
+        self._modules   = None
+        
+    def start(self):
+        if Profiler.ACTIVE is not None:
+            Profiler.ACTIVE.stop()
+        namespace = globals()
+        self._modules = namespace['cmds'], namespace['om2']
+        namespace['cmds'] = _ProfiledCall(self._modules[0], 'cmds', self)
+        namespace['om2']  = _ProfiledCall(self._modules[1], 'om2', self)
+        Profiler.ACTIVE = self
+        return self
+        
+    def stop(self):
+        if Profiler.ACTIVE is self:
+            globals()['cmds'], globals()['om2'] = self._modules
+            Profiler.ACTIVE = None
+        return self
+        
+    # -----------------------------------------------------------------------------------------
+    def enter(self, name):
+        self._stack.append(name)
+        return _clock()
+        
+    def exit(self, name, start):
+        self._stack.pop()
+        operation = self.operations.setdefault(name, {'calls': 0, 'seconds': 0.0, 'cmds': 0, 'om2': 0})
+        operation['calls']   += 1
+        if name not in self._stack: # recursion is timed once, by the outer call
+            operation['seconds'] += _clock() - start
+        
+    def recordCall(self, callName, caller, seconds):
+        site = '{} ({}:{})'.format(callName, caller.f_code.co_name, caller.f_lineno)
+        callSite = self.callSites.setdefault(site, {'calls': 0, 'seconds': 0.0})
+        callSite['calls']   += 1
+        callSite['seconds'] += seconds
+        api = callName.split('.')[0]
+        for name in set(self._stack): # counts include the nested operations
+            operation = self.operations.setdefault(name, {'calls': 0, 'seconds': 0.0, 'cmds': 0, 'om2': 0})
+            operation[api] += 1
+        
+    # -----------------------------------------------------------------------------------------
+    def asDict(self, top=20):
+        slowest = sorted(self.callSites.items(), key=lambda item: item[1]['seconds'], reverse=True)[:top]
+        return OrderedDict([('operations', self.operations), ('slowestCallSites', OrderedDict(slowest))])
+        
+    def report(self, top=10):
+        data  = self.asDict(top)
+        lines = ['{:<40} {:>6} {:>9} {:>9} {:>7} {:>7}'.format('operation', 'calls', 'total s', 'mean ms', 'cmds', 'om2')]
+        for name, op in sorted(data['operations'].items(), key=lambda item: item[1]['seconds'], reverse=True):
+            lines.append('{:<40} {:>6} {:>9.4f} {:>9.3f} {:>7} {:>7}'.format(
+                         name, op['calls'], op['seconds'], op['seconds'] * 1000.0 / max(op['calls'], 1), op['cmds'], op['om2']))
+        lines.append('')
+        lines.append('{:<57} {:>6} {:>9}'.format('slowest call sites', 'calls', 'total s'))
+        for site, callSite in data['slowestCallSites'].items():
+            lines.append('{:<57} {:>6} {:>9.4f}'.format(site, callSite['calls'], callSite['seconds']))
+        return '\n'.join(lines)
+        
+    def dump(self, path, top=50):
+        with open(path, 'w') as f:
+            json.dump(self.asDict(top), f, indent=4)
+        return path
+        
+    @classmethod
+    def fromEnvironment(cls):
+        '''
+        SPACESWITCH_PROFILE=1 profiles the whole session, a .json path is also written on exit
+        '''
+        value = os.environ.get('SPACESWITCH_PROFILE', '')
+        if value in ('', '0'):
+            return
+        profiler = cls().start()
+        if value.lower().endswith('.json'):
+            atexit.register(profiler.dump, value)
+        return profiler
+        
+        
+def profiled(*names):
+    '''
+    class decorator, times the given methods (all of them when no names are given) while a Profiler is active
+    properties are recorded as 'Class.attr', 'Class.attr=' and 'del Class.attr'
+    '''
+    def wrap(func, name):
+        def wrapper(*args, **kwargs):
+            profiler = Profiler.ACTIVE
+            if profiler is None:
+                return func(*args, **kwargs)
+            start = profiler.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit(name, start)
+        wrapper.__name__, wrapper.__doc__ = func.__name__, func.__doc__
+        return wrapper
+        
+    def decorator(cls):
+        for attrName, value in list(vars(cls).items()):
+            if attrName.startswith('__') or (names and attrName not in names):
+                continue
+            name = '{}.{}'.format(cls.__name__, attrName)
+            if isinstance(value, property):
+                value = property(value.fget and wrap(value.fget, name), 
+                                 value.fset and wrap(value.fset, name + '='), 
+                                 value.fdel and wrap(value.fdel, 'del ' + name), value.__doc__)
+            elif isinstance(value, (staticmethod, classmethod)):
+                value = type(value)(wrap(value.__func__, name))
+            elif callable(value) and not isinstance(value, type):
+                value = wrap(value, name)
+            else:
+                continue
+            setattr(cls, attrName, value)
+        return cls
+    return decorator
+    
+SESSION_PROFILER = Profiler.fromEnvironment()
+
+# ---------------------------------------------------------------------------------------------
+@profiled()
+class MetaRegistry(object):
+    '''
+    uuid -> space switch meta node, kept up to date by node added/removed callbacks
+    the scene is scanned once (on first use and after new/open), new network nodes are only
+    checked when the registry is queried since their attributes do not exist yet when they are added
+    its scene callbacks also drop the NameAllocator index, and its node callbacks, before new/open/import/reference
+    and with every reset
+    '''
+    _NODES     = OrderedDict() # uuid: MObjectHandle
+    _PENDING   = OrderedDict() # uuid: MObjectHandle, added network nodes not checked yet
+    _CALLBACKS = []
+    _SEEDED    = False
+    
+    @classmethod
+    def install(cls):
+        if cls._CALLBACKS:
+            return
+        cls._CALLBACKS = [om2.MDGMessage.addNodeAddedCallback(cls._nodeAdded, SpaceSwitchMeta._NODETYPE),
+                          om2.MDGMessage.addNodeRemovedCallback(cls._nodeRemoved, SpaceSwitchMeta._NODETYPE),
+                          om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterNew, cls.reset),
+                          om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterOpen, cls.reset)]
+        cls._CALLBACKS.extend(om2.MSceneMessage.addCallback(message, NameAllocator.reset)
+                              for message in (om2.MSceneMessage.kBeforeNew, om2.MSceneMessage.kBeforeOpen,
+                                              om2.MSceneMessage.kBeforeImport, om2.MSceneMessage.kBeforeReference))
+        
+    @classmethod
+    def uninstall(cls):
+        for callbackId in cls._CALLBACKS:
+            om2.MMessage.removeCallback(callbackId)
+        cls._CALLBACKS = []
+        cls.reset()
+        
+    @classmethod
+    def reset(cls, *args):
+        cls._NODES.clear()
+        cls._PENDING.clear()
+        cls._SEEDED = False
+        NameAllocator.reset()
+        
+    @classmethod
+    def seed(cls):
+        cls.reset()
+        it = om2.MItDependencyNodes(om2.MFn.kAffect)
+        while not it.isDone():
+            mobj = it.thisNode()
+            if cls.isMetaNode(mobj):
+                cls._NODES[om2.MFnDependencyNode(mobj).uuid().asString()] = om2.MObjectHandle(mobj)
+            it.next()
+        cls._SEEDED = True
+        
+    @staticmethod
+    def isMetaNode(mobj):
+        fnNode = om2.MFnDependencyNode(mobj)
+        return fnNode.typeName == SpaceSwitchMeta._NODETYPE and fnNode.hasAttribute('metaClass') and \
+               fnNode.findPlug('metaClass', False).asString() == 'SpaceSwitch'
+    
+    # -----------------------------------------------------------------------------------------
+    @classmethod
+    def _nodeAdded(cls, mobj, clientData=None):
+        if cls._SEEDED:
+            cls._PENDING[om2.MFnDependencyNode(mobj).uuid().asString()] = om2.MObjectHandle(mobj)
+        
+    @classmethod
+    def _nodeRemoved(cls, mobj, clientData=None):
+        uuid = om2.MFnDependencyNode(mobj).uuid().asString()
+        cls._NODES.pop(uuid, None)
+        cls._PENDING.pop(uuid, None)
+        
+    @classmethod
+    def _update(cls):
+        cls.install()
+        if not cls._SEEDED:
+            return cls.seed()
+        while cls._PENDING:
+            uuid, handle = cls._PENDING.popitem(last=False)
+            if handle.isValid() and cls.isMetaNode(handle.object()):
+                cls._NODES[uuid] = handle
+        
+    # -----------------------------------------------------------------------------------------
+    @classmethod
+    def uuids(cls):
+        cls._update()
+        return [uuid for uuid, handle in cls._NODES.items() if handle.isValid()]
+    
+    @classmethod
+    def mobjects(cls):
+        cls._update()
+        return [handle.object() for handle in cls._NODES.values() if handle.isValid()]
+        
+    @classmethod
+    def contains(cls, uuid):
+        cls._update()
+        handle = cls._NODES.get(uuid)
+        return handle is not None and handle.isValid()
+
+@profiled()
+class MetaIndex(object):
+    '''
+    source / offsetGroup / spaceTarget uuid -> the meta nodes that use them, see MetaUtils.metaOfSource and co
+    the meta nodes are read once, after that an attribute changed callback on each of them marks it dirty when
+    one of its connections is made or broken (deleting a source or target breaks them too) and only the dirty ones
+    are read again on the next query, new meta nodes are picked up like in MetaRegistry
+    '''
+    _ENTRIES      = {} # meta uuid: (source uuid, offsetGroup uuid, (spaceTarget uuid, ...))
+    _SOURCES      = {} # uuid: meta uuid
+    _OFFSETGROUPS = {} # uuid: meta uuid
+    _TARGETS      = {} # uuid: OrderedDict(meta uuid: None)
+    _HANDLES      = {} # meta uuid: MObjectHandle
+    _WATCHERS     = {} # meta uuid: attribute changed callback id
+    _DIRTY        = set()
+    _PENDING      = OrderedDict() # uuid: MObjectHandle, added network nodes not checked yet
+    _CALLBACKS    = []
+    _SEEDED       = False
+    
+    @classmethod
+    def install(cls):
+        if cls._CALLBACKS:
+            return
+        cls._CALLBACKS = [om2.MDGMessage.addNodeAddedCallback(cls._nodeAdded, SpaceSwitchMeta._NODETYPE),
+                          om2.MDGMessage.addNodeRemovedCallback(cls._nodeRemoved, SpaceSwitchMeta._NODETYPE)]
+        cls._CALLBACKS.extend(om2.MSceneMessage.addCallback(message, cls.reset)
+                              for message in (om2.MSceneMessage.kBeforeNew, om2.MSceneMessage.kBeforeOpen))
+        
+    @classmethod
+    def reset(cls, *args):
+        for callbackId in cls._CALLBACKS + list(cls._WATCHERS.values()):
+            try:
+                om2.MMessage.removeCallback(callbackId)
+            except RuntimeError: # its node is already gone
+                pass
+        cls._CALLBACKS = []
+        for table in (cls._ENTRIES, cls._SOURCES, cls._OFFSETGROUPS, cls._TARGETS, cls._HANDLES, cls._WATCHERS, 
+                      cls._DIRTY, cls._PENDING):
+            table.clear()
+        cls._SEEDED = False
+        
+    @classmethod
+    def seed(cls):
+        cls.reset()
+        cls.install()
+        for mobj in MetaRegistry.mobjects():
+            cls._watch(mobj)
+        cls._SEEDED = True
+        
+    # -----------------------------------------------------------------------------------------
+    @classmethod
+    def _watch(cls, mobj):
+        uuid = om2.MFnDependencyNode(mobj).uuid().asString()
+        if uuid in cls._WATCHERS:
+            om2.MMessage.removeCallback(cls._WATCHERS[uuid])
+        cls._WATCHERS[uuid] = om2.MNodeMessage.addAttributeChangedCallback(mobj, cls._attributeChanged, uuid)
+        cls._HANDLES[uuid]  = om2.MObjectHandle(mobj)
+        cls._read(uuid)
+        
+    @classmethod
+    def _read(cls, uuid):
+        cls._drop(uuid)
+        handle = cls._HANDLES.get(uuid)
+        if handle is None or not handle.isValid():
+            return
+        def sourceId(plug):
+            source = plug.source()
+            return None if source.isNull else om2.MFnDependencyNode(source.node()).uuid().asString()
+        fnNode     = om2.MFnDependencyNode(handle.object())
+        targetPlug = fnNode.findPlug('target', False)
+        spaceTargetAttr = fnNode.attribute('spaceTarget')
+        entry = (sourceId(fnNode.findPlug('source', False)), sourceId(fnNode.findPlug('offsetGroup', False)),
+                 tuple(sourceId(targetPlug.elementByLogicalIndex(index).child(spaceTargetAttr)) 
+                       for index in targetPlug.getExistingArrayAttributeIndices()))
+        cls._ENTRIES[uuid] = entry
+        if entry[0] is not None:
+            cls._SOURCES[entry[0]] = uuid
+        if entry[1] is not None:
+            cls._OFFSETGROUPS[entry[1]] = uuid
+        for targetId in entry[2]:
+            if targetId is not None:
+                cls._TARGETS.setdefault(targetId, OrderedDict())[uuid] = None
+                
+    @classmethod
+    def _drop(cls, uuid):
+        entry = cls._ENTRIES.pop(uuid, None)
+        if entry is None:
+            return
+        for table, nodeId in ((cls._SOURCES, entry[0]), (cls._OFFSETGROUPS, entry[1])):
+            if table.get(nodeId) == uuid:
+                del table[nodeId]
+        for targetId in entry[2]:
+            metas = cls._TARGETS.get(targetId)
+            if metas is not None:
+                metas.pop(uuid, None)
+                if not metas:
+                    del cls._TARGETS[targetId]
+                    
+    @classmethod
+    def _attributeChanged(cls, msg, plug, otherPlug, clientData=None):
+        if msg & (om2.MNodeMessage.kConnectionMade | om2.MNodeMessage.kConnectionBroken):
+            cls._DIRTY.add(clientData)
+            
+    @classmethod
+    def _nodeAdded(cls, mobj, clientData=None):
+        if cls._SEEDED:
+            cls._PENDING[om2.MFnDependencyNode(mobj).uuid().asString()] = om2.MObjectHandle(mobj)
+            
+    @classmethod
+    def _nodeRemoved(cls, mobj, clientData=None):
+        uuid = om2.MFnDependencyNode(mobj).uuid().asString()
+        cls._PENDING.pop(uuid, None)
+        cls._DIRTY.discard(uuid)
+        cls._HANDLES.pop(uuid, None)
+        if uuid in cls._WATCHERS:
+            om2.MMessage.removeCallback(cls._WATCHERS.pop(uuid))
+        cls._drop(uuid)
+        
+    @classmethod
+    def _update(cls):
+        if not cls._SEEDED:
+            return cls.seed()
+        while cls._PENDING:
+            uuid, handle = cls._PENDING.popitem(last=False)
+            if handle.isValid() and MetaRegistry.isMetaNode(handle.object()):
+                cls._watch(handle.object())
+        while cls._DIRTY:
+            cls._read(cls._DIRTY.pop())
+            
+    # -----------------------------------------------------------------------------------------
+    @classmethod
+    def _mobjects(cls, uuids):
+        handles = [cls._HANDLES.get(uuid) for uuid in uuids]
+        return [handle.object() for handle in handles if handle is not None and handle.isValid()]
+        
+    @classmethod
+    def bySource(cls, uuid):
+        cls._update()
+        return cls._mobjects([cls._SOURCES[uuid]] if uuid in cls._SOURCES else [])
+        
+    @classmethod
+    def byOffsetGroup(cls, uuid):
+        cls._update()
+        return cls._mobjects([cls._OFFSETGROUPS[uuid]] if uuid in cls._OFFSETGROUPS else [])
+        
+    @classmethod
+    def bySpaceTarget(cls, uuid):
+        cls._update()
+        return cls._mobjects(cls._TARGETS.get(uuid, ()))
+        
+@profiled()
+class NameAllocator(object):
+    '''
+    free names for MetaUtils.uniqueName: name, name_001, name_002 ...
+    the scene names are indexed by prefix once with a single cmds.ls, after that node added/removed/renamed
+    callbacks keep the index in sync, the callbacks only live while the index does and the whole
+    index is dropped by MetaRegistry: before new/open/import/reference and with its reset
+    a reserved name is taken until a node gets it or the Transaction it was reserved in ends
+    '''
+    _INDEX     = {} # prefix: {'counts': {suffix: nodes}, 'reserved': set(suffix), 'next': lowest suffix that may be free}
+    _CALLBACKS = []
+    _SEEDED    = False
+    _SUFFIX    = re.compile(r'^(.+)_(\d{3,})$')
+    
+    @classmethod
+    def install(cls):
+        if cls._CALLBACKS:
+            return
+        MetaRegistry.install()
+        cls._CALLBACKS = [om2.MDGMessage.addNodeAddedCallback(cls._nodeAdded, 'dependNode'),
+                          om2.MDGMessage.addNodeRemovedCallback(cls._nodeRemoved, 'dependNode'),
+                          om2.MNodeMessage.addNameChangedCallback(om2.MObject(), cls._nameChanged)]
+        
+    @classmethod
+    def reset(cls, *args):
+        for callbackId in cls._CALLBACKS:
+            om2.MMessage.removeCallback(callbackId)
+        cls._CALLBACKS = []
+        cls._INDEX.clear()
+        cls._SEEDED = False
+        
+    @staticmethod
+    def format(prefix, suffix):
+        return '{}_{:03d}'.format(prefix, suffix) if suffix else prefix
+        
+    @classmethod
+    def parse(cls, name):
+        '''
+        every (prefix, suffix) a short name can be counted under, 'a_002' is both ('a_002', 0) and ('a', 2)
+        '''
+        yield name, 0
+        match = cls._SUFFIX.match(name)
+        if match and int(match.group(2)) and '{:03d}'.format(int(match.group(2))) == match.group(2):
+            yield match.group(1), int(match.group(2))
+    
+    @classmethod
+    def seed(cls):
+        cls.reset()
+        cls.install()
+        for name in cmds.ls() or []:
+            cls._count(name.split('|')[-1], 1)
+        cls._SEEDED = True
+        
+    @classmethod
+    def _index(cls, prefix):
+        if not cls._SEEDED:
+            cls.seed()
+        entry = cls._INDEX.get(prefix)
+        if entry is None:
+            entry = cls._INDEX[prefix] = {'counts': {}, 'reserved': set(), 'next': 0}
+        return entry
+    
+    @classmethod
+    def _count(cls, name, step):
+        for prefix, suffix in cls.parse(name):
+            entry = cls._INDEX.get(prefix)
+            if entry is None:
+                if step < 0:
+                    continue
+                entry = cls._INDEX[prefix] = {'counts': {}, 'reserved': set(), 'next': 0}
+            counts = entry['counts']
+            counts[suffix] = counts.get(suffix, 0) + step
+            if step > 0:
+                entry['reserved'].discard(suffix)
+            elif counts[suffix] <= 0:
+                del counts[suffix]
+                if suffix not in entry['reserved']:
+                    entry['next'] = min(entry['next'], suffix)
+    
+    # -----------------------------------------------------------------------------------------
+    @classmethod
+    def _nodeAdded(cls, mobj, clientData=None):
+        cls._count(om2.MFnDependencyNode(mobj).name(), 1)
+        
+    @classmethod
+    def _nodeRemoved(cls, mobj, clientData=None):
+        cls._count(om2.MFnDependencyNode(mobj).name(), -1)
+        
+    @classmethod
+    def _nameChanged(cls, mobj, previousName, clientData=None):
+        if previousName:
+            cls._count(previousName, -1)
+        cls._count(om2.MFnDependencyNode(mobj).name(), 1)
+        
+    # -----------------------------------------------------------------------------------------
+    @classmethod
+    def allocate(cls, prefix, reserve=False):
+        '''
+        reserve: keep the name taken until a node is created with it, inside a Transaction only until it ends
+        '''
+        entry  = cls._index(prefix)
+        suffix = entry['next']
+        while suffix in entry['counts'] or suffix in entry['reserved']:
+            suffix += 1
+        entry['next'] = suffix
+        if reserve:
+            entry['reserved'].add(suffix)
+            if Transaction.current is not None:
+                Transaction.current.reserved.append((prefix, suffix))
+        return cls.format(prefix, suffix)
+        
+    @classmethod
+    def release(cls, reserved):
+        '''
+        give back reserved names that no node took, reserved: [(prefix, suffix), ...]
+        '''
+        for prefix, suffix in reserved:
+            entry = cls._INDEX.get(prefix)
+            if entry is None or suffix not in entry['reserved']:
+                continue
+            entry['reserved'].discard(suffix)
+            if suffix not in entry['counts']:
+                entry['next'] = min(entry['next'], suffix)
+    
+    @classmethod
+    def reserve(cls, prefix, count):
+        '''
+        hand out count free names at once, for bulk builds
+        return: [name, ...]
+        '''
+        return [cls.allocate(prefix, reserve=True) for _ in range(count)]
+
+@profiled()
+class MetaUtils(object):
+    
+    @staticmethod
+    def createMetaNode(nodeName, nodeType):
+        modifier = om2.MDGModifier()
+        mobj = modifier.createNode(nodeType)
+        modifier.renameNode(mobj, nodeName)
+        MetaUtils.addMetaAttributes(modifier, mobj)
+        commitModifier(modifier)
+        
+        modifier = om2.MDGModifier()
+        MetaUtils.initMetaAttributes(modifier, mobj)
+        commitModifier(modifier)
+        return om2.MFnDependencyNode(mobj).name()
+    
+    @staticmethod
+    def addMetaAttributes(modifier, mobj):
+        tAttr = om2.MFnTypedAttribute()
+        mAttr = om2.MFnMessageAttribute()
+        cAttr = om2.MFnCompoundAttribute()
+        # ----------------------------------------------------
+        attrs = [tAttr.create('metaClass', 'metaClass', om2.MFnData.kString),
+                 tAttr.create('mode', 'mode', om2.MFnData.kString),
+                 tAttr.create('summary', 'summary', om2.MFnData.kString),
+                 mAttr.create('source', 'source'),
+                 mAttr.create('offsetGroup', 'offsetGroup')]
+        attrs.append(cAttr.create('constraints', 'constraints'))
+        for attrName in ('pointConstraint', 'orientConstraint', 'scaleConstraint', 'parentConstraint'):
+            cAttr.addChild(mAttr.create(attrName, attrName))
+        
+        # ----------------------------------------------------
+        attrs.append(cAttr.create('target', 'target'))
+        cAttr.addChild(tAttr.create('attrName', 'attrName', om2.MFnData.kString))
+        cAttr.addChild(mAttr.create('spaceTarget', 'spaceTarget'))
+        cAttr.array = True
+        # ----------------------------------------------------
+        for attrName in ('spaceLocs', 'conditionNodes', 'matrixNodes'):
+            attrs.append(tAttr.create(attrName, attrName, om2.MFnData.kString))
+            tAttr.array = True
+        
+        attrs.append(tAttr.create('offsetGroupLocalMatrix', 'offsetGroupLocalMatrix', om2.MFnData.kMatrix))
+        attrs.append(tAttr.create('spaceOffsets', 'spaceOffsets', om2.MFnData.kMatrix))
+        tAttr.array = True
+        for attr in attrs:
+            modifier.addAttribute(mobj, attr)
+    
+    @staticmethod
+    def initMetaAttributes(modifier, mobj):
+        modifier.newPlugValueString(MetaUtils.getPlug(mobj, 'metaClass'), 'SpaceSwitch')
+        queueCommand(modifier, 'setAttr', '{}.metaClass'.format(om2.MFnDependencyNode(mobj).name()), lock=True)
+    
+    @staticmethod
+    def connectMiAttr(node, attr, metaNode, metaAttr):
+        return MetaUtils.connectMiAttrs([node], attr, metaNode, metaAttr)[0]
+    
+    @staticmethod
+    def connectMiAttrs(nodes, attr, metaNode, metaAttr):
+        '''
+        node.attr -> metaNode.metaAttr[i] for every node, filling the free slots in order with one modifier
+        return: [index, ...]
+        '''
+        metaPlug = MetaUtils.getPlug(MetaUtils.getMObject(metaNode), metaAttr)
+        indices  = MetaUtils.freeIndices(metaPlug, len(nodes))
+        modifier = om2.MDGModifier()
+        for node, index in zip(nodes, indices):
+            modifier.connect(MetaUtils.getPlug(MetaUtils.getMObject(node), attr), metaPlug.elementByLogicalIndex(index))
+        commitModifier(modifier)
+        return indices
+    
+    @staticmethod
+    def freeIndices(plug, count):
+        '''
+        the first count logical indices of an array plug without an incoming connection,
+        the used indices are read once so sparse arrays are filled from the lowest hole
+        '''
+        used = set(index for index in plug.getExistingArrayAttributeIndices() 
+                   if plug.elementByLogicalIndex(index).isDestination)
+        indices = []; index = 0
+        while len(indices) < count:
+            if index not in used:
+                indices.append(index)
+            index += 1
+        return indices
+    
+    @staticmethod
+    def isUuidValid(uuid):
+        if isinstance(uuid, str):
+            return om2.MUuid(uuid).valid()
+        elif isinstance(uuid, om2.MUuid):
+            return uuid.valid()
+        return False
+        
+    @staticmethod
+    def getMetaNodes():
+        return [SpaceSwitchMeta.fromMObject(mobj) for mobj in MetaRegistry.mobjects()]
+        
+    @staticmethod
+    def nodeUuid(node):
+        '''
+        node: name, MObject or uuid
+        '''
+        if isinstance(node, om2.MObject):
+            return om2.MFnDependencyNode(node).uuid().asString()
+        return node if MetaUtils.isUuidValid(node) else MetaUtils.getUuid(node)
+        
+    @staticmethod
+    def metaOfSource(node):
+        '''
+        return: the SpaceSwitchMeta whose source is node, or None
+        '''
+        mobjs = MetaIndex.bySource(MetaUtils.nodeUuid(node))
+        return SpaceSwitchMeta.fromMObject(mobjs[0]) if mobjs else None
+        
+    @staticmethod
+    def metaOfOffsetGroup(node):
+        '''
+        return: the SpaceSwitchMeta whose offsetGroup is node, or None
+        '''
+        mobjs = MetaIndex.byOffsetGroup(MetaUtils.nodeUuid(node))
+        return SpaceSwitchMeta.fromMObject(mobjs[0]) if mobjs else None
+        
+    @staticmethod
+    def metasOfSpaceTarget(node):
+        '''
+        the switches to look at before deleting or renaming a target
+        return: [SpaceSwitchMeta, ...] that have node as a spaceTarget
+        '''
+        return [SpaceSwitchMeta.fromMObject(mobj) for mobj in MetaIndex.bySpaceTarget(MetaUtils.nodeUuid(node))]
+                
+    @staticmethod
+    def deleteNodes(modifier, mobjs):
+        '''
+        queue the deletion of every node still alive once, modifier: MDagModifier
+        '''
+        queued = set()
+        for mobj in mobjs:
+            handle = om2.MObjectHandle(mobj)
+            if handle.isValid() and handle.hashCode() not in queued:
+                queued.add(handle.hashCode())
+                modifier.deleteNode(mobj)
+                
+    @staticmethod            
+    def uniqueName(name, reserved=None):
+        '''
+        reserved: set of names handed out but not created yet, updated in place
+        '''
+        if any(char in name for char in '|*?[]'):
+            startNum = 0; newName = name
+            while cmds.objExists(newName) or (reserved is not None and newName in reserved):
+                startNum += 1
+                newName = '{}_{:03d}'.format(name, startNum)
+        else:
+            newName = NameAllocator.allocate(name, reserve=reserved is not None)
+        if reserved is not None:
+            reserved.add(newName)
+        return newName
+        
+    @staticmethod
+    def uniqueNames(name, count, reserved=None):
+        '''
+        count free names for one prefix, taken until they are created, the Transaction they were taken in ends
+        or the scene changes
+        '''
+        names = NameAllocator.reserve(name, count)
+        if reserved is not None:
+            reserved.update(names)
+        return names
+        
+    @staticmethod     
+    def getUuid(nodeName):
+        try:
+            mobj = om2.MGlobal.getSelectionListByName(nodeName).getDependNode(0)
+            return om2.MFnDependencyNode(mobj).uuid().asString()
+        except:
+            return  
+    
+    # -----------------------------------------------------------------------------------------
+    @staticmethod
+    def getMObject(nodeName):
+        try:
+            return om2.MGlobal.getSelectionListByName(nodeName).getDependNode(0)
+        except:
+            return
+    
+    @staticmethod
+    def getMObjects(nodeNames):
+        '''
+        return: {nodeName: MObject or None}
+        '''
+        return dict((nodeName, MetaUtils.getMObject(nodeName)) for nodeName in nodeNames)
+    
+    @staticmethod
+    def matchNodes(nodeNames):
+        '''
+        every name with the nodes it matches, looked up with a single cmds.ls
+        return: {nodeName: [long name, ...]}, the long names of dag nodes start with '|'
+        '''
+        nodeNames = set(nodeNames)
+        if not nodeNames: # cmds.ls([]) lists the whole scene
+            return {}
+        byLeaf = {}
+        for longName in set(cmds.ls(list(nodeNames), long=True) or []):
+            byLeaf.setdefault(longName.rsplit('|', 1)[-1], []).append(longName)
+        matches = {}
+        for nodeName in nodeNames:
+            path = nodeName if nodeName.startswith('|') else '|' + nodeName
+            matches[nodeName] = [longName for longName in byLeaf.get(nodeName.rsplit('|', 1)[-1], []) 
+                                 if longName == nodeName or longName.endswith(path)]
+        return matches
+    
+    @staticmethod
+    def nodesByUuid(uuids):
+        '''
+        return: {uuid: MObject or None}, None when the uuid matches no node or more than one (a rig referenced twice)
+        '''
+        nodes = {}
+        for uuid in set(uuids):
+            nodes[uuid] = None
+            if not uuid or not MetaUtils.isUuidValid(uuid):
+                continue
+            try:
+                sel = om2.MSelectionList().add(om2.MUuid(uuid))
+            except RuntimeError:
+                continue
+            if sel.length() == 1:
+                nodes[uuid] = sel.getDependNode(0)
+        return nodes
+        
+    @staticmethod
+    def resolveNodes(refs):
+        '''
+        refs: [(nodeName, uuid), ...], the uuid wins while it still points at a single node so renamed
+        and reparented nodes are found, otherwise the name is used
+        return: {(nodeName, uuid): long name or None}
+        '''
+        refs     = set(refs)
+        byUuid   = MetaUtils.nodesByUuid(uuid for _, uuid in refs)
+        resolved = {}
+        for ref in refs:
+            nodeName, uuid = ref
+            mobj = byUuid.get(uuid)
+            if mobj is None and nodeName:
+                mobj = MetaUtils.getMObject(nodeName)
+            resolved[ref] = None if mobj is None else MetaUtils.longName(mobj)
+        return resolved
+    
+    @staticmethod
+    def getPlug(mobj, attrPath):
+        '''
+        attrPath: 'offsetGroup', 'target[0].spaceTarget', 'constraints.pointConstraint'
+        '''
+        fnNode = om2.MFnDependencyNode(mobj)
+        plug   = None
+        for token in attrPath.split('.'):
+            attrName, _, index = token.partition('[')
+            plug = fnNode.findPlug(attrName, False) if plug is None else plug.child(fnNode.attribute(attrName))
+            if index:
+                plug = plug.elementByLogicalIndex(int(index[:-1]))
+        return plug
+    
+    @staticmethod
+    def localMatrix(mobj):
+        return om2.MFnMatrixData(MetaUtils.getPlug(mobj, 'matrix').asMObject()).matrix()
+    
+    @staticmethod
+    def worldMatrix(mobj):
+        return om2.MDagPath.getAPathTo(mobj).inclusiveMatrix()
+    
+    @staticmethod
+    def mixMatrix(driven, rest, flags):
+        '''
+        flags: (translate, rotate, scale), each channel group comes from driven when set, from rest otherwise
+        '''
+        matrix = om2.MTransformationMatrix(rest)
+        source = om2.MTransformationMatrix(driven)
+        translate, rotate, scale = flags
+        if translate:
+            matrix.setTranslation(source.translation(om2.MSpace.kTransform), om2.MSpace.kTransform)
+        if rotate:
+            matrix.setRotation(source.rotation())
+        if scale:
+            matrix.setScale(source.scale(om2.MSpace.kTransform), om2.MSpace.kTransform)
+        return matrix.asMatrix()
+    
+    @staticmethod
+    @contextmanager
+    def evaluationContext(frame):
+        '''
+        plugs read inside the with block are evaluated at frame, the current time does not change
+        '''
+        with om2.MDGContextGuard(om2.MDGContext(om2.MTime(frame, om2.MTime.uiUnit()))) as guard:
+            yield guard
+    
+    @staticmethod
+    def sampleMatrices(plugs, frames):
+        '''
+        every matrix plug at every frame, one context per frame for all the plugs
+        return: [[MMatrix, ...] per plug]
+        '''
+        samples = [[] for _ in plugs]
+        for frame in frames:
+            with MetaUtils.evaluationContext(frame):
+                for plug, matrices in zip(plugs, samples):
+                    matrices.append(om2.MFnMatrixData(plug.asMObject()).matrix())
+        return samples
+    
+    @staticmethod
+    def isKeyable(plug):
+        '''
+        not locked and either free or already driven by an anim curve
+        '''
+        if plug.isLocked:
+            return False
+        return not plug.isDestination or plug.source().node().hasFn(om2.MFn.kAnimCurve)
+    
+    @staticmethod
+    def longName(mobj):
+        if mobj.hasFn(om2.MFn.kDagNode):
+            return om2.MDagPath.getAPathTo(mobj).fullPathName()
+        return om2.MFnDependencyNode(mobj).name()
+    
+    @staticmethod
+    def shortName(mobj):
+        '''
+        shortest unique name, same as cmds.listConnections
+        '''
+        if mobj.hasFn(om2.MFn.kDagNode):
+            return om2.MDagPath.getAPathTo(mobj).partialPathName()
+        return om2.MFnDependencyNode(mobj).name()
+    
+    # -----------------------------------------------------------------------------------------
+    @staticmethod
+    def checkDuplicateValue(data, key):
+        values = set()
+        for item in data.values():
+            value = item[key]
+            if value in values:
+                return False
+            values.add(value)
+        return True
+    
+    @staticmethod
+    def checkNodeData(data):
+        '''
+        return: None if data can be built, else the reason why not
+        '''
+        return SpaceSwitchSpec.fromNodeData(data).check()
+     
+# ---------------------------------------------------------------------------------------------
+# build specs
+def targetKeys(targetWidgets):
+    '''
+    the keys of nodeData['targetWidgets'] in the order of their spaces, numbers (int or str) by value so '10' 
+    comes after '2', anything else after them by name. the build, edit, summary and records all follow it
+    '''
+    def order(key):
+        key = str(key)
+        return (0, int(key), '') if key.isdigit() else (1, 0, key)
+    return sorted(targetWidgets, key=order)
+    
+def targetOrder(targetWidgets):
+    '''
+    the widgets of nodeData['targetWidgets'] in targetKeys order
+    '''
+    return [targetWidgets[key] for key in targetKeys(targetWidgets)]
+    
+def normalizeTargets(data):
+    '''
+    a copy of nodeData with targetWidgets keyed 0..n-1 in targetKeys order, as readNodeData returns it
+    '''
+    return dict(data, targetWidgets=OrderedDict(enumerate(targetOrder(data.get('targetWidgets') or {}))))
+    
+class SpaceTarget(object):
+    '''
+    one space of a switch, key: its index in nodeData['targetWidgets'] (None: its position)
+    '''
+    __slots__ = ('attrName', 'spaceTarget', 'key')
+    
+    def __init__(self, attrName, spaceTarget, key=None):
+        self.attrName    = attrName
+        self.spaceTarget = spaceTarget
+        self.key         = key
+        
+    def __eq__(self, other):
+        return isinstance(other, SpaceTarget) and \
+               (self.attrName, self.spaceTarget, self.key) == (other.attrName, other.spaceTarget, other.key)
+        
+    def __ne__(self, other):
+        return not self == other
+        
+    def __repr__(self):
+        return 'SpaceTarget({!r}, {!r})'.format(self.attrName, self.spaceTarget)
+        
+        
+class SpaceSwitchSpec(object):
+    '''
+    what one switch is built from, converts to and from the nodeData dict without loss:
+    conType: the constraint types that are on, in SpaceSwitchMeta.CONSTRAINTS order
+    mode   : None when nodeData has no mode (built as SpaceSwitchMeta.MODES[0])
+    '''
+    __slots__ = ('source', 'offsetGroup', 'conType', 'targets', 'mode')
+    
+    def __init__(self, source, offsetGroup, conType=(), targets=(), mode=None):
+        self.source      = source
+        self.offsetGroup = offsetGroup
+        self.conType     = tuple(conType)
+        self.targets     = list(targets)
+        self.mode        = mode
+        
+    def __eq__(self, other):
+        return isinstance(other, SpaceSwitchSpec) and all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+        
+    def __ne__(self, other):
+        return not self == other
+        
+    def __repr__(self):
+        return 'SpaceSwitchSpec({!r}, {!r}, {} targets)'.format(self.source, self.offsetGroup, len(self.targets))
+        
+    @classmethod
+    def fromNodeData(cls, data):
+        conType = data.get('conType') or {}
+        widgets = data.get('targetWidgets') or {}
+        return cls(data.get('source'), data.get('offsetGroup'), 
+                   [name for name in SpaceSwitchMeta.CONSTRAINTS if conType.get(name)],
+                   [SpaceTarget(widgets[key].get('attrName'), widgets[key].get('spaceTarget'), key) 
+                    for key in targetKeys(widgets)],
+                   data.get('mode'))
+        
+    def toNodeData(self):
+        data = {'source'       : self.source,
+                'offsetGroup'  : self.offsetGroup,
+                'conType'      : dict((name, name in self.conType) for name in SpaceSwitchMeta.CONSTRAINTS),
+                'targetWidgets': OrderedDict((index if target.key is None else target.key, 
+                                              {'attrName': target.attrName, 'spaceTarget': target.spaceTarget})
+                                             for index, target in enumerate(self.targets))}
+        if self.mode is not None:
+            data['mode'] = self.mode
+        return data
+        
+    def nodeNames(self):
+        '''
+        return: [source, offsetGroup, spaceTarget, ...]
+        '''
+        return [self.source, self.offsetGroup] + [target.spaceTarget for target in self.targets]
+        
+    def check(self):
+        '''
+        the checks that need no scene
+        return: None if the spec can be built, else the reason why not
+        '''
+        if self.source is None or self.offsetGroup is None:
+            return 'Invalid parameter'
+            
+        if self.source == self.offsetGroup:
+            return 'Invalid parameter'
+        
+        if not self.conType:
+            return 'Invalid constraint type'
+        
+        if not self.targets:
+            return 'Please add at least one space switch'
+        
+        if False in [bool(target.attrName) for target in self.targets]:
+            return 'Invalid attribute name'
+            
+        if None in [target.spaceTarget for target in self.targets]:
+            return 'Invalid target object'
+            
+        '''
+        avoid having identical targets/attrName, which could cause us to lose the constraint objects
+        '''    
+        if len(set(target.attrName for target in self.targets)) < len(self.targets):
+            return 'Having the same attribute name'
+            
+        if len(set(target.spaceTarget for target in self.targets)) < len(self.targets):
+            return 'Having the same target object'
+            
+        if (self.mode or SpaceSwitchMeta.MODES[0]) not in SpaceSwitchMeta.MODES:
+            return 'Invalid mode, expected one of: {}'.format(', '.join(SpaceSwitchMeta.MODES))
+            
+        if self.mode == 'matrix' and om2.MGlobal.apiVersion() < 20200000:
+            return 'Matrix mode needs offsetParentMatrix (Maya 2020 or later)'
+        return
+        
+
+def validateSpecs(specs, replacing=()):
+    '''
+    check a whole batch in one pass: each spec on its own, the specs against each other (shared source or 
+    offsetGroup) and against the scene, every node name of the batch is looked up with a single cmds.ls
+    specs    : [SpaceSwitchSpec or nodeData, ...]
+    replacing: long names of the sources whose switch is replaced, they may already have a spaceSwitch
+    return   : [(specIndex, message), ...]
+    '''
+    specs  = [SpaceSwitchSpec.fromNodeData(spec) if isinstance(spec, dict) else spec for spec in specs]
+    errors = []
+    valid  = []
+    for index, spec in enumerate(specs):
+        message = spec.check()
+        if message:
+            errors.append((index, message))
+        else:
+            valid.append(index)
+    matches = MetaUtils.matchNodes(name for index in valid for name in specs[index].nodeNames())
+    
+    sources, offsetGroups = {}, {}
+    for index in valid:
+        names     = specs[index].nodeNames()
+        missing   = [name for name in names if not matches[name]]
+        ambiguous = [name for name in names if len(matches[name]) > 1]
+        if missing:
+            errors.append((index, 'Object does not exist: {}'.format(', '.join(missing))))
+            continue
+        if ambiguous:
+            errors.append((index, 'More than one object matches name: {}'.format(', '.join(ambiguous))))
+            continue
+        longNames = [matches[name][0] for name in names]
+        fields    = ['source', 'offsetGroup'] + ['spaceTarget'] * (len(names) - 2)
+        notDag    = [(field, name) for field, name, longName in list(zip(fields, names, longNames))[1:] 
+                     if not longName.startswith('|')] # only dag nodes have a path
+        if notDag:
+            errors.append((index, ', '.join('{} {!r} is not a dagNode'.format(field, name) for field, name in notDag)))
+            continue
+        # -------------------------------------------------------------------
+        source, offsetGroup, targets = longNames[0], longNames[1], longNames[2:]
+        if source == offsetGroup or len(set(targets)) < len(targets):
+            errors.append((index, 'Invalid parameter' if source == offsetGroup else 'Having the same target object'))
+            continue
+        if source in targets or offsetGroup in targets:
+            errors.append((index, 'The source or offset group cannot be its own space target'))
+            continue
+        if source in sources:
+            errors.append((index, 'Same source as spec {}'.format(sources[source])))
+        if offsetGroup in offsetGroups:
+            errors.append((index, 'Same offset group as spec {}'.format(offsetGroups[offsetGroup])))
+        sources.setdefault(source, index)
+        offsetGroups.setdefault(offsetGroup, index)
+        
+    replacing = set(replacing)
+    for source, mobj in MetaUtils.getMObjects([source for source in sources if source not in replacing]).items():
+        if mobj is not None and om2.MFnDependencyNode(mobj).hasAttribute('spaceSwitch'):
+            errors.append((sources[source], 'Source already has a space switch: {}'.format(source)))
+    return sorted(errors, key=lambda error: error[0])
+    
+@profiled()
+class SpaceSwitchMeta(object):
+    _CACHE     = OrderedDict() # uuid: (MObjectHandle, SpaceSwitchMeta), least recently used first
+    _CACHESIZE = 1024          # None: unbounded
+    _CALLBACKS = []
+    _NODETYPE  = 'network'
+    CONSTRAINTS = OrderedDict([('point',  'pointConstraint'),
+                               ('orient', 'orientConstraint'),
+                               ('scale',  'scaleConstraint'),
+                               ('parent', 'parentConstraint')])
+    '''
+    condition: one condition node per constraint and target (legacy)
+    shared   : one condition node per target, shared by all the constraints
+    matrix   : no locators or constraints, multMatrix per target -> blendMatrix -> offsetParentMatrix
+    '''
+    MODES = ('condition', 'shared', 'matrix')
+    KEY_CHANNELS = ('translateX', 'translateY', 'translateZ', 'rotateX', 'rotateY', 'rotateZ', 'scaleX', 'scaleY', 'scaleZ')
+    lastBuildTimings  = None # per phase timings of the last createMany
+    lastSwitchTimings = None # per phase timings of the last switchSpaceMany
+    SPEC_FORMAT  = 'spaceSwitchSpecs'
+    SPEC_VERSION = 1
+    SUMMARY_VERSION = 1 # meta.summary, a spec record plus the uuids of the built nodes, see readSummaries
+    
+    @staticmethod
+    @contextmanager
+    def profile(report=True, path=None):
+        '''
+        with SpaceSwitchMeta.profile() as profiler: ...
+        report: print the summary table to the script editor, path: also dump the results as json
+        '''
+        previous = Profiler.ACTIVE
+        profiler = Profiler().start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            if previous is not None:
+                previous.start()
+            if report:
+                print(profiler.report())
+            if path:
+                profiler.dump(path)
+    
+    def __new__(cls, *args, **kwargs):
+        nodeName = args[0] if len(args) > 0 else kwargs.get('nodeName')
+        
+        mobj = MetaUtils.getMObject(nodeName)
+        if mobj is None:
+            mobj = MetaUtils.getMObject(cls._create(nodeName, cls._NODETYPE))
+        return cls.fromMObject(mobj)
+    
+    @classmethod
+    def fromMObject(cls, mobj):
+        '''
+        cached instance for a meta node MObject, skips the name -> uuid lookup
+        '''
+        cls._installCache()
+        fnNode = om2.MFnDependencyNode(mobj)
+        uuid   = fnNode.uuid().asString()
+        entry  = cls._CACHE.pop(uuid, None)
+        if entry is None or not entry[0].isValid():
+            instance = super(SpaceSwitchMeta, cls).__new__(cls)
+            instance._node   = fnNode
+            instance._INITOK = True
+            entry = (om2.MObjectHandle(mobj), instance)
+        cls._CACHE[uuid] = entry
+        while cls._CACHESIZE is not None and len(cls._CACHE) > cls._CACHESIZE:
+            cls._CACHE.popitem(last=False)
+        return entry[1]
+    
+    @classmethod
+    def _installCache(cls):
+        if cls._CALLBACKS:
+            return
+        cls._CALLBACKS = [om2.MDGMessage.addNodeRemovedCallback(cls._nodeRemoved, cls._NODETYPE),
+                          om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeNew, cls.clearCache),
+                          om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeOpen, cls.clearCache)]
+    
+    @classmethod
+    def _nodeRemoved(cls, mobj, clientData=None):
+        cls._CACHE.pop(om2.MFnDependencyNode(mobj).uuid().asString(), None)
+        
+    @classmethod
+    def clearCache(cls, *args):
+        cls._CACHE.clear()
+        
+    def __init__(self, nodeName):
+        if not hasattr(self, '_INITOK'):
+            self.node    = nodeName
+            self._INITOK = True
+            
+    def __str__(self):
+        return self.path
+        
+    def __repr__(self):
+        return "<SpaceSwitchMeta |'{}'>".format(self.path)
+        
+    @classmethod
+    def _create(cls, nodeName, nodeType):
+        return MetaUtils.createMetaNode(nodeName, nodeType)
+            
+    @property
+    def node(self):
+        return self._node
+    
+    @node.setter
+    def node(self, nodeName):
+        mobj       = om2.MGlobal.getSelectionListByName(nodeName).getDependNode(0)
+        self._node = om2.MFnDependencyNode(mobj)
+        
+    @property
+    def path(self):
+        return self.node.name()
+        
+    @property
+    def mobject(self):
+        return self.node.object()
+        
+    # -----------------------------------------------------------------------------------------    
+    @property
+    def source(self):
+        source = cmds.listConnections('{}.source'.format(self), d=False)
+        return cmds.ls(source[0], long=True)[0] if source else None
+    
+    @source.setter
+    def source(self, obj):
+        cmds.connectAttr('{}.message'.format(obj), '{}.source'.format(self), f=True)
+        
+    @property
+    def offsetGroup(self):
+        offsetGroup = cmds.listConnections('{}.offsetGroup'.format(self), d=False)
+        return cmds.ls(offsetGroup[0], long=True)[0] if offsetGroup else None
+    
+    @offsetGroup.setter
+    def offsetGroup(self, obj):
+        cmds.connectAttr('{}.message'.format(obj), '{}.offsetGroup'.format(self), f=True)
+    
+    # -----------------------------------------------------------------------------------------
+    @property
+    def target(self):
+        targetWidgets = {}
+        # get target count
+        spaceTargets = cmds.listConnections('{}.target'.format(self), d=False)
+        #print(spaceTargets)
+        for index, target in enumerate(spaceTargets):
+            targetData = {}
+            targetData['attrName']    = cmds.getAttr('{}.target[{}].attrName'.format(self, index))
+            targetData['spaceTarget'] = target
+            targetWidgets[index] = targetData
+            
+        return targetWidgets
+        
+    @target.setter
+    def target(self, data):
+        for index, widget in enumerate(data.values()):
+            target = widget['spaceTarget']
+            cmds.connectAttr('{}.message'.format(target), '{}.target[{}].spaceTarget'.format(self, index), f=True)
+            attrName = widget['attrName']
+            cmds.setAttr('{}.target[{}].attrName'.format(self, index), attrName, typ="string")
+            
+    @property        
+    def spaceLocs(self):
+        return cmds.listConnections('{}.spaceLocs'.format(self), d=False) or []
+        
+    @spaceLocs.setter
+    def spaceLocs(self, data):
+        offsetGroup, targets = data
+        _targets = [value['spaceTarget'] for value in targets.values()]
+        mobjs    = MetaUtils.getMObjects([offsetGroup] + _targets)
+        
+        dagModifier, modifier = om2.MDagModifier(), om2.MDGModifier()
+        self._createSpaceLocs(dagModifier, modifier, self.source.split('|')[-1], 
+                              mobjs[offsetGroup], [mobjs[t] for t in _targets], set())
+        commitModifier(dagModifier)
+        commitModifier(modifier)
+        
+    def _createSpaceLocs(self, dagModifier, modifier, sourceName, offsetGroup, targets, reserved, ogWorld=None):
+        '''
+        one locator per target, parented to the target and matched to the offsetGroup
+        ogWorld: the offsetGroup world matrix to match, its current one by default
+        return: [MObject, ...]
+        '''
+        ogWorld    = MetaUtils.worldMatrix(offsetGroup) if ogWorld is None else ogWorld
+        locsPlug   = MetaUtils.getPlug(self.mobject, 'spaceLocs')
+        locIndices = MetaUtils.freeIndices(locsPlug, len(targets))
+        
+        locNames = MetaUtils.uniqueNames('{}_spaceSwitch_LOC'.format(sourceName), len(targets), reserved)
+        locs = []
+        for target, locName, locIndex in zip(targets, locNames, locIndices):
+            #locName = MetaUtils.uniqueName('{}_{}_spaceSwitch_LOC'.format(self.source.split('|')[-1], target.split('|')[-1]))
+            loc = dagModifier.createNode('transform', target)
+            dagModifier.renameNode(loc, locName)
+            
+            # matchTransform, expressed in the space of the target
+            matrix   = om2.MTransformationMatrix(ogWorld * MetaUtils.worldMatrix(target).inverse())
+            rotation = matrix.rotation()
+            values   = list(matrix.translation(om2.MSpace.kTransform)) + \
+                       [rotation.x, rotation.y, rotation.z] + \
+                       list(matrix.scale(om2.MSpace.kTransform))
+            fnLoc  = om2.MFnDependencyNode(loc)
+            for attrName, value in zip(('translateX', 'translateY', 'translateZ', 
+                                        'rotateX', 'rotateY', 'rotateZ', 
+                                        'scaleX', 'scaleY', 'scaleZ'), values):
+                dagModifier.newPlugValueDouble(fnLoc.findPlug(attrName, False), value)
+            modifier.connect(fnLoc.findPlug('message', False), locsPlug.elementByLogicalIndex(locIndex))
+            locs.append(loc)
+        return locs
+                
+    @property
+    def constraints(self):
+        _constraints = []
+        childAttrs = cmds.attributeQuery('constraints', node=self, listChildren=True)
+        for attr in childAttrs:
+            cons = cmds.listConnections('{}.constraints.{}'.format(self, attr), d=False)
+            if cons is None:
+                continue
+            _constraints.append(cons[0])
+        return _constraints
+        
+    @constraints.setter
+    @addUndo
+    def constraints(self, data):
+        types, offsetGroup, spaceLoc = data
+        modifier = om2.MDGModifier()
+        self._createConstraints(modifier, types, offsetGroup, spaceLoc)
+        commitModifier(modifier)
+        
+    def _createConstraints(self, modifier, types, offsetGroup, spaceLocs, reserved=None):
+        '''
+        the constraint commands are queued on modifier with a free name picked up front, 
+        so their settings and meta connection are queued with them
+        return: [constraint, ...], they exist once modifier is committed
+        '''
+        constraints = []
+        for conType, conCmd in self.CONSTRAINTS.items():
+            if not types.get(conType):
+                continue
+            c = MetaUtils.uniqueName('{}_{}1'.format(offsetGroup.split('|')[-1], conCmd), reserved)
+            queueCommand(modifier, conCmd, spaceLocs, offsetGroup, mo=True, n=c)
+            if conType in ('orient', 'parent'):
+                queueCommand(modifier, 'setAttr', '{}.interpType'.format(c), 2)
+            queueCommand(modifier, 'connectAttr', '{}.message'.format(c), '{}.constraints.{}'.format(self.path, conCmd))
+            constraints.append(c)
+        return constraints
+                
+    # -----------------------------------------------------------------------------------------
+    @property
+    def conType(self):
+        if self.mode == 'matrix':
+            return self._matrixConType()
+        conTypeDic = {}
+        # get childs attr name
+        childAttrs = cmds.attributeQuery('constraints', node=self, listChildren=True)
+        for attr in childAttrs:
+            value = bool(cmds.listConnections('{}.constraints.{}'.format(self, attr)))
+            conTypeDic[attr.split('Constraint')[0]] = value
+        return conTypeDic
+        
+    def createAttr(self, ctrl, targets, remap=None):
+        '''
+        an existing spaceSwitch is edited in place, its keys, anim layers and connections are kept
+        remap: {old index: new index}, default: every old field goes to the target with the same attrName, else to 0
+        '''
+        attrNames = [value['attrName'] for value in targetOrder(targets)]
+        fnCtrl    = om2.MFnDependencyNode(MetaUtils.getMObject(ctrl))
+        if not fnCtrl.hasAttribute('spaceSwitch'):
+            fnEnum = om2.MFnEnumAttribute()
+            attr   = fnEnum.create('spaceSwitch', 'spaceSwitch', 0)
+            for index, attrName in enumerate(attrNames):
+                fnEnum.addField(attrName, index)
+            fnEnum.keyable = True
+            modifier = om2.MDGModifier()
+            modifier.addAttribute(fnCtrl.object(), attr)
+            commitModifier(modifier)
+            return
+        if remap is None:
+            remap = dict((index, attrNames.index(field) if field in attrNames else 0) 
+                         for index, field in enumerate(self._enumFields(fnCtrl.attribute('spaceSwitch'))))
+        self._updateSwitchAttr(ctrl, attrNames, remap)
+    
+    # -----------------------------------------------------------------------------------------------
+    @property
+    def matrixNodes(self):
+        if not self.node.hasAttribute('matrixNodes'):
+            return []
+        return cmds.listConnections('{}.matrixNodes'.format(self), d=False) or []
+        
+    def _matrixConType(self):
+        '''
+        read back from the blendMatrix channel weights, point + orient is the same as parent here
+        '''
+        conTypeDic = dict((conType, False) for conType in self.CONSTRAINTS)
+        nodesPlug  = MetaUtils.getPlug(self.mobject, 'matrixNodes')
+        for index in nodesPlug.getExistingArrayAttributeIndices():
+            plugs = nodesPlug.elementByLogicalIndex(index).connectedTo(True, False)
+            if not plugs or om2.MFnDependencyNode(plugs[0].node()).typeName != 'blendMatrix':
+                continue
+            translate, rotate, scale = [MetaUtils.getPlug(plugs[0].node(), 'target[0].{}'.format(attrName)).asFloat() > 0.5 
+                                        for attrName in ('translateWeight', 'rotateWeight', 'scaleWeight')]
+            conTypeDic['parent'] = translate and rotate
+            conTypeDic['point']  = translate and not rotate
+            conTypeDic['orient'] = rotate and not translate
+            conTypeDic['scale']  = scale
+            break
+        return conTypeDic
+        
+    @staticmethod
+    def _matrixWeights(conType):
+        '''
+        blendMatrix target weights for the constraint types
+        '''
+        return {'translateWeight': bool(conType.get('point') or conType.get('parent')),
+                'rotateWeight'   : bool(conType.get('orient') or conType.get('parent')),
+                'scaleWeight'    : bool(conType.get('scale')),
+                'shearWeight'    : bool(conType.get('scale'))}
+        
+    def _createMatrixNetwork(self, modifier, ctrl, offsetGroup, targets, conType, reserved):
+        '''
+        target.worldMatrix -> multMatrix (one per target) -> blendMatrix -> offsetGroup.offsetParentMatrix
+        the offsets are stored on the meta node, the rest matrix is the blendMatrix input so 
+        the channels that are not switched keep the offsetGroup rest pose
+        '''
+        meta        = self.mobject
+        sourceName  = ctrl.split('|')[-1]
+        ctrlPlug    = MetaUtils.getPlug(MetaUtils.getMObject(ctrl), 'spaceSwitch')
+        offsetsPlug = MetaUtils.getPlug(meta, 'spaceOffsets')
+        nodesPlug   = MetaUtils.getPlug(meta, 'matrixNodes')
+        condsPlug   = MetaUtils.getPlug(meta, 'conditionNodes')
+        ogWorld     = MetaUtils.worldMatrix(offsetGroup)
+        fnOg        = om2.MFnDependencyNode(offsetGroup)
+        weights     = self._matrixWeights(conType)
+        
+        blend   = modifier.createNode('blendMatrix')
+        modifier.renameNode(blend, MetaUtils.uniqueName('{}_spaceSwitch_blendMatrix'.format(sourceName), reserved))
+        fnBlend = om2.MFnDependencyNode(blend)
+        modifier.connect(MetaUtils.getPlug(meta, 'offsetGroupLocalMatrix'), fnBlend.findPlug('inputMatrix', False))
+        modifier.connect(fnBlend.findPlug('message', False), nodesPlug.elementByLogicalIndex(0))
+        
+        for index, target in enumerate(targets):
+            offsetPlug = offsetsPlug.elementByLogicalIndex(index)
+            modifier.newPlugValue(offsetPlug, om2.MFnMatrixData().create(ogWorld * MetaUtils.worldMatrix(target).inverse()))
+            mult, fnCond = self._createMatrixTarget(modifier, ctrlPlug, sourceName, fnOg, blend, index, index, 
+                                                    offsetPlug, target, weights, reserved)
+            modifier.connect(om2.MFnDependencyNode(mult).findPlug('message', False), nodesPlug.elementByLogicalIndex(index + 1))
+            modifier.connect(fnCond.findPlug('message', False), condsPlug.elementByLogicalIndex(index))
+            
+        # the local transform moves into offsetParentMatrix, restored from offsetGroupLocalMatrix on delete
+        for attrName in ('translateX', 'translateY', 'translateZ', 'rotateX', 'rotateY', 'rotateZ'):
+            modifier.newPlugValueDouble(fnOg.findPlug(attrName, False), 0.0)
+        for attrName in ('scaleX', 'scaleY', 'scaleZ'):
+            modifier.newPlugValueDouble(fnOg.findPlug(attrName, False), 1.0)
+        modifier.connect(fnBlend.findPlug('outputMatrix', False), fnOg.findPlug('offsetParentMatrix', False))
+        
+    def _createMatrixTarget(self, modifier, ctrlPlug, sourceName, fnOg, blend, index, blendIndex, offsetPlug, target, weights, reserved):
+        '''
+        offset * target.worldMatrix * offsetGroup.parentInverseMatrix -> blend.target[blendIndex], 
+        weighted by a selector on space index
+        return: multMatrix MObject, selector MFnDependencyNode
+        '''
+        mult   = modifier.createNode('multMatrix')
+        modifier.renameNode(mult, MetaUtils.uniqueName('{}_spaceSwitch_multMatrix'.format(sourceName), reserved))
+        fnMult = om2.MFnDependencyNode(mult)
+        matrixIn = fnMult.findPlug('matrixIn', False)
+        modifier.connect(offsetPlug, matrixIn.elementByLogicalIndex(0))
+        modifier.connect(MetaUtils.getPlug(target, 'worldMatrix[0]'), matrixIn.elementByLogicalIndex(1))
+        modifier.connect(fnOg.findPlug('parentInverseMatrix', False).elementByLogicalIndex(0), matrixIn.elementByLogicalIndex(2))
+        
+        blendTarget = 'target[{}].'.format(blendIndex)
+        modifier.connect(fnMult.findPlug('matrixSum', False), MetaUtils.getPlug(blend, blendTarget + 'targetMatrix'))
+        for attrName, value in weights.items():
+            modifier.newPlugValueFloat(MetaUtils.getPlug(blend, blendTarget + attrName), 1.0 if value else 0.0)
+            
+        fnCond = self._createSelector(modifier, ctrlPlug, '{}_spaceSwitch'.format(sourceName), index, reserved)
+        modifier.connect(fnCond.findPlug('outColorR', False), MetaUtils.getPlug(blend, blendTarget + 'weight'))
+        return mult, fnCond
+        
+    # -----------------------------------------------------------------------------------------------
+    @property
+    def mode(self):
+        if not self.node.hasAttribute('mode'): # meta nodes created before the modes existed
+            return self.MODES[0]
+        return self.node.findPlug('mode', False).asString() or self.MODES[0]
+        
+    @property
+    def conditionNodes(self):
+        return cmds.listConnections('{}.conditionNodes'.format(self), d=False) or []
+            
+    def createConditionNode(self, ctrl, constraints):
+        modifier = om2.MDGModifier()
+        self._createConditionNodes(modifier, ctrl, constraints, self.spaceLocs, set(), self.mode)
+        commitModifier(modifier)
+        
+    def _createConditionNodes(self, modifier, ctrl, constraints, spaceLocs, reserved, mode):
+        ctrlPlug  = MetaUtils.getPlug(MetaUtils.getMObject(ctrl), 'spaceSwitch')
+        condsPlug = MetaUtils.getPlug(self.mobject, 'conditionNodes')
+        fnConsList = [om2.MFnDependencyNode(MetaUtils.getMObject(cons)) for cons in constraints]
+        
+        # condition: [[cons], [cons], ...] one selector per constraint and target
+        # shared   : [[cons, cons, ...]]  one selector per target drives every constraint
+        groups = [[fnCons] for fnCons in fnConsList] if mode == 'condition' else [fnConsList] if fnConsList else []
+        condIndices = iter(MetaUtils.freeIndices(condsPlug, len(groups) * len(spaceLocs)))
+        for group in groups:
+            for index, loc in enumerate(spaceLocs):
+                locName = loc.split('|')[-1]
+                fnCond  = self._createSelector(modifier, ctrlPlug, locName, index, reserved)
+                for fnCons in group:
+                    modifier.connect(fnCond.findPlug('outColorR', False), fnCons.findPlug('{}W{}'.format(locName, index), False))
+                modifier.connect(fnCond.findPlug('message', False), condsPlug.elementByLogicalIndex(next(condIndices)))
+                
+    @staticmethod
+    def _createSelector(modifier, ctrlPlug, name, index, reserved):
+        '''
+        condition node, outColorR is 1 while ctrl.spaceSwitch == index
+        '''
+        condNode = modifier.createNode('condition')
+        modifier.renameNode(condNode, MetaUtils.uniqueName('{}_condition'.format(name), reserved))
+        fnCond   = om2.MFnDependencyNode(condNode)
+        modifier.newPlugValueFloat(fnCond.findPlug('colorIfTrueR', False), 1)
+        modifier.newPlugValueFloat(fnCond.findPlug('colorIfFalseR', False), 0)
+        modifier.newPlugValueFloat(fnCond.findPlug('secondTerm', False), index)
+        modifier.connect(ctrlPlug, fnCond.findPlug('firstTerm', False))
+        return fnCond
+                
+    @property    
+    def offsetGroupMatrix(self):
+        return cmds.getAttr('{}.offsetGroupLocalMatrix'.format(self))
+
+    @offsetGroupMatrix.setter
+    def offsetGroupMatrix(self, inMatrix):
+        cmds.setAttr('{}.offsetGroupLocalMatrix'.format(self), inMatrix, typ='matrix')
+    # -----------------------------------------------------------------------------------------
+    
+    def _connectNodeData(self, modifier, data, mobjs):
+        '''
+        source, offsetGroup, targets and the offsetGroup rest matrix
+        '''
+        meta = self.mobject
+        modifier.newPlugValueString(MetaUtils.getPlug(meta, 'mode'), data.get('mode', self.MODES[0]))
+        modifier.connect(MetaUtils.getPlug(mobjs[data['source']], 'message'), MetaUtils.getPlug(meta, 'source'))
+        modifier.connect(MetaUtils.getPlug(mobjs[data['offsetGroup']], 'message'), MetaUtils.getPlug(meta, 'offsetGroup'))
+        for index, widget in enumerate(targetOrder(data['targetWidgets'])):
+            modifier.connect(MetaUtils.getPlug(mobjs[widget['spaceTarget']], 'message'), 
+                             MetaUtils.getPlug(meta, 'target[{}].spaceTarget'.format(index)))
+            modifier.newPlugValueString(MetaUtils.getPlug(meta, 'target[{}].attrName'.format(index)), widget['attrName'])
+        
+        matrixData = om2.MFnMatrixData().create(MetaUtils.localMatrix(mobjs[data['offsetGroup']]))
+        modifier.newPlugValue(MetaUtils.getPlug(meta, 'offsetGroupLocalMatrix'), matrixData)
+        
+    @classmethod
+    def _build(cls, metas, specs, timer, reserved=None):
+        '''
+        build every spec on its empty meta node, each phase goes through a single modifier
+        '''
+        reserved = set() if reserved is None else reserved
+        with timer('resolve'):
+            nodeNames = set()
+            for data in specs:
+                nodeNames.update([data['source'], data['offsetGroup']])
+                nodeNames.update(widget['spaceTarget'] for widget in data['targetWidgets'].values())
+            mobjs = MetaUtils.getMObjects(nodeNames)
+            
+        with timer('spaceLocs'):
+            dagModifier, modifier = om2.MDagModifier(), om2.MDGModifier()
+            spaceLocs = []
+            for meta, data in zip(metas, specs):
+                meta._connectNodeData(modifier, data, mobjs)
+                if data.get('mode') == 'matrix': # no locators
+                    spaceLocs.append([])
+                    continue
+                targets = [mobjs[widget['spaceTarget']] for widget in targetOrder(data['targetWidgets'])]
+                spaceLocs.append(meta._createSpaceLocs(dagModifier, modifier, data['source'].split('|')[-1], 
+                                                       mobjs[data['offsetGroup']], targets, reserved))
+            commitModifier(dagModifier)
+            commitModifier(modifier)
+            spaceLocs = [[MetaUtils.longName(loc) for loc in locs] for locs in spaceLocs]
+            
+        with timer('constraints'):
+            modifier    = om2.MDGModifier()
+            constraints = [meta._createConstraints(modifier, data['conType'], MetaUtils.longName(mobjs[data['offsetGroup']]), locs, reserved)
+                           if locs else [] for meta, data, locs in zip(metas, specs, spaceLocs)]
+            commitModifier(modifier)
+            
+        with timer('attributes'):
+            for meta, data in zip(metas, specs):
+                meta.createAttr(MetaUtils.longName(mobjs[data['source']]), data['targetWidgets'])
+                
+        with timer('conditions'):
+            modifier = om2.MDGModifier()
+            for meta, data, locs, cons in zip(metas, specs, spaceLocs, constraints):
+                ctrl = MetaUtils.longName(mobjs[data['source']])
+                if data.get('mode') == 'matrix':
+                    targets = [mobjs[widget['spaceTarget']] for widget in targetOrder(data['targetWidgets'])]
+                    meta._createMatrixNetwork(modifier, ctrl, mobjs[data['offsetGroup']], targets, data['conType'], reserved)
+                    continue
+                meta._createConditionNodes(modifier, ctrl, cons, locs, reserved, data.get('mode', cls.MODES[0]))
+            commitModifier(modifier)
+            
+        with timer('summary'):
+            cls._writeSummaries(metas, specs, mobjs)
+            
+    @classmethod
+    @addUndo
+    def createMany(cls, specs, verbose=False, replacing=()):
+        '''
+        headless batch build, specs: [nodeData or SpaceSwitchSpec, ...]
+        all specs are validated before anything is created and the whole build is one undo chunk,
+        the per phase timings are kept in SpaceSwitchMeta.lastBuildTimings
+        replacing: long names of the sources that keep the spaceSwitch of a torn down switch, it is edited in place
+        return: [SpaceSwitchMeta, ...]
+        '''
+        timer = PhaseTimer()
+        with timer('validate'):
+            specs  = [normalizeTargets(spec.toNodeData() if isinstance(spec, SpaceSwitchSpec) else spec) for spec in specs]
+            errors = cls.validateMany(specs, replacing)
+            if errors:
+                raise ValueError('\n'.join('spec {}: {}'.format(index, message) for index, message in errors))
+                
+        with timer('metaNodes'):
+            reserved  = set()
+            modifier  = om2.MDGModifier()
+            mobjs     = []
+            for data in specs:
+                mobj = modifier.createNode(cls._NODETYPE)
+                modifier.renameNode(mobj, MetaUtils.uniqueName('{}_spaceSwitch_META'.format(data['source'].split('|')[-1]), reserved))
+                MetaUtils.addMetaAttributes(modifier, mobj)
+                mobjs.append(mobj)
+            commitModifier(modifier)
+            
+            modifier = om2.MDGModifier()
+            for mobj in mobjs:
+                MetaUtils.initMetaAttributes(modifier, mobj)
+            commitModifier(modifier)
+            metas = [cls.fromMObject(mobj) for mobj in mobjs]
+            
+        cls._build(metas, specs, timer, reserved)
+        
+        cls.lastBuildTimings = timer.timings
+        if verbose:
+            om2.MGlobal.displayInfo('SpaceSwitchMeta.createMany: {} switches\n{}'.format(len(metas), timer.report()))
+        return metas
+        
+    @staticmethod
+    def validateMany(specs, replacing=()):
+        '''
+        see validateSpecs
+        '''
+        return validateSpecs(specs, replacing)
+        
+    # -----------------------------------------------------------------------------------------
+        
+    @property
+    def nodeData(self):
+        return self.readNodeData()
+        
+    def readNodeData(self, names=None):
+        '''
+        same dict as source / offsetGroup / conType / target / mode, read in a single pass 
+        over the meta node plugs instead of one cmds query per attribute
+        names: node name cache, shared between meta nodes by readMany
+        '''
+        names  = {} if names is None else names
+        fnNode = self.node
+        
+        def sourceName(plug, long=False):
+            plugs = plug.connectedTo(True, False)
+            if not plugs:
+                return None
+            mobj   = plugs[0].node()
+            handle = om2.MObjectHandle(mobj)
+            key    = (handle.hashCode(), long)
+            if key not in names or not names[key][0] == handle:
+                names[key] = (handle, MetaUtils.longName(mobj) if long else MetaUtils.shortName(mobj))
+            return names[key][1]
+        
+        _nodeData = {}
+        _nodeData['source']      = sourceName(fnNode.findPlug('source', False), True)
+        _nodeData['offsetGroup'] = sourceName(fnNode.findPlug('offsetGroup', False), True)
+        _nodeData['mode']        = (fnNode.findPlug('mode', False).asString() if fnNode.hasAttribute('mode') else '') or self.MODES[0]
+        
+        if _nodeData['mode'] == 'matrix':
+            _nodeData['conType'] = self._matrixConType()
+        else:
+            conTypeDic = {}
+            consPlug   = fnNode.findPlug('constraints', False)
+            for i in range(consPlug.numChildren()):
+                childPlug = consPlug.child(i)
+                conTypeDic[om2.MFnAttribute(childPlug.attribute()).name.split('Constraint')[0]] = childPlug.isConnected
+            _nodeData['conType'] = conTypeDic
+        
+        targetWidgets = {}
+        targetPlug    = fnNode.findPlug('target', False)
+        attrNameAttr, spaceTargetAttr = fnNode.attribute('attrName'), fnNode.attribute('spaceTarget')
+        for index in targetPlug.getExistingArrayAttributeIndices():
+            elementPlug = targetPlug.elementByLogicalIndex(index)
+            spaceTarget = sourceName(elementPlug.child(spaceTargetAttr))
+            if spaceTarget is None:
+                continue
+            targetWidgets[len(targetWidgets)] = {'attrName'   : elementPlug.child(attrNameAttr).asString(),
+                                                 'spaceTarget': spaceTarget}
+        _nodeData['targetWidgets'] = targetWidgets
+        return _nodeData
+        
+    @classmethod
+    def readMany(cls, metas):
+        '''
+        return: [nodeData, ...], the target names are looked up once for all the meta nodes
+        '''
+        names = {}
+        return [meta.readNodeData(names) for meta in metas]
+        
+    # -----------------------------------------------------------------------------------------
+    # summary
+    @property
+    def summary(self):
+        '''
+        the record written to the summary attribute at build time, None when the meta node has none
+        this version can read
+        '''
+        if not self.node.hasAttribute('summary'):
+            return None
+        try:
+            record = json.loads(self.node.findPlug('summary', False).asString() or 'null')
+        except ValueError:
+            return None
+        if not isinstance(record, dict) or record.get('version') != self.SUMMARY_VERSION:
+            return None
+        return record
+        
+    def _summaryRecord(self, data, mobjs):
+        '''
+        toRecord of data with the uuids of the nodes built for it, read from the meta node plugs
+        '''
+        def uuids(mobjs):
+            return [om2.MFnDependencyNode(mobj).uuid().asString() for mobj in mobjs]
+        record = OrderedDict([('version', self.SUMMARY_VERSION)])
+        record.update(self.toRecord(data, mobjs))
+        record['nodes'] = OrderedDict((attrName, uuids(self._arraySources(attrName))) 
+                                      for attrName in ('spaceLocs', 'conditionNodes', 'matrixNodes'))
+        constraints = self._constraintNodes()
+        record['nodes']['constraints'] = OrderedDict(zip(constraints.keys(), uuids(constraints.values())))
+        return record
+        
+    @classmethod
+    def _writeSummaries(cls, metas, specs, mobjs):
+        '''
+        write the summary of every meta, meta nodes built before the attribute existed get it first
+        mobjs: {nodeName: MObject} of the nodes the specs point at
+        '''
+        missing = [meta for meta in metas if not meta.node.hasAttribute('summary')]
+        if missing:
+            modifier = om2.MDGModifier()
+            for meta in missing:
+                modifier.addAttribute(meta.mobject, om2.MFnTypedAttribute().create('summary', 'summary', om2.MFnData.kString))
+            commitModifier(modifier)
+        longNames = dict((nodeName, MetaUtils.longName(mobj)) for nodeName, mobj in mobjs.items() if mobj is not None)
+        longObjs  = dict((longNames[nodeName], mobj) for nodeName, mobj in mobjs.items() if mobj is not None)
+        modifier  = om2.MDGModifier()
+        for meta, data in zip(metas, specs):
+            data = dict(data, source=longNames[data['source']], offsetGroup=longNames[data['offsetGroup']],
+                        targetWidgets=OrderedDict((index, dict(widget, spaceTarget=longNames[widget['spaceTarget']])) 
+                                                  for index, widget in enumerate(targetOrder(data['targetWidgets']))))
+            modifier.newPlugValueString(meta.node.findPlug('summary', False), 
+                                        json.dumps(meta._summaryRecord(data, longObjs), separators=(',', ':')))
+        commitModifier(modifier)
+        
+    @classmethod
+    def readSummaries(cls, metas):
+        '''
+        nodeData of every meta from its summary, one plug read per meta node and one lookup per uuid,
+        renamed and reparented nodes are found by their uuid. the summary is not checked against the connections
+        (see checkSummaries), the meta nodes without one, or with a node it can not find, are read like readMany
+        return: [nodeData, ...]
+        '''
+        records = [meta.summary for meta in metas]
+        nodes   = MetaUtils.nodesByUuid(uuid for record in records if record is not None 
+                                        for _, uuid in cls.recordRefs(record))
+        longNames, shortNames, names = {}, {}, {}
+        def nodeName(uuid, cache, func):
+            if uuid not in cache:
+                cache[uuid] = func(nodes[uuid])
+            return cache[uuid]
+            
+        result = []
+        for meta, record in zip(metas, records):
+            if record is None or any(nodes.get(uuid) is None for _, uuid in cls.recordRefs(record)):
+                result.append(meta.readNodeData(names))
+                continue
+            resolved = dict(((target['spaceTarget'], target['uuid']), nodeName(target['uuid'], shortNames, MetaUtils.shortName)) 
+                            for target in record['targets'])
+            for key in ('source', 'offsetGroup'):
+                resolved[(record[key], record[key + 'Uuid'])] = nodeName(record[key + 'Uuid'], longNames, MetaUtils.longName)
+            result.append(cls.fromRecord(record, resolved))
+        return result
+        
+    @staticmethod
+    def _summaryKey(record):
+        '''
+        the part of a summary the connections decide, the names are left out, the nodes are found by uuid
+        '''
+        return (record.get('sourceUuid'), record.get('offsetGroupUuid'), record.get('mode'), 
+                sorted(key for key, value in record.get('conType', {}).items() if value),
+                [(target.get('attrName'), target.get('uuid')) for target in record.get('targets', [])],
+                json.dumps(record.get('nodes'), sort_keys=True))
+        
+    @classmethod
+    def checkSummaries(cls, metas=None):
+        '''
+        compare the summaries of metas (default: every meta node in the scene) with their live connections,
+        only done on demand, readSummaries trusts them
+        return: [(meta, message), ...] for the missing and out of date ones
+        '''
+        metas = MetaUtils.getMetaNodes() if metas is None else metas
+        specs = cls.readMany(metas)
+        nodeNames = set()
+        for data in specs:
+            nodeNames.update(name for name in (data['source'], data['offsetGroup']) if name)
+            nodeNames.update(widget['spaceTarget'] for widget in data['targetWidgets'].values())
+        mobjs  = MetaUtils.getMObjects(nodeNames)
+        issues = []
+        for meta, data in zip(metas, specs):
+            record = meta.summary
+            if record is None:
+                issues.append((meta, 'No summary'))
+            elif cls._summaryKey(record) != cls._summaryKey(meta._summaryRecord(data, mobjs)):
+                issues.append((meta, 'Summary does not match the connections'))
+        return issues
+        
+    @classmethod
+    @addUndo
+    def writeSummaries(cls, metas=None):
+        '''
+        write the summaries of metas (default: every meta node in the scene) again from their live connections
+        the switches that lost their source, offsetGroup or a target are left to repairScene
+        return: number of summaries written
+        '''
+        metas = MetaUtils.getMetaNodes() if metas is None else metas
+        specs = cls.readMany(metas)
+        whole = [(meta, data) for meta, data in zip(metas, specs) if data['source'] and data['offsetGroup'] and 
+                 len(data['targetWidgets']) == len(list(meta.node.findPlug('target', False).getExistingArrayAttributeIndices()))]
+        nodeNames = set()
+        for _, data in whole:
+            nodeNames.update([data['source'], data['offsetGroup']])
+            nodeNames.update(widget['spaceTarget'] for widget in data['targetWidgets'].values())
+        if whole:
+            cls._writeSummaries([meta for meta, _ in whole], [data for _, data in whole], MetaUtils.getMObjects(nodeNames))
+        return len(whole)
+        
+    @nodeData.setter    
+    @addUndo
+    def nodeData(self, data):
+        self._build([self], [data], PhaseTimer())
+        cmds.select(self.source, ne=True)
+        
+    @nodeData.deleter    
+    @addUndo
+    def nodeData(self):
+        self._teardown()
+        
+    def _teardown(self, keepAttr=False):
+        '''
+        delete the switch, keepAttr: leave the spaceSwitch attribute on the source with its keys and connections,
+        a build on the same source then edits it in place (see createAttr)
+        '''
+        mode     = self.mode
+        modifier = om2.MDagModifier()
+        MetaUtils.deleteNodes(modifier, self._arraySources('conditionNodes') + list(self._constraintNodes().values()) +
+                                        self._arraySources('spaceLocs') + self._arraySources('matrixNodes'))
+        fnSource = om2.MFnDependencyNode(MetaUtils.getMObject(self.source))
+        if not keepAttr and fnSource.hasAttribute('spaceSwitch'):
+            modifier.removeAttribute(fnSource.object(), fnSource.attribute('spaceSwitch'))
+        if mode == 'matrix':
+            modifier.newPlugValue(MetaUtils.getPlug(MetaUtils.getMObject(self.offsetGroup), 'offsetParentMatrix'), 
+                                  om2.MFnMatrixData().create(om2.MMatrix()))
+        queueCommand(modifier, 'xform', self.offsetGroup, m=self.offsetGroupMatrix, ws=False)
+        modifier.deleteNode(self.mobject)
+        commitModifier(modifier)
+        
+    # -----------------------------------------------------------------------------------------
+    # in place edit
+    @addUndo
+    def edit(self, data):
+        '''
+        update the switch to data without building it again, only the targets and constraint types that
+        differ get their locator, constraint target, selector or multMatrix added or removed,
+        the spaceSwitch enum is renamed in place and its keys follow their target to the new index
+        (keys on a removed target go to the first space)
+        a new offsetGroup or mode can not be edited, the switch is built again on the same spaceSwitch attribute 
+        so the keys stay, only a new source deletes the switch with its keys and builds it again
+        return: SpaceSwitchMeta, self unless it was built again
+        '''
+        data    = normalizeTargets(data)
+        current = self.readNodeData()
+        errors  = self.validateMany([data], [current['source']])
+        if errors:
+            raise ValueError('\n'.join(message for _, message in errors))
+            
+        nodeNames = set([data['source'], data['offsetGroup']])
+        nodeNames.update(widget['spaceTarget'] for widget in data['targetWidgets'].values())
+        mobjs = MetaUtils.getMObjects(nodeNames)
+        ctrl  = MetaUtils.longName(mobjs[data['source']])
+        mode  = data.get('mode', self.MODES[0])
+        if ctrl != current['source']:
+            del self.nodeData
+            return self.createMany([data])[0]
+            
+        slots   = self._targetSlots()
+        targets = [{'target'  : MetaUtils.longName(mobjs[widget['spaceTarget']]), 
+                    'mobject' : mobjs[widget['spaceTarget']], 
+                    'attrName': widget['attrName']} for widget in targetOrder(data['targetWidgets'])]
+        indices = dict((target['target'], index) for index, target in enumerate(targets))
+        remap   = dict((slot['index'], indices.get(slot['target'], 0)) for slot in slots)
+        if (MetaUtils.longName(mobjs[data['offsetGroup']]), mode) != (current['offsetGroup'], current['mode']):
+            # the keys first follow their target, the build then finds the fields it expects (see repairScene)
+            if om2.MFnDependencyNode(mobjs[data['source']]).hasAttribute('spaceSwitch'):
+                self._updateSwitchAttr(ctrl, [target['attrName'] for target in targets], remap)
+            self._teardown(keepAttr=True)
+            return self.createMany([data], replacing=[ctrl])[0]
+            
+        conType = dict((key, bool(data['conType'].get(key))) for key in self.CONSTRAINTS)
+        if [(slot['target'], slot['attrName']) for slot in slots] == [(target['target'], target['attrName']) for target in targets] \
+           and conType == current['conType']:
+            return self
+            
+        if mode == 'matrix':
+            self._editMatrixNetwork(ctrl, mobjs[data['offsetGroup']], slots, targets, conType, conType != current['conType'])
+        else:
+            self._editConstraintNetwork(ctrl, mobjs[data['offsetGroup']], slots, targets, conType, mode)
+            
+        modifier = om2.MDGModifier()
+        self._setArraySources(modifier, MetaUtils.getPlug(self.mobject, 'target'), 
+                              [target['mobject'] for target in targets], self.node.attribute('spaceTarget'))
+        for index, target in enumerate(targets):
+            plug = MetaUtils.getPlug(self.mobject, 'target[{}].attrName'.format(index))
+            if plug.asString() != target['attrName']:
+                modifier.newPlugValueString(plug, target['attrName'])
+        commitModifier(modifier)
+        self._updateSwitchAttr(ctrl, [target['attrName'] for target in targets], remap)
+        self._writeSummaries([self], [data], mobjs)
+        return self
+        
+    def _targetSlots(self):
+        '''
+        the nodes built for every target, in target order, read from the meta node plugs
+        the selectors are matched to their target by their secondTerm
+        return: [{'index', 'target', 'mobject', 'attrName', 'loc', 'mult', 'selectors'}, ...], 
+                loc / mult are None in the modes that do not build them
+        '''
+        selectors = {}
+        for cond in self._arraySources('conditionNodes'):
+            selectors.setdefault(int(round(MetaUtils.getPlug(cond, 'secondTerm').asDouble())), []).append(cond)
+        locs  = self._arraySources('spaceLocs')
+        mults = [mobj for mobj in self._arraySources('matrixNodes') if om2.MFnDependencyNode(mobj).typeName == 'multMatrix']
+        
+        slots      = []
+        targetPlug = self.node.findPlug('target', False)
+        attrNameAttr, spaceTargetAttr = self.node.attribute('attrName'), self.node.attribute('spaceTarget')
+        for logicalIndex in targetPlug.getExistingArrayAttributeIndices():
+            elementPlug = targetPlug.elementByLogicalIndex(logicalIndex)
+            plugs = elementPlug.child(spaceTargetAttr).connectedTo(True, False)
+            if not plugs:
+                continue
+            index = len(slots)
+            slots.append({'index'    : index,
+                          'target'   : MetaUtils.longName(plugs[0].node()),
+                          'mobject'  : plugs[0].node(),
+                          'attrName' : elementPlug.child(attrNameAttr).asString(),
+                          'loc'      : locs[index] if index < len(locs) else None,
+                          'mult'     : mults[index] if index < len(mults) else None,
+                          'selectors': selectors.get(index, [])})
+        return slots
+        
+    def _arraySources(self, attrName):
+        '''
+        return: [MObject, ...] connected to the elements of a message multi, in index order
+        '''
+        if not self.node.hasAttribute(attrName):
+            return []
+        plug  = self.node.findPlug(attrName, False)
+        nodes = []
+        for index in plug.getExistingArrayAttributeIndices():
+            plugs = plug.elementByLogicalIndex(index).connectedTo(True, False)
+            if plugs:
+                nodes.append(plugs[0].node())
+        return nodes
+        
+    def _constraintNodes(self):
+        '''
+        return: {conType: constraint MObject} of the constraints connected to the meta node
+        '''
+        nodes    = OrderedDict()
+        consPlug = self.node.findPlug('constraints', False)
+        for conType, conCmd in self.CONSTRAINTS.items():
+            plugs = consPlug.child(self.node.attribute(conCmd)).connectedTo(True, False)
+            if plugs:
+                nodes[conType] = plugs[0].node()
+        return nodes
+        
+    def _constraintWeights(self, constraints):
+        '''
+        return: {conType: {target long name: weight plug}}
+        '''
+        weights = {}
+        for conType, mobj in constraints.items():
+            conCmd  = getattr(cmds, self.CONSTRAINTS[conType])
+            conName = MetaUtils.longName(mobj)
+            targets = conCmd(conName, q=True, targetList=True) or []
+            aliases = conCmd(conName, q=True, weightAliasList=True) or []
+            weights[conType] = dict((MetaUtils.longName(MetaUtils.getMObject(target)), MetaUtils.getPlug(mobj, alias)) 
+                                    for target, alias in zip(targets, aliases))
+        return weights
+        
+    def _restWorldMatrix(self, offsetGroup):
+        '''
+        the offsetGroup world matrix in the rest pose the switch was built from
+        '''
+        local = om2.MFnMatrixData(MetaUtils.getPlug(self.mobject, 'offsetGroupLocalMatrix').asMObject()).matrix()
+        return local * om2.MDagPath.getAPathTo(offsetGroup).exclusiveMatrix()
+        
+    @staticmethod
+    def _setArraySources(modifier, arrayPlug, mobjs, childAttr=None):
+        '''
+        arrayPlug[i](.childAttr) <- mobjs[i].message, only the elements that change are reconnected
+        and the elements past the end are removed
+        '''
+        for index in arrayPlug.getExistingArrayAttributeIndices():
+            if index >= len(mobjs):
+                modifier.removeMultiInstance(arrayPlug.elementByLogicalIndex(index), True)
+        for index, mobj in enumerate(mobjs):
+            plug  = arrayPlug.elementByLogicalIndex(index)
+            plug  = plug.child(childAttr) if childAttr is not None else plug
+            plugs = plug.connectedTo(True, False)
+            if plugs and plugs[0].node() == mobj:
+                continue
+            if plugs:
+                modifier.disconnect(plugs[0], plug)
+            modifier.connect(MetaUtils.getPlug(mobj, 'message'), plug)
+            
+    def _editConstraintNetwork(self, ctrl, offsetGroup, slots, targets, conType, mode):
+        '''
+        condition / shared modes, everything new is created before anything is removed 
+        so a constraint is never left without a target
+        '''
+        meta       = self.mobject
+        ogName     = MetaUtils.longName(offsetGroup)
+        reserved   = set()
+        kept       = dict((slot['target'], slot) for slot in slots)
+        newTargets = set(target['target'] for target in targets)
+        removed    = [slot for slot in slots if slot['target'] not in newTargets]
+        
+        # locators of the new targets, matched to the rest pose like the ones built with the switch
+        dagModifier, modifier = om2.MDagModifier(), om2.MDGModifier()
+        newLocs = iter(self._createSpaceLocs(dagModifier, modifier, ctrl.split('|')[-1], offsetGroup,
+                                             [target['mobject'] for target in targets if target['target'] not in kept], 
+                                             reserved, self._restWorldMatrix(offsetGroup)))
+        commitModifier(dagModifier)
+        commitModifier(modifier)
+        locs      = [kept[target['target']]['loc'] if target['target'] in kept else next(newLocs) for target in targets]
+        locNames  = [MetaUtils.longName(loc) for loc in locs]
+        addedLocs = [locName for target, locName in zip(targets, locNames) if target['target'] not in kept]
+        
+        # constraints: new targets on the kept ones, the switched on types built on every locator
+        constraints = self._constraintNodes()
+        created     = OrderedDict()
+        modifier    = om2.MDGModifier()
+        for key, conCmd in self.CONSTRAINTS.items():
+            if not conType[key]:
+                continue
+            if key in constraints:
+                if addedLocs:
+                    queueCommand(modifier, conCmd, addedLocs, ogName, mo=True)
+                continue
+            created[key] = self._createConstraints(modifier, {key: True}, ogName, locNames, reserved)[0]
+        commitModifier(modifier)
+        for key, c in created.items():
+            constraints[key] = MetaUtils.getMObject(c)
+        
+        # removed targets and switched off types, with the selectors that only drove them
+        removedLocs = [slot['loc'] for slot in removed if slot['loc'] is not None]
+        switchedOff = [constraints.pop(key) for key in list(constraints) if not conType[key]]
+        obsolete    = [cond for slot in removed for cond in slot['selectors']]
+        if mode == 'condition':
+            obsolete += [cond for slot in slots if slot not in removed for cond in slot['selectors'] if switchedOff and
+                         all(plug.node() in switchedOff for plug in MetaUtils.getPlug(cond, 'outColorR').destinations())]
+        modifier = om2.MDagModifier()
+        for key, mobj in constraints.items():
+            if removedLocs and key not in created:
+                queueCommand(modifier, self.CONSTRAINTS[key], [MetaUtils.longName(loc) for loc in removedLocs], ogName, e=True, rm=True)
+        MetaUtils.deleteNodes(modifier, obsolete + switchedOff + removedLocs)
+        commitModifier(modifier)
+            
+        # selectors: kept ones move to their new index, new ones for the new targets and types
+        ctrlPlug  = MetaUtils.getPlug(MetaUtils.getMObject(ctrl), 'spaceSwitch')
+        condsPlug = MetaUtils.getPlug(meta, 'conditionNodes')
+        weights   = self._constraintWeights(constraints)
+        modifier  = om2.MDGModifier()
+        newConds  = []
+        for index, (target, locName) in enumerate(zip(targets, locNames)):
+            slot      = kept.get(target['target'])
+            selectors = [cond for cond in slot['selectors'] if om2.MObjectHandle(cond).isValid()] if slot else []
+            for cond in selectors:
+                if slot['index'] != index:
+                    modifier.newPlugValueFloat(MetaUtils.getPlug(cond, 'secondTerm'), index)
+            plugs = [weights[key][locName] for key in constraints if slot is None or key in created]
+            if not plugs:
+                continue
+            if mode == 'condition':
+                groups = [[plug] for plug in plugs]
+            elif selectors: # shared, the target selector also drives the new constraints
+                for plug in plugs:
+                    modifier.connect(MetaUtils.getPlug(selectors[0], 'outColorR'), plug)
+                groups = []
+            else:
+                groups = [plugs]
+            for group in groups:
+                fnCond = self._createSelector(modifier, ctrlPlug, locName.split('|')[-1], index, reserved)
+                for plug in group:
+                    modifier.connect(fnCond.findPlug('outColorR', False), plug)
+                newConds.append(fnCond)
+        for fnCond, condIndex in zip(newConds, MetaUtils.freeIndices(condsPlug, len(newConds))):
+            modifier.connect(fnCond.findPlug('message', False), condsPlug.elementByLogicalIndex(condIndex))
+        self._setArraySources(modifier, MetaUtils.getPlug(meta, 'spaceLocs'), locs)
+        commitModifier(modifier)
+        
+    def _editMatrixNetwork(self, ctrl, offsetGroup, slots, targets, conType, weightsChanged):
+        '''
+        matrix mode, the kept targets keep their offset, the new ones are matched to the rest pose
+        '''
+        meta        = self.mobject
+        sourceName  = ctrl.split('|')[-1]
+        reserved    = set()
+        kept        = dict((slot['target'], slot) for slot in slots)
+        newTargets  = set(target['target'] for target in targets)
+        removed     = [slot for slot in slots if slot['target'] not in newTargets]
+        offsetsPlug = MetaUtils.getPlug(meta, 'spaceOffsets')
+        nodesPlug   = MetaUtils.getPlug(meta, 'matrixNodes')
+        blend       = [mobj for mobj in self._arraySources('matrixNodes') if om2.MFnDependencyNode(mobj).typeName == 'blendMatrix'][0]
+        
+        def blendIndex(mult):
+            for plug in MetaUtils.getPlug(mult, 'matrixSum').destinations():
+                if plug.node() == blend:
+                    return plug.parent().logicalIndex()
+                    
+        blendIndices = dict((slot['target'], blendIndex(slot['mult'])) for slot in slots if slot['mult'] is not None)
+        offsets      = dict((slot['target'], om2.MFnMatrixData(offsetsPlug.elementByLogicalIndex(slot['index']).asMObject()).matrix())
+                            for slot in slots if slot['target'] in newTargets)
+        restWorld    = self._restWorldMatrix(offsetGroup)
+        
+        modifier = om2.MDagModifier()
+        MetaUtils.deleteNodes(modifier, [mobj for slot in removed for mobj in [slot['mult']] + slot['selectors'] if mobj is not None])
+        commitModifier(modifier)
+            
+        modifier = om2.MDGModifier()
+        for slot in removed:
+            if blendIndices.get(slot['target']) is not None:
+                modifier.removeMultiInstance(MetaUtils.getPlug(blend, 'target[{}]'.format(blendIndices[slot['target']])), True)
+                
+        ctrlPlug  = MetaUtils.getPlug(MetaUtils.getMObject(ctrl), 'spaceSwitch')
+        fnOg      = om2.MFnDependencyNode(offsetGroup)
+        weights   = self._matrixWeights(conType)
+        used      = set(blendIndices[slot['target']] for slot in slots if slot not in removed)
+        freeBlend = (index for index in range(len(slots) + len(targets)) if index not in used)
+        mults, selectors = [], []
+        for index, target in enumerate(targets):
+            offsetPlug = offsetsPlug.elementByLogicalIndex(index)
+            slot       = kept.get(target['target'])
+            if slot is None:
+                modifier.newPlugValue(offsetPlug, om2.MFnMatrixData().create(restWorld * MetaUtils.worldMatrix(target['mobject']).inverse()))
+                mult, fnCond = self._createMatrixTarget(modifier, ctrlPlug, sourceName, fnOg, blend, index, next(freeBlend), 
+                                                        offsetPlug, target['mobject'], weights, reserved)
+                mults.append(mult)
+                selectors.append(fnCond.object())
+                continue
+            mults.append(slot['mult'])
+            selectors.extend(slot['selectors'])
+            if slot['index'] != index:
+                modifier.newPlugValue(offsetPlug, om2.MFnMatrixData().create(offsets[target['target']]))
+                matrixIn = MetaUtils.getPlug(slot['mult'], 'matrixIn[0]')
+                modifier.disconnect(matrixIn.source(), matrixIn)
+                modifier.connect(offsetPlug, matrixIn)
+                for cond in slot['selectors']:
+                    modifier.newPlugValueFloat(MetaUtils.getPlug(cond, 'secondTerm'), index)
+            if weightsChanged:
+                for attrName, value in weights.items():
+                    modifier.newPlugValueFloat(MetaUtils.getPlug(blend, 'target[{}].{}'.format(blendIndices[target['target']], attrName)), 
+                                               1.0 if value else 0.0)
+        for index in offsetsPlug.getExistingArrayAttributeIndices():
+            if index >= len(targets):
+                modifier.removeMultiInstance(offsetsPlug.elementByLogicalIndex(index), True)
+        self._setArraySources(modifier, nodesPlug, [blend] + mults)
+        self._setArraySources(modifier, MetaUtils.getPlug(meta, 'conditionNodes'), selectors)
+        commitModifier(modifier)
+        
+    def _updateSwitchAttr(self, ctrl, attrNames, remap):
+        '''
+        rename the spaceSwitch enum fields in place, its keys or value follow their target to the new index,
+        every curve driving it (anim layers and driven keys too) is rewritten in one call
+        remap: {old index: new index}
+        '''
+        modifier = om2.MDGModifier()
+        queueCommand(modifier, 'addAttr', '{}.spaceSwitch'.format(ctrl), e=True, en=':'.join(attrNames))
+        plug   = MetaUtils.getPlug(MetaUtils.getMObject(ctrl), 'spaceSwitch')
+        moved  = any(old != new for old, new in remap.items())
+        curves = self._switchCurves(plug) if moved else []
+        if moved and not curves and not plug.isDestination and not plug.isLocked:
+            modifier.newPlugValueInt(plug, remap.get(plug.asInt(), 0))
+        commitModifier(modifier)
+        if curves:
+            keys = AnimCurveModifier()
+            for fnCurve in curves:
+                keys.setValues(fnCurve, [remap.get(int(round(fnCurve.value(index))), 0) for index in range(fnCurve.numKeys)], 
+                               oma2.MFnAnimCurve.kTangentStep)
+            commitModifier(keys)
+        
+    @staticmethod
+    def _switchCurves(plug):
+        '''
+        return: [MFnAnimCurve, ...] driving plug, straight or through the animBlendNodes of anim layers
+        '''
+        curves, plugs = [], [plug]
+        while plugs:
+            source = plugs.pop().source()
+            if source.isNull:
+                continue
+            if source.node().hasFn(om2.MFn.kAnimCurve):
+                curves.append(oma2.MFnAnimCurve(source.node()))
+                continue
+            fnNode = om2.MFnDependencyNode(source.node())
+            if fnNode.typeName.startswith('animBlendNode'):
+                plugs.extend(fnNode.findPlug(attrName, False) for attrName in ('inputA', 'inputB') if fnNode.hasAttribute(attrName))
+        return curves
+        
+    # -----------------------------------------------------------------------------------------
+    # health check
+    REPAIRS = ('teardown', 'delete', 'reconnect', 'rename', 'rebuild')
+    
+    @classmethod
+    def checkScene(cls, metas=None, repair=False, verbose=False):
+        '''
+        check every meta node (default: all of them in the scene) in one pass over their plugs, without a cmds
+        query per attribute, the switch parts no meta node owns any more are found with a single cmds.ls
+        return: {'metas'      : number of meta nodes checked, 
+                 'healthy'    : number of meta nodes without issues,
+                 'brokenLinks': [issue, ...] lost sources, targets, locators, constraint weights, selectors, matrix nodes,
+                 'orphans'    : [issue, ...] switch parts that drive nothing or belong to no meta node,
+                 'enumDrift'  : [issue, ...] spaceSwitch enums that no longer match the targets,
+                 'repaired'   : see repairScene, only with repair=True}
+                 issue: {'meta', 'kind', 'node', 'message', 'repair'}, repair is one of REPAIRS or None
+        '''
+        metas  = MetaUtils.getMetaNodes() if metas is None else metas
+        report = OrderedDict([('metas', len(metas)), ('healthy', 0), ('brokenLinks', []), ('orphans', []), ('enumDrift', [])])
+        owned  = {}
+        for meta in metas:
+            issues = meta._checkHealth(owned)
+            report['healthy'] += not issues
+            for category, issue in issues:
+                report[category].append(issue)
+                
+        # parts named like the ones the build creates, that neither a meta node nor one of its constraints points at,
+        # the scene is listed by uuid so only the unowned ones are looked up
+        candidates = []
+        for pattern, types, nameRe in (('*_spaceSwitch_LOC*', ['transform'], r'_spaceSwitch_LOC(_\d{3,})?$'), 
+                                       ('*_spaceSwitch_*', ['condition', 'multMatrix', 'blendMatrix'], None)):
+            names = cmds.ls(pattern, type=types, recursive=True, long=True) or []
+            if names:
+                candidates.extend((nodeId, nodeName) for nodeId, nodeName in zip(cmds.ls(pattern, type=types, recursive=True, uuid=True), names) 
+                                  if nameRe is None or re.search(nameRe, nodeName))
+        ownedIds = set(om2.MFnDependencyNode(mobj).uuid().asString() for bucket in owned.values() for mobj in bucket) if candidates else ()
+        for nodeId, nodeName in candidates:
+            mobj = None if nodeId in ownedIds else MetaUtils.getMObject(nodeName)
+            if mobj is None:
+                continue
+            report['orphans'].append(cls._issue(None, om2.MFnDependencyNode(mobj).typeName, nodeName, 'Not owned by any space switch', 'delete'))
+            
+        if repair:
+            report['repaired'] = cls.repairScene(report)
+        if verbose:
+            om2.MGlobal.displayInfo('SpaceSwitchMeta.checkScene: {} meta nodes, {} healthy, {} broken links, {} orphans, {} enum drifts'.format(
+                                    report['metas'], report['healthy'], len(report['brokenLinks']), len(report['orphans']), len(report['enumDrift'])))
+        return report
+        
+    @staticmethod
+    def _issue(meta, kind, node, message, repair):
+        return OrderedDict([('meta', meta), ('kind', kind), ('node', node), ('message', message), ('repair', repair)])
+        
+    @staticmethod
+    def _enumFields(attr):
+        fnEnum = om2.MFnEnumAttribute(attr)
+        fields = []
+        for value in range(fnEnum.getMin(), fnEnum.getMax() + 1):
+            try:
+                fields.append(fnEnum.fieldName(value))
+            except RuntimeError: # sparse enum
+                continue
+        return fields
+        
+    def _checkHealth(self, owned):
+        '''
+        issues of one meta node, read from its plugs and the plugs of the nodes it points at
+        owned: {MObjectHandle hash: [MObject, ...]} of the nodes that belong to a switch, the ones found here are added
+        return: [(category, issue), ...]
+        '''
+        meta   = self.path
+        fnNode = self.node
+        issues = []
+        def issue(category, kind, node, message, repair):
+            issues.append((category, self._issue(meta, kind, node, message, repair)))
+        def own(mobj):
+            bucket = owned.setdefault(om2.MObjectHandle(mobj).hashCode(), [])
+            if mobj not in bucket:
+                bucket.append(mobj)
+        def driver(plug):
+            source = plug.source()
+            return None if source.isNull else source
+            
+        parts       = dict((attrName, self._arraySources(attrName)) for attrName in ('spaceLocs', 'conditionNodes', 'matrixNodes'))
+        constraints = self._constraintNodes() 
+        for mobj in [mobj for nodes in parts.values() for mobj in nodes] + list(constraints.values()):
+            own(mobj)
+        
+        ends = {}
+        for attrName in ('source', 'offsetGroup'):
+            plug = driver(fnNode.findPlug(attrName, False))
+            ends[attrName] = None if plug is None else plug.node()
+            if plug is None:
+                issue('brokenLinks', attrName, meta, 'The {} is no longer connected'.format(attrName), 'teardown')
+        if None in ends.values():
+            return issues
+        ctrl, offsetGroup = ends['source'], ends['offsetGroup']
+        
+        # targets, a deleted target leaves its element behind with the attrName
+        attrNames  = []
+        lost       = []
+        targetPlug = fnNode.findPlug('target', False)
+        attrNameAttr, spaceTargetAttr = fnNode.attribute('attrName'), fnNode.attribute('spaceTarget')
+        for logicalIndex in targetPlug.getExistingArrayAttributeIndices():
+            element  = targetPlug.elementByLogicalIndex(logicalIndex)
+            attrName = element.child(attrNameAttr).asString()
+            if not element.child(spaceTargetAttr).isDestination:
+                lost.append(('{}.target[{}]'.format(meta, logicalIndex), attrName))
+                continue
+            attrNames.append(attrName)
+        for node, attrName in lost:
+            issue('brokenLinks', 'spaceTarget', node, 'The space target of {} was deleted'.format(attrName or node), 
+                  'rebuild' if attrNames else 'teardown')
+        if not attrNames:
+            return issues
+            
+        # the enum and the selectors it drives
+        fnCtrl   = om2.MFnDependencyNode(ctrl)
+        ctrlPlug = fnCtrl.findPlug('spaceSwitch', False) if fnCtrl.hasAttribute('spaceSwitch') else None
+        if ctrlPlug is None:
+            issue('brokenLinks', 'spaceSwitch', MetaUtils.longName(ctrl), 'The source has no spaceSwitch attribute', 'rebuild')
+        else:
+            fields = self._enumFields(fnCtrl.attribute('spaceSwitch'))
+            if fields != attrNames:
+                issue('enumDrift', 'spaceSwitch', '{}.spaceSwitch'.format(MetaUtils.longName(ctrl)), 
+                      'Enum {} does not match the targets {}'.format(':'.join(fields), ':'.join(attrNames)), 'rename')
+        for cond in parts['conditionNodes']:
+            fnCond    = om2.MFnDependencyNode(cond)
+            firstTerm = driver(fnCond.findPlug('firstTerm', False))
+            if ctrlPlug is not None and firstTerm != ctrlPlug:
+                issue('brokenLinks', 'selector', fnCond.name(), 'Not driven by {}.spaceSwitch'.format(MetaUtils.longName(ctrl)), 'reconnect')
+            if not fnCond.findPlug('outColorR', False).isSource:
+                issue('orphans', 'condition', fnCond.name(), 'Drives nothing', 'delete')
+                
+        if self.mode == 'matrix':
+            byType = dict((typeName, []) for typeName in ('blendMatrix', 'multMatrix'))
+            for mobj in parts['matrixNodes']:
+                byType.setdefault(om2.MFnDependencyNode(mobj).typeName, []).append(mobj)
+            blends, mults = byType['blendMatrix'], byType['multMatrix']
+            if len(mults) < len(attrNames):
+                issue('brokenLinks', 'multMatrix', meta, '{} of {} multMatrix nodes are missing'.format(len(attrNames) - len(mults), len(attrNames)), 'rebuild')
+            if not blends:
+                issue('brokenLinks', 'blendMatrix', meta, 'The blendMatrix was deleted', 'rebuild')
+                return issues
+            fnBlend = om2.MFnDependencyNode(blends[0])
+            output  = driver(om2.MFnDependencyNode(offsetGroup).findPlug('offsetParentMatrix', False))
+            if output is None or output.node() != blends[0]:
+                issue('brokenLinks', 'blendMatrix', fnBlend.name(), 'Does not drive the offsetParentMatrix of the offsetGroup', 'rebuild')
+            blendTargets, weightAttr = fnBlend.findPlug('target', False), fnBlend.attribute('weight')
+            for index in blendTargets.getExistingArrayAttributeIndices():
+                weight = blendTargets.elementByLogicalIndex(index).child(weightAttr)
+                source = driver(weight)
+                if source is None or not source.node().hasFn(om2.MFn.kCondition):
+                    issue('brokenLinks', 'weight', weight.name(), 'The target weight is not driven by a selector', 'rebuild')
+            return issues
+            
+        # constraint modes, every locator is a target of every constraint and every weight is driven by a selector
+        locs = parts['spaceLocs']
+        if len(locs) < len(attrNames):
+            issue('brokenLinks', 'spaceLoc', meta, '{} of {} space locators are missing'.format(len(attrNames) - len(locs), len(attrNames)), 'rebuild')
+        if not constraints:
+            issue('brokenLinks', 'constraint', MetaUtils.longName(offsetGroup), 'No constraint is left', 'rebuild')
+        locIds = set(om2.MObjectHandle(loc).hashCode() for loc in locs)
+        for conType, con in constraints.items():
+            fnCon     = om2.MFnDependencyNode(con)
+            conTarget = fnCon.findPlug('target', False)
+            parentMatrixAttr, weightAttr = fnCon.attribute('targetParentMatrix'), fnCon.attribute('targetWeight')
+            targeted  = set()
+            for index in conTarget.getExistingArrayAttributeIndices():
+                element      = conTarget.elementByLogicalIndex(index)
+                parentMatrix = driver(element.child(parentMatrixAttr))
+                if parentMatrix is None:
+                    continue
+                own(parentMatrix.node())
+                targeted.add(om2.MObjectHandle(parentMatrix.node()).hashCode())
+                weight = element.child(weightAttr)
+                alias  = driver(weight)
+                source = None if alias is None else driver(alias)
+                if source is None or not source.node().hasFn(om2.MFn.kCondition):
+                    issue('brokenLinks', 'weight', (alias or weight).name(), 'The target weight is not driven by a selector', 'rebuild')
+                    continue
+                own(source.node())
+            if locIds - targeted:
+                issue('brokenLinks', 'constraint', fnCon.name(), '{} space locators are not targets of it'.format(len(locIds - targeted)), 'rebuild')
+        return issues
+        
+    @classmethod
+    @addUndo
+    def repairScene(cls, report):
+        '''
+        fix the issues of a checkScene report in bulk, one batch per action over all the meta nodes:
+        teardown : meta nodes without source, offsetGroup or targets are removed with everything they still own
+        delete   : the orphaned nodes go in the same modifier
+        reconnect: selectors are driven by the spaceSwitch attribute again, one modifier
+        rename   : spaceSwitch enum fields are set to the target names in place, keys follow their target
+        rebuild  : damaged switches are deleted and built again with one createMany, their spaceSwitch keys and 
+                   value are kept, a key on a lost target goes to the first space
+        return: {action: number of meta nodes or nodes fixed, 'failed': [(meta, message), ...]}
+        '''
+        issues  = report['brokenLinks'] + report['orphans'] + report['enumDrift']
+        actions = dict((action, OrderedDict()) for action in cls.REPAIRS)
+        for issue in issues:
+            if issue['repair'] in actions:
+                actions[issue['repair']].setdefault(issue['meta'] if issue['repair'] != 'delete' else issue['node'], issue)
+        teardown = [name for name in actions['teardown'] if MetaUtils.getMObject(name) is not None]
+        rebuild  = [name for name in actions['rebuild'] if name not in actions['teardown']]
+        result   = OrderedDict((action, 0) for action in cls.REPAIRS)
+        result['failed'] = []
+        
+        # rebuild specs are validated before anything is deleted, the ones that fail still get the other repairs
+        metas  = [cls.fromMObject(MetaUtils.getMObject(name)) for name in rebuild]
+        specs  = cls.readMany(metas)
+        errors = dict(cls.validateMany(specs, [data['source'] for data in specs]))
+        for index in sorted(errors, reverse=True):
+            result['failed'].insert(0, (rebuild[index], errors[index]))
+            del metas[index], specs[index], rebuild[index]
+        skip = set(teardown + rebuild)
+            
+        # teardown + delete, one modifier
+        doomed, restore = [], []
+        for name in teardown:
+            meta = cls.fromMObject(MetaUtils.getMObject(name))
+            ends = dict((attrName, [plug.node() for plug in meta.node.findPlug(attrName, False).connectedTo(True, False)]) 
+                        for attrName in ('source', 'offsetGroup'))
+            doomed.extend(mobj for attrName in ('conditionNodes', 'spaceLocs', 'matrixNodes') for mobj in meta._arraySources(attrName))
+            doomed.extend(meta._constraintNodes().values())
+            doomed.append(meta.mobject)
+            restore.append((meta.mode, ends, om2.MFnMatrixData(MetaUtils.getPlug(meta.mobject, 'offsetGroupLocalMatrix').asMObject()).matrix()))
+        deleted = set(om2.MFnDependencyNode(mobj).uuid().asString() for mobj in doomed)
+        for name in actions['delete']:
+            mobj = MetaUtils.getMObject(name)
+            if mobj is not None and actions['delete'][name]['meta'] not in skip and om2.MFnDependencyNode(mobj).uuid().asString() not in deleted:
+                doomed.append(mobj)
+                result['delete'] += 1
+        modifier = om2.MDagModifier()
+        MetaUtils.deleteNodes(modifier, doomed)
+        for mode, ends, local in restore:
+            for ctrl in ends['source']:
+                fnCtrl = om2.MFnDependencyNode(ctrl)
+                if fnCtrl.hasAttribute('spaceSwitch'):
+                    modifier.removeAttribute(ctrl, fnCtrl.attribute('spaceSwitch'))
+            for offsetGroup in ends['offsetGroup']:
+                if mode == 'matrix':
+                    modifier.newPlugValue(MetaUtils.getPlug(offsetGroup, 'offsetParentMatrix'), om2.MFnMatrixData().create(om2.MMatrix()))
+                queueCommand(modifier, 'xform', MetaUtils.longName(offsetGroup), m=list(local), ws=False)
+        commitModifier(modifier)
+        result['teardown'] = len(teardown)
+        
+        # reconnect + rename
+        modifier = om2.MDGModifier()
+        for name, issue in actions['reconnect'].items():
+            if name in skip:
+                continue
+            meta     = cls.fromMObject(MetaUtils.getMObject(name))
+            ctrlPlug = MetaUtils.getPlug(MetaUtils.getMObject(meta.source), 'spaceSwitch')
+            for cond in meta._arraySources('conditionNodes'):
+                firstTerm = MetaUtils.getPlug(cond, 'firstTerm')
+                if firstTerm.source() == ctrlPlug:
+                    continue
+                if firstTerm.isDestination:
+                    modifier.disconnect(firstTerm.source(), firstTerm)
+                modifier.connect(ctrlPlug, firstTerm)
+            result['reconnect'] += 1
+        commitModifier(modifier)
+        for name in actions['rename']:
+            if name in skip:
+                continue
+            meta = cls.fromMObject(MetaUtils.getMObject(name))
+            data = meta.readNodeData()
+            meta._updateSwitchAttr(data['source'], [widget['attrName'] for widget in targetOrder(data['targetWidgets'])], 
+                                   meta._survivingIndices())
+            result['rename'] += 1
+            
+        # rebuild, the spaceSwitch attribute stays with its keys, they first follow their target to its index among
+        # the targets that still exist, the build then finds the fields it expects
+        sources = [data['source'] for data in specs]
+        for meta, data in zip(metas, specs):
+            if om2.MFnDependencyNode(MetaUtils.getMObject(data['source'])).hasAttribute('spaceSwitch'):
+                meta._updateSwitchAttr(data['source'], [widget['attrName'] for widget in targetOrder(data['targetWidgets'])], 
+                                       meta._survivingIndices())
+            meta._teardown(keepAttr=True)
+        metas = cls.createMany(specs, replacing=sources) if specs else []
+        result['rebuild'] = len(metas)
+        return result
+        
+    def _survivingIndices(self):
+        '''
+        return: {spaceSwitch index: index among the targets that still exist}
+        '''
+        remap      = {}
+        targetPlug = self.node.findPlug('target', False)
+        spaceTargetAttr = self.node.attribute('spaceTarget')
+        for oldIndex, logicalIndex in enumerate(targetPlug.getExistingArrayAttributeIndices()):
+            if targetPlug.elementByLogicalIndex(logicalIndex).child(spaceTargetAttr).isDestination:
+                remap[oldIndex] = len(remap)
+        return remap
+        
+    # -----------------------------------------------------------------------------------------
+    # spec files
+    @classmethod
+    def toRecord(cls, data, mobjs):
+        '''
+        nodeData -> json friendly dict, targetWidgets becomes an ordered list and every node keeps its uuid
+        mobjs: {nodeName: MObject or None}
+        '''
+        def uuid(nodeName):
+            mobj = mobjs.get(nodeName)
+            return None if mobj is None else om2.MFnDependencyNode(mobj).uuid().asString()
+            
+        return OrderedDict([('source'         , data['source']),
+                            ('sourceUuid'     , uuid(data['source'])),
+                            ('offsetGroup'    , data['offsetGroup']),
+                            ('offsetGroupUuid', uuid(data['offsetGroup'])),
+                            ('mode'           , data.get('mode', cls.MODES[0])),
+                            ('conType'        , OrderedDict((key, data['conType'].get(key, False)) for key in cls.CONSTRAINTS)),
+                            ('targets'        , [OrderedDict([('attrName'   , widget['attrName']),
+                                                              ('spaceTarget', widget['spaceTarget']),
+                                                              ('uuid'       , uuid(widget['spaceTarget']))])
+                                                 for widget in targetOrder(data['targetWidgets'])])])
+    
+    @staticmethod
+    def recordRefs(record):
+        '''
+        return: [(nodeName, uuid), ...] of every node the record points at
+        '''
+        return [(record['source'], record.get('sourceUuid')), (record['offsetGroup'], record.get('offsetGroupUuid'))] + \
+               [(target['spaceTarget'], target.get('uuid')) for target in record['targets']]
+    
+    @classmethod
+    def fromRecord(cls, record, resolved):
+        '''
+        record -> nodeData, resolved: MetaUtils.resolveNodes result, unresolved nodes are None
+        '''
+        targets = [resolved[(target['spaceTarget'], target.get('uuid'))] for target in record['targets']]
+        return {'source'       : resolved[(record['source'], record.get('sourceUuid'))],
+                'offsetGroup'  : resolved[(record['offsetGroup'], record.get('offsetGroupUuid'))],
+                'conType'      : dict((key, bool(record['conType'].get(key))) for key in cls.CONSTRAINTS),
+                'targetWidgets': dict((index, {'attrName': target['attrName'], 'spaceTarget': spaceTarget})
+                                      for index, (target, spaceTarget) in enumerate(zip(record['targets'], targets))),
+                'mode'         : record.get('mode', cls.MODES[0])}
+    
+    @classmethod
+    def exportSpecs(cls, path, metas=None):
+        '''
+        write the nodeData of metas (default: every meta node in the scene) to path
+        .jsonl: a header line then one switch per line, anything else: a single json document
+        return: number of switches written
+        '''
+        metas = MetaUtils.getMetaNodes() if metas is None else metas
+        specs = cls.readMany(metas)
+        nodeNames = set()
+        for data in specs:
+            nodeNames.update(name for name in (data['source'], data['offsetGroup']) if name)
+            nodeNames.update(widget['spaceTarget'] for widget in data['targetWidgets'].values())
+        mobjs   = MetaUtils.getMObjects(nodeNames)
+        records = [cls.toRecord(data, mobjs) for data in specs]
+        header  = OrderedDict([('format', cls.SPEC_FORMAT), ('version', cls.SPEC_VERSION), ('count', len(records))])
+        
+        with open(path, 'w') as f:
+            if path.lower().endswith('.jsonl'):
+                f.write(json.dumps(header) + '\n')
+                for record in records:
+                    f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            else:
+                header['switches'] = records
+                json.dump(header, f, indent=4)
+        return len(records)
+    
+    @classmethod
+    def readSpecFile(cls, path):
+        '''
+        yield the records of a file written by exportSpecs, .jsonl files are streamed line by line
+        '''
+        def checkHeader(header):
+            if header.get('format') != cls.SPEC_FORMAT:
+                raise ValueError('Not a space switch spec file: {}'.format(path))
+            if header.get('version', 0) > cls.SPEC_VERSION:
+                raise ValueError('Spec file version {} is newer than this tool ({})'.format(header['version'], cls.SPEC_VERSION))
+                
+        with open(path, 'r') as f:
+            if not path.lower().endswith('.jsonl'):
+                header = json.load(f)
+                checkHeader(header)
+                for record in header.get('switches', []):
+                    yield record
+                return
+            checkHeader(json.loads(f.readline() or '{}'))
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    @classmethod
+    @addUndo
+    def importSpecs(cls, path, replace=False, verbose=False):
+        '''
+        rebuild the switches of a spec file in one createMany, every node is resolved by uuid first and then by name
+        replace: delete the switches that already exist on the imported sources, otherwise they fail validation,
+                 their spaceSwitch attribute is kept and its keys follow the attrNames of the imported targets
+        return: [SpaceSwitchMeta, ...]
+        '''
+        records  = list(cls.readSpecFile(path))
+        resolved = MetaUtils.resolveNodes(ref for record in records for ref in cls.recordRefs(record))
+        missing  = sorted(set(ref[0] for ref, nodeName in resolved.items() if nodeName is None))
+        if missing:
+            raise ValueError('Object does not exist: {}'.format(', '.join(missing)))
+        specs = [cls.fromRecord(record, resolved) for record in records]
+        
+        sources = [data['source'] for data in specs] if replace else ()
+        for meta in [MetaUtils.metaOfSource(source) for source in sources]:
+            if meta is not None:
+                meta._teardown(keepAttr=True)
+        return cls.createMany(specs, verbose, sources)
+        
+    # -----------------------------------------------------------------------------------------
+    # mirror
+    '''
+    re.sub (pattern, replacement) pairs, the first one that matches a name wins so a side is only swapped once
+    '''
+    MIRROR_RULES = ((r'^L_', 'R_'), (r'^R_', 'L_'),
+                    (r'_l(?=_|$)', '_r'), (r'_r(?=_|$)', '_l'),
+                    (r'_L(?=_|$)', '_R'), (r'_R(?=_|$)', '_L'))
+    
+    @classmethod
+    def mirrorName(cls, nodeName, rules=None):
+        '''
+        every component of a dag path is mirrored on its own, namespaces are kept
+        rules: default MIRROR_RULES
+        return: the name of the other side, nodeName itself when it has no side (world, COG)
+        '''
+        rules = cls.MIRROR_RULES if rules is None else rules
+        def mirror(part):
+            namespace, colon, leaf = part.rpartition(':')
+            for pattern, replacement in rules:
+                mirrored, count = re.subn(pattern, replacement, leaf, count=1)
+                if count:
+                    return namespace + colon + mirrored
+            return part
+        return '|'.join(mirror(part) for part in nodeName.split('|'))
+        
+    @classmethod
+    @addUndo
+    def mirrorMany(cls, metas=None, rules=None, replace=False, verbose=False):
+        '''
+        build the switches of the other side of the rig in one createMany, source, offsetGroup, spaceTargets and 
+        attrNames go through mirrorName and all the mirrored names are looked up with a single cmds.ls,
+        a target without a side (world, COG) is kept as it is
+        a switch is skipped when its source or offsetGroup has no side, when its other side is mirrored in the same batch,
+        when a mirrored name does not exist or the mirrored spec does not validate
+        metas  : default all the meta nodes in the scene
+        replace: delete the switches that already exist on the mirrored sources, otherwise they are skipped,
+                 their spaceSwitch keys are kept (see createAttr)
+        return : {'metas'     : [SpaceSwitchMeta, ...], 
+                  'skipped'   : [(meta, message), ...], 
+                  'unresolved': [(meta, mirrored name), ...]}
+        '''
+        metas  = MetaUtils.getMetaNodes() if metas is None else metas
+        result = OrderedDict([('metas', []), ('skipped', []), ('unresolved', [])])
+        mirrored = []
+        for meta, data in zip(metas, cls.readMany(metas)):
+            spec = SpaceSwitchSpec.fromNodeData(data)
+            if None in (spec.source, spec.offsetGroup):
+                result['skipped'].append((meta, 'Invalid parameter'))
+                continue
+            unsided = [name for name in (spec.source, spec.offsetGroup) if cls.mirrorName(name, rules) == name]
+            if unsided:
+                result['skipped'].append((meta, 'No side in {}'.format(', '.join(unsided))))
+                continue
+            mirrored.append((meta, spec, SpaceSwitchSpec(cls.mirrorName(spec.source, rules), cls.mirrorName(spec.offsetGroup, rules), 
+                                                         spec.conType, [SpaceTarget(cls.mirrorName(target.attrName, rules), 
+                                                                                    cls.mirrorName(target.spaceTarget, rules)) 
+                                                                        for target in spec.targets], spec.mode)))
+        matches = MetaUtils.matchNodes(name for _, _, spec in mirrored for name in spec.nodeNames())
+        
+        batch = set(spec.source for _, spec, _ in mirrored)
+        specs, built = [], []
+        for meta, spec, mirror in mirrored:
+            missing = [name for name in mirror.nodeNames() if not matches[name]]
+            if missing:
+                result['unresolved'].extend((meta, name) for name in missing)
+                result['skipped'].append((meta, 'Object does not exist: {}'.format(', '.join(missing))))
+                continue
+            ambiguous = [name for name in mirror.nodeNames() if len(matches[name]) > 1]
+            if ambiguous:
+                result['skipped'].append((meta, 'More than one object matches name: {}'.format(', '.join(ambiguous))))
+                continue
+            mirror.source, mirror.offsetGroup = matches[mirror.source][0], matches[mirror.offsetGroup][0]
+            for target in mirror.targets:
+                target.spaceTarget = matches[target.spaceTarget][0]
+            if mirror.source in batch:
+                result['skipped'].append((meta, 'The other side is mirrored too: {}'.format(mirror.source)))
+                continue
+            specs.append(mirror)
+            built.append(meta)
+            
+        replacing = [spec.source for spec in specs] if replace else ()
+        errors    = dict(validateSpecs(specs, replacing))
+        for index in sorted(errors, reverse=True):
+            result['skipped'].append((built[index], errors[index]))
+            del specs[index], built[index]
+        if replace:
+            for meta in [MetaUtils.metaOfSource(spec.source) for spec in specs]:
+                if meta is not None:
+                    meta._teardown(keepAttr=True)
+        result['metas'] = cls.createMany(specs, replacing=replacing) if specs else []
+        
+        if verbose:
+            om2.MGlobal.displayInfo('SpaceSwitchMeta.mirrorMany: {} mirrored, {} skipped, {} unresolved names'.format(
+                                    len(result['metas']), len(result['skipped']), len(result['unresolved'])))
+        return result
+        
+    # -----------------------------------------------------------------------------------------
+    # match and switch
+    def switchSpace(self, space, frames=None, holdPrevious=True):
+        '''
+        see switchSpaceMany
+        '''
+        return self.switchSpaceMany([self], space, frames, holdPrevious)
+    
+    @classmethod
+    @addUndo
+    def switchSpaceMany(cls, metas, space, frames=None, holdPrevious=True, verbose=False):
+        '''
+        switch every meta to space over frames and key the source so it keeps its world pose
+        space : target index or attrName, frames: [frame, ...], the current frame by default
+        the matrices of every meta are sampled in one pass over the frames (an MDGContext per frame,
+        the current time does not move), solved for all the frames at once (numpy when it is available)
+        and keyed with one MFnAnimCurve.addKeys per channel, holdPrevious also keys the frame before 
+        the range with the current space and pose, the timings are kept in SpaceSwitchMeta.lastSwitchTimings
+        shear (a non-uniformly scaled space under rotation) cannot be keyed and is dropped
+        return: number of keys
+        '''
+        frames = sorted(set(float(frame) for frame in frames)) if frames else [cmds.currentTime(q=True)]
+        held   = frames[0] - 1.0 if holdPrevious else None
+        timer  = PhaseTimer()
+        with timer('resolve'):
+            jobs = [cls._switchJob(meta, space) for meta in metas]
+            
+        with timer('sample'):
+            samples = MetaUtils.sampleMatrices([plug for job in jobs for plug in job['plugs']], frames)
+            if held is not None:
+                with MetaUtils.evaluationContext(held):
+                    for job in jobs:
+                        job['held'] = [plug.asDouble() for plug in job['channels']] + [job['switch'].asInt()]
+                        
+        with timer('solve'):
+            solve = cls._solveNumpy if numpy is not None else cls._solveMatrices
+            for index, job in enumerate(jobs):
+                matrices = samples[index * 5:index * 5 + 5]
+                previous = job['held'][3:6] if held is not None else None
+                rows     = cls._channelValues(solve(matrices, job['offset'], job['flags']), job['rotateOrder'], previous)
+                switch   = [float(job['index'])] * len(frames)
+                if held is not None:
+                    rows, switch = [job['held'][:9]] + rows, [float(job['held'][9])] + switch
+                job['curves'] = [(plug, cls._curveType(name), list(values), oma2.MFnAnimCurve.kTangentClamped) 
+                                 for name, plug, values, keyable in zip(cls.KEY_CHANNELS, job['channels'], zip(*rows), job['keyable']) 
+                                 if keyable]
+                job['curves'].append((job['switch'], oma2.MFnAnimCurve.kAnimCurveTU, switch, oma2.MFnAnimCurve.kTangentStep))
+                
+        with timer('keys'):
+            unit   = om2.MTime.uiUnit()
+            times  = [om2.MTime(frame, unit) for frame in ([held] if held is not None else []) + frames]
+            curves = [curve for job in jobs for curve in job['curves']]
+            keys   = AnimCurveModifier()
+            for fnCurve, (plug, curveType, values, tangent) in zip(keys.curves([curve[:2] for curve in curves]), curves):
+                keys.addKeys(fnCurve, times, values, tangent)
+            commitModifier(keys)
+            
+        cls.lastSwitchTimings = timer.timings
+        if verbose:
+            om2.MGlobal.displayInfo('SpaceSwitchMeta.switchSpaceMany: {} switches x {} frames\n{}'.format(
+                                    len(jobs), len(frames), timer.report()))
+        return len(curves) * len(times)
+    
+    @staticmethod
+    def _curveType(channel):
+        return oma2.MFnAnimCurve.kAnimCurveTL if channel.startswith('translate') else \
+               oma2.MFnAnimCurve.kAnimCurveTA if channel.startswith('rotate') else oma2.MFnAnimCurve.kAnimCurveTU
+    
+    @classmethod
+    def _switchJob(cls, meta, space):
+        '''
+        the plugs and settings switchSpaceMany needs for one meta
+        '''
+        data      = meta.readNodeData()
+        attrNames = [widget['attrName'] for widget in targetOrder(data['targetWidgets'])]
+        index     = space if isinstance(space, int) else attrNames.index(space) if space in attrNames else -1
+        if not 0 <= index < len(attrNames):
+            raise ValueError('{}: no space {!r}, the spaces are {}'.format(meta, space, attrNames))
+            
+        conType = data['conType']
+        ctrl    = MetaUtils.getMObject(data['source'])
+        og      = MetaUtils.getMObject(data['offsetGroup'])
+        offset  = None
+        if meta.mode == 'matrix':
+            spaceNode = MetaUtils.getMObject(targetOrder(data['targetWidgets'])[index]['spaceTarget'])
+            offset    = om2.MFnMatrixData(MetaUtils.getPlug(meta.mobject, 'spaceOffsets[{}]'.format(index)).asMObject()).matrix()
+        else:
+            spaceNode = MetaUtils.getMObject(meta.spaceLocs[index])
+            
+        channels = [MetaUtils.getPlug(ctrl, name) for name in cls.KEY_CHANNELS]
+        switch   = MetaUtils.getPlug(ctrl, 'spaceSwitch')
+        if not MetaUtils.isKeyable(switch):
+            raise ValueError('{}.spaceSwitch is locked or driven'.format(data['source']))
+        keyable = [MetaUtils.isKeyable(plug) for plug in channels]
+        if not all(keyable):
+            om2.MGlobal.displayWarning('{}: locked or driven channels are not keyed: {}'.format(meta, 
+                                       ', '.join(name for name, each in zip(cls.KEY_CHANNELS, keyable) if not each)))
+        return {'index'      : index,
+                'flags'      : (bool(conType.get('point') or conType.get('parent')), 
+                                bool(conType.get('orient') or conType.get('parent')), 
+                                bool(conType.get('scale'))),
+                'offset'     : offset,
+                'plugs'      : [MetaUtils.getPlug(ctrl, 'worldMatrix[0]'), MetaUtils.getPlug(ctrl, 'parentMatrix[0]'),
+                                MetaUtils.getPlug(og, 'worldMatrix[0]'), MetaUtils.getPlug(og, 'parentMatrix[0]'),
+                                MetaUtils.getPlug(spaceNode, 'worldMatrix[0]')],
+                'channels'   : channels,
+                'keyable'    : keyable,
+                'switch'     : switch,
+                'rotateOrder': MetaUtils.getPlug(ctrl, 'rotateOrder').asInt()}
+    
+    @staticmethod
+    def _solveMatrices(matrices, offset, flags):
+        '''
+        matrices: [[ctrl world], [ctrl parent], [offsetGroup world], [offsetGroup parent], [space world]] per frame
+        the offsetGroup local in the new space takes the switched channels (flags: translate, rotate, scale) 
+        from the space and the others from its current local, the ctrl parent follows the offsetGroup
+        return: [ctrl local MMatrix, ...]
+        '''
+        results = []
+        for ctrlWorld, ctrlParent, ogWorld, ogParent, spaceWorld in zip(*matrices):
+            ogParentInverse = ogParent.inverse()
+            spaceLocal = (offset * spaceWorld if offset is not None else spaceWorld) * ogParentInverse
+            if not all(flags):
+                spaceLocal = MetaUtils.mixMatrix(spaceLocal, ogWorld * ogParentInverse, flags)
+            newParent = ctrlParent * ogWorld.inverse() * spaceLocal * ogParent
+            results.append(ctrlWorld * newParent.inverse())
+        return results
+    
+    @staticmethod
+    def _solveNumpy(matrices, offset, flags):
+        '''
+        _solveMatrices on (frames, 4, 4) arrays
+        '''
+        ctrlWorld, ctrlParent, ogWorld, ogParent, spaceWorld = [
+            numpy.array([list(matrix) for matrix in each], dtype=float).reshape(-1, 4, 4) for each in matrices]
+        inverse = numpy.linalg.inv
+        if offset is not None:
+            spaceWorld = numpy.matmul(numpy.array(list(offset), dtype=float).reshape(4, 4), spaceWorld)
+        ogParentInverse = inverse(ogParent)
+        spaceLocal = numpy.matmul(spaceWorld, ogParentInverse)
+        if not all(flags):
+            translate, rotate, scale = flags
+            ogLocal = numpy.matmul(ogWorld, ogParentInverse)
+            spaceScale, ogScale = [numpy.linalg.norm(each[:, :3, :3], axis=2) for each in (spaceLocal, ogLocal)]
+            mixed = numpy.zeros_like(spaceLocal)
+            mixed[:, :3, :3] = (spaceLocal if rotate else ogLocal)[:, :3, :3] / (spaceScale if rotate else ogScale)[..., None] * \
+                               (spaceScale if scale else ogScale)[..., None]
+            mixed[:, 3, :3]  = (spaceLocal if translate else ogLocal)[:, 3, :3]
+            mixed[:, 3, 3]   = 1.0
+            spaceLocal = mixed
+        newParent = numpy.matmul(numpy.matmul(numpy.matmul(ctrlParent, inverse(ogWorld)), spaceLocal), ogParent)
+        return [om2.MMatrix(row) for row in numpy.matmul(ctrlWorld, inverse(newParent)).reshape(-1, 16).tolist()]
+    
+    @staticmethod
+    def _channelValues(matrices, rotateOrder, previous=None):
+        '''
+        local matrices -> [[tx, ty, tz, rx, ry, rz, sx, sy, sz], ...] in internal units, 
+        each rotation is the euler solution closest to the previous frame
+        '''
+        rows = []
+        previous = om2.MEulerRotation(previous[0], previous[1], previous[2], rotateOrder) if previous else None
+        for matrix in matrices:
+            matrix   = om2.MTransformationMatrix(matrix)
+            rotation = matrix.rotation().reorder(rotateOrder)
+            if previous is not None:
+                rotation = rotation.closestSolution(previous)
+            translation, scale = matrix.translation(om2.MSpace.kTransform), matrix.scale(om2.MSpace.kTransform)
+            rows.append([translation.x, translation.y, translation.z, rotation.x, rotation.y, rotation.z] + list(scale))
+            previous = rotation
+        return rows
+
+'''
+data =  {'source': 'joint1', 
+         'offsetGroup': 'joint1_str', 
+         'conType': {'point': False, 'orient': False, 'scale': True, 'parent': True}, 
+         'targetWidgets': {0: {'attrName': 'ikk', 'spaceTarget': 'ik'}, 
+                           1: {'attrName': 'fkk', 'spaceTarget': 'fk'}},
+         'mode': 'condition'} # optional, see SpaceSwitchMeta.MODES
+
+node = SpaceSwitchMeta('woshikangddan')
+node.nodeData = data
+node.nodeData
+node = node.edit(data) # in place, the spaceSwitch keys are kept
+del node.nodeData
+nodes = MetaUtils.getMetaNodes()
+
+metas = SpaceSwitchMeta.createMany([data, ...], verbose=True)
+SpaceSwitchMeta.lastBuildTimings
+
+# many scenes from a shell, a pool of mayapy workers (spaceSwitchBatch)
+mayapy -m spaceSwitchTool apply spec.json scenes/*.ma --workers 4
+'''
+
+class SpaceSwitchUI(object):
+    '''
+    the dialog lives in spaceSwitchToolUI, PySide2 is only imported when it is opened
+    so the meta layer above also runs in mayapy batch jobs
+    '''
+    @classmethod
+    def displayUI(cls):
+        return loadUI().SpaceSwitchUI.displayUI()
+
+def loadUI():
+    import spaceSwitchToolUI
+    return spaceSwitchToolUI
+    
+
+if __name__ == '__main__':
+    if sys.argv[1:]: # mayapy -m spaceSwitchTool apply spec.json scenes/*.ma, see spaceSwitchBatch
+        import spaceSwitchBatch
+        sys.exit(spaceSwitchBatch.main(sys.argv[1:]))
+    SpaceSwitchUI.displayUI()
+
+'''
+code by kangddan
+https://github.com/kangddan
+https://space.bilibili.com/174575687
+https://animator.at8.fun/
+'''
@@ -0,0 +1,767 @@
+import maya.cmds         as cmds
+import maya.api.OpenMaya as om2
+import PySide2.QtWidgets as QtWidgets
+import PySide2.QtCore    as QtCore
+import PySide2.QtGui     as QtGui
+from functools   import partial
+from collections import OrderedDict
+
+from spaceSwitchTool import (addUndo, profiled, getSelection, getNodeLongName, 
+                             MetaUtils, SpaceSwitchMeta, validateSpecs, targetOrder)
+
+'''
+the space switch dialog, imported by spaceSwitchTool.SpaceSwitchUI.displayUI:
+
+from spaceSwitchTool import SpaceSwitchUI
+SpaceSwitchUI.displayUI()
+'''
+
+def mayaMainWindow():
+    import sys
+    from maya.OpenMayaUI import MQtUtil
+    from shiboken2       import wrapInstance
+    if sys.version_info.major >= 3:
+        return wrapInstance(int(MQtUtil.mainWindow()), QtWidgets.QMainWindow)
+    else:
+        return wrapInstance(long(MQtUtil.mainWindow()), QtWidgets.QMainWindow)
+        
+class LineShape(QtWidgets.QFrame):
+    def __init__(self):
+        super(LineShape, self).__init__()
+        self.setFrameShape(QtWidgets.QFrame.HLine)
+        self.setStyleSheet("border-top: 2px solid #505050;")
+        
+class MetaNodeModel(QtCore.QAbstractListModel):
+    '''
+    the scene meta nodes, row 0 is <New>
+    rows are keyed by uuid so a refresh only inserts, removes or renames what changed,
+    nodeData is never read here, the dialog reads the summary of the selected row only
+    '''
+    MetaRole = QtCore.Qt.UserRole
+    UuidRole = QtCore.Qt.UserRole + 1
+    NEW      = '<New>'
+
+    def __init__(self, parent=None):
+        super(MetaNodeModel, self).__init__(parent)
+        self._metas = [] # [SpaceSwitchMeta, ...], row - 1
+        self._uuids = []
+        self._paths = []
+        self._rows  = None # uuid: row, built on the first rowOf after the rows changed
+
+    @staticmethod
+    def metaUuid(metaNode):
+        try:
+            return metaNode.node.uuid().asString()
+        except RuntimeError:
+            return
+
+    @staticmethod
+    def metaPath(metaNode):
+        try:
+            return metaNode.path
+        except RuntimeError:
+            return ''
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._metas) + 1
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return
+        row = index.row() - 1
+        if row < 0:
+            return self.NEW if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole) else None
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return self._paths[row]
+        if role == self.MetaRole:
+            return self._metas[row]
+        if role == self.UuidRole:
+            return self._uuids[row]
+        if role == QtCore.Qt.ToolTipRole: # only asked for the hovered row
+            try:
+                return 'source: {}'.format(self._metas[row].source)
+            except (RuntimeError, ValueError, IndexError):
+                return
+
+    def meta(self, row):
+        return self._metas[row - 1] if 0 < row <= len(self._metas) else None
+
+    def rowOf(self, metaNode):
+        uuid = metaNode if not isinstance(metaNode, SpaceSwitchMeta) else self.metaUuid(metaNode)
+        if self._rows is None:
+            self._rows = dict((uuid, row + 1) for row, uuid in enumerate(self._uuids))
+        return self._rows.get(uuid, -1)
+
+    def sync(self, metaNodes):
+        '''
+        diff the rows against metaNodes, existing rows keep their position
+        '''
+        metaNodes = OrderedDict((self.metaUuid(metaNode), metaNode) for metaNode in metaNodes)
+        for row in reversed(range(len(self._metas))):
+            metaNode = metaNodes.pop(self._uuids[row], None)
+            if metaNode is None:
+                self.beginRemoveRows(QtCore.QModelIndex(), row + 1, row + 1)
+                del self._metas[row], self._uuids[row], self._paths[row]
+                self._rows = None
+                self.endRemoveRows()
+                continue
+            self._metas[row] = metaNode
+            path = self.metaPath(metaNode)
+            if path != self._paths[row]:
+                self._paths[row] = path
+                index = self.index(row + 1)
+                self.dataChanged.emit(index, index)
+        if metaNodes:
+            self._insert(list(metaNodes.items()))
+
+    def add(self, metaNode):
+        self._insert([(self.metaUuid(metaNode), metaNode)])
+        return len(self._metas)
+
+    def replace(self, row, metaNode):
+        '''
+        swap the meta of a row, edit() may return a rebuilt meta node
+        '''
+        self._metas[row - 1] = metaNode
+        self._uuids[row - 1] = self.metaUuid(metaNode)
+        self._paths[row - 1] = self.metaPath(metaNode)
+        self._rows = None
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def remove(self, row):
+        if not 0 < row <= len(self._metas):
+            return
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._metas[row - 1], self._uuids[row - 1], self._paths[row - 1]
+        self._rows = None
+        self.endRemoveRows()
+
+    def _insert(self, items):
+        first = len(self._metas) + 1
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(items) - 1)
+        for uuid, metaNode in items:
+            self._metas.append(metaNode)
+            self._uuids.append(uuid)
+            self._paths.append(self.metaPath(metaNode))
+        self._rows = None
+        self.endInsertRows()
+
+
+class MetaFilterModel(QtCore.QSortFilterProxyModel):
+    '''
+    case insensitive search on the meta node names, <New> is never filtered out
+    '''
+    def __init__(self, parent=None):
+        super(MetaFilterModel, self).__init__(parent)
+        self.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+
+    def filterAcceptsRow(self, sourceRow, sourceParent):
+        return sourceRow == 0 or super(MetaFilterModel, self).filterAcceptsRow(sourceRow, sourceParent)
+
+
+class TargetModel(QtCore.QAbstractTableModel):
+    '''
+    the targets being edited, one [attrName, spaceTarget long name] per row
+    '''
+    HEADERS  = ('Attr Name', 'Space Target')
+    ATTRNAME = QtCore.QRegExp('^[a-zA-Z_][a-zA-Z0-9_]*$')
+    PICK_TIP = 'Double click to pick the selected object'
+
+    def __init__(self, parent=None):
+        super(TargetModel, self).__init__(parent)
+        self._rows = []
+        self._icon = None
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.ToolTipRole and section == 1:
+            return self.PICK_TIP
+
+    def flags(self, index):
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if index.column() == 0:
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return
+        attrName, spaceTarget = self._rows[index.row()]
+        if index.column() == 0:
+            if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+                return attrName
+            return
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return spaceTarget.split('|')[-1] if spaceTarget else ''
+        if role == QtCore.Qt.ToolTipRole:
+            return spaceTarget or self.PICK_TIP
+        if role == QtCore.Qt.DecorationRole:
+            if self._icon is None: # one icon shared by every row
+                self._icon = QtGui.QIcon(':moveUVLeft.png')
+            return self._icon
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.EditRole or not index.isValid():
+            return False
+        if index.column() == 0 and value and not self.ATTRNAME.exactMatch(value):
+            return False
+        self._rows[index.row()][index.column()] = value
+        self.dataChanged.emit(index, index)
+        return True
+
+    def targets(self):
+        return dict((index, {'attrName': attrName, 'spaceTarget': spaceTarget})
+                    for index, (attrName, spaceTarget) in enumerate(self._rows))
+
+    def setTargets(self, targetWidgets):
+        '''
+        one model reset instead of a widget per target
+        '''
+        self.beginResetModel()
+        self._rows = [[widget.get('attrName') or '', widget.get('spaceTarget')] for widget in targetOrder(targetWidgets)]
+        self.endResetModel()
+
+    def appendTarget(self, attrName='', spaceTarget=None):
+        row = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._rows.append([attrName, spaceTarget])
+        self.endInsertRows()
+        return row
+
+    def removeTarget(self, row=-1):
+        if not self._rows:
+            return
+        row = row if 0 <= row < len(self._rows) else len(self._rows) - 1
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+
+
+class TargetDelegate(QtWidgets.QStyledItemDelegate):
+    '''
+    attrName is edited in a validated line edit that the view creates only while editing,
+    double clicking a space target picks the selected dag node
+    '''
+    def createEditor(self, parent, option, index):
+        if index.column() != 0:
+            return
+        editor = QtWidgets.QLineEdit(parent)
+        editor.setValidator(QtGui.QRegExpValidator(TargetModel.ATTRNAME, editor))
+        return editor
+
+    def editorEvent(self, event, model, option, index):
+        if index.column() == 1 and event.type() == QtCore.QEvent.MouseButtonDblClick:
+            self.pickTarget(model, index)
+            return True
+        return super(TargetDelegate, self).editorEvent(event, model, option, index)
+
+    @staticmethod
+    def pickTarget(model, index):
+        sel = getSelection()
+        if not sel:
+            return om2.MGlobal.displayWarning('Please select an object')
+        if isinstance(sel[0], om2.MFnDependencyNode):
+            return om2.MGlobal.displayWarning('Please select an dagNode')
+        model.setData(index, getNodeLongName(sel[0])[1])
+        
+
+@profiled('getMeta', 'undoUpdate', 'refreshUI', 'updateData', 'metaExists', 'addSourceNode', 'createSpaceSwitch', 'deleteSpaceSwitch')
+class SpaceSwitchUI(QtWidgets.QDialog):
+    INSTANCE = None
+    REFRESH_DELAY = 150 # ms, bursts of undo/redo/scene events closer than this are refreshed once
+    
+    def showEvent(self, event):
+        if self.geometry:
+            self.restoreGeometry(self.geometry)
+        #self.getMeta()
+        if self.openUI:
+            self.createScriptJobs()
+            self.openUI = False
+        if self.refreshPending:
+            self.scheduleRefresh()
+        super(SpaceSwitchUI, self).showEvent(event)
+        
+    def closeEvent(self, event):
+        super(SpaceSwitchUI, self).closeEvent(event)
+        self.geometry = self.saveGeometry()
+        self.deleteScriptJobs()
+        self.refreshTimer.stop()
+        self.openUI = True
+        
+    # --------------------------------------------------------    
+    def createScriptJobs(self):
+        #print('create')
+        self.scriptJobs.append(cmds.scriptJob(event=['NewSceneOpened', partial(self.scheduleRefresh)], pro=True)) # new scene
+        self.scriptJobs.append(cmds.scriptJob(event=['PostSceneRead', partial(self.scheduleRefresh)], pro=True))  # open scene
+        self.scriptJobs.append(cmds.scriptJob(event=['Undo', partial(self.undoUpdate)], pro=True))  # undo
+        self.scriptJobs.append(cmds.scriptJob(event=['Redo', partial(self.undoUpdate)], pro=True))  # redo
+        
+    def deleteScriptJobs(self):
+        #print('delete')
+        for jobNumber in self.scriptJobs:
+            cmds.evalDeferred('if cmds.scriptJob(exists={0}):\tcmds.scriptJob(kill={0}, force=True)'.format(jobNumber))   
+        self.scriptJobs = [] 
+    # --------------------------------------------------------  
+    def undoUpdate(self):
+        self.scheduleRefresh()
+        
+    def scheduleRefresh(self):
+        '''
+        restart the debounce timer, nothing is refreshed while the dialog is hidden
+        '''
+        if self.isHidden():
+            self.refreshPending = True
+            return
+        self.refreshPending = False
+        self.refreshTimer.start()
+        
+    def refreshUI(self):
+        '''
+        diff the meta node model against the scene and re-read only the current meta node
+        '''
+        if self.isHidden():
+            self.refreshPending = True
+            return
+        current = self.currentMeta()
+        self.metaModel.sync(MetaUtils.getMetaNodes())
+            
+        metaNode = self.currentMeta()
+        if metaNode is not None:
+            self.setWidgetData(SpaceSwitchMeta.readSummaries([metaNode])[0])
+        elif current is not None:
+            self.resetData()
+
+    def getMeta(self):
+        self.metaModel.sync(MetaUtils.getMetaNodes())
+        self.updateData()
+        
+    def currentRow(self):
+        '''
+        meta model row of the combo selection, 0 is <New>
+        '''
+        index = self.metaProxy.index(self.targetsBox.currentIndex(), 0)
+        return self.metaProxy.mapToSource(index).row() if index.isValid() else 0
+        
+    def currentMeta(self):
+        return self.metaModel.meta(self.currentRow())
+        
+    def setCurrentRow(self, row):
+        index = self.metaProxy.mapFromSource(self.metaModel.index(row))
+        if not index.isValid(): # hidden by the search
+            self.filterLineEdit.blockSignals(True)
+            self.filterLineEdit.clear()
+            self.filterLineEdit.blockSignals(False)
+            self.metaProxy.setFilterFixedString('')
+            index = self.metaProxy.mapFromSource(self.metaModel.index(row))
+        self.targetsBox.setCurrentIndex(index.row())
+        
+    def filterMetaNodes(self, text):
+        current = self.currentMeta()
+        self.metaProxy.setFilterFixedString(text)
+        if self.currentMeta() is not current:
+            self.updateData()
+        
+    def resetData(self):
+        self.targetModel.setTargets({})
+        self.sourceLineEdit.setText('')
+        self.offsetGroupLineEdit.setText('')
+        self.positionCheckBox.setChecked(False)
+        self.rotationCheckBox.setChecked(False)
+        self.scaleCheckBox.setChecked(False)
+        self.parentCheckBox.setChecked(False)
+        
+        self.positionCheckBox.setEnabled(True)
+        self.rotationCheckBox.setEnabled(True)
+        self.modeBox.setCurrentIndex(0)
+        self.sourceLong = None
+        self.offsetGroupLong = None
+        
+    def updateData(self):
+        itemData = self.currentMeta()
+        if itemData is not None:
+            data = SpaceSwitchMeta.readSummaries([itemData])[0] # one plug read, see SpaceSwitchMeta.summary
+            self.setWidgetData(data)
+            cmds.select(data['source'], ne=True)
+        else:   
+            self.resetData()
+            #cmds.select(cl=True)
+    
+    def parentTo(self):
+        isParent = self.parentCheckBox.isChecked()
+        if isParent:
+            # get conscheckbox state
+            self.pBoxState = self.positionCheckBox.isChecked()
+            self.rBoxState = self.rotationCheckBox.isChecked()
+            
+            self.positionCheckBox.setChecked(False)
+            self.positionCheckBox.setEnabled(False)
+            self.rotationCheckBox.setChecked(False)
+            self.rotationCheckBox.setEnabled(False)
+            
+        else:
+            #try:
+            self.positionCheckBox.setChecked(self.pBoxState)
+            self.positionCheckBox.setEnabled(True)
+            self.rotationCheckBox.setChecked(self.rBoxState)
+            self.rotationCheckBox.setEnabled(True)
+            #except:
+                #pass
+    
+    # --------------------------------------------------------
+        
+    @classmethod
+    def displayUI(cls):
+        if cls.INSTANCE is None:
+            cls.INSTANCE = SpaceSwitchUI()
+  
+        if cls.INSTANCE.isHidden():
+            cls.INSTANCE.show()
+            
+        else:
+            if cls.INSTANCE.isMinimized():
+                cls.INSTANCE.showNormal()
+            cls.INSTANCE.raise_()
+            cls.INSTANCE.activateWindow()
+            
+    def __init__(self, parent=None):
+        super(SpaceSwitchUI, self).__init__(parent or mayaMainWindow())
+        self.setWindowTitle('Space Switch Tool')
+        self.geometry = None
+        self.setWindowFlags(QtCore.Qt.WindowType.Window)
+        self.resize(380, 450)
+        self.setFocusPolicy(QtCore.Qt.StrongFocus); self.setFocus()
+        # ---------------------------------------
+        self.createWidgets()
+        self.createLayouts()
+        self.createConnections()
+        self.sourceLong = None
+        self.offsetGroupLong = None
+        self.getMeta()
+        
+        self.openUI = True
+        self.scriptJobs = []
+        self.refreshPending = False
+        self.refreshTimer = QtCore.QTimer(self)
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.setInterval(self.REFRESH_DELAY)
+        self.refreshTimer.timeout.connect(self.refreshUI)
+        
+    def createLayouts(self):
+        mainLayout = QtWidgets.QVBoxLayout(self)
+        mainLayout.setMargin(8)
+        mainLayout.setSpacing(5)
+        
+        targetsLayout = QtWidgets.QHBoxLayout()
+        targetsLayout.setSpacing(5)
+        targetsLayout.addWidget(QtWidgets.QLabel('Meta  Nodes'))
+        targetsLayout.addWidget(self.targetsBox)
+        targetsLayout.addWidget(self.filterLineEdit)
+        targetsLayout.addWidget(self.updateBut)
+        targetsLayout.setStretchFactor(self.targetsBox, 1)
+        
+        gridLayout = QtWidgets.QGridLayout()
+        gridLayout.setSpacing(5)
+        gridLayout.addWidget(QtWidgets.QLabel('Source'), 0, 0)
+        gridLayout.addWidget( self.sourceLineEdit, 0, 1)
+        gridLayout.addWidget( self.sourceBut, 0, 2)
+        gridLayout.addWidget(QtWidgets.QLabel('Offset Group'), 1, 0)
+        gridLayout.addWidget( self.offsetGroupLineEdit, 1, 1)
+        gridLayout.addWidget( self.offsetGroupBut, 1, 2)
+        
+        subLayout = QtWidgets.QHBoxLayout()
+        subLayout.setSpacing(2)
+        subLayout.addWidget(self.addBut)
+        subLayout.addWidget(self.removeBut)
+    
+        # -----------------------------------------
+        butLayout = QtWidgets.QHBoxLayout()
+        butLayout.setSpacing(2)
+        butLayout.addWidget(self.createBut)
+        butLayout.addWidget(self.mirrorBut)
+        butLayout.addWidget(self.deleteBut)
+        
+        # -----------------------------------------
+        # buts layout
+        consCheckboxLayout = QtWidgets.QHBoxLayout()
+        consCheckboxLayout.setSpacing(5)
+        consCheckboxLayout.addWidget(self.positionCheckBox)
+        consCheckboxLayout.addWidget(self.rotationCheckBox)
+        consCheckboxLayout.addWidget(self.scaleCheckBox)
+        consCheckboxLayout.addWidget(self.parentCheckBox)
+        consCheckboxLayout.addWidget(self.modeBox)
+         
+        # -----------------------------------------
+        mainLayout.addLayout(targetsLayout)
+        mainLayout.addWidget(LineShape())
+        mainLayout.addLayout(gridLayout)
+        mainLayout.addLayout(subLayout)
+        mainLayout.addLayout(consCheckboxLayout)
+        
+        #mainLayout.addWidget(LineShape())
+        mainLayout.addWidget(self.targetsView)
+        mainLayout.addLayout(butLayout)
+        #mainLayout.addStretch()
+        
+    def createWidgets(self):
+
+        # one model for the scene meta nodes, the combo only shows the filtered rows
+        self.metaModel = MetaNodeModel(self)
+        self.metaProxy = MetaFilterModel(self)
+        self.metaProxy.setSourceModel(self.metaModel)
+        self.targetsBox = QtWidgets.QComboBox()
+        self.targetsBox.setModel(self.metaProxy)
+        self.targetsBox.view().setUniformItemSizes(True)
+        self.filterLineEdit = QtWidgets.QLineEdit()
+        self.filterLineEdit.setPlaceholderText('Search')
+        self.filterLineEdit.setClearButtonEnabled(True)
+        self.filterLineEdit.setFixedWidth(90)
+        self.updateBut  = QtWidgets.QPushButton()
+        self.updateBut.setFixedSize(26, 26)
+        self.updateBut.setIcon(QtGui.QIcon(':refresh.png'))
+        # ----------------------------------------
+        self.sourceLineEdit = QtWidgets.QLineEdit()
+        self.sourceLineEdit.setReadOnly(True)
+        self.sourceBut = QtWidgets.QPushButton()
+        self.sourceBut.setIcon(QtGui.QIcon(':moveUVLeft.png'))
+        
+        self.sourceBut.setFixedSize(28, 28)
+        self.offsetGroupLineEdit = QtWidgets.QLineEdit()
+        self.offsetGroupLineEdit.setReadOnly(True)
+        self.offsetGroupBut = QtWidgets.QPushButton()
+        self.offsetGroupBut.setIcon(QtGui.QIcon(':moveUVLeft.png'))
+        self.offsetGroupBut.setFixedSize(28, 28)
+        
+        # ----------------------------------------
+        self.addBut = QtWidgets.QPushButton('Add')
+        self.addBut.setFixedHeight(30)
+        self.removeBut = QtWidgets.QPushButton('Remove')
+        self.removeBut.setFixedHeight(30)
+        
+        # ----------------------------------------
+        self.targetModel = TargetModel(self)
+        self.targetsView = QtWidgets.QTableView()
+        self.targetsView.setModel(self.targetModel)
+        self.targetsView.setItemDelegate(TargetDelegate(self.targetsView))
+        self.targetsView.setAlternatingRowColors(True)
+        self.targetsView.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.targetsView.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.targetsView.setEditTriggers(QtWidgets.QAbstractItemView.DoubleClicked | 
+                                         QtWidgets.QAbstractItemView.EditKeyPressed)
+        self.targetsView.verticalHeader().setVisible(False)
+        self.targetsView.verticalHeader().setDefaultSectionSize(26)
+        self.targetsView.horizontalHeader().setStretchLastSection(True)
+        
+        # ----------------------------------------
+        self.positionCheckBox = QtWidgets.QCheckBox('point')
+        self.rotationCheckBox = QtWidgets.QCheckBox('orient')
+        self.scaleCheckBox = QtWidgets.QCheckBox('Scale')
+        self.parentCheckBox = QtWidgets.QCheckBox('Parent')
+        self.modeBox = QtWidgets.QComboBox()
+        self.modeBox.addItems(SpaceSwitchMeta.MODES)
+        self.modeBox.setToolTip('condition: one condition node per constraint and target\n'
+                                'shared: one condition node per target\n'
+                                'matrix: offsetParentMatrix, no locators or constraints (Maya 2020+)')
+        
+        # ----------------------------------------
+        self.createBut = QtWidgets.QPushButton('Create')
+        self.createBut.setFixedHeight(30)
+        self.mirrorBut = QtWidgets.QPushButton('Mirror')
+        self.mirrorBut.setFixedHeight(30)
+        self.mirrorBut.setToolTip('build the same switch on the other side of the rig (L_ / R_, _l / _r)')
+        self.deleteBut = QtWidgets.QPushButton('Delete')
+        self.deleteBut.setFixedHeight(30)
+ 
+    def createConnections(self):
+        self.addBut.clicked.connect(self.addTarget)
+        self.removeBut.clicked.connect(self.removeTarget)
+        self.parentCheckBox.clicked.connect(self.parentTo)
+        
+        self.sourceBut.clicked.connect(self.addSourceNode)
+        self.offsetGroupBut.clicked.connect(self.addOffsetGroupNode)
+
+        self.createBut.clicked.connect(self.createSpaceSwitch)
+        self.mirrorBut.clicked.connect(self.mirrorSpaceSwitch)
+        self.deleteBut.clicked.connect(self.deleteSpaceSwitch)
+        
+        '''
+        The activated signal is only emitted when the user manually selects an item
+        it will not be triggered by programmatically selecting an item
+        '''
+        self.targetsBox.activated.connect(self.updateData)
+        self.filterLineEdit.textChanged.connect(self.filterMetaNodes)
+        
+        # update ui
+        #self.shortcut = QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+Z"), self)
+        #self.shortcut.activated.connect(self._updateUI_)
+        self.updateBut.clicked.connect(self._updateUI_)
+        
+    # ----------------------------------------------------------------    
+    def _updateUI_(self):
+        self.getMeta() # rows are diffed in place, the current item is kept
+    
+    # --------------------------------------------------------------------------    
+    def metaExists(self, obj):
+        metaNode = MetaUtils.metaOfSource(obj)
+        if metaNode is None:
+            return
+        row = self.metaModel.rowOf(metaNode)
+        if row < 0: # built since the last refresh
+            self.metaModel.sync(MetaUtils.getMetaNodes())
+            row = self.metaModel.rowOf(metaNode)
+        self.setCurrentRow(row)
+        self.setWidgetData(SpaceSwitchMeta.readSummaries([metaNode])[0])
+        return True
+                
+    def addSourceNode(self):
+        sel = getSelection()
+        if not sel:
+            return om2.MGlobal.displayWarning('Please select an object')
+            
+        name, longName = getNodeLongName(sel[0])
+        
+        
+        if self.metaExists(longName):
+            return
+        # -------------------------------------------------------
+        self.sourceLineEdit.setText(name)
+        self.sourceLong = longName
+        
+        if isinstance(sel[0], om2.MFnDependencyNode):
+            return
+        parent = cmds.listRelatives(longName, p=True, f=True) # get parent longName
+        if parent:
+            self.offsetGroupLineEdit.setText(parent[0].split('|')[-1])
+            self.offsetGroupLong = parent[0]
+        
+    # -------------------------------------------------------------------------- 
+    
+    def addOffsetGroupNode(self):
+        sel = getSelection()
+        if not sel:
+            return om2.MGlobal.displayWarning('Please select an object')
+        
+        if isinstance(sel[0], om2.MFnDependencyNode):
+            return om2.MGlobal.displayWarning('Please select an dagNode')
+            
+        name, longName = getNodeLongName(sel[0])
+        self.offsetGroupLineEdit.setText(name)
+        self.offsetGroupLong = longName
+    # --------------------------------------------------------------------------
+    def addTarget(self):
+        row = self.targetModel.appendTarget()
+        index = self.targetModel.index(row, 0)
+        self.targetsView.setCurrentIndex(index)
+        self.targetsView.edit(index)
+
+    def removeTarget(self):
+        '''
+        remove the selected target, the last one when nothing is selected
+        '''
+        index = self.targetsView.currentIndex()
+        self.targetModel.removeTarget(index.row() if index.isValid() else -1)
+        
+    # ---------------------------------------------------------------
+    def getWidgetData(self):
+        data = {}
+        data['source']      = self.sourceLong
+        data['offsetGroup'] = self.offsetGroupLong
+        data['conType']     = {'point':self.positionCheckBox.isChecked(),
+                               'orient':self.rotationCheckBox.isChecked(),
+                               'scale'   :self.scaleCheckBox.isChecked(),
+                               'parent'  :self.parentCheckBox.isChecked()}
+        data['mode']        = self.modeBox.currentText()
+                               
+        data['targetWidgets'] = self.targetModel.targets()
+        return data
+        
+    def setWidgetData(self, data):
+
+        self.sourceLineEdit.setText(data.get('source').split('|')[-1])
+        self.sourceLong = data.get('source')
+        self.offsetGroupLineEdit.setText(data.get('offsetGroup').split('|')[-1])
+        self.offsetGroupLong = data.get('offsetGroup')
+        
+        # ------------------------------------------------------------------------
+
+        self.positionCheckBox.setChecked(data.get('conType')['point'])
+        self.rotationCheckBox.setChecked(data.get('conType')['orient'])
+        self.scaleCheckBox.setChecked(data.get('conType')['scale'])
+        self.parentCheckBox.setChecked(data.get('conType')['parent'])
+        
+        # --------------------------------------------------
+        # update checkbox state
+        self.pBoxState = data.get('conType')['point']
+        self.rBoxState = data.get('conType')['orient']
+        self.parentTo()
+        self.modeBox.setCurrentText(data.get('mode', SpaceSwitchMeta.MODES[0]))
+        
+        # ------------------------------------------------------------------------
+        self.targetModel.setTargets(data.get('targetWidgets', {}))
+            
+    # --------------------------------------------------------------------------------
+    def deleteTargetItemAndMeta(self):
+
+        row      = self.currentRow()
+        itemData = self.metaModel.meta(row)
+        if itemData is not None:
+            del itemData.nodeData
+            self.metaModel.remove(row)
+            
+    # -----------------------------------------------------------------------------       
+    def checkData(self, data, replacing=()):
+        errors = validateSpecs([data], replacing)
+        if errors:
+            return om2.MGlobal.displayWarning(errors[0][1])
+        return True
+        
+    # -----------------------------------------------------------------------------       
+    @addUndo        
+    def createSpaceSwitch(self): 
+        data     = self.getWidgetData()
+        row      = self.currentRow()
+        itemData = self.metaModel.meta(row)
+  
+        if not self.checkData(data, [] if itemData is None else [itemData.source]):
+            return
+            
+        # ---------------------------------------------------------------- 
+        if itemData is not None: # update the existing switch in place, its keys are kept
+            try:
+                metaNodeInstance = itemData.edit(data)
+            except ValueError as e:
+                return om2.MGlobal.displayWarning(str(e))
+            self.metaModel.replace(row, metaNodeInstance)
+            cmds.select(metaNodeInstance.source, ne=True)
+            return
+
+        # ----------------------------------------------------------------
+        metaNodeName = MetaUtils.uniqueName('{}_spaceSwitch_META'.format(data['source'].split('|')[-1]))
+        metaNodeInstance = SpaceSwitchMeta(metaNodeName)
+        metaNodeInstance.nodeData = data
+        self.setCurrentRow(self.metaModel.add(metaNodeInstance))
+      
+    def mirrorSpaceSwitch(self):
+        itemData = self.currentMeta()
+        if itemData is None:
+            return om2.MGlobal.displayWarning('Please select a space switch to mirror')
+        result = SpaceSwitchMeta.mirrorMany([itemData])
+        for metaNode, message in result['skipped']:
+            om2.MGlobal.displayWarning('{}: {}'.format(metaNode, message))
+        self.getMeta()
+        if result['metas']:
+            self.setCurrentRow(self.metaModel.rowOf(result['metas'][0]))
+            self.updateData()
+      
+    @addUndo  
+    def deleteSpaceSwitch(self):
+        
+        self.deleteTargetItemAndMeta()
+        self.updateData()